@@ -1,106 +1,325 @@
 #!/usr/bin/env python3
 """
-Scan all JSON files in assets/inventory_data for keys in `in_combat_stats` 
-or `out_of_combat_stats` that are not defined in web/optimizer/src/model/base.ts.
+Validate the buff JSON files in web/optimizer/public/game-data against the TS model.
+
+Checks every buff in character_data_buff, weapon_data_buff (talents[].buffs) and
+equipment_data_buff (two/four_piece_buffs):
+- stat keys in in_combat_stats / out_of_combat_stats exist in PropertyType (base.ts)
+- stat values are finite numbers; percentage stats (names ending in "_") stay in range
+- conversion blocks have the shape Buff.fromDict reads, with PropertyType endpoints
+- target blocks only use the BuffTarget flags, as booleans, with at least one set
+- source is a BuffSource member, stack_mode / max_stacks are valid
+
+Files are parsed once each, in a process pool. Results are cached per file sha256
+(plus a fingerprint of the enums and rules), so re-runs only touch changed files.
+A machine-readable report is written; the exit code is 1 when any error is found,
+so a data publish can be gated on it.
+
+Usage:
+    python scripts/analyze_buff_types.py
+    python scripts/analyze_buff_types.py --json          # print the report to stdout
+    python scripts/analyze_buff_types.py --only-changed  # records changed since the last clean --only-changed/full run
 """
 
+import argparse
+import hashlib
 import json
+import math
+import os
 import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from collections import defaultdict
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from record_manifest import acknowledge, load_changed_ids
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BASE_TS_PATH = PROJECT_ROOT / "web" / "optimizer" / "src" / "model" / "base.ts"
+BUFF_TS_PATH = PROJECT_ROOT / "web" / "optimizer" / "src" / "model" / "buff.ts"
+DATA_DIR = PROJECT_ROOT / "web" / "optimizer" / "public" / "game-data"
+CACHE_PATH = DATA_DIR / "buff_validation_cache.json"
+REPORT_PATH = DATA_DIR / "buff_validation_report.json"
+
+# Consumer name in record_manifest.json; acknowledged after a run without errors.
+RECORD_CONSUMER = "buff_validation"
+# Bump when a rule changes so cached results are re-validated.
+RULES_VERSION = 1
+
+# (directory, record_manifest category)
+BUFF_DIRECTORIES = [
+    ("character_data_buff", "character"),
+    ("weapon_data_buff", "weapon"),
+    ("equipment_data_buff", "equipment"),
+]
+
+TARGET_FLAGS = frozenset({"target_self", "target_enemy", "target_teammate", "target_bund"})
+STACK_MODES = frozenset({"linear", "full_only"})
+# Keys Buff.fromDict reads from a conversion block
+CONVERSION_REQUIRED = ("from_property", "to_property", "conversion_ratio")
+CONVERSION_OPTIONAL = frozenset({"max_value", "from_property_threshold"})
+# Percentage stats are stored as fractions (0.35 == 35%)
+PERCENT_RANGE = (-1.0, 2.0)
+
+# Below this many files, validating inline is faster than starting worker processes.
+MIN_FILES_FOR_POOL = 16
+
+
+def parse_ts_enum(path: Path, name: str) -> Dict[str, int]:
+    """Return {member: value} for a numeric `export enum <name>` in a TS file."""
+    content = path.read_text(encoding="utf-8")
+    match = re.search(r"export enum " + re.escape(name) + r" \{([^}]+)\}", content, re.DOTALL)
+    if not match:
+        raise ValueError(f"enum {name} not found in {path}")
+    return {
+        key: int(value)
+        for key, value in re.findall(r"^\s*([A-Za-z0-9_]+)\s*=\s*(-?\d+)", match.group(1), re.MULTILINE)
+    }
+
+
+def get_valid_properties() -> set:
+    """PropertyType member names from base.ts."""
+    return set(parse_ts_enum(BASE_TS_PATH, "PropertyType"))
+
+
+def iter_buffs(data: Any) -> Iterator[Tuple[str, Any]]:
+    """Yield (location, buff) for the three buff file layouts."""
+    if isinstance(data, list):
+        for i, buff in enumerate(data):
+            yield f"[{i}]", buff
+    elif isinstance(data, dict):
+        for key in ("two_piece_buffs", "four_piece_buffs"):
+            for i, buff in enumerate(data.get(key) or []):
+                yield f"{key}[{i}]", buff
+        for t, talent in enumerate(data.get("talents") or []):
+            for i, buff in enumerate(talent.get("buffs") or []):
+                yield f"talents[{t}].buffs[{i}]", buff
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def validate_buff(buff: Any, props: FrozenSet[str], sources: FrozenSet[str]) -> List[Tuple[str, str, str]]:
+    """Return [(level, code, message)] for one buff."""
+    issues: List[Tuple[str, str, str]] = []
+    if not isinstance(buff, dict):
+        return [("error", "buff_shape", f"buff is {type(buff).__name__}, expected object")]
+
+    for block in ("in_combat_stats", "out_of_combat_stats"):
+        stats = buff.get(block)
+        if stats is None:
+            continue
+        if not isinstance(stats, dict):
+            issues.append(("error", "stats_shape", f"{block} is {type(stats).__name__}, expected object"))
+            continue
+        for key, value in stats.items():
+            if key not in props:
+                issues.append(("error", "unknown_property", f"{block}.{key} is not a PropertyType"))
+            if not _is_number(value):
+                issues.append(("error", "bad_value", f"{block}.{key} = {value!r} is not a finite number"))
+            elif value == 0:
+                issues.append(("warning", "zero_value", f"{block}.{key} is 0"))
+            elif key.endswith("_") and not PERCENT_RANGE[0] <= value <= PERCENT_RANGE[1]:
+                issues.append(("warning", "range", f"{block}.{key} = {value} is outside {PERCENT_RANGE} for a percentage"))
+
+    conversion = buff.get("conversion")
+    if conversion is not None:
+        if not isinstance(conversion, dict):
+            issues.append(("error", "conversion_shape", f"conversion is {type(conversion).__name__}, expected object"))
+        else:
+            missing = [k for k in CONVERSION_REQUIRED if k not in conversion]
+            extra = sorted(set(conversion) - set(CONVERSION_REQUIRED) - CONVERSION_OPTIONAL)
+            if missing:
+                issues.append(("error", "conversion_shape", f"conversion is missing {missing} (unsupported keys: {extra})"))
+            elif extra:
+                issues.append(("warning", "conversion_shape", f"conversion has keys the loader ignores: {extra}"))
+            for key in ("from_property", "to_property"):
+                if key in conversion and conversion[key] not in props:
+                    issues.append(("error", "unknown_property", f"conversion.{key} = {conversion[key]!r} is not a PropertyType"))
+            ratio = conversion.get("conversion_ratio")
+            if "conversion_ratio" in conversion and not (_is_number(ratio) and ratio > 0):
+                issues.append(("error", "bad_value", f"conversion.conversion_ratio = {ratio!r} must be a positive number"))
+            for key in CONVERSION_OPTIONAL:
+                value = conversion.get(key)
+                if value is not None and not (_is_number(value) and value >= 0):
+                    issues.append(("error", "bad_value", f"conversion.{key} = {value!r} must be a non-negative number"))
+
+    target = buff.get("target")
+    if target is not None:
+        if not isinstance(target, dict):
+            issues.append(("error", "target_shape", f"target is {type(target).__name__}, expected object"))
+        else:
+            unknown = sorted(set(target) - TARGET_FLAGS)
+            if unknown:
+                issues.append(("error", "target_shape", f"target has unknown flags {unknown}"))
+            non_bool = sorted(k for k, v in target.items() if not isinstance(v, bool))
+            if non_bool:
+                issues.append(("error", "target_shape", f"target flags {non_bool} are not booleans"))
+            # Buff.fromDict defaults target_self to true when it is absent
+            if not any(target.get(k, k == "target_self") for k in TARGET_FLAGS):
+                issues.append(("error", "target_shape", "target selects nobody"))
+
+    source = buff.get("source")
+    if isinstance(source, str) and source not in sources:
+        issues.append(("error", "unknown_source", f"source {source!r} is not a BuffSource"))
+
+    stack_mode = buff.get("stack_mode")
+    if stack_mode is not None and stack_mode not in STACK_MODES:
+        issues.append(("error", "stack_mode", f"stack_mode {stack_mode!r} is not one of {sorted(STACK_MODES)}"))
+    max_stacks = buff.get("max_stacks")
+    if max_stacks is not None and not (isinstance(max_stacks, int) and not isinstance(max_stacks, bool) and max_stacks >= 1):
+        issues.append(("error", "max_stacks", f"max_stacks {max_stacks!r} must be a positive integer"))
 
-BASE_TS_PATH = Path("web/optimizer/src/model/base.ts")
-DATA_DIR = Path("assets/inventory_data")
+    return issues
 
-def get_valid_properties():
-    """Extracts PropertyType keys from base.ts"""
-    valid_props = set()
+
+def validate_file(rel_path: str, data: bytes, props: FrozenSet[str], sources: FrozenSet[str]) -> List[Dict[str, str]]:
+    """Parse one file and validate all of its buffs. Runs in a worker process."""
     try:
-        with open(BASE_TS_PATH, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Find the PropertyType enum block
-            match = re.search(r'export enum PropertyType \{([^}]+)\}', content, re.DOTALL)
-            if match:
-                enum_body = match.group(1)
-                # Extract keys like HP_BASE, ATK_, etc.
-                # Lines look like: HP_BASE = 11001, // ...
-                keys = re.findall(r'^\s*([A-Z0-9_]+)\s*=', enum_body, re.MULTILINE)
-                valid_props.update(keys)
-    except Exception as e:
-        print(f"Error reading base.ts: {e}")
-    return valid_props
-
-def scan_files(valid_props):
-    """Scans JSON files for invalid properties"""
-    invalid_props = defaultdict(list)
-    
-    # Directories to scan
-    dirs_to_scan = [
-        DATA_DIR / "character_data_buff",
-        DATA_DIR / "equipment_data_buff",
-        DATA_DIR / "weapon_data_buff"
-    ]
-
-    for d in dirs_to_scan:
-        if not d.exists():
+        parsed = json.loads(data)
+    except json.JSONDecodeError as e:
+        return [{"file": rel_path, "buff": "", "level": "error", "code": "json", "message": str(e)}]
+
+    results = []
+    for location, buff in iter_buffs(parsed):
+        buff_id = buff.get("id", location) if isinstance(buff, dict) else location
+        for level, code, message in validate_buff(buff, props, sources):
+            results.append({"file": rel_path, "buff": buff_id, "level": level, "code": code, "message": message})
+    return results
+
+
+def _validate_job(job: Tuple[str, bytes, FrozenSet[str], FrozenSet[str]]) -> List[Dict[str, str]]:
+    return validate_file(*job)
+
+
+def collect_files(only_changed: bool) -> List[Path]:
+    files = []
+    for dir_name, category in BUFF_DIRECTORIES:
+        directory = DATA_DIR / dir_name
+        if not directory.exists():
             continue
-            
-        for json_file in d.glob("*.json"):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                # Handle list of buffs (character/weapon) or object with list (equipment)
-                buffs = []
-                if isinstance(data, list):
-                    buffs = data
-                elif isinstance(data, dict):
-                    # Equipment file structure
-                    if "two_piece_buffs" in data:
-                        buffs.extend(data["two_piece_buffs"])
-                    if "four_piece_buffs" in data:
-                        buffs.extend(data["four_piece_buffs"])
-                    # Weapon file structure might be a dict with specific keys or list
-                    # If it's the new format, it's a list. If old, might be different.
-                    # Assuming list for weapon_data_buff based on previous interactions
-                    
-                for buff in buffs:
-                    if not isinstance(buff, dict):
-                        continue
-                        
-                    stats_blocks = [buff.get("in_combat_stats", {}), buff.get("out_of_combat_stats", {})]
-                    
-                    for stats in stats_blocks:
-                        if not stats:
-                            continue
-                        for key in stats.keys():
-                            if key not in valid_props:
-                                invalid_props[key].append(str(json_file))
-                                
-            except Exception as e:
-                print(f"Error reading {json_file}: {e}")
-
-    return invalid_props
-
-def main():
-    print("Extracting valid properties from base.ts...")
-    valid_props = get_valid_properties()
-    print(f"Found {len(valid_props)} valid properties.")
-    
-    print("\nScanning data files for unsupported properties...")
-    invalid_props = scan_files(valid_props)
-    
-    if not invalid_props:
-        print("\n✅ All properties are supported!")
+        changed = load_changed_ids(category, RECORD_CONSUMER) if only_changed else None
+        files.extend(
+            path for path in sorted(directory.glob("*.json"))
+            if changed is None or path.stem in changed
+        )
+    return files
+
+
+def load_cache(fingerprint: str) -> Dict[str, dict]:
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return cache.get("files", {}) if cache.get("fingerprint") == fingerprint else {}
+
+
+def save_json(data: Any, path: Path) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def run_validation(only_changed: bool = False, workers: Optional[int] = None, use_cache: bool = True) -> Dict[str, Any]:
+    """Validate all buff files and return the report."""
+    props = frozenset(get_valid_properties())
+    sources = frozenset(parse_ts_enum(BUFF_TS_PATH, "BuffSource"))
+    fingerprint = hashlib.sha256(
+        json.dumps([RULES_VERSION, sorted(props), sorted(sources)]).encode("utf-8")
+    ).hexdigest()
+    cache = load_cache(fingerprint) if use_cache else {}
+
+    files = collect_files(only_changed)
+    results: Dict[str, dict] = {}
+    jobs = []
+    for path in files:
+        rel_path = path.relative_to(DATA_DIR).as_posix()
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        cached = cache.get(rel_path)
+        if cached and cached.get("sha256") == digest:
+            results[rel_path] = cached
+        else:
+            results[rel_path] = {"sha256": digest, "issues": None}
+            jobs.append((rel_path, data, props, sources))
+
+    if len(jobs) >= MIN_FILES_FOR_POOL and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_validate_job, jobs, chunksize=max(1, len(jobs) // 32)))
+    else:
+        outputs = [_validate_job(job) for job in jobs]
+    for job, issues in zip(jobs, outputs):
+        results[job[0]]["issues"] = issues
+
+    # Keep cache entries of files outside this run (e.g. --only-changed) as long as they still exist.
+    merged = {k: v for k, v in cache.items() if (DATA_DIR / k).exists()}
+    merged.update(results)
+    save_json({"fingerprint": fingerprint, "files": merged}, CACHE_PATH)
+
+    issues = [issue for rel_path in sorted(results) for issue in results[rel_path]["issues"]]
+    levels = Counter(issue["level"] for issue in issues)
+    return {
+        "rules_version": RULES_VERSION,
+        "property_count": len(props),
+        "files": len(results),
+        "validated": len(jobs),
+        "cached": len(results) - len(jobs),
+        "errors": levels.get("error", 0),
+        "warnings": levels.get("warning", 0),
+        "by_code": dict(sorted(Counter(issue["code"] for issue in issues).items())),
+        "issues": issues,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"PropertyType members: {report['property_count']}")
+    print(f"Files: {report['files']} ({report['validated']} validated, {report['cached']} cached)")
+    if not report["issues"]:
+        print("\n✅ All buffs are valid!")
+        return
+
+    print(f"\n{'❌' if report['errors'] else '⚠️'} {report['errors']} errors, {report['warnings']} warnings\n")
+    by_message: Dict[Tuple[str, str, str], List[str]] = {}
+    for issue in report["issues"]:
+        by_message.setdefault((issue["level"], issue["code"], issue["message"]), []).append(
+            f"{issue['file']} ({issue['buff']})"
+        )
+    for (level, code, message), where in sorted(by_message.items()):
+        print(f"- [{level}] {code}: {message}")
+        # Show first 3 locations
+        for w in where[:3]:
+            print(f"  - {w}")
+        if len(where) > 3:
+            print(f"  - ... and {len(where) - 3} more")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Validate buff JSON files against PropertyType / BuffSource and the Buff model.")
+    parser.add_argument("--only-changed", action="store_true", help="Only scan records changed since this script last ran without errors (record_manifest.json).")
+    parser.add_argument("--json", action="store_true", help="Print the machine-readable report to stdout.")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH, help="Where to write the JSON report.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = inline).")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached results and re-validate every file.")
+    args = parser.parse_args()
+
+    report = run_validation(only_changed=args.only_changed, workers=args.workers, use_cache=not args.no_cache)
+    save_json(report, args.report)
+    if not report["errors"]:
+        # Files with errors stay pending so the next --only-changed run reports them again.
+        acknowledge(RECORD_CONSUMER, [category for _, category in BUFF_DIRECTORIES])
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
     else:
-        print(f"\n❌ Found {len(invalid_props)} unsupported properties:\n")
-        for prop, files in sorted(invalid_props.items()):
-            print(f"- {prop}:")
-            # Show first 3 files
-            for f in files[:3]:
-                print(f"  - {f}")
-            if len(files) > 3:
-                print(f"  - ... and {len(files) - 3} more files")
+        print_report(report)
+        print(f"\nReport written to {args.report}")
+    return 1 if report["errors"] else 0
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+搜索模式对比基准
+
+对存档中的任务分别运行基准模式与各对比模式，检查 TopN 是否一致，并报告耗时与少做的评估数。
+模式写作 <引擎>[+flat][+bound]：
+
+- 引擎：scalar（逐组合评估）、incremental（增量 DFS 评估）、numpy（按块向量化）
+- +flat：scalar / incremental 不按套装构成模板枚举，逐层检查 4 件套门槛
+- +bound：分支定界（按伤害上界跳过子树，stats.boundSkipped；numpy 只在前缀层检查，
+  伤害目标下通常跳过 0，见 VectorEvaluator）
+
+任务来源与 optimize_saves.py 相同（默认每个存档的全部队伍，或 --jobs 任务列表）；
+不给存档时使用 scripts/fixtures 下的夹具存档；--modes all 对比基准以外的全部模式。
+默认不做支配剪枝，以便在完整的组合空间上对比。
+
+夹具中的 duplicate_discs_save.json 含成对的重复盘，TopN 边界上有大量逐位相同的同分组合，
+用来检查各模式的同分取舍（按枚举顺序）是否一致；修改评估器或搜索后先跑一遍夹具：
+    python scripts/bench_search.py --baseline incremental --modes all
+
+使用方式：
+    python scripts/bench_search.py saves/account1.json
+    python scripts/bench_search.py saves/account1.json --baseline scalar --modes incremental incremental+bound
+    python scripts/bench_search.py saves/account1.json --baseline numpy --modes numpy+bound --top-n 20
+    python scripts/bench_search.py saves/account1.json --baseline scalar+flat --modes scalar
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import vector_evaluator
+from dominance_pruning import prune_dominated
+from optimize_saves import DEFAULT_TOP_N, ENGINES, collect_jobs, job_request, load_save
+from optimizer_context import DATA_DIR, GameData
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+TEMPLATE_ENGINES = ("scalar", "incremental")
+MODES = [
+    f"{engine}{flat}{bound}"
+    for engine in ENGINES
+    for flat in (("", "+flat") if engine in TEMPLATE_ENGINES else ("",))
+    for bound in ("", "+bound")
+]
+
+
+def parse_mode(mode: str) -> Tuple[str, Dict[str, bool]]:
+    """模式 -> (引擎, 搜索参数)"""
+    engine, *options = mode.split("+")
+    kwargs = {"bound": "bound" in options}
+    if "flat" in options:
+        kwargs["templates"] = False
+    return engine, kwargs
+
+
+def run_mode(mode: str, pre, top_n: int) -> dict:
+    engine, kwargs = parse_mode(mode)
+    start = time.perf_counter()
+    result = ENGINES[engine](pre, top_n=top_n, **kwargs)
+    elapsed = time.perf_counter() - start
+    stats = result["stats"]
+    return {
+        "seconds": elapsed,
+        "evaluated": stats["totalProcessed"],
+        "skipped": stats.get("boundSkipped", 0),
+        "top": [(b["damage"], tuple(b["discIds"])) for b in result["builds"]],
+    }
+
+
+def bench_job(game: GameData, save: dict, job: dict, top_n: int, baseline: str, modes: List[str], prune: bool) -> bool:
+    header, pre, _ = job_request(game, save, job)
+    top_n = int(job.get("topN", top_n))
+    if prune:
+        pre, _ = prune_dominated(pre, top_n)
+    base = run_mode(baseline, pre, top_n)
+    label = f"{job['save']} · {job.get('team') or job.get('character')} ({header['character']['key']})"
+    print(f"{label}: {baseline} 计算 {base['evaluated']:,}，{base['seconds']:.2f}s")
+    ok = True
+    for mode in modes:
+        result = run_mode(mode, pre, top_n)
+        same = result["top"] == base["top"]
+        ok = ok and same
+        avoided = base["evaluated"] - result["evaluated"]
+        speedup = base["seconds"] / result["seconds"] if result["seconds"] > 0 else float("inf")
+        print(
+            f"  {'✓' if same else '✗'} {mode}: 计算 {result['evaluated']:,}（少 {avoided:,}，"
+            f"跳过组合 {result['skipped']:,}），{result['seconds']:.2f}s，x{speedup:.2f}，"
+            f"TopN {'一致' if same else '不一致'}"
+        )
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="对比搜索模式（TopN 一致性 / 耗时 / 评估数）")
+    parser.add_argument("saves", nargs="*", help="存档导出 JSON（默认：scripts/fixtures 下的夹具存档）")
+    parser.add_argument("--jobs", type=Path, help="任务列表 JSON（默认：每个存档的全部队伍）")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N, help=f"每个任务保留的结果数（默认 {DEFAULT_TOP_N}）")
+    parser.add_argument("--baseline", choices=MODES, default="scalar", help="基准模式（默认 scalar）")
+    parser.add_argument("--modes", nargs="+", choices=MODES + ["all"], default=["incremental", "scalar+bound"],
+                        help="参与对比的模式（默认 incremental scalar+bound；all 为基准以外的全部模式）")
+    parser.add_argument("--prune", action="store_true", help="先做候选盘支配剪枝")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="game-data 目录")
+    args = parser.parse_args()
+    if "all" in args.modes:
+        args.modes = [m for m in MODES if m != args.baseline]
+    saves = args.saves or [str(p) for p in sorted(FIXTURES_DIR.glob("*.json"))]
+
+    if vector_evaluator.np is None and any(parse_mode(m)[0] == "numpy" for m in [args.baseline] + args.modes):
+        print("✗ numpy 模式需要 numpy（pip install numpy）")
+        return 1
+
+    try:
+        grouped = collect_jobs(saves, args.jobs)
+    except (ValueError, OSError) as e:
+        print(f"✗ {e}")
+        return 1
+
+    game = GameData(args.data_dir)
+    failed = 0
+    for path, jobs in grouped.items():
+        save = load_save(Path(path))
+        for job in jobs:
+            try:
+                if not bench_job(game, save, job, args.top_n, args.baseline, args.modes, args.prune):
+                    failed += 1
+            except (ValueError, FileNotFoundError) as e:
+                failed += 1
+                print(f"✗ {path} · {job.get('team') or job.get('character')}: {e}")
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
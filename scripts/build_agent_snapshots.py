@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+角色静态属性快照（优化器用）
+
+优化开始时 agent.ts / optimizer-context.ts 会从 character/{id}.json 重新计算成长属性、
+固定属性和核心技加成，这些只取决于游戏数据。本脚本离线算好，按 property-index.ts 的
+PROP_IDX 顺序写成 Float64 行向量：
+
+- agent_snapshots.bin:  所有行（小端 Float64，只保存用到的属性列）
+- agent_snapshots.json: 清单：列 -> PROP_IDX、每个角色的起始行、角色 Buff 的属性（已解析为 PROP_IDX）
+
+每个角色固定 ROWS 行，任意 (等级, 突破, 核心技等级) 的局外面板为：
+    base + ((level - 1) * growth) / 10000 + promotion[突破] + core[核心技等级 - 1]
+与 Agent.getGrowthStats / getBaseStats / getCoreSkillStats 的计算方式相同。
+
+character_data_buff 的 Buff 属性同样按 PROP_IDX 预先解析（稀疏 [索引, 数值] 列表），
+触发条件 / 转换仍由运行时按 Buff ID 从原文件读取。
+
+使用方式：
+    python scripts/build_agent_snapshots.py
+"""
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from analyze_buff_types import BASE_TS_PATH, parse_ts_enum
+from extract_core_skill_props import build_catalogue
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = PROJECT_ROOT / "web" / "optimizer" / "public" / "game-data"
+PROPERTY_INDEX_TS_PATH = PROJECT_ROOT / "web" / "optimizer" / "src" / "optimizer" / "types" / "property-index.ts"
+SNAPSHOT_NAME = "agent_snapshots"
+SNAPSHOT_VERSION = 1
+
+PROMOTIONS = 6
+CORE_LEVELS = 7
+# 每个角色的行布局
+ROWS = ["base", "growth"] + [f"promotion{p}" for p in range(PROMOTIONS)] + [f"core{c}" for c in range(1, CORE_LEVELS + 1)]
+
+# 成长属性：Stats 字段 (基础值, 成长值) -> PropertyType，与 Agent.getGrowthStats 一致
+GROWTH_STATS = {
+    "HP_BASE": ("HpMax", "HpGrowth"),
+    "ATK_BASE": ("Attack", "AttackGrowth"),
+    "DEF_BASE": ("Defence", "DefenceGrowth"),
+}
+# 突破加成：Level[突破 + 1] 的字段
+PROMOTION_STATS = {"HP_BASE": "HpMax", "ATK_BASE": "Attack", "DEF_BASE": "Defence"}
+# 固定属性：Stats 字段 -> (PropertyType, 除数)，与 Agent.getBaseStats 一致
+BASE_STATS = {
+    "BreakStun": ("IMPACT", None),
+    "Crit": ("CRIT_", 10000),
+    "CritDamage": ("CRIT_DMG_", 10000),
+    "ElementAbnormalPower": ("ANOM_MAS", None),
+    "ElementMystery": ("ANOM_PROF", None),
+    "SpRecover": ("ENER_REGEN", 100),
+    "PenDelta": ("PEN", None),
+    "PenRate": ("PEN_", 100),
+    "Shield": ("SHIELD_", None),
+}
+
+
+def parse_prop_idx(path: Path = PROPERTY_INDEX_TS_PATH) -> Dict[str, int]:
+    """property-index.ts 的 PROP_IDX（不含 TOTAL_PROPS）"""
+    content = path.read_text(encoding="utf-8")
+    match = re.search(r"export const PROP_IDX = \{(.*?)\} as const;", content, re.DOTALL)
+    if not match:
+        raise ValueError(f"PROP_IDX not found in {path}")
+    return {
+        name: int(idx)
+        for name, idx in re.findall(r"^\s*([A-Z0-9_]+):\s*(\d+),", match.group(1), re.MULTILINE)
+        if name != "TOTAL_PROPS"
+    }
+
+
+class PropResolver:
+    """PropertyType 成员名 / 枚举值 -> PROP_IDX（别名按枚举值解析，与 PROP_TYPE_TO_IDX 一致）"""
+
+    def __init__(self):
+        self.enum = parse_ts_enum(BASE_TS_PATH, "PropertyType")
+        self.prop_idx = parse_prop_idx()
+        self.total = max(self.prop_idx.values()) + 1
+        self.value_to_idx = {self.enum[name]: idx for name, idx in self.prop_idx.items() if name in self.enum}
+        self.unknown: Dict[str, int] = {}
+
+    def index(self, name: str) -> Optional[int]:
+        idx = self.value_to_idx.get(self.enum.get(name, -1))
+        if idx is None:
+            self.unknown[name] = self.unknown.get(name, 0) + 1
+        return idx
+
+
+def character_rows(data: dict, resolver: PropResolver, core_stats: Dict[int, List[Tuple[str, float]]]) -> List[Dict[int, float]]:
+    """一个角色的 ROWS 行（稀疏 {PROP_IDX: 数值}）"""
+    stats = data.get("Stats") or {}
+    levels = data.get("Level") or {}
+    rows: List[Dict[int, float]] = [{} for _ in ROWS]
+    base, growth = rows[0], rows[1]
+
+    for prop, (base_key, growth_key) in GROWTH_STATS.items():
+        idx = resolver.index(prop)
+        base[idx] = float(stats.get(base_key) or 0)
+        growth[idx] = float(stats.get(growth_key) or 0)
+
+    for promotion in range(1, PROMOTIONS):
+        level_data = levels.get(str(promotion + 1)) or {}
+        for prop, key in PROMOTION_STATS.items():
+            value = level_data.get(key) or 0
+            if value:
+                rows[2 + promotion][resolver.index(prop)] = float(value)
+
+    for key, (prop, divisor) in BASE_STATS.items():
+        value = stats.get(key)
+        if isinstance(value, (int, float)) and value != 0:
+            idx = resolver.index(prop)
+            base[idx] = base.get(idx, 0.0) + (value / divisor if divisor else value)
+
+    # 核心技等级 1 无属性；等级 c 对应 ExtraLevel[c - 1]
+    for core_level, entries in core_stats.items():
+        row = rows[2 + PROMOTIONS + core_level - 1]
+        for prop, value in entries:
+            idx = resolver.index(prop)
+            if idx is not None:
+                row[idx] = row.get(idx, 0.0) + value
+    return rows
+
+
+def core_stats_by_character(catalogue: dict) -> Dict[str, Dict[int, List[Tuple[str, float]]]]:
+    """核心技目录 -> {角色: {核心技等级: [(运行时 PropertyType, 数值)]}}（按运行时的名称映射）"""
+    result: Dict[str, Dict[int, List[Tuple[str, float]]]] = {}
+    for entry in catalogue["props"].values():
+        prop = entry["runtimeProperty"]
+        if prop is None:
+            continue
+        for char_id, values in entry["characters"].items():
+            per_level = result.setdefault(char_id, {})
+            for core_level, value in zip(catalogue["coreLevels"], values):
+                per_level.setdefault(core_level, []).append((prop, value))
+    return result
+
+
+def buff_stats(buffs: list, resolver: PropResolver) -> List[list]:
+    """[[buff id, 局外 [[索引, 数值]...], 局内 [[索引, 数值]...]], ...]"""
+    result = []
+    for buff in buffs:
+        entry = [buff.get("id")]
+        for block in ("out_of_combat_stats", "in_combat_stats"):
+            pairs = []
+            for name, value in (buff.get(block) or {}).items():
+                idx = resolver.index(name)
+                if idx is not None and isinstance(value, (int, float)):
+                    pairs.append([idx, value])
+            entry.append(sorted(pairs))
+        result.append(entry)
+    return result
+
+
+def build_snapshots(data_dir: Path = DATA_DIR) -> Tuple[dict, bytes]:
+    resolver = PropResolver()
+    core_stats = core_stats_by_character(build_catalogue(data_dir / "character"))
+
+    characters: Dict[str, dict] = {}
+    all_rows: List[Dict[int, float]] = []
+    for path in sorted((data_dir / "character").glob("*.json"), key=lambda p: p.stem):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not data.get("Stats"):
+            continue
+        char_id = str(data.get("Id") or path.stem)
+        entry = {"offset": len(all_rows), "name": data.get("Name", char_id)}
+        all_rows.extend(character_rows(data, resolver, core_stats.get(char_id, {})))
+
+        buff_path = data_dir / "character_data_buff" / f"{char_id}.json"
+        if buff_path.exists():
+            with open(buff_path, "r", encoding="utf-8") as f:
+                entry["buffs"] = buff_stats(json.load(f), resolver)
+        characters[char_id] = entry
+
+    # 只保存用到的列，按 PROP_IDX 升序
+    columns = sorted({idx for row in all_rows for idx in row})
+    binary = bytearray()
+    for row in all_rows:
+        binary += struct.pack(f"<{len(columns)}d", *(row.get(idx, 0.0) for idx in columns))
+
+    idx_to_name = {idx: name for name, idx in resolver.prop_idx.items()}
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "binary": f"{SNAPSHOT_NAME}.bin",
+        "byteLength": len(binary),
+        "propCount": resolver.total,
+        "columns": columns,
+        "columnNames": [idx_to_name[idx] for idx in columns],
+        "rows": ROWS,
+        "characters": characters,
+    }
+    return manifest, bytes(binary)
+
+
+def write_snapshots(manifest: dict, binary: bytes, data_dir: Path = DATA_DIR) -> Tuple[int, int]:
+    json_path = data_dir / f"{SNAPSHOT_NAME}.json"
+    bin_path = data_dir / manifest["binary"]
+    for path, content in (
+        (bin_path, binary),
+        (json_path, json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"),
+    ):
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+    return json_path.stat().st_size, bin_path.stat().st_size
+
+
+def snapshot_stats(manifest: dict, binary: bytes, char_id: str, level: int, promotion: int, core: int) -> List[float]:
+    """按清单还原某个角色的局外面板（长度 propCount，用于核对）"""
+    width = len(manifest["columns"])
+    offset = manifest["characters"][char_id]["offset"]
+
+    def row(name: str) -> Tuple[float, ...]:
+        start = (offset + ROWS.index(name)) * width * 8
+        return struct.unpack_from(f"<{width}d", binary, start)
+
+    base, growth = row("base"), row("growth")
+    promo = row(f"promotion{promotion}")
+    core_row = row(f"core{max(1, core)}")
+    result = [0.0] * manifest["propCount"]
+    for i, idx in enumerate(manifest["columns"]):
+        result[idx] = base[i] + ((level - 1) * growth[i]) / 10000 + promo[i] + core_row[i]
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="生成优化器用的角色静态属性快照")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="game-data 目录")
+    args = parser.parse_args()
+
+    manifest, binary = build_snapshots(args.data_dir)
+    json_size, bin_size = write_snapshots(manifest, binary, args.data_dir)
+    print(
+        f"✓ {len(manifest['characters'])} 个角色，{len(manifest['columns'])} 列 × {len(ROWS)} 行/角色 -> "
+        f"{SNAPSHOT_NAME}.json ({json_size / 1024:.1f} KB) + {manifest['binary']} ({bin_size / 1024:.1f} KB)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+game-data 合并包构建脚本（convert_csv_to_json.py / update_data.py 结束时自动调用，也可单独运行）
+
+前端启动时要分别请求 8 个索引文件，角色/音擎/驱动盘 Buff 又按需逐个请求。
+本脚本把这些文件打成两段带版本的合并包：
+- game-data.index.{hash}.bundle: 索引文件内容首尾相接（JSON 已去掉空白），启动时整段下载
+- game-data.buff.{hash}.bundle:  Buff 数据，前端按偏移表发起 Range 请求只取其中一个条目
+- bundle.json:                   偏移表 {路径: {segment, format, offset, length, ...}}，以及各段的文件名、大小、哈希
+
+索引与 Buff 分段打包，启动时只下载索引段，不会连带下载全部 Buff（约占合并包一半）。
+段名带内容哈希，内容不变时文件名不变，可长期缓存；只改了 Buff 时索引段的缓存仍然有效。
+
+formats.json 中登记了列式格式的数据集（见 columnar_export.py）以列式形式打包：
+元数据与二进制数值列各占一段，二进制段按 8 字节对齐。
+
+使用方式：
+    python scripts/build_data_bundle.py
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+from columnar_export import load_formats_manifest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(PROJECT_ROOT, "web", "optimizer", "public", "game-data")
+BUNDLE_INDEX = "bundle.json"
+BUNDLE_VERSION = 2
+BUNDLE_PATTERN = "game-data.*.bundle"
+
+# 合并包分段：索引段启动时整段下载，Buff 段按条目 Range 请求
+SEGMENT_INDEX = "index"
+SEGMENT_BUFF = "buff"
+
+# 与前端 game-data-cache.service.ts 的 INDEX_FILES 保持一致
+INDEX_FILES = [
+    "character.json",
+    "weapon.json",
+    "equipment.json",
+    "bangboo.json",
+    "bangboo_index.json",
+    "enemy.json",
+    "enemy_index.json",
+    "anomaly_bars.json",
+]
+
+# 按需加载的 Buff 数据目录（全部打包）
+BUFF_DIRECTORIES = [
+    "character_data_buff",
+    "weapon_data_buff",
+    "equipment_data_buff",
+]
+
+# 二进制段对齐（Float64Array 要求 8 字节对齐）
+BINARY_ALIGNMENT = 8
+
+
+def _read_minified(path: str) -> bytes:
+    with open(path, "r", encoding="utf-8") as f:
+        obj = json.load(f)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def bundle_segments(data_dir: str) -> Dict[str, List[str]]:
+    """各段需要打包的文件（相对 data_dir 的路径）"""
+    index_members = [name for name in INDEX_FILES if os.path.exists(os.path.join(data_dir, name))]
+    buff_members: List[str] = []
+    for dir_name in BUFF_DIRECTORIES:
+        files = sorted(glob.glob(os.path.join(data_dir, dir_name, "*.json")))
+        buff_members.extend(os.path.relpath(p, data_dir).replace(os.sep, "/") for p in files)
+    return {SEGMENT_INDEX: index_members, SEGMENT_BUFF: buff_members}
+
+
+def _append(buffer: bytearray, data: bytes, alignment: int = 1) -> int:
+    buffer.extend(b"\0" * (-len(buffer) % alignment))
+    offset = len(buffer)
+    buffer.extend(data)
+    return offset
+
+
+def _write_segment(data_dir: str, segment: str, buffer: bytearray) -> Dict[str, Any]:
+    digest = hashlib.sha256(buffer).hexdigest()
+    segment_name = f"game-data.{segment}.{digest[:12]}.bundle"
+    segment_path = os.path.join(data_dir, segment_name)
+    if not os.path.exists(segment_path):
+        with open(segment_path + ".tmp", "wb") as f:
+            f.write(buffer)
+        os.replace(segment_path + ".tmp", segment_path)
+    return {"file": f"/game-data/{segment_name}", "size": len(buffer), "sha256": digest}
+
+
+def build_bundle(data_dir: str = DATA_DIR) -> Dict[str, Any]:
+    """构建合并包各段并写出 bundle.json，返回偏移表"""
+    formats = load_formats_manifest(data_dir)["datasets"]
+    entries: Dict[str, Dict[str, Any]] = {}
+    segments: Dict[str, Dict[str, Any]] = {}
+
+    for segment, members in bundle_segments(data_dir).items():
+        buffer = bytearray()
+        for rel_path in members:
+            url = f"/game-data/{rel_path}"
+            columnar = formats.get(url)
+            if columnar:
+                meta_path = os.path.join(data_dir, columnar["columnar"].removeprefix("/game-data/"))
+                binary_path = os.path.join(data_dir, columnar["binary"].removeprefix("/game-data/"))
+                if os.path.exists(meta_path) and os.path.exists(binary_path):
+                    meta = _read_bytes(meta_path)
+                    binary = _read_bytes(binary_path)
+                    entries[url] = {
+                        "segment": segment,
+                        "format": "columnar",
+                        "offset": _append(buffer, meta),
+                        "length": len(meta),
+                        "binaryOffset": _append(buffer, binary, BINARY_ALIGNMENT),
+                        "binaryLength": len(binary),
+                    }
+                    continue
+
+            data = _read_minified(os.path.join(data_dir, rel_path))
+            entries[url] = {"segment": segment, "format": "json", "offset": _append(buffer, data), "length": len(data)}
+        segments[segment] = _write_segment(data_dir, segment, buffer)
+
+    # 清理旧版本的合并包
+    current = {os.path.basename(info["file"]) for info in segments.values()}
+    for old_path in glob.glob(os.path.join(data_dir, BUNDLE_PATTERN)):
+        if os.path.basename(old_path) not in current:
+            os.remove(old_path)
+
+    try:
+        with open(os.path.join(data_dir, "version.json"), "r", encoding="utf-8") as f:
+            data_version = json.load(f).get("version")
+    except (OSError, json.JSONDecodeError):
+        data_version = None
+
+    index = {
+        "version": BUNDLE_VERSION,
+        "dataVersion": data_version,
+        "segments": segments,
+        "entries": entries,
+    }
+    with open(os.path.join(data_dir, BUNDLE_INDEX), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    return index
+
+
+def print_bundle_summary(index: Dict[str, Any]) -> None:
+    for segment, info in index["segments"].items():
+        count = sum(1 for entry in index["entries"].values() if entry["segment"] == segment)
+        print(f"  ✓ 合并包 {segment} 段: {count} 个文件, {info['size'] / 1024:.1f} KB -> {info['file']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="将索引文件与 Buff 数据打包为带偏移表的合并包")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="game-data 目录")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data_dir):
+        print(f"未找到数据目录: {args.data_dir}")
+        return 1
+    print_bundle_summary(build_bundle(args.data_dir))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+图标图集构建脚本（在 update_icons.py 之后运行）
+
+将 game-data/icons 中的单张 webp 按类别打包为多个尺寸的精灵图集，并输出坐标映射：
+- 输出目录: web/optimizer/public/game-data/icon-atlas/
+- 图集文件: {category}@{size}.webp
+- 坐标映射: atlas.json，key 为图标代码（即 update_icons.py 推导出的文件名去掉 .webp）
+
+完全离线运行，只读取已下载的图标文件。依赖 Pillow（pip install Pillow）。
+
+使用方式：
+    python scripts/build_icon_atlas.py
+    python scripts/build_icon_atlas.py --category role_crop --quality 85
+"""
+import argparse
+import io
+import json
+import math
+import os
+import re
+import sys
+from typing import Dict, List, Tuple
+
+from update_icons import ICONS_DIR, STATIC_ICONS
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ATLAS_DIR = os.path.join(PROJECT_ROOT, "web", "optimizer", "public", "game-data", "icon-atlas")
+ATLAS_MAP_NAME = "atlas.json"
+
+# 单张图集最大边长（webp 上限 16383，这里留足余量）
+MAX_ATLAS_EDGE = 8192
+
+STATIC_ICON_CODES = {os.path.splitext(name)[0] for name in STATIC_ICONS}
+
+# 类别定义：(类别名, 匹配规则, 目标尺寸列表)
+# 尺寸为单元格最长边（保持宽高比缩放），按 UI 实际展示尺寸选取 1x/2x
+ICON_CATEGORIES: List[Tuple[str, "re.Pattern[str] | None", List[int]]] = [
+    ("role", re.compile(r"^IconRole\d+$"), [512, 256]),
+    ("role_crop", re.compile(r"^IconRoleCrop\d+$"), [192, 96]),
+    ("role_circle", re.compile(r"^IconRoleCircle\d+$"), [128, 64]),
+    ("weapon", re.compile(r"^Weapon_"), [128, 64]),
+    ("suit", re.compile(r"^Suit"), [128, 64]),
+    ("boss", re.compile(r"^Monster"), [256, 128]),
+    ("bangboo", re.compile(r"^BangbooGarageRole\d+$"), [128, 64]),
+    ("element", None, [64, 32]),  # update_icons.STATIC_ICONS（属性/技能/武器类型）
+]
+
+
+def classify(code: str) -> str | None:
+    """图标代码 -> 类别名（不属于任何类别返回 None）"""
+    if code in STATIC_ICON_CODES:
+        return "element"
+    for name, pattern, _ in ICON_CATEGORIES:
+        if pattern is not None and pattern.match(code):
+            return name
+    return None
+
+
+def collect_icons(icons_dir: str) -> Dict[str, List[str]]:
+    """按类别收集图标代码（排序保证输出稳定）"""
+    groups: Dict[str, List[str]] = {name: [] for name, _, _ in ICON_CATEGORIES}
+    for filename in sorted(os.listdir(icons_dir)):
+        if not filename.endswith(".webp"):
+            continue
+        code = os.path.splitext(filename)[0]
+        category = classify(code)
+        if category:
+            groups[category].append(code)
+    return groups
+
+
+def fit_size(width: int, height: int, target: int) -> Tuple[int, int]:
+    """保持宽高比缩放到最长边为 target（不放大）"""
+    scale = min(1.0, target / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def pack_grid(sizes: List[Tuple[int, int]]) -> Tuple[int, int, int, int, int]:
+    """
+    统一网格打包：同类图标宽高比基本一致，网格比装箱算法更简单且浪费很少。
+    返回 (cell_w, cell_h, cols, atlas_w, atlas_h)
+    """
+    cell_w = max(w for w, _ in sizes)
+    cell_h = max(h for _, h in sizes)
+    count = len(sizes)
+    cols = max(1, math.ceil(math.sqrt(count * cell_h / cell_w)))
+    cols = min(cols, max(1, MAX_ATLAS_EDGE // cell_w))
+    rows = math.ceil(count / cols)
+    return cell_w, cell_h, cols, cols * cell_w, rows * cell_h
+
+
+def build_category(
+    category: str,
+    codes: List[str],
+    sizes: List[int],
+    icons_dir: str,
+    out_dir: str,
+    quality: int,
+) -> Tuple[Dict[str, dict], Dict[str, dict], int]:
+    """
+    构建一个类别在所有目标尺寸下的图集。
+    返回 (atlases, frames, atlas_bytes)：
+    - atlases: {"role@256": {"file", "width", "height", "size"}}
+    - frames:  {code: {"256": [x, y, w, h], ...}}
+    """
+    sources = {}
+    for code in codes:
+        with Image.open(os.path.join(icons_dir, f"{code}.webp")) as img:
+            sources[code] = img.convert("RGBA")
+
+    atlases: Dict[str, dict] = {}
+    frames: Dict[str, dict] = {code: {} for code in codes}
+    atlas_bytes = 0
+
+    for size in sizes:
+        fitted = [fit_size(*sources[code].size, size) for code in codes]
+        cell_w, cell_h, cols, atlas_w, atlas_h = pack_grid(fitted)
+        if atlas_h > MAX_ATLAS_EDGE:
+            print(f"  ✗ {category}@{size}: 图集高度 {atlas_h} 超出上限 {MAX_ATLAS_EDGE}，跳过")
+            continue
+
+        atlas = Image.new("RGBA", (atlas_w, atlas_h), (0, 0, 0, 0))
+        for i, code in enumerate(codes):
+            w, h = fitted[i]
+            x = (i % cols) * cell_w
+            y = (i // cols) * cell_h
+            resized = sources[code] if (w, h) == sources[code].size else sources[code].resize((w, h), Image.LANCZOS)
+            atlas.paste(resized, (x, y))
+            frames[code][str(size)] = [x, y, w, h]
+
+        name = f"{category}@{size}"
+        buffer = io.BytesIO()
+        atlas.save(buffer, format="WEBP", quality=quality, method=6)
+        data = buffer.getvalue()
+        with open(os.path.join(out_dir, f"{name}.webp"), "wb") as f:
+            f.write(data)
+
+        atlas_bytes += len(data)
+        atlases[name] = {"file": f"{name}.webp", "width": atlas_w, "height": atlas_h, "size": size}
+        print(f"  ✓ {name}: {len(codes)} 个图标, {atlas_w}x{atlas_h}, {len(data) / 1024:.1f} KB")
+
+    return atlases, frames, atlas_bytes
+
+
+def format_bytes(n: int) -> str:
+    return f"{n / 1024 / 1024:.2f} MB" if n >= 1024 * 1024 else f"{n / 1024:.1f} KB"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="将图标打包为多尺寸精灵图集并输出坐标映射")
+    parser.add_argument("--icons-dir", default=ICONS_DIR, help="图标目录（默认 update_icons.py 的输出目录）")
+    parser.add_argument("--out-dir", default=ATLAS_DIR, help="图集输出目录")
+    parser.add_argument("--quality", type=int, default=82, help="webp 质量 (默认 82)")
+    parser.add_argument(
+        "--category",
+        action="append",
+        choices=[name for name, _, _ in ICON_CATEGORIES],
+        help="只构建指定类别，可重复（默认全部）",
+    )
+    args = parser.parse_args()
+
+    if Image is None:
+        print("错误: 需要 Pillow，请先执行 pip install Pillow")
+        return 1
+    if not os.path.isdir(args.icons_dir):
+        print(f"未找到图标目录: {args.icons_dir}（请先运行 update_icons.py）")
+        return 1
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    groups = collect_icons(args.icons_dir)
+    selected = set(args.category or groups.keys())
+
+    # 只构建部分类别时保留其它类别已有的映射
+    atlas_map = {"version": 1, "atlases": {}, "icons": {}}
+    map_path = os.path.join(args.out_dir, ATLAS_MAP_NAME)
+    if args.category and os.path.exists(map_path):
+        with open(map_path, "r", encoding="utf-8") as f:
+            atlas_map = json.load(f)
+    report = []
+
+    print(f"图标目录: {args.icons_dir}")
+    print(f"输出目录: {args.out_dir}\n")
+
+    for category, _, sizes in ICON_CATEGORIES:
+        codes = groups.get(category, [])
+        if category not in selected or not codes:
+            continue
+        print(f"[{category}]")
+        source_bytes = sum(os.path.getsize(os.path.join(args.icons_dir, f"{c}.webp")) for c in codes)
+        atlases, frames, atlas_bytes = build_category(
+            category, codes, sizes, args.icons_dir, args.out_dir, args.quality
+        )
+        atlas_map["atlases"].update(atlases)
+        for code, code_frames in frames.items():
+            atlas_map["icons"][code] = {"category": category, "frames": code_frames}
+        report.append((category, len(codes), source_bytes, atlas_bytes))
+
+    with open(map_path, "w", encoding="utf-8") as f:
+        json.dump(atlas_map, f, ensure_ascii=False, separators=(",", ":"))
+
+    # 体积报告：单图总大小 vs 全部尺寸图集总大小
+    print(f"\n{'类别':<12}{'图标数':>8}{'单图总计':>14}{'图集总计':>14}{'节省':>14}")
+    total_src = total_atlas = 0
+    for category, count, source_bytes, atlas_bytes in report:
+        total_src += source_bytes
+        total_atlas += atlas_bytes
+        print(
+            f"{category:<12}{count:>8}{format_bytes(source_bytes):>14}"
+            f"{format_bytes(atlas_bytes):>14}{format_bytes(source_bytes - atlas_bytes):>14}"
+        )
+    print(
+        f"{'合计':<12}{sum(r[1] for r in report):>8}{format_bytes(total_src):>14}"
+        f"{format_bytes(total_atlas):>14}{format_bytes(total_src - total_atlas):>14}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+驱动盘套装加成表（优化器用）
+
+fast-evaluator 初始化时要从 equipment_data_buff 的 two_piece_buffs / four_piece_buffs
+逐个对象构建每个套装的 2 件套 / 4 件套属性数组。本脚本离线把所有套装编译为
+按 property-index.ts 的 PROP_IDX 对齐的稠密表：
+
+- set_bonus_table.bin:  小端 Float64，每个套装 ROWS 行，每行 propCount 列（完整 PROP_IDX 宽度，
+                        Worker 可直接 new Float64Array(buffer, offset, propCount) 零拷贝取出）
+- set_bonus_table.json: 清单：setIdx -> 套装 ID、名称、4 件套 Buff 的叠层信息，以及表内容哈希
+
+行布局：
+- twoPiece:  2 件套 out_of_combat_stats 之和（与 getSetBuff(TWO_PIECE).out_of_combat 一致）
+- fourPiece: 4 件套 in_combat_stats 之和（与 buildFastRequest 目标套装 targetSetFourPieceBuff 一致，不乘层数）
+
+setIdx 保持稳定：沿用上一次生成的清单中的顺序，新套装按 ID 追加在末尾。
+
+使用方式：
+    python scripts/build_set_bonus_table.py
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from build_agent_snapshots import PropResolver
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = PROJECT_ROOT / "web" / "optimizer" / "public" / "game-data"
+TABLE_NAME = "set_bonus_table"
+TABLE_VERSION = 1
+
+# 每个套装的行布局：(行名, 原文件中的 Buff 列表, 属性块)
+ROWS = [
+    ("twoPiece", "two_piece_buffs", "out_of_combat_stats"),
+    ("fourPiece", "four_piece_buffs", "in_combat_stats"),
+]
+
+
+def previous_order(data_dir: Path) -> List[str]:
+    """上一次生成的清单中的 setIdx 顺序（不存在或版本不同时为空）"""
+    path = data_dir / f"{TABLE_NAME}.json"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return []
+    if manifest.get("version") != TABLE_VERSION:
+        return []
+    return [entry["id"] for entry in manifest.get("sets", [])]
+
+
+def set_rows(data: dict, resolver: PropResolver) -> List[List[float]]:
+    """一个套装的 ROWS 行（稠密，长度 resolver.total）"""
+    rows = []
+    for _, buffs_key, block in ROWS:
+        row = [0.0] * resolver.total
+        for buff in data.get(buffs_key) or []:
+            for name, value in (buff.get(block) or {}).items():
+                idx = resolver.index(name)
+                if idx is not None and isinstance(value, (int, float)):
+                    row[idx] += value
+        rows.append(row)
+    return rows
+
+
+def build_table(data_dir: Path = DATA_DIR) -> Tuple[dict, bytes]:
+    resolver = PropResolver()
+    suits: Dict[str, dict] = {}
+    for path in (data_dir / "equipment_data_buff").glob("*.json"):
+        with open(path, "r", encoding="utf-8") as f:
+            suits[path.stem] = json.load(f)
+
+    order = [suit_id for suit_id in previous_order(data_dir) if suit_id in suits]
+    order += sorted((suit_id for suit_id in suits if suit_id not in order), key=int)
+
+    sets = []
+    binary = bytearray()
+    for set_idx, suit_id in enumerate(order):
+        data = suits[suit_id]
+        for row in set_rows(data, resolver):
+            binary += struct.pack(f"<{resolver.total}d", *row)
+        sets.append({
+            "setIdx": set_idx,
+            "id": suit_id,
+            "name": data.get("name") or data.get("set_id"),
+            # 4 件套行不含层数，需要按层数计入的调用方从这里取
+            "fourPieceStacks": [
+                {"id": b.get("id"), "max_stacks": b.get("max_stacks"), "stack_mode": b.get("stack_mode")}
+                for b in data.get("four_piece_buffs") or []
+            ],
+        })
+
+    digest = hashlib.sha256(bytes(binary))
+    digest.update(json.dumps(order).encode("utf-8"))
+    manifest = {
+        "version": TABLE_VERSION,
+        "hash": digest.hexdigest()[:16],
+        "binary": f"{TABLE_NAME}.bin",
+        "byteLength": len(binary),
+        "propCount": resolver.total,
+        "rows": [name for name, _, _ in ROWS],
+        "sets": sets,
+    }
+    return manifest, bytes(binary)
+
+
+def write_table(manifest: dict, binary: bytes, data_dir: Path = DATA_DIR) -> Tuple[int, int]:
+    json_path = data_dir / f"{TABLE_NAME}.json"
+    bin_path = data_dir / manifest["binary"]
+    for path, content in (
+        (bin_path, binary),
+        (json_path, json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"),
+    ):
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+    return json_path.stat().st_size, bin_path.stat().st_size
+
+
+def set_bonus_row(manifest: dict, binary: bytes, set_idx: int, row: str) -> Tuple[float, ...]:
+    """按清单取出某个套装的一行（用于核对）"""
+    width = manifest["propCount"]
+    start = (set_idx * len(manifest["rows"]) + manifest["rows"].index(row)) * width * 8
+    return struct.unpack_from(f"<{width}d", binary, start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="生成优化器用的驱动盘套装加成表")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="game-data 目录")
+    args = parser.parse_args()
+
+    manifest, binary = build_table(args.data_dir)
+    json_size, bin_size = write_table(manifest, binary, args.data_dir)
+    print(
+        f"✓ {len(manifest['sets'])} 个套装 × {len(ROWS)} 行 × {manifest['propCount']} 列 -> "
+        f"{TABLE_NAME}.json ({json_size / 1024:.1f} KB) + {manifest['binary']} ({bin_size / 1024:.1f} KB)，"
+        f"hash {manifest['hash']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
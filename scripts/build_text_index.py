@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+角色 / 音擎 / 驱动盘描述文本的全文倒排索引
+
+构建时每个详情文件只读取、解析一次，文本只去除一次颜色与图标标签，按 extract_*_info.py 的字段划分成文本段：
+- 角色：影画（Talent）、潜能（Potential / PotentialDetail）、核心技（Passive，最高等级）
+- 音擎：特效（Talents，各精炼等级）
+- 驱动盘：2件套（Desc2）、4件套（Desc4）
+
+分词：拉丁字母 / 数字按词切分并转小写，连续的中日韩字符切成二元组（单字成段时保留单字）。
+索引保存在 text_index.json，记录每个详情文件的 sha256；再次构建时只重新分词内容变化的文件。
+查询按 BM25 打分，同一实体只保留得分最高的文本段。
+
+使用方式：
+    python scripts/build_text_index.py                     # 增量构建
+    python scripts/build_text_index.py --rebuild           # 全量重建
+    python scripts/build_text_index.py 异常掌控             # 构建（如需）后查询
+    python scripts/build_text_index.py 异常掌控 --kind weapon --limit 5
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from extract_batch import ENTITY_KINDS, iter_sections
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = PROJECT_ROOT / "web" / "optimizer" / "public" / "game-data"
+INDEX_PATH = DATA_DIR / "text_index.json"
+
+# 分词或文本段规则变化时递增，旧索引自动全量重建
+INDEX_VERSION = 1
+
+# 连续的中日韩字符 / 拉丁字母数字
+TOKEN_PATTERN = re.compile(r"([぀-ヿ㐀-䶿一-鿿豈-﫿]+)|([0-9a-z]+(?:\.[0-9]+)?)")
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """拉丁词 + 中日韩二元组"""
+    tokens = []
+    for cjk, word in TOKEN_PATTERN.findall(text.lower()):
+        if word:
+            tokens.append(word)
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+    return tokens
+
+
+class TextIndex:
+    """
+    倒排索引
+
+    docs:     {段 id: {"entity": "weapon/12001", "name", "section", "title", "text", "length"}}
+    files:    {"weapon/12001.json": {"sha256", "size", "mtime_ns", "docs": [段 id]}}
+    postings: {词: {段 id: 词频}}
+    """
+
+    def __init__(self, data: Optional[dict] = None):
+        data = data or {}
+        self.docs: Dict[str, dict] = data.get("docs", {})
+        self.files: Dict[str, dict] = data.get("files", {})
+        self.postings: Dict[str, Dict[str, int]] = data.get("postings", {})
+        # 有未保存的修改
+        self.dirty = not data
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> "TextIndex":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return cls()
+        return cls(data) if data.get("version") == INDEX_VERSION else cls()
+
+    def save(self, path: Path = INDEX_PATH) -> None:
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": INDEX_VERSION, "files": self.files, "docs": self.docs, "postings": self.postings},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    def remove_file(self, rel_path: str) -> None:
+        for doc_id in self.files.pop(rel_path, {}).get("docs", []):
+            doc = self.docs.pop(doc_id, None)
+            if doc is None:
+                continue
+            for token in set(tokenize(doc["title"] + "\n" + doc["text"])):
+                postings = self.postings.get(token)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self.postings[token]
+
+    def add_file(self, kind: str, path: Path, raw: bytes, stat: os.stat_result) -> None:
+        rel_path = f"{kind}/{path.name}"
+        entity = f"{kind}/{path.stem}"
+        data = json.loads(raw)
+        name = data.get("Name", path.stem)
+        doc_ids = []
+        for section, title, text in iter_sections(kind, data):
+            if not text and not title:
+                continue
+            doc_id = f"{entity}#{section}"
+            counts = Counter(tokenize(title + "\n" + text))
+            self.docs[doc_id] = {
+                "entity": entity,
+                "name": name,
+                "section": section,
+                "title": title,
+                "text": text,
+                "length": sum(counts.values()),
+            }
+            for token, tf in counts.items():
+                self.postings.setdefault(token, {})[doc_id] = tf
+            doc_ids.append(doc_id)
+        digest = hashlib.sha256(raw).hexdigest()
+        self.files[rel_path] = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "docs": doc_ids}
+
+    def update(self, data_dir: Path = DATA_DIR) -> Tuple[int, int]:
+        """增量更新，返回 (重新索引的文件数, 删除的文件数)"""
+        present = set()
+        updated = 0
+        for kind in ENTITY_KINDS:
+            directory = data_dir / kind
+            if not directory.is_dir():
+                continue
+            for path in sorted(directory.glob("*.json")):
+                rel_path = f"{kind}/{path.name}"
+                present.add(rel_path)
+                previous = self.files.get(rel_path)
+                stat = path.stat()
+                # mtime 与大小未变时不读取文件
+                if previous and previous["mtime_ns"] == stat.st_mtime_ns and previous["size"] == stat.st_size:
+                    continue
+                raw = path.read_bytes()
+                if previous and previous["sha256"] == hashlib.sha256(raw).hexdigest():
+                    previous["mtime_ns"] = stat.st_mtime_ns
+                    self.dirty = True
+                    continue
+                self.remove_file(rel_path)
+                self.add_file(kind, path, raw, stat)
+                updated += 1
+
+        removed = [p for p in self.files if p not in present]
+        for rel_path in removed:
+            self.remove_file(rel_path)
+        if updated or removed:
+            self.dirty = True
+        return updated, len(removed)
+
+    def search(self, query: str, kinds: Optional[List[str]] = None, limit: int = 10) -> List[dict]:
+        """BM25 打分，按实体合并（保留得分最高的段）"""
+        terms = Counter(tokenize(query))
+        if not terms or not self.docs:
+            return []
+        n = len(self.docs)
+        avg_length = sum(doc["length"] for doc in self.docs.values()) / n
+
+        scores: Dict[str, float] = {}
+        matched: Dict[str, int] = {}
+        for term, qtf in terms.items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                length = self.docs[doc_id]["length"]
+                norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+                scores[doc_id] = scores.get(doc_id, 0.0) + qtf * idf * norm
+                matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        best: Dict[str, Tuple[float, str]] = {}
+        for doc_id, score in scores.items():
+            # 命中全部查询词的段优先
+            score *= matched[doc_id] / len(terms)
+            entity = self.docs[doc_id]["entity"]
+            if kinds and entity.split("/", 1)[0] not in kinds:
+                continue
+            if entity not in best or score > best[entity][0]:
+                best[entity] = (score, doc_id)
+
+        ranked = sorted(best.values(), key=lambda item: (-item[0], item[1]))[:limit]
+        return [dict(self.docs[doc_id], id=doc_id, score=round(score, 4)) for score, doc_id in ranked]
+
+
+def snippet(text: str, query: str, width: int = 60) -> str:
+    """截取第一个命中词附近的文本"""
+    text = text.replace("\n", " ")
+    lowered = text.lower()
+    # 优先定位完整查询，找不到时取最早命中的词
+    positions = [lowered.find(query.lower())]
+    if positions[0] < 0:
+        positions = [p for p in (lowered.find(token) for token in tokenize(query)) if p >= 0]
+    start = max(0, min(positions) - width // 3) if positions else 0
+    end = start + width
+    return ("…" if start > 0 else "") + text[start:end] + ("…" if end < len(text) else "")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="构建描述文本的全文索引，并可直接查询")
+    parser.add_argument("query", nargs="*", help="查询文本（省略时只构建索引）")
+    parser.add_argument("--kind", action="append", choices=ENTITY_KINDS, help="限定实体类型，可多次指定")
+    parser.add_argument("--limit", type=int, default=10, help="最多返回的实体数")
+    parser.add_argument("--rebuild", action="store_true", help="忽略已有索引，全量重建")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出查询结果")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = TextIndex() if args.rebuild else TextIndex.load()
+    updated, removed = index.update()
+    if index.dirty:
+        index.save()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    query = " ".join(args.query)
+    if not query:
+        print(f"✓ 索引 {len(index.files)} 个文件、{len(index.docs)} 个文本段、{len(index.postings)} 个词")
+        print(f"  重新索引 {updated} 个，删除 {removed} 个（{build_ms:.0f} ms）")
+        return 0
+
+    start = time.perf_counter()
+    hits = index.search(query, kinds=args.kind, limit=args.limit)
+    search_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(hits, ensure_ascii=False, indent=2))
+        return 0
+    if not hits:
+        print(f"未找到: {query}")
+        return 0
+    print(f"查询「{query}」: {len(hits)} 个结果（{search_ms:.1f} ms）\n")
+    for rank, hit in enumerate(hits, 1):
+        print(f"{rank:>2}. [{hit['entity']}] {hit['name']} · {hit['title']}  ({hit['score']:.2f})")
+        print(f"    {snippet(hit['text'], query)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+音擎天赋属性表
+
+weapon_data_buff/*.json 中每个音擎有 5 个精炼等级的天赋，各自带完整的 Buff 对象，
+除了数值和描述之外几乎完全相同。前端切换音擎时要下载并解析整份文件，只为取其中一个精炼等级。
+
+本脚本把所有音擎合并为一个 weapon_talents.json：
+- columns: 所有音擎共用的属性列（PROP_IDX，升序）
+- 每个 Buff 槽位（同一音擎各精炼等级中位置相同的 Buff）：
+  - cols:   用到的列（columns 中的下标）
+  - in/out: 局内 / 局外属性的稠密表 [精炼 × cols]，按行展开为一维数组（全为 0 时省略）
+  - const:  各精炼等级相同的字段；perLevel: 各精炼等级不同的字段；templates: 只有精炼数字不同的字段（{r} 占位）
+- 无法映射到 PROP_IDX 的属性名原样保存在 extraIn / extraOut 中
+
+前端 weapon-talent-table.ts 可按音擎 ID 还原出与原文件结构相同的数据，未收录的音擎仍回退到原文件。
+
+使用方式：
+    python scripts/build_weapon_talent_table.py
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from build_agent_snapshots import PropResolver
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = PROJECT_ROOT / "web" / "optimizer" / "public" / "game-data"
+TABLE_NAME = "weapon_talents.json"
+TABLE_VERSION = 1
+
+REFINEMENTS = 5
+STAT_BLOCKS = (("in", "in_combat_stats"), ("out", "out_of_combat_stats"))
+# 只有精炼数字不同的字符串：{wid}_talent_{r}_1、「月相」-望-精{r}
+TEMPLATE_PATTERNS = ("_talent_{r}", "精{r}")
+# Buff 字段顺序（还原时保持与原文件一致）
+TALENT_FIELDS = ("level", "name", "description")
+
+
+def to_template(values: List[Any]) -> Optional[str]:
+    """各精炼等级的字符串只有精炼数字不同时返回模板"""
+    if not all(isinstance(v, str) for v in values):
+        return None
+    templates = set()
+    for r, value in enumerate(values, 1):
+        for pattern in TEMPLATE_PATTERNS:
+            value = value.replace(pattern.format(r=r), pattern)
+        templates.add(value)
+    if len(templates) == 1:
+        template = templates.pop()
+        if "{r}" in template:
+            return template
+    return None
+
+
+def compile_slot(buffs: List[dict], resolver: PropResolver, columns: Dict[int, int]) -> dict:
+    """同一槽位 5 个精炼等级的 Buff -> 槽位记录"""
+    slot: Dict[str, Any] = {"fields": [k for k in buffs[0]]}
+    const: Dict[str, Any] = {}
+    per_level: Dict[str, list] = {}
+    templates: Dict[str, str] = {}
+    for field in slot["fields"]:
+        if field in ("in_combat_stats", "out_of_combat_stats"):
+            continue
+        values = [b.get(field) for b in buffs]
+        if all(v == values[0] for v in values):
+            const[field] = values[0]
+        elif (template := to_template(values)) is not None:
+            templates[field] = template
+        else:
+            per_level[field] = values
+
+    # 稀疏属性 -> 稠密 [精炼 × 列]
+    tables: Dict[str, List[Dict[int, float]]] = {}
+    extras: Dict[str, list] = {}
+    for key, block in STAT_BLOCKS:
+        rows = []
+        extra = []
+        for buff in buffs:
+            row: Dict[int, float] = {}
+            unknown = {}
+            for name, value in (buff.get(block) or {}).items():
+                idx = resolver.index(name)
+                if idx is None or not isinstance(value, (int, float)) or isinstance(value, bool):
+                    unknown[name] = value
+                else:
+                    row[idx] = row.get(idx, 0.0) + value
+            rows.append(row)
+            extra.append(unknown)
+        tables[key] = rows
+        if any(extra):
+            extras[key] = extra
+
+    used = sorted({idx for rows in tables.values() for row in rows for idx in row})
+    for idx in used:
+        columns.setdefault(idx, len(columns))
+    slot["cols"] = used  # 先记 PROP_IDX，全部音擎处理完后换成 columns 下标
+    for key, rows in tables.items():
+        flat = [row.get(idx, 0) for row in rows for idx in used]
+        if any(flat):
+            slot[key] = flat
+    if "in" in extras:
+        slot["extraIn"] = extras["in"]
+    if "out" in extras:
+        slot["extraOut"] = extras["out"]
+    if const:
+        slot["const"] = const
+    if per_level:
+        slot["perLevel"] = per_level
+    if templates:
+        slot["templates"] = templates
+    return slot
+
+
+def compile_weapon(data: dict, resolver: PropResolver, columns: Dict[int, int]) -> Optional[dict]:
+    talents = data.get("talents") or []
+    if [t.get("level") for t in talents] != list(range(1, REFINEMENTS + 1)):
+        return None
+    slot_counts = {len(t.get("buffs") or []) for t in talents}
+    if len(slot_counts) != 1:
+        return None
+
+    weapon = {k: v for k, v in data.items() if k != "talents"}
+    weapon["talents"] = {field: [t.get(field) for t in talents] for field in TALENT_FIELDS[1:]}
+    weapon["slots"] = [
+        compile_slot([t["buffs"][j] for t in talents], resolver, columns)
+        for j in range(slot_counts.pop())
+    ]
+    return weapon
+
+
+def build_table(data_dir: Path = DATA_DIR) -> dict:
+    resolver = PropResolver()
+    columns: Dict[int, int] = {}
+    weapons: Dict[str, dict] = {}
+    skipped: List[str] = []
+    for path in sorted((data_dir / "weapon_data_buff").glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        weapon = compile_weapon(data, resolver, columns)
+        if weapon is None:
+            skipped.append(path.stem)
+            continue
+        weapons[path.stem] = weapon
+
+    # 列按 PROP_IDX 升序，槽位中的 PROP_IDX 换成列下标
+    ordered = sorted(columns)
+    position = {idx: i for i, idx in enumerate(ordered)}
+    for weapon in weapons.values():
+        for slot in weapon["slots"]:
+            slot["cols"] = [position[idx] for idx in slot["cols"]]
+
+    idx_to_name = {idx: name for name, idx in resolver.prop_idx.items()}
+    return {
+        "version": TABLE_VERSION,
+        "refinements": REFINEMENTS,
+        "columns": ordered,
+        "columnNames": [idx_to_name[idx] for idx in ordered],
+        "weapons": weapons,
+        "skipped": skipped,
+    }
+
+
+def expand_weapon(table: dict, weapon_id: str) -> Optional[dict]:
+    """还原为 weapon_data_buff/{id}.json 的结构（与前端 expandWeaponBuffData 相同，用于核对）"""
+    weapon = table["weapons"].get(weapon_id)
+    if weapon is None:
+        return None
+    names = table["columnNames"]
+    talents = []
+    for r in range(1, table["refinements"] + 1):
+        buffs = []
+        for slot in weapon["slots"]:
+            cols = slot["cols"]
+            buff = {}
+            for field in slot["fields"]:
+                if field in ("in_combat_stats", "out_of_combat_stats"):
+                    key = "in" if field == "in_combat_stats" else "out"
+                    values = slot.get(key, [0] * len(cols) * table["refinements"])
+                    row = values[(r - 1) * len(cols):r * len(cols)]
+                    stats = {names[c]: v for c, v in zip(cols, row) if v != 0}
+                    extra = slot.get("extraIn" if key == "in" else "extraOut")
+                    if extra:
+                        stats.update(extra[r - 1])
+                    buff[field] = stats
+                elif field in slot.get("const", {}):
+                    buff[field] = slot["const"][field]
+                elif field in slot.get("templates", {}):
+                    buff[field] = slot["templates"][field].replace("{r}", str(r))
+                else:
+                    buff[field] = slot["perLevel"][field][r - 1]
+            buffs.append(buff)
+        talent = {"level": r}
+        for field in TALENT_FIELDS[1:]:
+            talent[field] = weapon["talents"][field][r - 1]
+        talent["buffs"] = buffs
+        talents.append(talent)
+    result = {k: v for k, v in weapon.items() if k not in ("talents", "slots")}
+    result["talents"] = talents
+    return result
+
+
+def normalized(data: Any, resolver: PropResolver) -> Any:
+    """核对用：属性名按 PROP_IDX 规范化（别名合并），去掉值为 0 的属性"""
+    if isinstance(data, dict):
+        result = {}
+        for k, v in data.items():
+            if k in ("in_combat_stats", "out_of_combat_stats") and isinstance(v, dict):
+                stats = {}
+                for name, value in v.items():
+                    idx = resolver.index(name)
+                    if value != 0:
+                        stats[idx if idx is not None else name] = value
+                result[k] = stats
+            else:
+                result[k] = normalized(v, resolver)
+        return result
+    if isinstance(data, list):
+        return [normalized(v, resolver) for v in data]
+    return data
+
+
+def verify_table(table: dict, data_dir: Path = DATA_DIR) -> List[str]:
+    """还原每个音擎并与原文件比较，返回不一致的音擎 ID"""
+    resolver = PropResolver()
+    mismatched = []
+    for weapon_id in table["weapons"]:
+        with open(data_dir / "weapon_data_buff" / f"{weapon_id}.json", "r", encoding="utf-8") as f:
+            original = json.load(f)
+        if normalized(expand_weapon(table, weapon_id), resolver) != normalized(original, resolver):
+            mismatched.append(weapon_id)
+    return mismatched
+
+
+def write_table(table: dict, data_dir: Path = DATA_DIR) -> int:
+    path = data_dir / TABLE_NAME
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    os.replace(tmp_path, path)
+    return path.stat().st_size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="把 weapon_data_buff 合并为按精炼等级索引的稠密属性表")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="game-data 目录")
+    args = parser.parse_args()
+
+    table = build_table(args.data_dir)
+    mismatched = verify_table(table, args.data_dir)
+    if mismatched:
+        print(f"✗ 还原结果与原文件不一致: {', '.join(mismatched)}")
+        return 1
+
+    size = write_table(table, args.data_dir)
+    source_size = sum(p.stat().st_size for p in (args.data_dir / "weapon_data_buff").glob("*.json"))
+    print(
+        f"✓ {len(table['weapons'])} 个音擎，{len(table['columns'])} 列 -> {TABLE_NAME} "
+        f"({size / 1024:.1f} KB，原文件共 {source_size / 1024:.1f} KB)"
+    )
+    if table["skipped"]:
+        print(f"  未收录（天赋结构不规则，前端回退到原文件）: {', '.join(table['skipped'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
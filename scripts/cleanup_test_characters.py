@@ -1,12 +1,17 @@
 import argparse
+import hashlib
 import json
 import os
 import re
-from typing import Any, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
 
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_DIR = os.path.join(PROJECT_ROOT, "web", "optimizer", "public", "game-data")
+# Files found clean by a previous run: {"<category>/<name>": {"mtime_ns", "size", "sha256"}}
+SCAN_CACHE_PATH = os.path.join(DATA_DIR, "cleanup_scan_cache.json")
 
 # Supported categories:
 # - directory: DATA_DIR/<category>/*.json
@@ -15,6 +20,12 @@ SUPPORTED_CATEGORIES = ("character", "weapon", "equipment")
 
 
 TEST_PATTERN = re.compile(r"test", re.IGNORECASE)
+# Byte-level prefilter. Outside of strings JSON only has numbers, literals and
+# punctuation, so any "test" in a decoded string is also present in the raw bytes
+# (ASCII letters are never \u-escaped by json.dump). A raw hit can still be a false
+# positive (e.g. "\test" is a tab followed by "est"), so hits are confirmed on the
+# parsed document.
+RAW_TEST_PATTERN = re.compile(rb"test", re.IGNORECASE)
 
 
 def iter_strings(obj: Any) -> Iterable[str]:
@@ -41,6 +52,87 @@ def json_contains_test(obj: Any) -> bool:
     return False
 
 
+@dataclass
+class CategoryScan:
+    category: str
+    # (path, item id) of detail files that contain "Test"
+    matches: List[tuple] = field(default_factory=list)
+    # Cache entries for files that were found clean
+    clean: Dict[str, dict] = field(default_factory=dict)
+    scanned: int = 0
+    skipped: int = 0
+
+
+def load_scan_cache(path: str = SCAN_CACHE_PATH) -> Dict[str, dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except (OSError, json.JSONDecodeError, AttributeError):
+        return {}
+
+
+def save_scan_cache(files: Dict[str, dict], path: str = SCAN_CACHE_PATH) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "files": files}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def scan_bytes(data: bytes, item_id: str) -> Optional[str]:
+    """
+    Return the item id when the file contains "Test", None otherwise.
+
+    The raw bytes are searched first and the search stops at the first hit; only a
+    hit is parsed, to confirm it and to read the "Id" field.
+    """
+    if not RAW_TEST_PATTERN.search(data):
+        return None
+    try:
+        obj = json.loads(data)
+    except ValueError:
+        # If a file is broken, skip it instead of deleting unexpectedly.
+        return None
+    if not json_contains_test(obj):
+        return None
+    # Prefer Id field; fallback to filename.
+    return str((obj.get("Id") if isinstance(obj, dict) else None) or item_id)
+
+
+def scan_category(category: str, cache: Dict[str, dict], use_cache: bool = True) -> CategoryScan:
+    """Scan one category's detail files, skipping files unchanged since a clean run."""
+    result = CategoryScan(category)
+    detail_dir = os.path.join(DATA_DIR, category)
+    for entry in sorted(os.scandir(detail_dir), key=lambda e: e.name):
+        if not entry.name.endswith(".json") or not entry.is_file():
+            continue
+        key = f"{category}/{entry.name}"
+        stat = entry.stat()
+        previous = cache.get(key) if use_cache else None
+        if previous and previous.get("mtime_ns") == stat.st_mtime_ns and previous.get("size") == stat.st_size:
+            result.clean[key] = previous
+            result.skipped += 1
+            continue
+
+        with open(entry.path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        clean_entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+        # Touched but identical content: still clean.
+        if previous and previous.get("sha256") == digest:
+            result.clean[key] = clean_entry
+            result.skipped += 1
+            continue
+
+        result.scanned += 1
+        item_id = scan_bytes(data, os.path.splitext(entry.name)[0])
+        if item_id is None:
+            result.clean[key] = clean_entry
+        else:
+            result.matches.append((entry.path, item_id))
+    return result
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description=(
@@ -64,6 +156,11 @@ def main() -> int:
         action="store_true",
         help="Also remove entries from index json whose value contains 'Test' (in addition to ids found in detailed files).",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-scan every file, ignoring files recorded as clean by a previous run.",
+    )
     args = parser.parse_args()
 
     categories = args.category or list(SUPPORTED_CATEGORIES)
@@ -72,6 +169,7 @@ def main() -> int:
     total_removed_from_index = 0
     all_removed_ids: list[str] = []
 
+    runnable = []
     for category in categories:
         detail_dir = os.path.join(DATA_DIR, category)
         index_path = os.path.join(DATA_DIR, f"{category}.json")
@@ -82,6 +180,15 @@ def main() -> int:
         if not os.path.isfile(index_path):
             print(f"[skip] index not found: {os.path.relpath(index_path, PROJECT_ROOT)}")
             continue
+        runnable.append(category)
+
+    cache = load_scan_cache()
+    with ThreadPoolExecutor(max_workers=max(1, len(runnable))) as pool:
+        scans = list(pool.map(lambda c: scan_category(c, cache, use_cache=not args.no_cache), runnable))
+
+    for scan in scans:
+        category = scan.category
+        index_path = os.path.join(DATA_DIR, f"{category}.json")
 
         with open(index_path, "r", encoding="utf-8") as f:
             index = json.load(f)
@@ -89,23 +196,7 @@ def main() -> int:
         deleted_files = 0
         removed_ids: list[str] = []
 
-        for name in os.listdir(detail_dir):
-            if not name.endswith(".json"):
-                continue
-            path = os.path.join(detail_dir, name)
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    obj = json.load(f)
-            except Exception:
-                # If a file is broken, skip it instead of deleting unexpectedly.
-                continue
-
-            # Prefer Id field; fallback to filename.
-            item_id = str(obj.get("Id") or os.path.splitext(name)[0])
-
-            if not json_contains_test(obj):
-                continue
-
+        for path, item_id in scan.matches:
             removed_ids.append(item_id)
             if args.dry_run:
                 print(f"[dry-run] delete {os.path.relpath(path, PROJECT_ROOT)}")
@@ -133,10 +224,13 @@ def main() -> int:
                     else:
                         del index[item_id]
 
-        if not args.dry_run:
-            with open(index_path, "w", encoding="utf-8") as f:
+        # Only rewrite the index when an entry was actually removed.
+        if removed_from_index and not args.dry_run:
+            tmp_path = index_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
                 json.dump(index, f, ensure_ascii=False, indent=2)
                 f.write("\n")
+            os.replace(tmp_path, index_path)
 
         total_deleted_files += deleted_files
         total_removed_from_index += removed_from_index
@@ -144,6 +238,19 @@ def main() -> int:
 
         print(f"[{category}] matched test files: {deleted_files}")
         print(f"[{category}] removed from index: {removed_from_index}")
+        print(f"[{category}] scanned: {scan.scanned}, unchanged since last clean run: {scan.skipped}")
+
+    if not args.dry_run and scans:
+        # Keep entries of categories outside this run; drop files that no longer exist.
+        scanned_categories = {scan.category for scan in scans}
+        files = {
+            key: value
+            for key, value in cache.items()
+            if key.split("/", 1)[0] not in scanned_categories and os.path.isfile(os.path.join(DATA_DIR, key))
+        }
+        for scan in scans:
+            files.update(scan.clean)
+        save_scan_cache(files)
 
     print(f"matched test files (total): {total_deleted_files}")
     print(f"removed from indexes (total): {total_removed_from_index}")
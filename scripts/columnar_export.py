@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+列式紧凑导出（agent_skills.json / enemy.json 等大索引文件）
+
+原始格式是 {key: {字段: 值}}，每条记录都重复约 40 个字段名。列式格式拆为两个文件：
+- {name}.columnar.json: 字段列表 + 字符串列（低基数列做字典编码）
+- {name}.columnar.bin:  数值列按列连续存放的小端二进制，可直接映射为 TypedArray
+
+数值列选用能精确还原的最小类型（int8/int16/int32/float32/float64），
+布尔列为 uint8，字典编码的下标为 uint8/uint16。每列偏移按元素大小对齐。
+
+formats.json 记录每个数据集可用的格式，前端加载器据此选择列式或原始 JSON。
+
+使用方式：
+    python scripts/columnar_export.py                 # 由 game-data 中现有的 JSON 生成列式文件
+    python scripts/columnar_export.py enemy           # 只处理指定数据集
+"""
+import argparse
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(PROJECT_ROOT, "web", "optimizer", "public", "game-data")
+FORMATS_MANIFEST = "formats.json"
+COLUMNAR_VERSION = 1
+
+# 支持列式导出的数据集（文件名不含扩展名）
+COLUMNAR_DATASETS = ["agent_skills", "enemy"]
+
+# 类型名 -> (array typecode, 字节数, 取值范围)
+INT_TYPES = [
+    ("int8", "b", 1, -(2 ** 7), 2 ** 7 - 1),
+    ("int16", "h", 2, -(2 ** 15), 2 ** 15 - 1),
+    ("int32", "i", 4, -(2 ** 31), 2 ** 31 - 1),
+]
+TYPECODES = {"uint8": ("B", 1), "uint16": ("H", 2), "float32": ("f", 4), "float64": ("d", 8)}
+TYPECODES.update({name: (code, size) for name, code, size, _, _ in INT_TYPES})
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _float32_exact(value: float) -> bool:
+    return struct.unpack("<f", struct.pack("<f", value))[0] == value
+
+
+def numeric_type(values: List[float]) -> str:
+    """能无损表示全部取值的最小数值类型"""
+    if all(math.isfinite(v) and float(v).is_integer() for v in values):
+        lo, hi = min(values), max(values)
+        for name, _, _, min_value, max_value in INT_TYPES:
+            if min_value <= lo and hi <= max_value:
+                return name
+    if all(_float32_exact(float(v)) for v in values):
+        return "float32"
+    return "float64"
+
+
+class BinaryWriter:
+    """按列追加到同一块小端缓冲区，每列起始偏移按元素大小对齐"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def append(self, type_name: str, values: List[Any]) -> int:
+        code, size = TYPECODES[type_name]
+        padding = -len(self.buffer) % size
+        self.buffer.extend(b"\0" * padding)
+        offset = len(self.buffer)
+        if code in "bhiBH":
+            values = [int(v) for v in values]
+        packed = array(code, values)
+        if sys.byteorder != "little":
+            packed.byteswap()
+        self.buffer.extend(packed.tobytes())
+        return offset
+
+
+def encode_column(name: str, values: List[Any], writer: BinaryWriter) -> Dict[str, Any]:
+    """单列编码：数值/布尔进二进制，低基数字符串做字典编码，其余保留为 JSON 数组"""
+    if all(isinstance(v, bool) for v in values):
+        return {"name": name, "type": "bool", "offset": writer.append("uint8", values)}
+
+    if all(_is_number(v) for v in values):
+        type_name = numeric_type(values)
+        return {"name": name, "type": type_name, "offset": writer.append(type_name, values)}
+
+    if all(isinstance(v, str) for v in values):
+        distinct = sorted(set(values))
+        if len(distinct) <= len(values) // 2 and len(distinct) <= 2 ** 16:
+            index = {v: i for i, v in enumerate(distinct)}
+            codes = "uint8" if len(distinct) <= 2 ** 8 else "uint16"
+            return {
+                "name": name,
+                "type": "dict",
+                "codes": codes,
+                "offset": writer.append(codes, [index[v] for v in values]),
+                "values": distinct,
+            }
+        return {"name": name, "type": "string", "values": values}
+
+    # 列表等复杂值（如异常条的积蓄值需求）原样保留
+    return {"name": name, "type": "json", "values": values}
+
+
+def to_columnar(data: Dict[str, Dict[str, Any]], binary_name: str) -> Tuple[Dict[str, Any], bytes]:
+    """
+    {key: record} -> (列式元数据, 二进制数值列)
+
+    要求所有记录字段一致（convert_csv_to_json 的输出满足这一点）。
+    """
+    keys = list(data.keys())
+    records = list(data.values())
+    fields: List[str] = list(records[0].keys()) if records else []
+    for key, record in zip(keys, records):
+        if list(record.keys()) != fields:
+            raise ValueError(f"记录 {key} 的字段与首条记录不一致，无法列式导出")
+
+    writer = BinaryWriter()
+    columns = [encode_column(field, [r[field] for r in records], writer) for field in fields]
+
+    meta: Dict[str, Any] = {
+        "format": "columnar",
+        "version": COLUMNAR_VERSION,
+        "count": len(records),
+        "binary": binary_name,
+        "byteLength": len(writer.buffer),
+        "fields": fields,
+        "columns": columns,
+    }
+    # key 与某个字符串列完全相同时只记录列名（如 enemy 的 id）
+    key_column = next(
+        (c["name"] for c in columns if c["type"] == "string" and c["values"] == keys),
+        None,
+    )
+    if key_column:
+        meta["keyColumn"] = key_column
+    else:
+        meta["keys"] = keys
+    return meta, bytes(writer.buffer)
+
+
+def from_columnar(meta: Dict[str, Any], binary: bytes) -> Dict[str, Dict[str, Any]]:
+    """to_columnar 的逆变换（用于导出后校验，逻辑与前端解码器一致）"""
+    count = meta["count"]
+    decoded: Dict[str, List[Any]] = {}
+    for column in meta["columns"]:
+        type_name = column["type"]
+        if type_name in ("string", "json"):
+            decoded[column["name"]] = column["values"]
+            continue
+        storage = column["codes"] if type_name == "dict" else ("uint8" if type_name == "bool" else type_name)
+        code, size = TYPECODES[storage]
+        values = array(code)
+        values.frombytes(binary[column["offset"]:column["offset"] + size * count])
+        if sys.byteorder != "little":
+            values.byteswap()
+        if type_name == "dict":
+            decoded[column["name"]] = [column["values"][i] for i in values]
+        elif type_name == "bool":
+            decoded[column["name"]] = [bool(v) for v in values]
+        else:
+            decoded[column["name"]] = list(values)
+
+    keys = decoded[meta["keyColumn"]] if "keyColumn" in meta else meta["keys"]
+    return {
+        key: {field: decoded[field][i] for field in meta["fields"]}
+        for i, key in enumerate(keys)
+    }
+
+
+def load_formats_manifest(data_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(data_dir, FORMATS_MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        manifest = {}
+    manifest.setdefault("version", 1)
+    manifest.setdefault("datasets", {})
+    return manifest
+
+
+def update_formats_manifest(data_dir: str, name: str, columnar_meta: Optional[Dict[str, Any]]) -> None:
+    """
+    记录数据集可用格式，key 为前端加载的原始 JSON 路径。
+    columnar_meta 为 None 时移除该数据集的列式条目，避免加载器读到过期文件。
+    """
+    manifest = load_formats_manifest(data_dir)
+    path = f"/game-data/{name}.json"
+    if columnar_meta is None:
+        manifest["datasets"].pop(path, None)
+    else:
+        manifest["datasets"][path] = {
+            "columnar": f"/game-data/{name}.columnar.json",
+            "binary": f"/game-data/{columnar_meta['binary']}",
+            "count": columnar_meta["count"],
+        }
+    with open(os.path.join(data_dir, FORMATS_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def write_columnar(data: Dict[str, Dict[str, Any]], data_dir: str, name: str) -> Tuple[int, int]:
+    """写出 {name}.columnar.json / .bin 并更新 formats.json，返回 (元数据字节数, 二进制字节数)"""
+    binary_name = f"{name}.columnar.bin"
+    meta, binary = to_columnar(data, binary_name)
+    if from_columnar(meta, binary) != data:
+        raise ValueError(f"{name}: 列式导出校验失败（解码结果与原数据不一致）")
+
+    meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    with open(os.path.join(data_dir, f"{name}.columnar.json"), "wb") as f:
+        f.write(meta_bytes)
+    with open(os.path.join(data_dir, binary_name), "wb") as f:
+        f.write(binary)
+    update_formats_manifest(data_dir, name, meta)
+    return len(meta_bytes), len(binary)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="将 game-data 中的大索引 JSON 导出为列式紧凑格式")
+    parser.add_argument("datasets", nargs="*", help=f"数据集（默认全部）: {', '.join(COLUMNAR_DATASETS)}")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="game-data 目录")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.datasets if name not in COLUMNAR_DATASETS]
+    if unknown:
+        parser.error(f"不支持的数据集: {', '.join(unknown)}")
+
+    for name in args.datasets or COLUMNAR_DATASETS:
+        json_path = os.path.join(args.data_dir, f"{name}.json")
+        if not os.path.exists(json_path):
+            print(f"  ✗ {name}: 文件不存在 ({json_path})")
+            continue
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        meta_size, binary_size = write_columnar(data, args.data_dir, name)
+        raw_size = os.path.getsize(json_path)
+        total = meta_size + binary_size
+        print(
+            f"  ✓ {name}: {len(data)} 项, JSON {raw_size / 1024:.1f} KB -> "
+            f"列式 {total / 1024:.1f} KB (元数据 {meta_size / 1024:.1f} KB + 二进制 {binary_size / 1024:.1f} KB), "
+            f"减少 {(1 - total / raw_size) * 100:.0f}%"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,235 +9,193 @@
 2. 爬虫更新后重新同步数据
 3. 数据格式变更后批量转换
 """
-import csv
-import json
+import argparse
+import filecmp
 import shutil
 from pathlib import Path
 from typing import Dict, Any
 
+from build_data_bundle import build_bundle, print_bundle_summary
+from columnar_export import update_formats_manifest, write_columnar
+from csv_schema import Column, CsvSchema, convert_csv, stream_csv_to_json
+
+
+# ==================== CSV 列定义 ====================
+# 新增列只需在对应 schema 中加一行 Column(CSV列名, 输出字段, 类型)
+
+BANGBOO_SCHEMA = CsvSchema(
+    columns=(
+        Column('ID', 'id', 'str'),
+        Column('中文名称', 'CHS', 'str'),
+        Column(None, 'EN', 'str'),  # CSV中没有英文名
+        Column('生命值', 'base_hp'),
+        Column('生命值每级成长', 'hp_growth'),
+        Column('攻击力', 'base_atk'),
+        Column('攻击力每级成长', 'atk_growth'),
+        Column('冲击力', 'impact'),
+        Column('异常掌控', 'anomaly_mastery'),
+        Column('防御力', 'base_def'),
+        Column('防御力每级成长', 'def_growth'),
+        Column('暴击率', 'crit_rate'),
+        Column('暴击伤害', 'crit_dmg'),
+        Column('60级生命值', 'level_60_hp'),
+        Column('60级攻击力', 'level_60_atk'),
+        Column('60级防御力', 'level_60_def'),
+    ),
+    key_fields=('id',),
+    required=('id', 'CHS'),  # 跳过空ID或测试数据
+)
+
+ENEMY_SCHEMA = CsvSchema(
+    columns=(
+        Column('ID', 'id', 'str'),
+        Column('完整名称', 'full_name', 'str'),
+        Column('完整名称', 'CHS', 'str'),
+        Column('FullName', 'EN', 'str'),
+        Column('CodeName', 'code_name', 'str'),
+        Column('IndexID', 'index_id', 'str'),
+        # 基础属性
+        Column('生命值', 'hp'),
+        Column('攻击力', 'atk'),
+        Column('防御力', 'defense'),
+        Column('暴击伤害', 'crit_dmg'),
+        # 失衡相关
+        Column('失衡值上限', 'stun_max'),
+        Column('能否失衡', 'can_stun', 'bool'),
+        Column('失衡值自动回复', 'stun_auto_recovery'),
+        Column('失衡值自动回复时限', 'stun_auto_recovery_delay'),
+        Column('基础失衡恢复速度', 'base_stun_recovery_speed'),
+        Column('默认失衡恢复时间', 'default_stun_recovery_time'),
+        Column('失衡易伤倍率', 'stun_vulnerability_multiplier'),
+        Column('可连携次数', 'chain_attack_count', 'int'),
+        Column('初始抗打断等级', 'base_poise_level', 'int'),
+        Column('冻结时间抵抗', 'freeze_time_resistance'),
+        # 伤害抗性
+        Column('冰伤害抗性', 'ice_dmg_resistance'),
+        Column('火伤害抗性', 'fire_dmg_resistance'),
+        Column('电伤害抗性', 'electric_dmg_resistance'),
+        Column('物理伤害抗性', 'physical_dmg_resistance'),
+        Column('以太伤害抗性', 'ether_dmg_resistance'),
+        # 异常抗性
+        Column('冰异常抗性', 'ice_anomaly_resistance'),
+        Column('火异常抗性', 'fire_anomaly_resistance'),
+        Column('电异常抗性', 'electric_anomaly_resistance'),
+        Column('物理异常抗性', 'physical_anomaly_resistance'),
+        Column('以太异常抗性', 'ether_anomaly_resistance'),
+        # 失衡抗性
+        Column('冰失衡抗性', 'ice_stun_resistance'),
+        Column('火失衡抗性', 'fire_stun_resistance'),
+        Column('电失衡抗性', 'electric_stun_resistance'),
+        Column('物理失衡抗性', 'physical_stun_resistance'),
+        Column('以太失衡抗性', 'ether_stun_resistance'),
+        # 异常条ID
+        Column('冰异常条', 'ice_anomaly_bar', 'str'),
+        Column('火异常条', 'fire_anomaly_bar', 'str'),
+        Column('电异常条', 'electric_anomaly_bar', 'str'),
+        Column('物理异常条', 'physical_anomaly_bar', 'str'),
+        Column('以太异常条', 'ether_anomaly_bar', 'str'),
+        # 其他
+        Column('基础积蓄上限提升系数', 'base_buildup_coefficient'),
+        Column('能量球掉落', 'energy_orb_drop'),
+        Column('标签列表', 'tags', 'str'),
+        # 70级属性
+        Column('70级最大生命值', 'level_70_max_hp'),
+        Column('70级最大攻击力', 'level_70_max_atk'),
+        Column('70级最大失衡值上限', 'level_70_max_stun'),
+        Column('60级及以上防御力', 'level_60_plus_defense'),
+    ),
+    key_fields=('id',),
+    required=('id',),
+)
+
+AGENT_SKILLS_SCHEMA = CsvSchema(
+    columns=(
+        Column('代理人', 'agent_name', 'str'),
+        Column('技能', 'skill_name', 'str'),
+        Column('段', 'stage', 'str'),
+        Column('伤害倍率', 'dmg_ratio'),
+        Column('伤害倍率成长', 'dmg_ratio_growth'),
+        Column('失衡倍率', 'stun_ratio'),
+        Column('失衡倍率成长', 'stun_ratio_growth'),
+        Column('能量回复', 'energy_recovery'),
+        Column('异常积蓄', 'anomaly_buildup'),
+        Column('喧响值回复', 'decibel_recovery'),
+        Column('闪能累积', 'flash_energy'),
+        Column('秽盾削减值', 'corruption_shield'),
+        Column('技能类型', 'skill_type', 'str'),
+        Column('攻击类型', 'attack_type', 'str'),
+        Column('能量额外消耗', 'energy_extra_cost'),
+        Column('特殊能量', 'special_energy', 'str'),
+        Column('距离衰减', 'distance_decay', 'str'),
+    ),
+    key_fields=('agent_name', 'skill_name', 'stage'),  # "代理人_技能_段"，无段时省略
+    required=('agent_name', 'skill_name'),
+)
+
+BANGBOO_SKILLS_SCHEMA = CsvSchema(
+    columns=(
+        Column('名称', 'bangboo_name', 'str'),
+        Column('技能', 'skill_name', 'str'),
+        Column('伤害倍率', 'dmg_ratio'),
+        Column('伤害倍率成长', 'dmg_ratio_growth'),
+        Column('失衡倍率', 'stun_ratio'),
+        Column('失衡倍率成长', 'stun_ratio_growth'),
+        Column('异常积蓄', 'anomaly_buildup'),
+    ),
+    key_fields=('bangboo_name', 'skill_name'),  # "邦布名_技能名"
+    required=('bangboo_name', 'skill_name'),
+)
+
+ANOMALY_BARS_SCHEMA = CsvSchema(
+    columns=(
+        Column('异常条ID', 'id', 'str'),
+        Column('属性', 'element', 'str'),
+        Column('对应异常ID', 'anomaly_id', 'str'),
+        Column('备注', 'note', 'str'),
+        Column('异常CD', 'anomaly_cd'),
+        # 10次积蓄值需求
+        Column(tuple(f'积蓄值需求{i}' for i in range(1, 11)), 'buildup_requirements'),
+    ),
+    key_fields=('id',),
+    required=('id',),
+)
+
+# 输出文件名 -> (CSV文件名, schema, 描述)
+CSV_DATASETS = [
+    ('bangboo', '邦布属性.csv', BANGBOO_SCHEMA, '邦布索引'),
+    ('enemy', '敌人属性.csv', ENEMY_SCHEMA, '敌人索引'),
+    ('agent_skills', '代理人技能数据.csv', AGENT_SKILLS_SCHEMA, '代理人技能数据'),
+    ('bangboo_skills', '邦布技能.csv', BANGBOO_SKILLS_SCHEMA, '邦布技能数据'),
+    ('anomaly_bars', '异常条.csv', ANOMALY_BARS_SCHEMA, '异常条数据'),
+]
+
+# 支持列式导出的数据集（见 columnar_export.py）
+COLUMNAR_DATASETS = {'agent_skills', 'enemy'}
+
 
 def convert_bangboo_to_json(csv_path: Path) -> Dict[str, Any]:
     """将邦布属性CSV转换为JSON索引数据"""
-    bangboo_data = {}
-
-    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            bangboo_id = row.get('ID', '').strip()
-            name_cn = row.get('中文名称', '').strip()
-
-            # 跳过空ID或测试数据
-            if not bangboo_id or not name_cn:
-                continue
-
-            bangboo_data[bangboo_id] = {
-                'id': bangboo_id,
-                'CHS': name_cn,
-                'EN': '',  # CSV中没有英文名
-                'base_hp': float(row.get('生命值', 0) or 0),
-                'hp_growth': float(row.get('生命值每级成长', 0) or 0),
-                'base_atk': float(row.get('攻击力', 0) or 0),
-                'atk_growth': float(row.get('攻击力每级成长', 0) or 0),
-                'impact': float(row.get('冲击力', 0) or 0),
-                'anomaly_mastery': float(row.get('异常掌控', 0) or 0),
-                'base_def': float(row.get('防御力', 0) or 0),
-                'def_growth': float(row.get('防御力每级成长', 0) or 0),
-                'crit_rate': float(row.get('暴击率', 0) or 0),
-                'crit_dmg': float(row.get('暴击伤害', 0) or 0),
-                'level_60_hp': float(row.get('60级生命值', 0) or 0),
-                'level_60_atk': float(row.get('60级攻击力', 0) or 0),
-                'level_60_def': float(row.get('60级防御力', 0) or 0),
-            }
-
-    return bangboo_data
+    return convert_csv(BANGBOO_SCHEMA, csv_path)
 
 
 def convert_enemy_to_json(csv_path: Path) -> Dict[str, Any]:
     """将敌人属性CSV转换为JSON索引数据（完整字段）"""
-    enemy_data = {}
-
-    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            enemy_id = row.get('ID', '').strip()
-            full_name = row.get('完整名称', '').strip()
-
-            if not enemy_id:
-                continue
-
-            can_stun_str = row.get('能否失衡', 'True').strip()
-            can_stun = can_stun_str.lower() == 'true'
-
-            enemy_data[enemy_id] = {
-                'id': enemy_id,
-                'full_name': full_name,
-                'CHS': full_name,
-                'EN': row.get('FullName', '').strip(),
-                'code_name': row.get('CodeName', '').strip(),
-                'index_id': row.get('IndexID', '').strip(),
-                # 基础属性
-                'hp': safe_float(row.get('生命值', 0)),
-                'atk': safe_float(row.get('攻击力', 0)),
-                'defense': safe_float(row.get('防御力', 0)),
-                'crit_dmg': safe_float(row.get('暴击伤害', 0)),
-                # 失衡相关
-                'stun_max': safe_float(row.get('失衡值上限', 0)),
-                'can_stun': can_stun,
-                'stun_auto_recovery': safe_float(row.get('失衡值自动回复', 0)),
-                'stun_auto_recovery_delay': safe_float(row.get('失衡值自动回复时限', 0)),
-                'base_stun_recovery_speed': safe_float(row.get('基础失衡恢复速度', 0)),
-                'default_stun_recovery_time': safe_float(row.get('默认失衡恢复时间', 0)),
-                'stun_vulnerability_multiplier': safe_float(row.get('失衡易伤倍率', 0)),
-                'chain_attack_count': int(safe_float(row.get('可连携次数', 0))),
-                'base_poise_level': int(safe_float(row.get('初始抗打断等级', 0))),
-                'freeze_time_resistance': safe_float(row.get('冻结时间抵抗', 0)),
-                # 伤害抗性
-                'ice_dmg_resistance': safe_float(row.get('冰伤害抗性', 0)),
-                'fire_dmg_resistance': safe_float(row.get('火伤害抗性', 0)),
-                'electric_dmg_resistance': safe_float(row.get('电伤害抗性', 0)),
-                'physical_dmg_resistance': safe_float(row.get('物理伤害抗性', 0)),
-                'ether_dmg_resistance': safe_float(row.get('以太伤害抗性', 0)),
-                # 异常抗性
-                'ice_anomaly_resistance': safe_float(row.get('冰异常抗性', 0)),
-                'fire_anomaly_resistance': safe_float(row.get('火异常抗性', 0)),
-                'electric_anomaly_resistance': safe_float(row.get('电异常抗性', 0)),
-                'physical_anomaly_resistance': safe_float(row.get('物理异常抗性', 0)),
-                'ether_anomaly_resistance': safe_float(row.get('以太异常抗性', 0)),
-                # 失衡抗性
-                'ice_stun_resistance': safe_float(row.get('冰失衡抗性', 0)),
-                'fire_stun_resistance': safe_float(row.get('火失衡抗性', 0)),
-                'electric_stun_resistance': safe_float(row.get('电失衡抗性', 0)),
-                'physical_stun_resistance': safe_float(row.get('物理失衡抗性', 0)),
-                'ether_stun_resistance': safe_float(row.get('以太失衡抗性', 0)),
-                # 异常条ID
-                'ice_anomaly_bar': row.get('冰异常条', '').strip(),
-                'fire_anomaly_bar': row.get('火异常条', '').strip(),
-                'electric_anomaly_bar': row.get('电异常条', '').strip(),
-                'physical_anomaly_bar': row.get('物理异常条', '').strip(),
-                'ether_anomaly_bar': row.get('以太异常条', '').strip(),
-                # 其他
-                'base_buildup_coefficient': safe_float(row.get('基础积蓄上限提升系数', 0)),
-                'energy_orb_drop': safe_float(row.get('能量球掉落', 0)),
-                'tags': row.get('标签列表', '').strip(),
-                # 70级属性
-                'level_70_max_hp': safe_float(row.get('70级最大生命值', 0)),
-                'level_70_max_atk': safe_float(row.get('70级最大攻击力', 0)),
-                'level_70_max_stun': safe_float(row.get('70级最大失衡值上限', 0)),
-                'level_60_plus_defense': safe_float(row.get('60级及以上防御力', 0)),
-            }
-
-    return enemy_data
-
-
-def safe_float(value, default=0.0) -> float:
-    """安全地转换为浮点数"""
-    if value is None or value == '':
-        return default
-    try:
-        return float(value)
-    except (ValueError, TypeError):
-        return default
+    return convert_csv(ENEMY_SCHEMA, csv_path)
 
 
 def convert_agent_skills_to_json(csv_path: Path) -> Dict[str, Any]:
     """将代理人技能CSV转换为JSON数据"""
-    skills_data = {}
-
-    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            agent_name = row.get('代理人', '').strip()
-            skill_name = row.get('技能', '').strip()
-
-            if not agent_name or not skill_name:
-                continue
-
-            # 使用 "代理人_技能_段" 作为key
-            stage = row.get('段', '').strip()
-            key = f"{agent_name}_{skill_name}"
-            if stage:
-                key += f"_{stage}"
-
-            skills_data[key] = {
-                'agent_name': agent_name,
-                'skill_name': skill_name,
-                'stage': stage,
-                'dmg_ratio': safe_float(row.get('伤害倍率', 0)),
-                'dmg_ratio_growth': safe_float(row.get('伤害倍率成长', 0)),
-                'stun_ratio': safe_float(row.get('失衡倍率', 0)),
-                'stun_ratio_growth': safe_float(row.get('失衡倍率成长', 0)),
-                'energy_recovery': safe_float(row.get('能量回复', 0)),
-                'anomaly_buildup': safe_float(row.get('异常积蓄', 0)),
-                'decibel_recovery': safe_float(row.get('喧响值回复', 0)),
-                'flash_energy': safe_float(row.get('闪能累积', 0)),
-                'corruption_shield': safe_float(row.get('秽盾削减值', 0)),
-                'skill_type': row.get('技能类型', '').strip(),
-                'attack_type': row.get('攻击类型', '').strip(),
-                'energy_extra_cost': safe_float(row.get('能量额外消耗', 0)),
-                'special_energy': row.get('特殊能量', '').strip(),
-                'distance_decay': row.get('距离衰减', '').strip(),
-            }
-
-    return skills_data
+    return convert_csv(AGENT_SKILLS_SCHEMA, csv_path)
 
 
 def convert_bangboo_skills_to_json(csv_path: Path) -> Dict[str, Any]:
     """将邦布技能CSV转换为JSON数据"""
-    skills_data = {}
-
-    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            name = row.get('名称', '').strip()
-            skill_name = row.get('技能', '').strip()
-
-            if not name or not skill_name:
-                continue
-
-            # 使用 "邦布名_技能名" 作为key
-            key = f"{name}_{skill_name}"
-
-            skills_data[key] = {
-                'bangboo_name': name,
-                'skill_name': skill_name,
-                'dmg_ratio': safe_float(row.get('伤害倍率', 0)),
-                'dmg_ratio_growth': safe_float(row.get('伤害倍率成长', 0)),
-                'stun_ratio': safe_float(row.get('失衡倍率', 0)),
-                'stun_ratio_growth': safe_float(row.get('失衡倍率成长', 0)),
-                'anomaly_buildup': safe_float(row.get('异常积蓄', 0)),
-            }
-
-    return skills_data
+    return convert_csv(BANGBOO_SKILLS_SCHEMA, csv_path)
 
 
 def convert_anomaly_bars_to_json(csv_path: Path) -> Dict[str, Any]:
     """将异常条CSV转换为JSON数据"""
-    anomaly_data = {}
-
-    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            bar_id = row.get('异常条ID', '').strip()
-
-            if not bar_id:
-                continue
-
-            # 读取10次积蓄值需求
-            buildup_requirements = []
-            for i in range(1, 11):
-                req = safe_float(row.get(f'积蓄值需求{i}', 0))
-                buildup_requirements.append(req)
-
-            anomaly_data[bar_id] = {
-                'id': bar_id,
-                'element': row.get('属性', '').strip(),
-                'anomaly_id': row.get('对应异常ID', '').strip(),
-                'note': row.get('备注', '').strip(),
-                'anomaly_cd': safe_float(row.get('异常CD', 0)),
-                'buildup_requirements': buildup_requirements,
-            }
-
-    return anomaly_data
+    return convert_csv(ANOMALY_BARS_SCHEMA, csv_path)
 
 
 def copy_directory(src: Path, dst: Path, description: str):
@@ -252,6 +210,32 @@ def copy_directory(src: Path, dst: Path, description: str):
         print(f"  ✗ {description}: 源目录不存在 ({src})")
 
 
+def copy_changed_files(src: Path, dst: Path, description: str):
+    """
+    增量同步目录：只复制与目标内容不同的源文件，并删除源目录中已不存在的文件
+
+    以本脚本实际读取的 assets/inventory_data 为准逐文件比较（大小与修改时间一致时视为相同，
+    否则比较内容；copy2 保留修改时间），结果与整目录复制相同。
+    """
+    if not src.exists():
+        print(f"  ✗ {description}: 源目录不存在 ({src})")
+        return
+    dst.mkdir(parents=True, exist_ok=True)
+    copied = 0
+    sources = {path.name for path in src.glob('*.json')}
+    for name in sorted(sources):
+        src_file, dst_file = src / name, dst / name
+        if not dst_file.exists() or not filecmp.cmp(src_file, dst_file, shallow=True):
+            shutil.copy2(src_file, dst_file)
+            copied += 1
+    removed = 0
+    for dst_file in dst.glob('*.json'):
+        if dst_file.name not in sources:
+            dst_file.unlink()
+            removed += 1
+    print(f"  ✓ {description}: {copied} 个变更文件" + (f"，删除 {removed} 个" if removed else ""))
+
+
 def copy_file(src: Path, dst: Path, description: str):
     """复制单个文件"""
     if src.exists():
@@ -262,15 +246,49 @@ def copy_file(src: Path, dst: Path, description: str):
         print(f"  ✗ {description}: 源文件不存在 ({src})")
 
 
-def save_json(data: Dict[str, Any], output_path: Path, description: str):
-    """保存JSON文件"""
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"  ✓ {description}: {len(data)} 项")
+def convert_dataset(csv_path: Path, schema: CsvSchema, target_dir: Path, name: str, description: str, columnar: bool):
+    """
+    CSV 逐行转换并流式写入 {name}.json
+
+    列式数据集在 columnar 为 True 时额外导出列式格式并登记到 formats.json（列式导出需要完整数据）
+    """
+    count = stream_csv_to_json(schema, csv_path, target_dir / f'{name}.json')
+    print(f"  ✓ {description}: {count} 项")
+    if name not in COLUMNAR_DATASETS:
+        return
+    if columnar:
+        meta_size, binary_size = write_columnar(convert_csv(schema, csv_path), str(target_dir), name)
+        print(f"    列式格式: {(meta_size + binary_size) / 1024:.1f} KB")
+    else:
+        # 未导出列式文件时移除登记，避免前端读到与 JSON 不一致的旧文件
+        update_formats_manifest(str(target_dir), name, None)
+
+
+# 详细数据目录（--only-changed 时只复制与目标不同的文件）
+DETAIL_DIRECTORIES = [
+    ('character', '角色详细数据'),
+    ('weapon', '音擎详细数据'),
+    ('equipment', '驱动盘详细数据'),
+    ('character_data_buff', '角色Buff数据'),
+    ('weapon_data_buff', '音擎Buff数据'),
+    ('equipment_data_buff', '驱动盘Buff数据'),
+]
 
 
 def main():
+    parser = argparse.ArgumentParser(description="同步爬虫原始数据到前端 game-data 目录")
+    parser.add_argument(
+        '--only-changed',
+        action='store_true',
+        help='详细数据只复制源目录中与目标内容不同的文件（默认整目录复制）',
+    )
+    parser.add_argument(
+        '--columnar',
+        action='store_true',
+        help='额外为 agent_skills.json / enemy.json 导出列式紧凑格式（见 columnar_export.py）',
+    )
+    args = parser.parse_args()
+
     # 路径配置
     root_dir = Path(__file__).parent.parent
     source_dir = root_dir / 'assets' / 'inventory_data'
@@ -287,71 +305,42 @@ def main():
     target_dir.mkdir(parents=True, exist_ok=True)
 
     # ==================== 1. 复制JSON索引文件 ====================
-    print("[1/4] 复制JSON索引文件...")
+    print("[1/5] 复制JSON索引文件...")
     copy_file(source_dir / 'character.json', target_dir / 'character.json', '角色索引')
     copy_file(source_dir / 'weapon.json', target_dir / 'weapon.json', '音擎索引')
     copy_file(source_dir / 'equipment.json', target_dir / 'equipment.json', '驱动盘索引')
     print()
 
     # ==================== 2. 转换CSV为JSON ====================
-    print("[2/4] 转换CSV为JSON...")
-
-    # 邦布数据
-    bangboo_csv = source_dir / 'csv' / '邦布属性.csv'
-    if bangboo_csv.exists():
-        bangboo_data = convert_bangboo_to_json(bangboo_csv)
-        save_json(bangboo_data, target_dir / 'bangboo.json', '邦布索引')
-    else:
-        print(f"  ✗ 邦布索引: CSV文件不存在")
-
-    # 敌人数据
-    enemy_csv = source_dir / 'csv' / '敌人属性.csv'
-    if enemy_csv.exists():
-        enemy_data = convert_enemy_to_json(enemy_csv)
-        save_json(enemy_data, target_dir / 'enemy.json', '敌人索引')
-    else:
-        print(f"  ✗ 敌人索引: CSV文件不存在")
-
-    # 代理人技能数据
-    agent_skills_csv = source_dir / 'csv' / '代理人技能数据.csv'
-    if agent_skills_csv.exists():
-        agent_skills_data = convert_agent_skills_to_json(agent_skills_csv)
-        save_json(agent_skills_data, target_dir / 'agent_skills.json', '代理人技能数据')
-    else:
-        print(f"  ✗ 代理人技能数据: CSV文件不存在")
-
-    # 邦布技能数据
-    bangboo_skills_csv = source_dir / 'csv' / '邦布技能.csv'
-    if bangboo_skills_csv.exists():
-        bangboo_skills_data = convert_bangboo_skills_to_json(bangboo_skills_csv)
-        save_json(bangboo_skills_data, target_dir / 'bangboo_skills.json', '邦布技能数据')
-    else:
-        print(f"  ✗ 邦布技能数据: CSV文件不存在")
-
-    # 异常条数据
-    anomaly_bars_csv = source_dir / 'csv' / '异常条.csv'
-    if anomaly_bars_csv.exists():
-        anomaly_bars_data = convert_anomaly_bars_to_json(anomaly_bars_csv)
-        save_json(anomaly_bars_data, target_dir / 'anomaly_bars.json', '异常条数据')
-    else:
-        print(f"  ✗ 异常条数据: CSV文件不存在")
+    print("[2/5] 转换CSV为JSON...")
+
+    for name, csv_name, schema, description in CSV_DATASETS:
+        csv_path = source_dir / 'csv' / csv_name
+        if csv_path.exists():
+            convert_dataset(csv_path, schema, target_dir, name, description, args.columnar)
+        else:
+            print(f"  ✗ {description}: CSV文件不存在")
     print()
 
     # ==================== 3. 复制详细数据目录 ====================
-    print("[3/4] 复制详细数据目录...")
-    copy_directory(source_dir / 'character', target_dir / 'character', '角色详细数据')
-    copy_directory(source_dir / 'weapon', target_dir / 'weapon', '音擎详细数据')
-    copy_directory(source_dir / 'equipment', target_dir / 'equipment', '驱动盘详细数据')
-    copy_directory(source_dir / 'character_data_buff', target_dir / 'character_data_buff', '角色Buff数据')
-    copy_directory(source_dir / 'weapon_data_buff', target_dir / 'weapon_data_buff', '音擎Buff数据')
-    copy_directory(source_dir / 'equipment_data_buff', target_dir / 'equipment_data_buff', '驱动盘Buff数据')
+    print("[3/5] 复制详细数据目录...")
+    for dir_name, description in DETAIL_DIRECTORIES:
+        if args.only_changed:
+            copy_changed_files(source_dir / dir_name, target_dir / dir_name, description)
+        else:
+            copy_directory(source_dir / dir_name, target_dir / dir_name, description)
     print()
 
     # ==================== 4. 复制CSV数据（保留原始数据） ====================
-    print("[4/4] 复制CSV数据...")
+    print("[4/5] 复制CSV数据...")
     copy_directory(source_dir / 'csv', target_dir / 'csv', 'CSV原始数据')
     print()
 
+    # ==================== 5. 打包合并包 ====================
+    print("[5/5] 打包索引与Buff数据...")
+    print_bundle_summary(build_bundle(str(target_dir)))
+    print()
+
     # ==================== 完成 ====================
     print("=" * 70)
     print("✓ 数据同步完成！")
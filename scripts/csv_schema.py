@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+声明式 CSV 列定义 + 流式转换
+
+每个数据集用 CsvSchema 声明 "CSV 列名 -> 输出字段 / 类型 / 默认值"。
+读到表头后 compile_schema() 把列定义编译成按列下标取值的转换器列表，之后每行只做
+下标访问和类型转换，不再为每行构造 DictReader 的字典；记录逐条写入 JSON，
+不在内存中拼出完整结果。
+
+输出与原来的 json.dump(dict, indent=2) 逐字节一致，包括重复 key 的处理
+（后出现的行覆盖前面的值，但保留首次出现的位置）。
+"""
+import csv
+from dataclasses import dataclass
+from json.encoder import py_encode_basestring
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    from _json import encode_basestring
+except ImportError:
+    encode_basestring = py_encode_basestring
+
+
+def safe_float(value, default=0.0) -> float:
+    """安全地转换为浮点数"""
+    if value is None or value == '':
+        return default
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+
+# 列缺失时的默认原始值（与 row.get(列名, 默认) 的旧行为一致）
+DEFAULTS: Dict[str, Any] = {'str': '', 'float': 0.0, 'int': 0, 'bool': 'True'}
+
+
+_INFINITY = float('inf')
+
+
+def _float_json(value: float) -> str:
+    # 与 json 模块的 floatstr 一致
+    if value != value:
+        return 'NaN'
+    if value == _INFINITY:
+        return 'Infinity'
+    if value == -_INFINITY:
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+# 类型 -> 单个值的 JSON 文本编码（均为 C 实现或简单分支，比通用 json.dumps(indent=2) 快得多）
+SCALAR_ENCODERS: Dict[str, Callable[[Any], str]] = {
+    'str': encode_basestring,
+    'float': _float_json,
+    'int': int.__repr__,
+    'bool': lambda value: 'true' if value else 'false',
+}
+
+
+@dataclass(frozen=True)
+class Column:
+    """
+    一个输出字段
+
+    header 为 None 时输出常量 default；为元组时按顺序读取多列，输出列表
+    （如异常条的 10 个积蓄值需求）。同一 CSV 列可以映射到多个输出字段。
+    """
+    header: Union[str, Tuple[str, ...], None]
+    key: str
+    type: str = 'float'
+    default: Any = None
+
+    def raw_default(self) -> Any:
+        return DEFAULTS[self.type] if self.default is None else self.default
+
+
+@dataclass(frozen=True)
+class CsvSchema:
+    columns: Tuple[Column, ...]
+    key_fields: Tuple[str, ...]  # 记录 key 由这些输出字段的非空值用 "_" 连接
+    required: Tuple[str, ...]  # 任一字段为空时跳过该行
+
+    def column(self, key: str) -> Column:
+        return next(c for c in self.columns if c.key == key)
+
+
+# 编译后的单字段取值函数：row(list[str]) -> 输出值
+Getter = Callable[[List[str]], Any]
+
+
+def _constant(column: Column) -> Getter:
+    default = column.raw_default()
+    if column.type == 'str':
+        value = default.strip() if isinstance(default, str) else default
+    elif column.type == 'bool':
+        value = str(default).strip().lower() == 'true' if isinstance(default, str) else bool(default)
+    elif column.type == 'int':
+        value = int(safe_float(default, default))
+    else:
+        value = safe_float(default, default)
+    return lambda row: value
+
+
+def _compile_getter(column: Column, index: Dict[str, int]) -> Getter:
+    """
+    按列下标编译取值函数（每种类型一个专用闭包，每行只做一次下标访问和一次转换）
+
+    行已由调用方补齐到表头宽度，无需再检查越界。
+    """
+    if column.header is None or (isinstance(column.header, str) and column.header not in index):
+        return _constant(column)
+
+    if isinstance(column.header, tuple):
+        getters = [_compile_getter(Column(h, column.key, column.type, column.default), index) for h in column.header]
+        return lambda row: [g(row) for g in getters]
+
+    i = index[column.header]
+    default = column.raw_default()
+    if column.type == 'str':
+        return lambda row: row[i].strip()
+    if column.type == 'bool':
+        return lambda row: row[i].strip().lower() == 'true'
+    if column.type == 'int':
+        return lambda row: int(safe_float(row[i], default))
+
+    def get_float(row: List[str]) -> float:
+        value = row[i]
+        if not value:
+            return default
+        try:
+            return float(value)
+        except ValueError:
+            return default
+
+    return get_float
+
+
+def _compile_encoder(column: Column) -> Callable[[Any], str]:
+    """值 -> indent=2 格式下记录内（第二层）的 JSON 文本"""
+    encode = SCALAR_ENCODERS[column.type]
+    if not isinstance(column.header, tuple):
+        return encode
+
+    def encode_list(values: List[Any]) -> str:
+        if not values:
+            return '[]'
+        return '[\n      ' + ',\n      '.join(map(encode, values)) + '\n    ]'
+
+    return encode_list
+
+
+class CompiledSchema:
+    """
+    按某个 CSV 表头编译好的 schema
+
+    fields 为 [(输出字段, 取值函数, JSON 编码函数, 预先拼好的 '\n    "字段": ' 前缀)]
+    """
+
+    def __init__(self, schema: CsvSchema, header: Sequence[str]):
+        index = {name.strip(): i for i, name in enumerate(header)}
+        self.width = len(header)
+        self.fields = [
+            (
+                c.key,
+                _compile_getter(c, index),
+                _compile_encoder(c),
+                '\n    ' + encode_basestring(c.key) + ': ',
+            )
+            for c in schema.columns
+        ]
+        getters = {c.key: _compile_getter(c, index) for c in schema.columns}
+        self._key_getters = [getters[k] for k in schema.key_fields]
+        self._required_getters = [getters[k] for k in schema.required]
+
+    def pad(self, row: List[str]) -> List[str]:
+        """补齐缺列的短行（缺失值按空字符串处理，即取默认值）"""
+        if len(row) < self.width:
+            row = row + [''] * (self.width - len(row))
+        return row
+
+    def key(self, row: List[str]) -> Optional[str]:
+        """记录 key；必填字段为空时返回 None"""
+        for get in self._required_getters:
+            if not get(row):
+                return None
+        return '_'.join(str(v) for v in (get(row) for get in self._key_getters) if v)
+
+    def record(self, row: List[str]) -> Dict[str, Any]:
+        return {key: get(row) for key, get, _, _ in self.fields}
+
+    def record_json(self, row: List[str]) -> str:
+        """记录的 JSON 文本（作为顶层对象的值，缩进与 json.dump(indent=2) 相同）"""
+        if not self.fields:
+            return '{}'
+        parts = [prefix + encode(get(row)) for _, get, encode, prefix in self.fields]
+        return '{' + ','.join(parts) + '\n  }'
+
+
+def compile_schema(schema: CsvSchema, header: Sequence[str]) -> CompiledSchema:
+    return CompiledSchema(schema, header)
+
+
+def _open_csv(csv_path: Path):
+    return open(csv_path, 'r', encoding='utf-8-sig', newline='')
+
+
+def iter_rows(schema: CsvSchema, csv_path: Path) -> Iterator[Tuple[str, List[str], CompiledSchema]]:
+    """
+    逐行产出 (key, 原始行, 编译后的 schema)，顺序与语义与 "dict[key] = 记录" 逐行赋值相同
+
+    先只扫描 key 列找出重复 key，仅保存重复 key 最后一次出现的原始行；
+    第二遍在首次出现的位置输出最终的行，后续重复行跳过。
+    """
+    with _open_csv(csv_path) as f:
+        reader = csv.reader(f)
+        compiled = compile_schema(schema, next(reader, []))
+        seen = set()
+        duplicates = set()
+        for row in reader:
+            key = compiled.key(compiled.pad(row))
+            if key is None:
+                continue
+            if key in seen:
+                duplicates.add(key)
+            seen.add(key)
+
+    last_rows: Dict[str, List[str]] = {}
+    with _open_csv(csv_path) as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        if duplicates:
+            for row in reader:
+                row = compiled.pad(row)
+                key = compiled.key(row)
+                if key in duplicates:
+                    last_rows[key] = row
+            f.seek(0)
+            reader = csv.reader(f)
+            next(reader, None)
+
+        emitted = set()
+        for row in reader:
+            row = compiled.pad(row)
+            key = compiled.key(row)
+            if key is None:
+                continue
+            if key in duplicates:
+                if key in emitted:
+                    continue
+                emitted.add(key)
+                row = last_rows[key]
+            yield key, row, compiled
+
+
+def iter_records(schema: CsvSchema, csv_path: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """逐条产出 (key, 记录字典)"""
+    for key, row, compiled in iter_rows(schema, csv_path):
+        yield key, compiled.record(row)
+
+
+def convert_csv(schema: CsvSchema, csv_path: Path) -> Dict[str, Any]:
+    """一次性转换为字典（需要完整数据时使用，如列式导出）"""
+    return dict(iter_records(schema, csv_path))
+
+
+def stream_csv_to_json(schema: CsvSchema, csv_path: Path, output_path: Path) -> int:
+    """
+    CSV 逐行转换并直接写出 JSON 文本，格式与 json.dump(..., ensure_ascii=False, indent=2) 相同
+
+    记录不经过中间字典，内存占用与 CSV 行数无关。返回写入的条目数。
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for key, row, compiled in iter_rows(schema, csv_path):
+            f.write(('{\n  ' if count == 0 else ',\n  ') + encode_basestring(key) + ': ' + compiled.record_json(row))
+            count += 1
+        f.write('\n}' if count else '{}')
+    return count
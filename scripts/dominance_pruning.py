@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+候选盘支配剪枝（无损）
+
+OptimizerView 的 applyDominancePruning 按有效词条分数截断后再做支配过滤，会丢掉可能进入 TopN 的盘。
+这里在搜索开始前做一次保证 TopN 不变的预处理：
+
+- 比较维度：本次请求的伤害（或 hp / atk 目标）实际读取的属性列（relevant_columns），
+  即有效词条选择在伤害公式下的精确版本——攻击三元组、暴击、穿透、增伤、异常相关列，
+  以及转换类 Buff 的来源列；其余词条（如能量回复）不影响结果，不参与比较
+- 同一位置、同一套装内比较：套装计数与目标四件套判断完全相同，只有词条不同
+- 盘 d 被剪掉，当且仅当同组中至少 top_n 个排在它之前的盘（槽位内按有效词条分数降序）
+  在每个维度上都 >= d。伤害对这些列单调不减，于是任何含 d 的组合都至少有 top_n 个
+  伤害不低、且枚举顺序更靠前的组合（只替换 d），它不可能进入 TopN
+
+伤害只有在各乘区对属性单调时才满足上面的前提（转换比例非负、暴击伤害非负、异常掌控为正），
+不满足时不剪枝。
+
+使用方式：
+    from dominance_pruning import prune_dominated
+    pre, report = prune_dominated(pre, top_n=10)
+"""
+import sys
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Sequence, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fast_evaluator import (
+    ATK, ATK_, ATK_BASE, DEF, DEF_, DEF_BASE, ELEMENT_TO_BUILDUP_IDX, ELEMENT_TO_BUILDUP_RES_IDX, ELEMENT_TO_DMG_IDX,
+    HP, HP_, HP_BASE, IDX_TO_PROP, IMPACT, IMPACT_, PROP_IDX, SKILL_TAG_DMG_IDX,
+    DiscData, Precomputed, is_monotone,
+)
+
+# 快照面板 -> 参与计算的局外属性列；转换类 Buff 的来源 / 目标下标 -> 面板
+PANEL_COLUMNS = {
+    "atk": (ATK_BASE, ATK_, ATK),
+    "hp": (HP_BASE, HP_, HP),
+    "def": (DEF_BASE, DEF_, DEF),
+    "impact": (IMPACT, IMPACT_),
+}
+CONVERSION_SOURCE_PANEL = {ATK_BASE: "atk", HP_BASE: "hp", DEF_BASE: "def", IMPACT: "impact"}
+CONVERSION_TARGET_PANEL = {ATK: "atk", HP: "hp", DEF: "def", IMPACT: "impact"}
+
+
+def relevant_columns(pre: Precomputed) -> Set[int]:
+    """目标函数读取的属性列（含经转换类 Buff 间接影响结果的来源列）"""
+    panels: Set[str] = {"hp"} if pre.objective == "hp" else {"atk"}
+    columns: Set[int] = set()
+    if pre.objective not in ("hp", "atk"):
+        columns |= {PROP_IDX[k] for k in ("CRIT_", "CRIT_DMG_", "DMG_", "PEN", "PEN_", "DEF_RED_", "DEF_IGN_")}
+        for skill in pre.skills:
+            if skill.element in ELEMENT_TO_DMG_IDX:
+                columns.add(ELEMENT_TO_DMG_IDX[skill.element])
+            columns |= {SKILL_TAG_DMG_IDX[t] for t in skill.tags if t in SKILL_TAG_DMG_IDX}
+            if skill.is_mingpo or skill.is_penetration:
+                columns |= {PROP_IDX["SHEER_FORCE"], PROP_IDX["SHEER_DMG_"]}
+                panels.add("hp")
+            if skill.anomaly_buildup > 0:
+                columns |= {PROP_IDX[k] for k in ("ANOM_PROF", "ANOM_MAS", "ANOM_BUILDUP_", "ANOM_BUILDUP_RES_")}
+                columns.add(ELEMENT_TO_BUILDUP_RES_IDX.get(skill.element, ELEMENT_TO_BUILDUP_RES_IDX[200]))
+                if skill.element in ELEMENT_TO_BUILDUP_IDX:
+                    columns.add(ELEMENT_TO_BUILDUP_IDX[skill.element])
+        if pre.special_anomaly and pre.special_anomaly.get("element") == "lieshuang":
+            columns |= {PROP_IDX["ANOM_BUILDUP_"], ELEMENT_TO_DMG_IDX[202], ELEMENT_TO_BUILDUP_IDX[202]}
+
+    # 转换类 Buff：目标被读取时来源也被读取（直到不再新增）
+    changed = True
+    while changed:
+        changed = False
+        for conv in pre.conversion_buffs:
+            to_panel = CONVERSION_TARGET_PANEL.get(conv.to_idx)
+            if not (to_panel in panels if to_panel else conv.to_idx in columns):
+                continue
+            src_panel = CONVERSION_SOURCE_PANEL.get(conv.from_idx)
+            if src_panel and src_panel not in panels:
+                panels.add(src_panel)
+                changed = True
+            elif not src_panel and conv.from_idx not in columns:
+                columns.add(conv.from_idx)
+                changed = True
+
+    for panel in panels:
+        columns |= set(PANEL_COLUMNS[panel])
+    return columns
+
+
+def dominated(discs: Sequence[DiscData], columns: Sequence[int], top_n: int) -> List[bool]:
+    """槽位内每个盘是否被同套装中至少 top_n 个排在它之前的盘弱支配"""
+    values = []
+    for disc in discs:
+        stats = dict(disc.stats)
+        values.append(tuple(stats.get(c, 0.0) for c in columns))
+    flags = [False] * len(discs)
+    by_set: Dict[int, List[int]] = {}
+    for i, disc in enumerate(discs):
+        by_set.setdefault(disc.set_idx, []).append(i)
+    for members in by_set.values():
+        for pos, i in enumerate(members):
+            if pos < top_n:
+                continue
+            mine, count = values[i], 0
+            for j in members[:pos]:
+                if all(a >= b for a, b in zip(values[j], mine)):
+                    count += 1
+                    if count >= top_n:
+                        flags[i] = True
+                        break
+    return flags
+
+
+def combinations(discs_by_slot: Sequence[Sequence[DiscData]]) -> int:
+    total = 1
+    for slot in discs_by_slot:
+        total *= len(slot)
+    return total
+
+
+def prune_dominated(pre: Precomputed, top_n: int) -> Tuple[Precomputed, dict]:
+    """
+    剪掉不可能进入 TopN 的候选盘 -> (新的 Precomputed, 统计)
+
+    统计：{"columns", "removedDiscs", "perSlot", "combinationsBefore", "combinationsAfter", "combinationsRemoved"}
+    """
+    before = combinations(pre.discs_by_slot)
+    columns = sorted(relevant_columns(pre))
+    if top_n > 0 and is_monotone(pre):
+        discs_by_slot = [
+            [d for d, drop in zip(slot, dominated(slot, columns, top_n)) if not drop]
+            for slot in pre.discs_by_slot
+        ]
+    else:
+        discs_by_slot = [list(slot) for slot in pre.discs_by_slot]
+    after = combinations(discs_by_slot)
+    report = {
+        "columns": [IDX_TO_PROP[c] for c in columns],
+        "removedDiscs": sum(len(a) - len(b) for a, b in zip(pre.discs_by_slot, discs_by_slot)),
+        "perSlot": [len(slot) for slot in discs_by_slot],
+        "combinationsBefore": before,
+        "combinationsAfter": after,
+        "combinationsRemoved": before - after,
+    }
+    return replace(pre, discs_by_slot=discs_by_slot), report
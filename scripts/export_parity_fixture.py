@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Python / TS 快速评估器一致性夹具
+
+对 scripts/fixtures/parity_save.json（每个位置 3 个盘的小存档）的每个默认任务，
+用 optimize_saves.job_request 构建 Precomputed，并用 fast_evaluator.search 求 TopN，
+把 PrecomputedData 形状的输入与期望 TopN（伤害 + discIds）写为 TS 模块
+web/optimizer/src/optimizer/workers/fast-evaluator.parity-fixture.ts。
+
+fast-evaluator.parity.test.ts 用 TS FastEvaluator 枚举同一输入的全部组合并与期望 TopN 比对；
+--check 重新计算并与已提交的夹具比对（Python 侧口径变化时失败）。两边都改动时重新生成夹具。
+
+属性数组在夹具中为稀疏 [[PROP_IDX, 数值], ...]，测试中还原为 Float64Array。
+TopN 相邻伤害（含第 N+1 名）的相对差距必须大于 RELATIVE_TOLERANCE，避免并列导致排序不确定。
+
+使用方式：
+    python scripts/export_parity_fixture.py
+    python scripts/export_parity_fixture.py --check
+"""
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import fast_evaluator
+from fast_evaluator import PROP_COUNT, Precomputed, to_sparse
+from optimize_saves import default_jobs, job_request, load_save
+from optimizer_context import DATA_DIR, GameData
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SAVE_PATH = Path(__file__).resolve().parent / "fixtures" / "parity_save.json"
+FIXTURE_PATH = PROJECT_ROOT / "web" / "optimizer" / "src" / "optimizer" / "workers" / "fast-evaluator.parity-fixture.ts"
+TOP_N = 10
+RELATIVE_TOLERANCE = 1e-9
+# 只含标量的数组（稀疏属性对、discIds、tags）折叠为一行
+SCALAR_ARRAY = re.compile(r"\[\s*([^\[\]{}]*?)\s*\]")
+
+FIXTURE_HEADER = """\
+/**
+ * Python / TS 快速评估器一致性夹具
+ *
+ * 由 scripts/export_parity_fixture.py 根据 scripts/fixtures/parity_save.json 生成，请勿手动修改。
+ * expected 为 Python fast_evaluator.search 的 TopN；属性数组为稀疏 [PROP_IDX, 数值] 列表。
+ */
+
+export type SparseStats = [number, number][];
+
+export interface ParityDisc {
+  id: string;
+  setId: string;
+  setIdx: number;
+  isTargetSet: boolean;
+  stats: SparseStats;
+}
+
+export interface ParityPrecomputed {
+  mergedStats: SparseStats;
+  mergedBuff: SparseStats;
+  conversionBuffs: {
+    fromPropIdx: number;
+    toPropIdx: number;
+    ratio: number;
+    threshold: number;
+    maxValue: number | null;
+    isTeammate: boolean;
+  }[];
+  discsBySlot: ParityDisc[][];
+  targetSetId: string;
+  targetSetTwoPiece: SparseStats;
+  targetSetFourPieceBuff: SparseStats;
+  otherSetTwoPiece: Record<string, SparseStats>;
+  fixedMultipliers: {
+    baseResRed: number;
+    baseDmgTakenInc: number;
+    stunVulnerability: number;
+    distanceMult: number;
+    attackerLevel: number;
+    baseAnomalyCritRate: number;
+    baseAnomalyCritDmg: number;
+    baseAnomalyDmgBonus: number;
+    defenseParams: { levelBase: number; enemyDef: number; baseDefRed: number; baseDefIgn: number };
+  };
+  skillsParams: {
+    ratio: number;
+    element: number;
+    anomalyBuildup: number;
+    tags: number[];
+    isPenetration: boolean;
+    isMingpo: boolean;
+  }[];
+  objective: 'damage' | 'atk' | 'hp';
+  agentLevel: number;
+  enemyStats: {
+    elementResistances: Record<string, number>;
+    anomalyThresholds: Record<string, number>;
+    hasCorruptionShield: boolean;
+  };
+  specialAnomalyConfig: { element: string; ratio: number } | null;
+  anomalyTotalRatioAtT: number;
+  disorderTotalRatioAtT: number;
+}
+
+export interface ParityCase {
+  name: string;
+  precomputed: ParityPrecomputed;
+  expected: { damage: number; discIds: string[] }[];
+}
+"""
+
+
+def export_precomputed(pre: Precomputed) -> dict:
+    """Precomputed -> PrecomputedData 形状（属性数组为稀疏列表）"""
+    fm = pre.fixed
+    set_ids = {disc.set_idx: disc.set_id for slot in pre.discs_by_slot for disc in slot if not disc.is_target}
+    return {
+        "mergedStats": to_sparse(pre.merged_stats),
+        "mergedBuff": to_sparse(pre.merged_buff),
+        "conversionBuffs": [
+            {
+                "fromPropIdx": conv.from_idx,
+                "toPropIdx": conv.to_idx,
+                "ratio": conv.ratio,
+                "threshold": conv.threshold,
+                "maxValue": conv.max_value,
+                "isTeammate": False,
+            }
+            for conv in pre.conversion_buffs
+        ],
+        "discsBySlot": [
+            [
+                {
+                    "id": disc.id,
+                    "setId": disc.set_id,
+                    "setIdx": disc.set_idx,
+                    "isTargetSet": disc.is_target,
+                    "stats": disc.stats,
+                }
+                for disc in slot
+            ]
+            for slot in pre.discs_by_slot
+        ],
+        "targetSetId": pre.target_set_id,
+        "targetSetTwoPiece": to_sparse(pre.target_set_two_piece),
+        "targetSetFourPieceBuff": to_sparse(pre.target_set_four_piece_buff),
+        "otherSetTwoPiece": {
+            set_ids[set_idx]: to_sparse(row)
+            for set_idx, row in sorted(pre.set_two_piece.items())
+            if set_idx in set_ids
+        },
+        "fixedMultipliers": {
+            "baseResRed": fm.base_res_red,
+            "baseDmgTakenInc": fm.base_dmg_taken_inc,
+            "stunVulnerability": fm.stun_vulnerability,
+            "distanceMult": fm.distance_mult,
+            "attackerLevel": fm.attacker_level,
+            "baseAnomalyCritRate": 0,
+            "baseAnomalyCritDmg": 0,
+            "baseAnomalyDmgBonus": fm.base_anomaly_dmg_bonus,
+            "defenseParams": {
+                "levelBase": fm.level_base,
+                "enemyDef": fm.enemy_def,
+                "baseDefRed": fm.base_def_red,
+                "baseDefIgn": fm.base_def_ign,
+            },
+        },
+        "skillsParams": [
+            {
+                "ratio": skill.ratio,
+                "element": skill.element,
+                "anomalyBuildup": skill.anomaly_buildup,
+                "tags": skill.tags,
+                "isPenetration": skill.is_penetration,
+                "isMingpo": skill.is_mingpo,
+            }
+            for skill in pre.skills
+        ],
+        "objective": pre.objective,
+        "agentLevel": fm.attacker_level,
+        "enemyStats": {
+            "elementResistances": pre.element_resistances,
+            "anomalyThresholds": pre.anomaly_thresholds,
+            "hasCorruptionShield": pre.has_corruption_shield,
+        },
+        "specialAnomalyConfig": pre.special_anomaly,
+        "anomalyTotalRatioAtT": pre.anomaly_total_ratio,
+        "disorderTotalRatioAtT": pre.disorder_total_ratio,
+    }
+
+
+def expected_builds(pre: Precomputed, name: str, top_n: int) -> List[dict]:
+    """TopN（多取一名检查相邻伤害不并列）"""
+    builds = fast_evaluator.search(pre, top_n + 1)["builds"]
+    if len(builds) <= top_n:
+        raise ValueError(f"{name}: 可行组合只有 {len(builds)} 个，少于 TopN + 1")
+    for better, worse in zip(builds, builds[1:]):
+        if better["damage"] - worse["damage"] <= RELATIVE_TOLERANCE * better["damage"]:
+            raise ValueError(f"{name}: {better['discIds']} 与 {worse['discIds']} 伤害并列，请调整夹具存档")
+    return [{"damage": build["damage"], "discIds": build["discIds"]} for build in builds[:top_n]]
+
+
+def build_cases(data_dir: Path, save_path: Path, top_n: int) -> List[dict]:
+    game = GameData(data_dir)
+    save = load_save(save_path)
+    cases = []
+    for job in default_jobs(str(save_path), save):
+        header, pre, _ = job_request(game, save, job)
+        name = f"{job['team']} {header['character']['key']}"
+        cases.append({"name": name, "precomputed": export_precomputed(pre), "expected": expected_builds(pre, name, top_n)})
+    return cases
+
+
+def render_fixture(cases: List[dict], top_n: int) -> str:
+    body = json.dumps(cases, ensure_ascii=False, indent=2)
+    body = SCALAR_ARRAY.sub(lambda m: "[" + re.sub(r",\s+", ", ", m.group(1)) + "]", body)
+    return (
+        f"{FIXTURE_HEADER}\n"
+        f"export const PARITY_PROP_COUNT = {PROP_COUNT};\n"
+        f"export const PARITY_TOP_N = {top_n};\n\n"
+        f"export const PARITY_CASES: ParityCase[] = {body};\n"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="生成 Python / TS 快速评估器一致性夹具")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="game-data 目录")
+    parser.add_argument("--save", type=Path, default=SAVE_PATH, help="夹具存档")
+    parser.add_argument("--output", type=Path, default=FIXTURE_PATH, help="生成的 TS 夹具")
+    parser.add_argument("--top-n", type=int, default=TOP_N)
+    parser.add_argument("--check", action="store_true", help="只比对，不写入；不一致时返回 1")
+    args = parser.parse_args()
+
+    cases = build_cases(args.data_dir, args.save, args.top_n)
+    text = render_fixture(cases, args.top_n)
+    if args.check:
+        current = args.output.read_text(encoding="utf-8") if args.output.exists() else ""
+        if current != text:
+            print(f"✗ {args.output} 与 Python 评估结果不一致，请重新运行 export_parity_fixture.py 并确认 TS 测试通过")
+            return 1
+        print(f"✓ {len(cases)} 个任务与夹具一致")
+        return 0
+    args.output.write_text(text, encoding="utf-8")
+    print(f"✓ {len(cases)} 个任务 × Top{args.top_n} -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
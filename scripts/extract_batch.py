@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+extract_*_info.py 的批量模式
+
+一个进程内完成多个角色 / 音擎 / 驱动盘的提取：
+- 选择：ID 列表、文件名通配（如 "14*"）或 --all
+- 所有文件经同一个线程池加载器读取、解析，各文件只读一次
+- 文本只去除一次颜色与图标标签（预编译正则）
+- 输出 NDJSON（每个实体一行）或 CSV（每个文本段一行），不再逐个格式化打印
+
+extract_character_info.py / extract_weapon_info.py / extract_equipment_info.py
+在传入多个 ID、通配或 --all 时也会转到这里。
+
+使用方式：
+    python scripts/extract_batch.py weapon --all
+    python scripts/extract_batch.py character 1011 1021 --format csv -o characters.csv
+    python scripts/extract_batch.py equipment "31*"
+    python scripts/extract_batch.py all --all --format csv
+    python scripts/extract_weapon_info.py --all --format csv
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from extract_character_info import character_info_from_data
+from extract_equipment_info import equipment_info_from_data
+from extract_weapon_info import weapon_info_from_data
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = PROJECT_ROOT / "web" / "optimizer" / "public" / "game-data"
+
+# 详情目录名即实体类型
+ENTITY_KINDS = ("character", "weapon", "equipment")
+OUTPUT_FORMATS = ("ndjson", "csv")
+CSV_FIELDS = ["kind", "id", "name", "section", "title", "text"]
+
+# <color=#xxxxxx>…</color> 只保留内容；<IconMap:Icon_Normal> 等图标直接去掉
+TAG_PATTERN = re.compile(r"</?color[^>]*>|<IconMap:[^>]*>")
+# 通配字符
+GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+def strip_tags(text: str) -> str:
+    """去除颜色与图标标签"""
+    return TAG_PATTERN.sub("", text or "")
+
+
+def iter_sections(kind: str, data: dict) -> Iterator[Tuple[str, str, str]]:
+    """按 extract_*_info 的字段划分文本段，产出 (段 key, 段标题, 去标签后的文本)"""
+    if kind == "character":
+        info = character_info_from_data(data)
+        for talent in info["影画（天赋）"]:
+            yield f"talent.{talent['等级']}", f"影画{talent['等级']} {strip_tags(talent['名称'])}", strip_tags(talent["描述"])
+        for i, pot in enumerate(info["潜能"], 1):
+            yield f"potential.{i}", f"潜能 {strip_tags(pot['名称'])}", strip_tags(pot["描述"])
+        for i, core in enumerate(info["核心技"], 1):
+            yield f"passive.{i}", strip_tags(core["名称"]), strip_tags(core["描述"])
+    elif kind == "weapon":
+        info = weapon_info_from_data(data)
+        for talent in info["特效"]:
+            yield f"talents.{talent['等级']}", f"精炼{talent['等级']} {strip_tags(talent['名称'])}", strip_tags(talent["描述"])
+    elif kind == "equipment":
+        info = equipment_info_from_data(data)
+        yield "desc2", "2件套", strip_tags(info["2件套效果"])
+        yield "desc4", "4件套", strip_tags(info["4件套效果"])
+
+
+def resolve_paths(
+    kind: str,
+    selectors: Sequence[str],
+    select_all: bool,
+    strict: bool = True,
+    data_dir: Path = DATA_DIR,
+) -> List[Path]:
+    """
+    ID / 通配 / 路径 -> 详情文件列表（去重，保持给出的顺序）
+
+    --all 时返回目录下所有 JSON（按文件名排序）。strict 时找不到的 ID 会报错，否则跳过。
+    """
+    directory = data_dir / kind
+    if select_all:
+        return sorted(directory.glob("*.json"))
+
+    paths: List[Path] = []
+    for selector in selectors:
+        if GLOB_CHARS.search(selector):
+            pattern = selector if selector.endswith(".json") else selector + ".json"
+            matches = sorted(directory.glob(pattern))
+            if not matches and strict:
+                raise FileNotFoundError(f"{kind}: 没有匹配 {selector} 的文件")
+            paths.extend(matches)
+            continue
+        path = directory / f"{selector}.json" if selector.isdigit() else Path(selector)
+        if path.exists():
+            paths.append(path)
+        elif strict:
+            raise FileNotFoundError(f"文件不存在: {path}")
+    return list(dict.fromkeys(paths))
+
+
+def load_files(paths: Iterable[Path], workers: Optional[int] = None) -> List[Tuple[Path, Any]]:
+    """共享加载器：线程池读取并解析 JSON，结果顺序与输入一致"""
+    def load(path: Path) -> Tuple[Path, Any]:
+        return path, json.loads(path.read_bytes())
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(load, paths))
+
+
+def build_record(kind: str, path: Path, data: dict) -> dict:
+    return {
+        "kind": kind,
+        "id": str(data.get("Id") or path.stem),
+        "name": data.get("Name", "未知"),
+        "sections": [
+            {"section": section, "title": title, "text": text}
+            for section, title, text in iter_sections(kind, data)
+        ],
+    }
+
+
+def write_ndjson(records: Iterable[dict], out: TextIO) -> int:
+    count = 0
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(records: Iterable[dict], out: TextIO) -> int:
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    count = 0
+    for record in records:
+        for section in record["sections"]:
+            writer.writerow({"kind": record["kind"], "id": record["id"], "name": record["name"], **section})
+        count += 1
+    return count
+
+
+def is_batch_invocation(argv: Sequence[str]) -> bool:
+    """单个 ID / 路径沿用原来的格式化打印；多个参数、通配或任何选项走批量模式"""
+    return len(argv) > 1 or any(arg.startswith("-") or GLOB_CHARS.search(arg) for arg in argv)
+
+
+def run_batch(kinds: Sequence[str], argv: Sequence[str], prog: Optional[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog=prog, description="批量提取角色 / 音擎 / 驱动盘描述文本")
+    parser.add_argument("ids", nargs="*", help="ID、文件名通配（如 \"14*\"）或文件路径")
+    parser.add_argument("--all", action="store_true", help="提取目录下所有文件")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="ndjson", help="输出格式（默认 ndjson）")
+    parser.add_argument("-o", "--output", type=Path, help="输出文件（默认标准输出）")
+    parser.add_argument("--workers", type=int, default=None, help="加载线程数")
+    args = parser.parse_args(argv)
+    if not args.ids and not args.all:
+        parser.error("需要 ID / 通配，或 --all")
+
+    # 多个类型时 ID 只需在其中一个目录存在
+    strict = len(kinds) == 1
+    try:
+        paths = [(kind, path) for kind in kinds for path in resolve_paths(kind, args.ids, args.all, strict)]
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if not paths:
+        print("没有匹配的文件", file=sys.stderr)
+        return 1
+
+    loaded = load_files([path for _, path in paths], args.workers)
+    records = (build_record(kind, path, data) for (kind, _), (path, data) in zip(paths, loaded))
+
+    write = write_csv if args.format == "csv" else write_ndjson
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            count = write(records, f)
+        print(f"✓ {count} 条 -> {args.output}", file=sys.stderr)
+    else:
+        write(records, sys.stdout)
+    return 0
+
+
+def main() -> int:
+    if len(sys.argv) < 2 or sys.argv[1] not in ENTITY_KINDS + ("all",):
+        print(f"用法: extract_batch.py {{{','.join(ENTITY_KINDS)},all}} [ID ...] [--all] [--format ndjson|csv]", file=sys.stderr)
+        return 2
+    kind = sys.argv[1]
+    kinds = ENTITY_KINDS if kind == "all" else (kind,)
+    return run_batch(kinds, sys.argv[2:], prog=f"extract_batch.py {kind}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
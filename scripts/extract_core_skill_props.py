@@ -1,42 +1,182 @@
 #!/usr/bin/env python3
-"""提取所有角色核心技属性"""
+"""
+核心技属性 Prop ID 目录
 
+遍历 character/*.json 的 ExtraLevel，生成 core_skill_props.json：
+Prop ID -> 使用该属性的角色 -> 各核心技等级的数值（与 agent.ts getCoreSkillStats 相同的换算：
+Format 含 % 时除以 10000）。
+
+每个 Prop ID 同时映射到 base.ts 的 PropertyType：
+- property:        按 propIdToPropertyType（PROP_ID_TO_PROPERTY_TYPE，未登记时 Prop ID 即枚举值）
+- runtimeProperty: 按 agent.ts _mapCoreSkillNameToPropertyType 的名称映射（运行时实际使用）
+两者任一缺失或不一致时记入 unmapped / conflicts 并在输出中标出。
+
+默认只打印汇总；--write 时写出 core_skill_props.json（update_data.py --rebuild-derived 直接调用 write_catalogue）。
+
+使用方式：
+    python scripts/extract_core_skill_props.py
+    python scripts/extract_core_skill_props.py --write      # 写出 core_skill_props.json
+    python scripts/extract_core_skill_props.py --check      # 存在未映射的 Prop ID 时返回 1
+"""
+
+import argparse
 import json
+import os
+import re
+import sys
 from pathlib import Path
-from collections import defaultdict
-
-def main():
-    char_dir = Path("web/optimizer/public/game-data/character")
-    
-    # 收集所有 Prop 值
-    all_props = defaultdict(set)  # prop_id -> set of (name, format)
-    
-    for json_file in char_dir.glob("*.json"):
-        with open(json_file, "r", encoding="utf-8") as f:
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from analyze_buff_types import BASE_TS_PATH, parse_ts_enum
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = PROJECT_ROOT / "web" / "optimizer" / "public" / "game-data"
+CHARACTER_DIR = DATA_DIR / "character"
+AGENT_TS_PATH = PROJECT_ROOT / "web" / "optimizer" / "src" / "model" / "agent.ts"
+CATALOGUE_NAME = "core_skill_props.json"
+CATALOGUE_VERSION = 1
+
+
+def parse_prop_id_overrides(path: Path = BASE_TS_PATH) -> Dict[int, int]:
+    """base.ts 的 PROP_ID_TO_PROPERTY_TYPE"""
+    content = path.read_text(encoding="utf-8")
+    match = re.search(r"PROP_ID_TO_PROPERTY_TYPE[^=]*=\s*\{([^}]*)\}", content)
+    if not match:
+        return {}
+    return {int(k): int(v) for k, v in re.findall(r"^\s*(\d+)\s*:\s*(\d+)", match.group(1), re.MULTILINE)}
+
+
+def parse_runtime_name_map(path: Path = AGENT_TS_PATH) -> Dict[str, str]:
+    """agent.ts _mapCoreSkillNameToPropertyType 中的 名称 -> PropertyType 成员名"""
+    content = path.read_text(encoding="utf-8")
+    match = re.search(r"_mapCoreSkillNameToPropertyType\(.*?\{(.*?)\};", content, re.DOTALL)
+    if not match:
+        return {}
+    return dict(re.findall(r"'([^']+)'\s*:\s*PropertyType\.([A-Za-z0-9_]+)", match.group(1)))
+
+
+def scale_value(value, fmt: str) -> float:
+    """与 getCoreSkillStats 一致：百分比格式 {0:0.#%} 的 Value=480 表示 4.8%"""
+    value = float(value or 0)
+    return value / 10000 if "%" in (fmt or "") else value
+
+
+def build_catalogue(character_dir: Path = CHARACTER_DIR) -> dict:
+    enum = parse_ts_enum(BASE_TS_PATH, "PropertyType")
+    # 枚举值 -> 成员名（别名取先声明的）
+    value_to_name: Dict[int, str] = {}
+    for name, value in enum.items():
+        value_to_name.setdefault(value, name)
+    overrides = parse_prop_id_overrides()
+    name_map = parse_runtime_name_map()
+
+    props: Dict[str, dict] = {}
+    by_character: Dict[str, List[str]] = {}
+    level_keys: Optional[List[str]] = None
+    max_levels: List[int] = []
+
+    for path in sorted(character_dir.glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
-        
-        char_name = data.get("Name", json_file.stem)
-        extra_level = data.get("ExtraLevel", {})
-        
-        for level_key, level_data in extra_level.items():
-            extra = level_data.get("Extra", {})
-            for prop_key, prop_data in extra.items():
+        extra_level = data.get("ExtraLevel") or {}
+        if not extra_level:
+            continue
+        char_id = str(data.get("Id") or path.stem)
+        keys = sorted(extra_level, key=int)
+        if level_keys is None:
+            level_keys = keys
+            max_levels = [extra_level[k].get("MaxLevel") for k in keys]
+        elif keys != level_keys:
+            print(f"⚠️  {char_id}: ExtraLevel 等级 {keys} 与其他角色 {level_keys} 不一致")
+
+        for level_index, level_key in enumerate(level_keys):
+            for prop_data in (extra_level.get(level_key) or {}).get("Extra", {}).values():
                 prop_id = prop_data.get("Prop")
-                name = prop_data.get("Name")
-                fmt = prop_data.get("Format")
-                value = prop_data.get("Value")
-                
-                if prop_id:
-                    all_props[prop_id].add((name, fmt))
-    
-    # 输出结果
+                if not prop_id:
+                    continue
+                key = str(prop_id)
+                entry = props.get(key)
+                if entry is None:
+                    entry = props[key] = {
+                        "name": prop_data.get("Name"),
+                        "format": prop_data.get("Format"),
+                        "percent": "%" in (prop_data.get("Format") or ""),
+                        "characters": {},
+                    }
+                values = entry["characters"].setdefault(char_id, [0.0] * len(level_keys))
+                values[level_index] = scale_value(prop_data.get("Value"), prop_data.get("Format"))
+                if key not in by_character.setdefault(char_id, []):
+                    by_character[char_id].append(key)
+
+    unmapped: List[int] = []
+    conflicts: List[int] = []
+    for key, entry in props.items():
+        prop_id = int(key)
+        type_value = overrides.get(prop_id, prop_id)
+        entry["property"] = value_to_name.get(type_value)
+        entry["runtimeProperty"] = name_map.get(entry["name"])
+        if entry["property"] is None or entry["runtimeProperty"] is None:
+            unmapped.append(prop_id)
+        elif entry["property"] != entry["runtimeProperty"]:
+            conflicts.append(prop_id)
+
+    return {
+        "version": CATALOGUE_VERSION,
+        # ExtraLevel[k] 对应核心技等级 k + 1（核心技等级 1 无属性）
+        "coreLevels": [int(k) + 1 for k in (level_keys or [])],
+        "maxLevels": max_levels,
+        "props": {k: props[k] for k in sorted(props, key=int)},
+        "byCharacter": {k: sorted(v, key=int) for k, v in sorted(by_character.items())},
+        "unmapped": sorted(unmapped),
+        "conflicts": sorted(conflicts),
+    }
+
+
+def write_catalogue(catalogue: dict, data_dir: Path = DATA_DIR) -> Path:
+    path = data_dir / CATALOGUE_NAME
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(catalogue, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def print_catalogue(catalogue: dict) -> None:
     print("=== 核心技属性 Prop ID 汇总 ===\n")
-    for prop_id in sorted(all_props.keys()):
-        names = all_props[prop_id]
-        for name, fmt in names:
-            print(f"Prop: {prop_id:5d} | Name: {name:12s} | Format: {fmt}")
-    
-    print(f"\n共 {len(all_props)} 种不同的 Prop ID")
+    for prop_id, entry in catalogue["props"].items():
+        flag = ""
+        if int(prop_id) in catalogue["unmapped"]:
+            flag = "  ✗ 未映射"
+        elif int(prop_id) in catalogue["conflicts"]:
+            flag = "  ⚠️ 映射不一致"
+        print(
+            f"Prop: {int(prop_id):5d} | Name: {entry['name']:12s} | Format: {entry['format']:10s}"
+            f" | 角色: {len(entry['characters']):3d}"
+            f" | PropertyType: {entry['property'] or '-'} / 运行时: {entry['runtimeProperty'] or '-'}{flag}"
+        )
+
+    print(f"\n共 {len(catalogue['props'])} 种不同的 Prop ID，{len(catalogue['byCharacter'])} 个角色")
+    if catalogue["unmapped"]:
+        print(f"未映射: {', '.join(map(str, catalogue['unmapped']))}")
+    if catalogue["conflicts"]:
+        print(f"Prop ID 映射与运行时名称映射不一致: {', '.join(map(str, catalogue['conflicts']))}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="生成核心技属性 Prop ID 目录（core_skill_props.json）")
+    parser.add_argument("--check", action="store_true", help="存在未映射的 Prop ID 时返回 1")
+    parser.add_argument("--write", action="store_true", help=f"写出 {CATALOGUE_NAME}（默认只打印）")
+    args = parser.parse_args()
+
+    catalogue = build_catalogue()
+    print_catalogue(catalogue)
+    if args.write:
+        path = write_catalogue(catalogue)
+        print(f"\n✓ {path.relative_to(PROJECT_ROOT)} ({path.stat().st_size / 1024:.1f} KB)")
+    return 1 if args.check and catalogue["unmapped"] else 0
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -8,9 +8,12 @@ import re
 from pathlib import Path
 
 
+COLOR_TAG_PATTERN = re.compile(r'<color=[^>]*>([^<]*)</color>')
+
+
 def strip_color_tags(text: str) -> str:
     """去除颜色标签 <color=...>...</color>"""
-    return re.sub(r'<color=[^>]*>([^<]*)</color>', r'\1', text)
+    return COLOR_TAG_PATTERN.sub(r'\1', text)
 
 
 def clean_text(text: str) -> str:
@@ -21,8 +24,11 @@ def clean_text(text: str) -> str:
 def extract_weapon_info(file_path: str):
     """提取武器文件中的特效信息"""
     with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+        return weapon_info_from_data(json.load(f))
+
 
+def weapon_info_from_data(data: dict):
+    """提取武器文件中的特效信息（已解析的 JSON）"""
     result = {
         "武器名称": data.get("Name", "未知"),
         "特效": []
@@ -57,7 +63,12 @@ def print_weapon_info(info: dict):
 
 def main():
     import sys
-    
+
+    # 多个 ID、通配或 --all / --format 等选项：批量模式
+    from extract_batch import is_batch_invocation, run_batch
+    if is_batch_invocation(sys.argv[1:]):
+        sys.exit(run_batch(("weapon",), sys.argv[1:], prog=Path(sys.argv[0]).name))
+
     # 武器数据目录
     # 注意：路径从项目根目录开始
     weapon_dir = Path.cwd() / "web" / "optimizer" / "public" / "game-data" / "weapon"
@@ -0,0 +1,796 @@
+#!/usr/bin/env python3
+"""
+快速评估器（Python 版）
+
+与 web/optimizer/src/optimizer/workers/fast-evaluator.ts 及 fast-optimization.worker.ts
+保持同一口径（见 docs/fast_evaluator_flow.md），供服务器端批量优化使用：
+
+- Precomputed：对应 PrecomputedData（由 optimizer_context.build_request 构建）
+- FastEvaluator：增量 push/pop 维护累加器与非目标套装 2 件套，叶子上计算快照1/2/3、转换类 Buff 与各乘区
+- search：六重循环枚举 + 目标套装剪枝 + TopN 最小堆，返回与 Worker 相同结构的结果与统计；
+  有目标套装时按套装构成模板（composition_templates）枚举，不生成凑不齐 4 件套的组合
+
+属性数组均为长度 PROP_COUNT 的 list[float]，下标即 property-index.ts 的 PROP_IDX。
+"""
+import heapq
+import itertools
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from build_agent_snapshots import parse_prop_idx
+
+PROP_IDX = parse_prop_idx()
+PROP_COUNT = max(PROP_IDX.values()) + 1
+IDX_TO_PROP = {idx: name for name, idx in PROP_IDX.items()}
+
+ELEMENT_KEYS = {200: "physical", 201: "fire", 202: "ice", 203: "electric", 205: "ether"}
+ELEMENT_TO_DMG_IDX = {el: PROP_IDX[f"{key.upper()}_DMG_"] for el, key in ELEMENT_KEYS.items()}
+ELEMENT_TO_BUILDUP_IDX = {el: PROP_IDX[f"{key.upper()}_ANOMALY_BUILDUP_"] for el, key in ELEMENT_KEYS.items()}
+ELEMENT_TO_BUILDUP_RES_IDX = {el: PROP_IDX[f"{key.upper()}_ANOM_BUILDUP_RES_"] for el, key in ELEMENT_KEYS.items()}
+ELEMENT_TO_RES_RED_IDX = {key: PROP_IDX[f"{key.upper()}_RES_RED_"] for key in ELEMENT_KEYS.values()}
+ELEMENT_TO_RES_IGN_IDX = {key: PROP_IDX[f"{key.upper()}_RES_IGN_"] for key in ELEMENT_KEYS.values()}
+
+# 技能标签 -> 技能增伤索引（与 FastEvaluator.getSkillTagDmgIdx 一致）
+SKILL_TAG_DMG_IDX = {
+    1: PROP_IDX["NORMAL_ATK_DMG_"],
+    2: PROP_IDX["SPECIAL_ATK_DMG_"],
+    3: PROP_IDX["CHAIN_ATK_DMG_"],
+    4: PROP_IDX["ULTIMATE_ATK_DMG_"],
+    5: PROP_IDX["DASH_ATK_DMG_"],
+    6: PROP_IDX["DODGE_COUNTER_DMG_"],
+    7: PROP_IDX["ASSIST_ATK_DMG_"],
+    8: PROP_IDX["ENHANCED_SPECIAL_DMG_"],
+    9: PROP_IDX["ADDL_ATK_DMG_"],
+}
+
+# 未配置敌人异常阈值时的积蓄阈值（anomaly-constants.ts STANDARD_BUILDUP_THRESHOLD）
+STANDARD_BUILDUP_THRESHOLD = 100.0
+
+ATK_BASE, ATK_, ATK = PROP_IDX["ATK_BASE"], PROP_IDX["ATK_"], PROP_IDX["ATK"]
+HP_BASE, HP_, HP = PROP_IDX["HP_BASE"], PROP_IDX["HP_"], PROP_IDX["HP"]
+DEF_BASE, DEF_, DEF = PROP_IDX["DEF_BASE"], PROP_IDX["DEF_"], PROP_IDX["DEF"]
+IMPACT, IMPACT_ = PROP_IDX["IMPACT"], PROP_IDX["IMPACT_"]
+
+
+def zeros() -> List[float]:
+    return [0.0] * PROP_COUNT
+
+
+def to_sparse(values: Sequence[float]) -> List[Tuple[int, float]]:
+    return [(i, v) for i, v in enumerate(values) if v != 0]
+
+
+@dataclass
+class DiscData:
+    """驱动盘预计算数据（对应 DiscData；stats 为稀疏 [(PROP_IDX, 数值)]，不含套装效果）"""
+    id: str
+    stats: List[Tuple[int, float]]
+    set_id: str
+    set_idx: int
+    is_target: bool
+    effective_score: float = 0.0
+    # 主词条属性名（PropertyType 成员名），仅用于主词条筛选 / 展示
+    main_stat: str = ""
+
+
+@dataclass
+class ConversionBuff:
+    """转换类 Buff（对应 ConversionBuffData）"""
+    from_idx: int
+    to_idx: int
+    ratio: float
+    threshold: float = 0.0
+    max_value: Optional[float] = None
+
+
+@dataclass
+class SkillParams:
+    """技能参数（对应 PrecomputedSkillParams）"""
+    ratio: float
+    element: int
+    anomaly_buildup: float
+    tags: List[int]
+    is_penetration: bool = False
+    is_mingpo: bool = False
+
+
+@dataclass
+class FixedMultipliers:
+    """固定乘区输入（对应 FixedMultipliers + DefenseParams）"""
+    base_dmg_taken_inc: float = 0.0
+    stun_vulnerability: float = 0.0
+    distance_mult: float = 1.0
+    attacker_level: int = 60
+    base_anomaly_dmg_bonus: float = 0.0
+    level_base: float = 700.0
+    enemy_def: float = 800.0
+    base_def_red: float = 0.0
+    base_def_ign: float = 0.0
+    base_res_red: float = 0.0
+
+
+@dataclass
+class Precomputed:
+    """预计算数据（对应 PrecomputedData）"""
+    merged_stats: List[float]
+    merged_buff: List[float]
+    conversion_buffs: List[ConversionBuff]
+    discs_by_slot: List[List[DiscData]]
+    target_set_id: str
+    target_set_two_piece: List[float]
+    target_set_four_piece_buff: List[float]
+    # setIdx -> 非目标套装 2 件套（套装加成表中的行 + 表中没有的套装）
+    set_two_piece: Dict[int, List[float]]
+    fixed: FixedMultipliers
+    skills: List[SkillParams]
+    objective: str = "damage"
+    element_resistances: Dict[str, float] = field(default_factory=dict)
+    anomaly_thresholds: Dict[str, float] = field(default_factory=dict)
+    has_corruption_shield: bool = False
+    special_anomaly: Optional[dict] = None
+    anomaly_total_ratio: float = 0.0
+    disorder_total_ratio: float = 0.0
+
+
+class FastEvaluator:
+    """
+    快速评估器
+
+    - accumulator：局外底座（mergedStats + 目标 2pc）+ 已加入的盘
+    - dyn2pc：非目标套装 2 件套（计数 1->2 时加入，2->1 时撤销）
+    - eval_buffer：accumulator + workerMergedBuff + dyn2pc（叶子评估的局内属性底座）
+
+    push 前把三者压栈、在副本上叠加，pop 直接出栈恢复，不做浮点减法：
+    同一组合无论经由哪条枚举路径到达，分数都逐位相同（同分比较 rank 才有意义）。
+    """
+
+    def __init__(self, pre: Precomputed):
+        self.pre = pre
+        self.has_mingpo = any(s.is_mingpo or s.is_penetration for s in pre.skills)
+        self.base_stats = [m + t for m, t in zip(pre.merged_stats, pre.target_set_two_piece)]
+        self.merged_buff = [m + t for m, t in zip(pre.merged_buff, pre.target_set_four_piece_buff)]
+        self.two_piece = {set_idx: to_sparse(row) for set_idx, row in pre.set_two_piece.items()}
+        self.accumulator = zeros()
+        self.eval_buffer = zeros()
+        self.dyn2pc = zeros()
+        self.set_counts: Dict[int, int] = {}
+        self.saved: List[Tuple[List[float], List[float], List[float]]] = []
+        self._compute_fixed()
+
+    def _compute_fixed(self) -> None:
+        pre, fm, mb = self.pre, self.pre.fixed, self.merged_buff
+        self.distance_mult = fm.distance_mult
+        self.dmg_taken_mult = 1 + fm.base_dmg_taken_inc
+        self.stun_vuln_mult = 1 + fm.stun_vulnerability
+        self.level_mult = 1 + (fm.attacker_level - 1) / 59
+        anom_crit = min(1.0, max(0.0, mb[PROP_IDX["ANOM_CRIT_"]]))
+        self.anomaly_crit_mult = 1 + anom_crit * mb[PROP_IDX["ANOM_CRIT_DMG_"]]
+        self.anomaly_dmg_mult = 1 + fm.base_anomaly_dmg_bonus
+
+        element = pre.skills[0].element if pre.skills else 200
+        key = ELEMENT_KEYS.get(element, "physical")
+        enemy_res = pre.element_resistances.get(key, 0.0)
+        total_res_red = (
+            mb[PROP_IDX["ENEMY_RES_RED_"]] + mb[ELEMENT_TO_RES_RED_IDX[key]]
+            + mb[PROP_IDX["RES_IGN_"]] + mb[ELEMENT_TO_RES_IGN_IDX[key]]
+        )
+        self.res_mult = max(0.0, min(2.0, 1 - enemy_res + total_res_red))
+        self.universal_mult = self.res_mult * self.dmg_taken_mult * self.stun_vuln_mult
+
+        # 防御区的敌方底数（腐蚀护盾翻倍）
+        self.base_def = fm.enemy_def * (2 if pre.has_corruption_shield else 1)
+
+    def fixed_multipliers(self) -> dict:
+        return {
+            "resMult": self.res_mult,
+            "dmgTakenMult": self.dmg_taken_mult,
+            "stunVulnMult": self.stun_vuln_mult,
+            "distanceMult": self.distance_mult,
+            "levelMult": self.level_mult,
+            "anomalyCritMult": self.anomaly_crit_mult,
+            "anomalyDmgMult": self.anomaly_dmg_mult,
+        }
+
+    # ------------------------------------------------------------------
+    # 增量枚举
+    # ------------------------------------------------------------------
+
+    def begin(self) -> None:
+        self.accumulator = self.base_stats[:]
+        self.eval_buffer = [a + b for a, b in zip(self.accumulator, self.merged_buff)]
+        self.dyn2pc = zeros()
+        self.set_counts = {}
+        self.saved = []
+
+    def push(self, disc: DiscData) -> None:
+        self.saved.append((self.accumulator, self.eval_buffer, self.dyn2pc))
+        acc = self.accumulator = self.accumulator[:]
+        eb = self.eval_buffer = self.eval_buffer[:]
+        for i, v in disc.stats:
+            acc[i] += v
+            eb[i] += v
+        if disc.is_target:
+            return
+        prev = self.set_counts.get(disc.set_idx, 0)
+        self.set_counts[disc.set_idx] = prev + 1
+        if prev == 1:
+            dyn = self.dyn2pc = self.dyn2pc[:]
+            for i, v in self.two_piece.get(disc.set_idx, ()):
+                dyn[i] += v
+                eb[i] += v
+
+    def pop(self, disc: DiscData) -> None:
+        if not disc.is_target:
+            self.set_counts[disc.set_idx] -= 1
+        self.accumulator, self.eval_buffer, self.dyn2pc = self.saved.pop()
+
+    # ------------------------------------------------------------------
+    # 叶子评估
+    # ------------------------------------------------------------------
+
+    def _leaf(self, discs: Sequence[DiscData]):
+        """
+        计算当前累加状态下的可变伤害（不含通用乘区）
+
+        返回 (damage, eb, snapshots, def_mult)，目标盘数不足 4 时返回 None。
+        eb 是 eval_buffer 的副本（写入了快照3面板与转换产物），增量状态不受影响。
+        """
+        pre = self.pre
+        if pre.target_set_id and len(discs) == 6:
+            if sum(1 for d in discs if d.is_target) < 4:
+                return None
+
+        acc, dyn, mb = self.accumulator, self.dyn2pc, self.merged_buff
+        eb = self.eval_buffer[:]
+
+        # 快照1：局外三元组（含动态 2 件套）-> 面板
+        atk1 = (acc[ATK_BASE] + dyn[ATK_BASE]) * (1 + acc[ATK_] + dyn[ATK_]) + acc[ATK] + dyn[ATK]
+        hp1 = (acc[HP_BASE] + dyn[HP_BASE]) * (1 + acc[HP_] + dyn[HP_]) + acc[HP] + dyn[HP]
+        def1 = (acc[DEF_BASE] + dyn[DEF_BASE]) * (1 + acc[DEF_] + dyn[DEF_]) + acc[DEF] + dyn[DEF]
+        imp1 = (acc[IMPACT] + dyn[IMPACT]) * (1 + acc[IMPACT_] + dyn[IMPACT_])
+
+        # 快照2：普通 Buff
+        atk2 = atk1 * (1 + mb[ATK_]) + mb[ATK]
+        hp2 = hp1 * (1 + mb[HP_]) + mb[HP]
+        def2 = def1 * (1 + mb[DEF_]) + mb[DEF]
+        imp2 = imp1 * (1 + mb[IMPACT_]) + mb[IMPACT]
+
+        # 快照3：转换类 Buff（源取快照2，不链式）
+        atk3, hp3, def3, imp3 = atk2, hp2, def2, imp2
+        for conv in pre.conversion_buffs:
+            src = conv.from_idx
+            if src == ATK_BASE:
+                value = atk2
+            elif src == HP_BASE:
+                value = hp2
+            elif src == DEF_BASE:
+                value = def2
+            elif src == IMPACT:
+                value = imp2
+            else:
+                value = acc[src]
+            converted = max(0.0, value - conv.threshold) * conv.ratio
+            if conv.max_value is not None:
+                converted = min(converted, conv.max_value)
+            to = conv.to_idx
+            if to == ATK:
+                atk3 += converted
+            elif to == HP:
+                hp3 += converted
+            elif to == DEF:
+                def3 += converted
+            elif to == IMPACT:
+                imp3 += converted
+            else:
+                eb[to] += converted
+
+        snapshots = {
+            "snapshot1": {"atk": atk1, "hp": hp1, "def": def1, "impact": imp1},
+            "snapshot2": {"atk": atk2, "hp": hp2, "def": def2, "impact": imp2},
+            "snapshot3": {"atk": atk3, "hp": hp3, "def": def3, "impact": imp3},
+        }
+        eb[ATK], eb[HP], eb[DEF], eb[IMPACT] = atk3, hp3, def3, imp3
+
+        if pre.objective in ("hp", "atk"):
+            return (hp3 if pre.objective == "hp" else atk3), eb, snapshots, None
+
+        # 命破：强制覆盖贯穿值并清空穿透
+        if self.has_mingpo:
+            eb[PROP_IDX["PEN"]] = 0.0
+            eb[PROP_IDX["PEN_"]] = 0.0
+            eb[PROP_IDX["SHEER_FORCE"]] += hp2 * 0.1 + atk2 * 0.3
+
+        def_mult = self.def_mult(eb)
+        crit_rate = min(1.0, max(0.0, eb[PROP_IDX["CRIT_"]]))
+        crit_zone = 1 + crit_rate * eb[PROP_IDX["CRIT_DMG_"]]
+
+        total = 0.0
+        for skill in pre.skills:
+            dmg_bonus = self.dmg_bonus(eb, skill)
+            if skill.is_penetration:
+                total += (
+                    eb[PROP_IDX["SHEER_FORCE"]] * skill.ratio * dmg_bonus * crit_zone
+                    * (1 + eb[PROP_IDX["SHEER_DMG_"]])
+                )
+            else:
+                total += atk3 * skill.ratio * dmg_bonus * crit_zone * def_mult
+            if skill.anomaly_buildup > 0:
+                anomaly, disorder = self.anomaly_damage(eb, atk3, dmg_bonus, def_mult, skill.element, skill.anomaly_buildup)
+                total += anomaly + disorder
+
+        if pre.special_anomaly and pre.special_anomaly.get("element") == "lieshuang":
+            total += self.lieshuang_damage(eb, atk3, def_mult, crit_zone)
+
+        return total, eb, snapshots, def_mult
+
+    def evaluate(self, discs: Sequence[DiscData]) -> Optional[float]:
+        """当前组合的可变伤害（排序用，不含通用乘区）；目标盘数不足 4 时返回 None"""
+        leaf = self._leaf(discs)
+        return None if leaf is None else leaf[0]
+
+    def optimistic(self, extra: Sequence[Tuple[int, float]], extra_2pc: Sequence[Tuple[int, float]]) -> float:
+        """当前累加状态再加上 extra（盘词条）与 extra_2pc（2 件套）后的可变伤害，增量状态不变（分支定界用）"""
+        saved = self.accumulator, self.eval_buffer, self.dyn2pc
+        acc, eb, dyn = saved[0][:], saved[1][:], saved[2][:]
+        for i, v in extra:
+            acc[i] += v
+            eb[i] += v
+        for i, v in extra_2pc:
+            dyn[i] += v
+            eb[i] += v
+        self.accumulator, self.eval_buffer, self.dyn2pc = acc, eb, dyn
+        try:
+            return self._leaf(())[0]
+        finally:
+            self.accumulator, self.eval_buffer, self.dyn2pc = saved
+
+    def def_mult(self, eb: Sequence[float]) -> float:
+        fm = self.pre.fixed
+        def_red = fm.base_def_red + eb[PROP_IDX["DEF_RED_"]]
+        def_ign = fm.base_def_ign + eb[PROP_IDX["DEF_IGN_"]]
+        effective = max(0.0, self.base_def * (1 - def_red - def_ign) * (1 - eb[PROP_IDX["PEN_"]]) - eb[PROP_IDX["PEN"]])
+        return fm.level_base / (effective + fm.level_base)
+
+    @staticmethod
+    def dmg_bonus(eb: Sequence[float], skill: SkillParams) -> float:
+        bonus = 1 + eb[PROP_IDX["DMG_"]]
+        element_idx = ELEMENT_TO_DMG_IDX.get(skill.element)
+        if element_idx is not None:
+            bonus += eb[element_idx]
+        for tag in skill.tags:
+            tag_idx = SKILL_TAG_DMG_IDX.get(tag)
+            if tag_idx is not None:
+                bonus += eb[tag_idx]
+        return bonus
+
+    def accumulation_zone(self, eb: Sequence[float], element: int) -> float:
+        mastery = eb[PROP_IDX["ANOM_MAS"]]
+        mastery_zone = mastery / 100 if mastery > 0 else 1.0
+        efficiency = 1 + eb[PROP_IDX["ANOM_BUILDUP_"]]
+        buildup_idx = ELEMENT_TO_BUILDUP_IDX.get(element)
+        if buildup_idx is not None:
+            efficiency += eb[buildup_idx]
+        res_idx = ELEMENT_TO_BUILDUP_RES_IDX.get(element, ELEMENT_TO_BUILDUP_RES_IDX[200])
+        resistance = 1 - eb[PROP_IDX["ANOM_BUILDUP_RES_"]] - eb[res_idx]
+        return max(0.0, mastery_zone * efficiency * resistance * self.distance_mult)
+
+    def anomaly_damage(self, eb: Sequence[float], atk: float, dmg_bonus: float, def_mult: float,
+                       element: int, buildup: float) -> Tuple[float, float]:
+        """异常 / 紊乱伤害（不含通用乘区）"""
+        prof_mult = max(0.0, min(10.0, eb[PROP_IDX["ANOM_PROF"]] / 100))
+        threshold = self.pre.anomaly_thresholds.get(ELEMENT_KEYS.get(element, "physical"), STANDARD_BUILDUP_THRESHOLD)
+        procs = max(0.0, min(1.0, buildup * self.accumulation_zone(eb, element) / threshold))
+        if procs <= 0:
+            return 0.0, 0.0
+        common = (
+            dmg_bonus * prof_mult * self.anomaly_dmg_mult * self.anomaly_crit_mult
+            * self.level_mult * def_mult
+        )
+        anomaly = atk * self.pre.anomaly_total_ratio * common * procs
+        disorder = atk * self.pre.disorder_total_ratio * common * min(procs, 5)
+        return anomaly, disorder
+
+    def lieshuang_damage(self, eb: Sequence[float], atk: float, def_mult: float, crit_zone: float) -> float:
+        """烈霜伤害（星见雅；不含通用乘区）"""
+        pre = self.pre
+        dmg_bonus = 1 + eb[PROP_IDX["DMG_"]] + eb[ELEMENT_TO_DMG_IDX[202]]
+        buildup_mult = 1 + eb[PROP_IDX["ANOM_BUILDUP_"]] + eb[ELEMENT_TO_BUILDUP_IDX[202]]
+        buildup = sum(s.anomaly_buildup for s in pre.skills if s.element == 202)
+        if buildup == 0 and pre.skills:
+            buildup = pre.skills[0].anomaly_buildup
+        threshold = pre.anomaly_thresholds.get("ice", 600.0)
+        procs = buildup * buildup_mult / threshold
+        return atk * pre.special_anomaly["ratio"] * dmg_bonus * crit_zone * def_mult * procs
+
+    # ------------------------------------------------------------------
+    # 完整结果
+    # ------------------------------------------------------------------
+
+    def full_result(self, discs: Sequence[DiscData]) -> dict:
+        """重新累加组合并计算完整结果（对应 createFullResult；finalStats 为完整属性数组）"""
+        self.begin()
+        for disc in discs:
+            self.push(disc)
+        leaf = self._leaf(discs)
+        if leaf is None:
+            raise ValueError("组合不满足目标四件套")
+        variable, eb, snapshots, def_mult = leaf
+        pre = self.pre
+        universal = self.universal_mult
+        atk = snapshots["snapshot3"]["atk"]
+
+        two_piece_sets = []
+        for set_idx, count in self.set_counts.items():
+            if count >= 2:
+                two_piece_sets.append(next(d.set_id for d in discs if d.set_idx == set_idx))
+        set_info = {"twoPieceSets": two_piece_sets, "fourPieceSet": pre.target_set_id or None}
+
+        if def_mult is None:
+            # 目标属性模式：不计算伤害乘区
+            return {
+                "damage": variable * universal,
+                "discIds": [d.id for d in discs],
+                "finalStats": eb,
+                "snapshots": snapshots,
+                "breakdown": {"direct": 0.0, "anomaly": 0.0, "disorder": 0.0},
+                "multipliers": {},
+                "setInfo": set_info,
+            }
+
+        crit_zone = 1 + min(1.0, max(0.0, eb[PROP_IDX["CRIT_"]])) * eb[PROP_IDX["CRIT_DMG_"]]
+        direct = anomaly = disorder = 0.0
+        for skill in pre.skills:
+            dmg_bonus = self.dmg_bonus(eb, skill)
+            if skill.is_penetration:
+                direct += (
+                    eb[PROP_IDX["SHEER_FORCE"]] * skill.ratio * dmg_bonus * crit_zone
+                    * (1 + eb[PROP_IDX["SHEER_DMG_"]]) * universal * self.distance_mult
+                )
+            else:
+                direct += atk * skill.ratio * dmg_bonus * crit_zone * def_mult * universal * self.distance_mult
+            if skill.anomaly_buildup > 0:
+                a, d = self.anomaly_damage(eb, atk, dmg_bonus, def_mult, skill.element, skill.anomaly_buildup)
+                anomaly += a * universal
+                disorder += d * universal
+        breakdown = {"direct": direct, "anomaly": anomaly, "disorder": disorder}
+        special = pre.special_anomaly if pre.special_anomaly and pre.special_anomaly.get("element") == "lieshuang" else None
+        if special:
+            lieshuang = self.lieshuang_damage(eb, atk, def_mult, crit_zone) * universal
+            if lieshuang > 0:
+                breakdown["lieshuang"] = lieshuang
+
+        skill0 = pre.skills[0]
+        element_idx = ELEMENT_TO_DMG_IDX.get(skill0.element)
+        multipliers = {
+            "baseDirectDamage": atk * skill0.ratio,
+            "baseAnomalyDamage": atk * pre.anomaly_total_ratio,
+            "baseDisorderDamage": atk * pre.disorder_total_ratio,
+            "anomalyProfMult": eb[PROP_IDX["ANOM_PROF"]] / 100,
+            "accumulationZone": self.accumulation_zone(eb, skill0.element),
+            "critZone": crit_zone,
+            "dmgBonus": 1 + eb[PROP_IDX["DMG_"]] + (eb[element_idx] if element_idx is not None else 0.0),
+        }
+        if special:
+            multipliers["baseLieshuangDamage"] = atk * special["ratio"]
+
+        return {
+            "damage": variable * universal,
+            "discIds": [d.id for d in discs],
+            "finalStats": eb,
+            "snapshots": snapshots,
+            "breakdown": breakdown,
+            "multipliers": multipliers,
+            "defMult": def_mult,
+            "setInfo": set_info,
+        }
+
+
+def slot_order(discs_by_slot: Sequence[Sequence[DiscData]]) -> List[int]:
+    """按候选盘数量升序的枚举顺序（少的放外层，与 Worker 一致）"""
+    return sorted(range(6), key=lambda s: len(discs_by_slot[s]))
+
+
+def is_monotone(pre: Precomputed) -> bool:
+    """目标函数是否对候选盘词条 / 2 件套属性单调不减（支配剪枝与分支定界的前提）"""
+    if any(conv.ratio < 0 for conv in pre.conversion_buffs):
+        return False
+    base = [m + b for m, b in zip(pre.merged_stats, pre.merged_buff)]
+    if base[PROP_IDX["CRIT_DMG_"]] < 0:
+        return False
+    # 异常掌控 <= 0 时掌控区取 1，加掌控反而可能降低积蓄
+    if any(s.anomaly_buildup > 0 for s in pre.skills) and base[PROP_IDX["ANOM_MAS"]] <= 0:
+        return False
+    return True
+
+
+# 上界比较的相对余量（上界与叶子的累加顺序不同，浮点舍入可能差几个 ulp）
+BOUND_RTOL = 1e-9
+
+
+class DamageBound:
+    """
+    分支定界的乐观上界
+
+    remaining[level]：第 level..5 层每个属性列取该层候选盘最大值之和（稀疏）；
+    two_piece[r]：还剩 r 层时最多新生效的非目标 2 件套（有目标套装时至多 1 个，否则至多 3 个），
+    每列取各套装 2 件套数值中最大的若干个之和。
+    把二者加到当前累加状态上按叶子公式求值；目标函数对属性单调不减（is_monotone），
+    所以结果不低于子树中任何组合的伤害。
+    two_piece_sets 给定时只考虑这些套装的 2 件套（套装构成模板已确定 2 件套时使用）。
+    """
+
+    def __init__(self, pre: Precomputed, slots: Sequence[Sequence[DiscData]],
+                 two_piece_sets: Optional[Iterable[int]] = None):
+        self.remaining: List[List[Tuple[int, float]]] = [[] for _ in range(7)]
+        totals = zeros()
+        for level in range(5, -1, -1):
+            best = zeros()
+            for disc in slots[level]:
+                for i, v in disc.stats:
+                    best[i] = max(best[i], v)
+            totals = [t + b for t, b in zip(totals, best)]
+            self.remaining[level] = to_sparse(totals)
+
+        if two_piece_sets is None:
+            set_idxs = {d.set_idx for slot in slots for d in slot if not d.is_target}
+        else:
+            set_idxs = set(two_piece_sets)
+        rows = [pre.set_two_piece.get(s) or [] for s in sorted(set_idxs)]
+        columns: Dict[int, List[float]] = {}
+        for row in rows:
+            for i, v in enumerate(row):
+                if v > 0:
+                    columns.setdefault(i, []).append(v)
+        most = 1 if pre.target_set_id else 3
+        self.two_piece = [
+            [(i, sum(sorted(values, reverse=True)[:min(most, r)])) for i, values in sorted(columns.items())]
+            for r in range(7)
+        ]
+
+    def value(self, evaluator: "FastEvaluator", level: int) -> float:
+        """evaluator 已加入第 0..level-1 层的盘时，其余层任意选择所能达到的伤害上界"""
+        return evaluator.optimistic(self.remaining[level], self.two_piece[6 - level]) * (1 + BOUND_RTOL)
+
+
+@dataclass
+class CompositionTemplate:
+    """
+    套装构成模板：哪些层放目标套装、其余各层放哪个非目标套装
+
+    candidates[level] 为该层符合模板的候选盘下标（升序），members 为同样内容的集合；
+    two_piece 为模板确定生效的非目标 2 件套（恰好两层放同一非目标套装时），否则为 None。
+    """
+    candidates: List[List[int]]
+    members: List[Set[int]]
+    two_piece: Optional[int]
+
+
+def composition_templates(slots: Sequence[Sequence[DiscData]]) -> List[CompositionTemplate]:
+    """
+    目标套装 4 件套的全部套装构成模板
+
+    目标套装占任意 4、5 或 6 层；剩余每层按非目标套装分组，每种组合一个模板。
+    各模板的组合互不重叠，并集恰为满足 4 件套门槛的全部组合；缺少候选盘的模板不生成。
+    """
+    target = [[i for i, d in enumerate(slot) if d.is_target] for slot in slots]
+    others: List[Dict[int, List[int]]] = []
+    for slot in slots:
+        groups: Dict[int, List[int]] = {}
+        for i, disc in enumerate(slot):
+            if not disc.is_target:
+                groups.setdefault(disc.set_idx, []).append(i)
+        others.append(groups)
+
+    templates: List[CompositionTemplate] = []
+    for size in (6, 5, 4):
+        for levels in itertools.combinations(range(6), size):
+            if not all(target[level] for level in levels):
+                continue
+            free = [level for level in range(6) if level not in levels]
+            for sets in itertools.product(*(sorted(others[level]) for level in free)):
+                candidates = [target[level] for level in range(6)]
+                for level, set_idx in zip(free, sets):
+                    candidates[level] = others[level][set_idx]
+                two_piece = sets[0] if len(sets) == 2 and sets[0] == sets[1] else None
+                templates.append(CompositionTemplate(candidates, [set(c) for c in candidates], two_piece))
+    return templates
+
+
+def span(lists: Sequence[Sequence[int]]) -> int:
+    """各层候选数之积（子树中的组合数）"""
+    total = 1
+    for candidates in lists:
+        total *= len(candidates)
+    return total
+
+
+class PrefixSearch:
+    """
+    按前缀执行的枚举（search 与并行调度共用）
+
+    run(prefix) 枚举以 prefix（前若干层的候选盘下标）开头的全部组合，结果并入同一个 TopN 堆。
+    堆元素 (damage, -rank, indices)：rank 为组合在完整枚举中的序号，同分时先枚举到的组合保留，
+    因此任意切分前缀后合并的 TopN 与一次完整枚举相同。
+
+    incremental=True 时枚举与叶子评估改用 incremental_evaluator.IncrementalEvaluator（按层入栈的压缩列状态，
+    叶子只为最后一层付出代价），FastEvaluator 只用于生成完整结果。
+
+    bound=True 时启用分支定界：堆满后，某层选定的盘使子树上界（DamageBound）低于堆顶时跳过整棵子树，
+    跳过的可行组合数计入 bounded（逐层检查门槛时，子树中凑不齐 4 件套的组合计入 pruned，
+    因此 processed + pruned + bounded 恒为组合总数）。子树中的组合都进不了堆，结果与完整枚举相同。
+
+    templates=True 且有目标套装时按套装构成模板枚举：每个模板各层只遍历符合模板的候选盘，
+    凑不齐 4 件套的组合不再逐层入栈后剪掉，而是整体计入 pruned；上界也按模板的候选盘与 2 件套计算。
+    模板打乱了枚举顺序，所以同分时比较 rank 而不依赖先后。
+    """
+
+    def __init__(self, pre: Precomputed, top_n: int = 10, bound: bool = False, incremental: bool = False,
+                 templates: bool = True):
+        self.pre = pre
+        self.top_n = top_n
+        self.order = slot_order(pre.discs_by_slot)
+        self.slots = [pre.discs_by_slot[s] for s in self.order]
+        self.counts = [len(s) for s in self.slots]
+        if 0 in self.counts:
+            raise ValueError("没有可用的驱动盘组合")
+        # 各层下标在 rank 中的权重（该层之后各层候选数之积）
+        self.subtree = [1] * 6
+        for level in range(4, -1, -1):
+            self.subtree[level] = self.subtree[level + 1] * self.counts[level + 1]
+        self.evaluator = FastEvaluator(pre)
+        if incremental:
+            from incremental_evaluator import IncrementalEvaluator
+            self.stepper = IncrementalEvaluator(pre, self.slots)
+        else:
+            self.stepper = self.evaluator
+        self.has_target = bool(pre.target_set_id)
+        # target_ways[level][t]：level 及之后各层恰好选到 t 个目标盘的组合数（逐层剪枝时统计跳过的可行叶子）
+        self.target_ways: List[List[int]] = [[1]]
+        for slot in reversed(self.slots):
+            targets = sum(1 for disc in slot if disc.is_target)
+            ways = [0] * (len(self.target_ways[0]) + 1)
+            for t, w in enumerate(self.target_ways[0]):
+                ways[t] += w * (len(slot) - targets)
+                ways[t + 1] += w * targets
+            self.target_ways.insert(0, ways)
+        bound = bound and is_monotone(pre)
+        self.bounds = DamageBound(pre, self.slots) if bound else None
+        self.templates = composition_templates(self.slots) if templates and self.has_target else None
+        self.template_bounds: List[Optional[DamageBound]] = [
+            DamageBound(
+                pre,
+                [[slot[i] for i in candidates] for slot, candidates in zip(self.slots, template.candidates)],
+                [] if template.two_piece is None else [template.two_piece],
+            ) if bound else None
+            for template in self.templates or []
+        ]
+        self.heap: List[Tuple[float, int, Tuple[int, ...]]] = []
+        self.processed = self.pruned = self.bounded = 0
+
+    def run(self, prefix: Sequence[int] = ()) -> None:
+        if self.templates is None:
+            self._run(prefix, [range(n) for n in self.counts], self.bounds, self.has_target)
+            return
+        covered = 0
+        for template, bounds in zip(self.templates, self.template_bounds):
+            if all(i in template.members[level] for level, i in enumerate(prefix)):
+                self._run(prefix, template.candidates, bounds, False)
+                covered += span(template.candidates[len(prefix):])
+        self.pruned += span([range(n) for n in self.counts[len(prefix):]]) - covered
+
+    def _run(self, prefix: Sequence[int], lists: Sequence[Sequence[int]], bounds: Optional[DamageBound],
+             has_target: bool) -> None:
+        """lists[level]：该层遍历的候选盘下标；has_target=False 时不再逐层检查 4 件套门槛"""
+        evaluator, slots, heap, top_n = self.stepper, self.slots, self.heap, self.top_n
+        subtree = [span(lists[level + 1:]) for level in range(6)]
+        picked: List[Optional[DiscData]] = [None] * 6
+        indices = [0] * 6
+
+        evaluator.begin()
+        target_count = 0
+        for level, i in enumerate(prefix):
+            disc = slots[level][i]
+            evaluator.push(disc)
+            target_count += 1 if disc.is_target else 0
+            if has_target and target_count + 5 - level < 4:
+                self.pruned += subtree[level]
+                return
+            picked[level] = disc
+            indices[level] = i
+
+        def descend(level: int, target_count: int) -> None:
+            candidates = slots[level]
+            remaining = 5 - level
+            for i in lists[level]:
+                disc = candidates[i]
+                evaluator.push(disc)
+                count = target_count + (1 if disc.is_target else 0)
+                if has_target and count + remaining < 4:
+                    self.pruned += subtree[level]
+                    evaluator.pop(disc)
+                    continue
+                if bounds is not None and level < 5 and len(heap) >= top_n \
+                        and bounds.value(evaluator, level + 1) < heap[0][0]:
+                    # 只有凑得齐 4 件套的叶子算作定界跳过，其余本会被门槛剪掉
+                    feasible = self.feasible_leaves(level + 1, count) if has_target else subtree[level]
+                    self.bounded += feasible
+                    self.pruned += subtree[level] - feasible
+                    evaluator.pop(disc)
+                    continue
+                picked[level] = disc
+                indices[level] = i
+                if level < 5:
+                    descend(level + 1, count)
+                else:
+                    self._leaf(picked, indices)
+                evaluator.pop(disc)
+
+        if len(prefix) < 6:
+            descend(len(prefix), target_count)
+        else:
+            self._leaf(picked, indices)
+
+    def feasible_leaves(self, level: int, target_count: int) -> int:
+        """已选 target_count 个目标盘时，level 及之后各层（完整候选）凑得齐 4 件套的组合数"""
+        return sum(self.target_ways[level][max(0, 4 - target_count):])
+
+    def _leaf(self, picked: Sequence[DiscData], indices: Sequence[int]) -> None:
+        damage = self.stepper.evaluate(picked)
+        self.processed += 1
+        if damage is None:
+            return
+        heap = self.heap
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, (damage, -self.rank(indices), tuple(indices)))
+        elif damage > heap[0][0] or (damage == heap[0][0] and -self.rank(indices) > heap[0][1]):
+            heapq.heapreplace(heap, (damage, -self.rank(indices), tuple(indices)))
+
+    def rank(self, indices: Sequence[int]) -> int:
+        return sum(i * w for i, w in zip(indices, self.subtree))
+
+    def ranked(self) -> List[Tuple[float, Tuple[int, ...]]]:
+        """[(damage, 各层下标)]，按伤害降序、同分按枚举顺序"""
+        return [(damage, idx) for damage, _, idx in sorted(self.heap, key=lambda item: (-item[0], -item[1]))]
+
+    def builds(self, ranked: Sequence[Tuple[float, Tuple[int, ...]]]) -> List[dict]:
+        return [self.evaluator.full_result(combo_discs(self.slots, self.order, idx)) for _, idx in ranked]
+
+
+def search(pre: Precomputed, top_n: int = 10, worker_id: int = 0, total_workers: int = 1, bound: bool = False,
+           incremental: bool = False, templates: bool = True) -> dict:
+    """
+    枚举全部组合并返回 TopN（对应 runFastOptimization）
+
+    第一层循环按 [n0*w/W, n0*(w+1)/W) 分片；返回 {"builds": [...], "stats": {...}}，
+    builds 按伤害降序，discIds 按位置 1-6。bound=True 时启用分支定界，stats 额外含 boundSkipped；
+    incremental=True 时使用增量 DFS 评估器；templates=False 时退回逐层检查 4 件套门槛的枚举。
+    """
+    start = time.perf_counter()
+    runner = PrefixSearch(pre, top_n, bound, incremental, templates)
+    n0 = runner.counts[0]
+    for i0 in range(n0 * worker_id // total_workers, n0 * (worker_id + 1) // total_workers):
+        runner.run((i0,))
+    builds = runner.builds(runner.ranked())
+    elapsed = time.perf_counter() - start
+    processed, pruned, bounded = runner.processed, runner.pruned, runner.bounded
+    stats = {
+        "totalProcessed": processed,
+        "prunedCount": pruned,
+        "timeMs": elapsed * 1000,
+        "averageSpeed": (processed + pruned + bounded) / elapsed if elapsed > 0 else 0.0,
+    }
+    if bound:
+        stats["boundSkipped"] = bounded
+    return {"builds": builds, "stats": stats}
+
+
+def combo_discs(slots: Sequence[Sequence[DiscData]], order: Sequence[int], indices: Sequence[int]) -> List[DiscData]:
+    """把按枚举层记录的下标映射回位置 1-6 的盘列表"""
+    discs: List[Optional[DiscData]] = [None] * 6
+    for level, idx in enumerate(indices):
+        discs[order[level]] = slots[level][idx]
+    return discs
@@ -0,0 +1,293 @@
+"""
+Shared HTTP fetch engine for the data/icon update scripts.
+
+- Bounded parallelism through a thread pool (``Fetcher.map``)
+- Per-host token-bucket rate limiting instead of fixed ``time.sleep`` calls
+- Retries with exponential backoff (+ jitter) on network errors, 429 and 5xx
+- Conditional requests: ``304 Not Modified`` is returned as a result, not an error
+- Keep-alive connection reuse (one pooled connection per host and worker thread)
+- Resumable downloads to disk (``.part`` + Range) with atomic rename on completion
+
+Only the standard library is used so the scripts keep running without extra installs.
+"""
+import http.client
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_USER_AGENT = "Mozilla/5.0"
+
+# HTTP statuses worth retrying (rate limited / transient upstream errors)
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+MAX_REDIRECTS = 5
+CHUNK_SIZE = 64 * 1024
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class FetchError(Exception):
+    """Raised when a URL could not be fetched after all retries."""
+
+    def __init__(self, url: str, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.url = url
+        self.status = status
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, at most ``capacity`` stored."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until ``tokens`` are available, then consume them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """One token bucket per host, created lazily."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str) -> None:
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[host] = bucket
+        bucket.acquire()
+
+
+class ConnectionPool:
+    """
+    Keep-alive connections keyed by (scheme, host), one set per thread.
+
+    http.client connections are not thread-safe, so each worker thread keeps its
+    own connection per host and reuses it for every request it makes.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connections(self) -> Dict[Tuple[str, str], http.client.HTTPConnection]:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = {}
+            self._local.conns = conns
+        return conns
+
+    def get(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        conns = self._connections()
+        key = (scheme, netloc)
+        conn = conns.get(key)
+        if conn is None:
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(netloc, timeout=self.timeout)
+            elif scheme == "http":
+                conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+            else:
+                raise ValueError(f"unsupported URL scheme: {scheme}")
+            conns[key] = conn
+        return conn
+
+    def discard(self, scheme: str, netloc: str) -> None:
+        conn = self._connections().pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+
+class _HTTPStatusError(Exception):
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class Fetcher:
+    """
+    Thread-pool based fetcher.
+
+    Args:
+        concurrency: Maximum number of requests in flight.
+        rate: Requests per second allowed per host (token bucket refill rate).
+        burst: Token bucket capacity per host (defaults to ``rate``).
+        retries: Extra attempts after the first failure.
+        backoff: Base delay in seconds; attempt ``n`` waits ``backoff * 2**n`` (+ jitter).
+        timeout: Socket timeout per request in seconds.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        rate: float = 20.0,
+        burst: Optional[float] = None,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 30.0,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.concurrency = max(1, int(concurrency))
+        self.limiter = HostRateLimiter(rate, burst)
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.pool = ConnectionPool(timeout)
+
+    def _sleep_backoff(self, attempt: int) -> None:
+        delay = self.backoff * (2 ** attempt)
+        time.sleep(delay + random.uniform(0, delay / 2))
+
+    def _open(self, url: str, headers: Dict[str, str]) -> Tuple[str, http.client.HTTPResponse]:
+        """Send a GET over a pooled connection, following redirects. Returns (final_url, response)."""
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            conn = self.pool.get(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+            except (http.client.HTTPException, OSError):
+                # Stale keep-alive connection or network error: drop it so the retry reconnects.
+                self.pool.discard(parts.scheme, parts.netloc)
+                raise
+            if response.status in REDIRECT_STATUSES and response.getheader("Location"):
+                response.read()
+                url = urljoin(url, response.getheader("Location"))
+                continue
+            return url, response
+        raise FetchError(url, "too many redirects")
+
+    def _with_retries(self, url: str, func: Callable[[], R]) -> R:
+        last_error = "unknown error"
+        last_status: Optional[int] = None
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire(url)
+            try:
+                return func()
+            except _HTTPStatusError as e:
+                last_status = e.status
+                last_error = str(e)
+                if e.status not in RETRY_STATUSES:
+                    break
+            except (http.client.HTTPException, OSError, ValueError) as e:
+                last_error = str(e) or type(e).__name__
+                # The response may have been cut off mid-body; never reuse that connection.
+                parts = urlsplit(url)
+                self.pool.discard(parts.scheme, parts.netloc)
+
+            if attempt < self.retries:
+                self._sleep_backoff(attempt)
+
+        raise FetchError(url, last_error, last_status)
+
+    def _headers(self, extra: Optional[Dict[str, str]]) -> Dict[str, str]:
+        headers = {"User-Agent": self.user_agent, "Connection": "keep-alive"}
+        if extra:
+            headers.update(extra)
+        return headers
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """GET ``url`` with rate limiting and retries. Raises ``FetchError`` on failure."""
+        req_headers = self._headers(headers)
+
+        def attempt() -> FetchResult:
+            _, response = self._open(url, req_headers)
+            body = response.read()
+            if response.status >= 400:
+                raise _HTTPStatusError(response.status)
+            return FetchResult(
+                url=url,
+                status=response.status,
+                body=body,
+                headers={k.lower(): v for k, v in response.getheaders()},
+            )
+
+        return self._with_retries(url, attempt)
+
+    def download_to_file(self, url: str, filepath: str) -> int:
+        """
+        Stream ``url`` to ``filepath``; returns the number of bytes received.
+
+        Data is written to ``filepath + '.part'`` and renamed into place once complete,
+        so readers never see a half-written file. A leftover ``.part`` from an
+        interrupted run is resumed with a Range request when the server supports it.
+        """
+        part_path = filepath + ".part"
+
+        def attempt() -> int:
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            extra = {"Range": f"bytes={offset}-"} if offset else None
+            _, response = self._open(url, self._headers(extra))
+            if response.status == 416:
+                # Range not satisfiable: the partial file is stale, start over.
+                response.read()
+                os.remove(part_path)
+                _, response = self._open(url, self._headers(None))
+            if response.status >= 400:
+                response.read()
+                raise _HTTPStatusError(response.status)
+
+            mode = "ab" if response.status == 206 else "wb"
+            received = 0
+            with open(part_path, mode) as out_file:
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    out_file.write(chunk)
+                    received += len(chunk)
+            os.replace(part_path, filepath)
+            return received
+
+        return self._with_retries(url, attempt)
+
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """Run ``func`` over ``items`` with at most ``concurrency`` workers; results keep input order."""
+        items = list(items)
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(items))) as pool:
+            return list(pool.map(func, items))
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+增量 DFS 评估器
+
+docs/fast_opt_incremental_search_design.md 的实现：枚举树每进入一层只叠加该层盘的影响，
+退出时回滚，叶子上只为第 6 层的盘付出代价。与 FastEvaluator 的 push/pop 一样按层入栈、
+出栈回滚（不做减法，没有浮点累积误差），区别在于：
+
+- 只保存压缩列：候选盘词条 / 非目标套装 2 件套涉及的列 + 叶子公式读取的列（K 列，通常二三十列），
+  而不是整条 PROP_COUNT 属性数组；叶子不再复制 eval_buffer
+- 叶子公式按本次请求预先折叠：属性下标换成压缩列号、常量乘区 / Buff 提前算好、
+  技能按 (元素, 标签) 预先分组，去掉了 FastEvaluator._leaf 中的字典查找与快照字典
+
+算式与 FastEvaluator._leaf 逐项同序（相同的加法 / 乘法顺序），同一组合得到相同的浮点结果。
+完整结果（full_result）仍由 FastEvaluator 生成。
+
+接口与 FastEvaluator 的增量部分相同（begin / push / pop / evaluate / optimistic），
+fast_evaluator.PrefixSearch(incremental=True) 用它替换叶子评估。
+"""
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fast_evaluator import (
+    ATK, ATK_, ATK_BASE, DEF, DEF_, DEF_BASE, ELEMENT_KEYS, ELEMENT_TO_BUILDUP_IDX, ELEMENT_TO_BUILDUP_RES_IDX,
+    ELEMENT_TO_DMG_IDX, HP, HP_, HP_BASE, IMPACT, IMPACT_, PROP_IDX, SKILL_TAG_DMG_IDX, STANDARD_BUILDUP_THRESHOLD,
+    DiscData, FastEvaluator, Precomputed,
+)
+
+PEN, PEN_ = PROP_IDX["PEN"], PROP_IDX["PEN_"]
+SHEER_FORCE, SHEER_DMG_ = PROP_IDX["SHEER_FORCE"], PROP_IDX["SHEER_DMG_"]
+# 快照面板（转换类 Buff 的来源 / 目标）
+PANELS = {ATK_BASE: "atk", HP_BASE: "hp", DEF_BASE: "def", IMPACT: "impact"}
+PANEL_TARGETS = {ATK: "atk", HP: "hp", DEF: "def", IMPACT: "impact"}
+SNAPSHOT_COLUMNS = (ATK_BASE, ATK_, ATK, HP_BASE, HP_, HP, DEF_BASE, DEF_, DEF, IMPACT, IMPACT_)
+
+
+class IncrementalEvaluator:
+    """
+    压缩列上的增量评估器
+
+    - acc / dyn / eb：各层的 accumulator / dyn2pc / eval_buffer（压缩列），栈顶为当前状态
+    - set_counts：非目标套装计数（整数，增减可精确回滚）
+    """
+
+    def __init__(self, pre: Precomputed, slots: Sequence[Sequence[DiscData]]):
+        self.pre = pre
+        scalar = FastEvaluator(pre)
+        self.scalar = scalar
+
+        # 压缩列：候选盘词条 + 2 件套 + 叶子公式读取的列
+        two_piece = {s: row for s, row in scalar.two_piece.items()}
+        cols = {i for slot in slots for d in slot for i, _ in d.stats}
+        cols.update(i for row in two_piece.values() for i, _ in row)
+        cols.update(SNAPSHOT_COLUMNS)
+        cols.update(PROP_IDX[k] for k in ("CRIT_", "CRIT_DMG_", "DMG_", "DEF_RED_", "DEF_IGN_", "ANOM_PROF",
+                                          "ANOM_MAS", "ANOM_BUILDUP_", "ANOM_BUILDUP_RES_"))
+        cols.update((PEN, PEN_, SHEER_FORCE, SHEER_DMG_))
+        for skill in pre.skills:
+            cols.update(self._skill_columns(skill))
+        cols.update(ELEMENT_TO_DMG_IDX.values())
+        cols.update(ELEMENT_TO_BUILDUP_IDX.values())
+        for conv in pre.conversion_buffs:
+            cols.update((conv.from_idx, conv.to_idx))
+        self.cols = sorted(cols)
+        pos = {c: k for k, c in enumerate(self.cols)}
+        self.pos = pos
+
+        self.base_acc = [scalar.base_stats[c] for c in self.cols]
+        self.base_eb = [a + scalar.merged_buff[c] for a, c in zip(self.base_acc, self.cols)]
+        self.two_piece = {s: [(pos[i], v) for i, v in row] for s, row in two_piece.items()}
+        self.disc_stats: Dict[int, List[Tuple[int, float]]] = {
+            id(d): [(pos[i], v) for i, v in d.stats] for slot in slots for d in slot
+        }
+        self._fold_constants()
+        self.begin()
+
+    @staticmethod
+    def _skill_columns(skill) -> List[int]:
+        columns = [ELEMENT_TO_BUILDUP_RES_IDX.get(skill.element, ELEMENT_TO_BUILDUP_RES_IDX[200])]
+        columns += [SKILL_TAG_DMG_IDX[t] for t in skill.tags if t in SKILL_TAG_DMG_IDX]
+        return columns
+
+    def _fold_constants(self) -> None:
+        """叶子公式中与组合无关的部分"""
+        pre, scalar, pos = self.pre, self.scalar, self.pos
+        mb = scalar.merged_buff
+        self.snap2 = {
+            "atk": (1 + mb[ATK_], mb[ATK]),
+            "hp": (1 + mb[HP_], mb[HP]),
+            "def": (1 + mb[DEF_], mb[DEF]),
+            "impact": (1 + mb[IMPACT_], mb[IMPACT]),
+        }
+        self.conversions = [
+            (PANELS.get(c.from_idx), pos[c.from_idx], PANEL_TARGETS.get(c.to_idx), pos[c.to_idx],
+             c.threshold, c.ratio, c.max_value)
+            for c in pre.conversion_buffs
+        ]
+        # 除攻击外叶子需要的面板：转换类 Buff 的来源、命破（生命）、生命目标
+        panels = {src for src, *_ in self.conversions if src}
+        if scalar.has_mingpo or pre.objective == "hp":
+            panels.add("hp")
+        triplets = {
+            "hp": (pos[HP_BASE], pos[HP_], pos[HP]),
+            "def": (pos[DEF_BASE], pos[DEF_], pos[DEF]),
+            "impact": (pos[IMPACT], pos[IMPACT_], None),
+        }
+        self.atk_cols = (pos[ATK_BASE], pos[ATK_], pos[ATK])
+        self.panel_cols = [(name, triplets[name]) for name in ("hp", "def", "impact") if name in panels]
+        # 叶子需要改写 eb（转换类 Buff 写入非面板列 / 命破覆盖）时才复制
+        self.writes_eb = scalar.has_mingpo or any(to is None for _, _, to, *_ in self.conversions)
+
+        # 技能：增伤区读取的列（DMG_ 之后依次加元素 / 标签增伤）
+        self.skills = []
+        for skill in pre.skills:
+            bonus = []
+            if skill.element in ELEMENT_TO_DMG_IDX:
+                bonus.append(pos[ELEMENT_TO_DMG_IDX[skill.element]])
+            bonus += [pos[SKILL_TAG_DMG_IDX[t]] for t in skill.tags if t in SKILL_TAG_DMG_IDX]
+            anomaly = None
+            if skill.anomaly_buildup > 0:
+                buildup_idx = ELEMENT_TO_BUILDUP_IDX.get(skill.element)
+                res_idx = ELEMENT_TO_BUILDUP_RES_IDX.get(skill.element, ELEMENT_TO_BUILDUP_RES_IDX[200])
+                threshold = pre.anomaly_thresholds.get(
+                    ELEMENT_KEYS.get(skill.element, "physical"), STANDARD_BUILDUP_THRESHOLD
+                )
+                anomaly = (skill.anomaly_buildup, None if buildup_idx is None else pos[buildup_idx], pos[res_idx], threshold)
+            self.skills.append((skill.ratio, skill.is_penetration, bonus, anomaly))
+
+        special = pre.special_anomaly
+        self.lieshuang = None
+        if special and special.get("element") == "lieshuang":
+            buildup = sum(s.anomaly_buildup for s in pre.skills if s.element == 202)
+            if buildup == 0 and pre.skills:
+                buildup = pre.skills[0].anomaly_buildup
+            self.lieshuang = (special["ratio"], buildup, pre.anomaly_thresholds.get("ice", 600.0))
+
+        self.k = tuple(pos[PROP_IDX[name]] for name in (
+            "CRIT_", "CRIT_DMG_", "DMG_", "DEF_RED_", "DEF_IGN_", "ANOM_PROF", "ANOM_MAS", "ANOM_BUILDUP_",
+            "ANOM_BUILDUP_RES_", "PEN", "PEN_", "SHEER_FORCE", "SHEER_DMG_",
+        )) + (pos[ELEMENT_TO_DMG_IDX[202]], pos[ELEMENT_TO_BUILDUP_IDX[202]])
+
+    # ------------------------------------------------------------------
+    # 增量枚举
+    # ------------------------------------------------------------------
+
+    def begin(self) -> None:
+        self.acc = [self.base_acc[:]]
+        self.dyn = [[0.0] * len(self.cols)]
+        self.eb = [self.base_eb[:]]
+        self.set_counts: Dict[int, int] = {}
+
+    def push(self, disc: DiscData) -> None:
+        acc, eb, dyn = self.acc[-1][:], self.eb[-1][:], self.dyn[-1]
+        for k, v in self.disc_stats[id(disc)]:
+            acc[k] += v
+            eb[k] += v
+        if not disc.is_target:
+            prev = self.set_counts.get(disc.set_idx, 0)
+            self.set_counts[disc.set_idx] = prev + 1
+            if prev == 1:
+                dyn = dyn[:]
+                for k, v in self.two_piece.get(disc.set_idx, ()):
+                    dyn[k] += v
+                    eb[k] += v
+        self.acc.append(acc)
+        self.eb.append(eb)
+        self.dyn.append(dyn)
+
+    def pop(self, disc: DiscData) -> None:
+        if not disc.is_target:
+            self.set_counts[disc.set_idx] -= 1
+        self.acc.pop()
+        self.eb.pop()
+        self.dyn.pop()
+
+    # ------------------------------------------------------------------
+    # 叶子评估（与 FastEvaluator._leaf 逐项同序）
+    # ------------------------------------------------------------------
+
+    def evaluate(self, discs: Sequence[DiscData]) -> Optional[float]:
+        """当前组合的可变伤害；目标盘数不足 4 时返回 None"""
+        if self.pre.target_set_id and len(discs) == 6:
+            if sum(1 for d in discs if d.is_target) < 4:
+                return None
+        return self._damage(self.acc[-1], self.dyn[-1], self.eb[-1])
+
+    def optimistic(self, extra: Sequence[Tuple[int, float]], extra_2pc: Sequence[Tuple[int, float]]) -> float:
+        """与 FastEvaluator.optimistic 相同：当前状态加上 extra / extra_2pc 后的可变伤害"""
+        pos = self.pos
+        acc, eb, dyn = self.acc[-1][:], self.eb[-1][:], self.dyn[-1][:]
+        for i, v in extra:
+            acc[pos[i]] += v
+            eb[pos[i]] += v
+        for i, v in extra_2pc:
+            dyn[pos[i]] += v
+            eb[pos[i]] += v
+        return self._damage(acc, dyn, eb)
+
+    def _damage(self, acc: List[float], dyn: List[float], eb: List[float]) -> float:
+        pre, scalar = self.pre, self.scalar
+        if self.writes_eb:
+            eb = eb[:]
+
+        # 快照1 -> 快照2
+        a_base, a_pct, a_flat = self.atk_cols
+        atk1 = (acc[a_base] + dyn[a_base]) * (1 + acc[a_pct] + dyn[a_pct]) + acc[a_flat] + dyn[a_flat]
+        mult, flat = self.snap2["atk"]
+        atk2 = atk1 * mult + flat
+        panels = {"atk": atk2}
+        for name, (base_k, pct_k, flat_k) in self.panel_cols:
+            value = (acc[base_k] + dyn[base_k]) * (1 + acc[pct_k] + dyn[pct_k])
+            if flat_k is not None:
+                value = value + acc[flat_k] + dyn[flat_k]
+            mult, flat = self.snap2[name]
+            panels[name] = value * mult + flat
+        atk3 = atk2
+        hp2 = hp3 = panels.get("hp", 0.0)
+
+        # 快照3：转换类 Buff（源取快照2，不链式）
+        for src, src_k, to, to_k, threshold, ratio, max_value in self.conversions:
+            value = panels[src] if src else acc[src_k]
+            converted = max(0.0, value - threshold) * ratio
+            if max_value is not None:
+                converted = min(converted, max_value)
+            if to == "atk":
+                atk3 += converted
+            elif to == "hp":
+                hp3 += converted
+            elif to is None:
+                eb[to_k] += converted
+
+        objective = pre.objective
+        if objective == "atk":
+            return atk3
+        if objective == "hp":
+            return hp3
+
+        (crit_k, crit_dmg_k, dmg_k, def_red_k, def_ign_k, prof_k, mastery_k, buildup_k, buildup_res_k,
+         pen_k, pen_pct_k, sheer_k, sheer_dmg_k, ice_dmg_k, ice_buildup_k) = self.k
+        if scalar.has_mingpo:
+            eb[pen_k] = 0.0
+            eb[pen_pct_k] = 0.0
+            eb[sheer_k] += hp2 * 0.1 + atk2 * 0.3
+
+        fm = pre.fixed
+        def_red = fm.base_def_red + eb[def_red_k]
+        def_ign = fm.base_def_ign + eb[def_ign_k]
+        effective = max(0.0, scalar.base_def * (1 - def_red - def_ign) * (1 - eb[pen_pct_k]) - eb[pen_k])
+        def_mult = fm.level_base / (effective + fm.level_base)
+        crit_rate = min(1.0, max(0.0, eb[crit_k]))
+        crit_zone = 1 + crit_rate * eb[crit_dmg_k]
+
+        total = 0.0
+        zones = {}
+        for ratio, is_penetration, bonus_cols, anomaly in self.skills:
+            dmg_bonus = 1 + eb[dmg_k]
+            for k in bonus_cols:
+                dmg_bonus += eb[k]
+            if is_penetration:
+                total += eb[sheer_k] * ratio * dmg_bonus * crit_zone * (1 + eb[sheer_dmg_k])
+            else:
+                total += atk3 * ratio * dmg_bonus * crit_zone * def_mult
+            if anomaly is not None:
+                buildup, element_k, res_k, threshold = anomaly
+                # 精通区 / 积蓄区只与元素有关，同元素技能共用
+                key = (element_k, res_k)
+                if key not in zones:
+                    prof_mult = max(0.0, min(10.0, eb[prof_k] / 100))
+                    mastery = eb[mastery_k]
+                    mastery_zone = mastery / 100 if mastery > 0 else 1.0
+                    efficiency = 1 + eb[buildup_k]
+                    if element_k is not None:
+                        efficiency += eb[element_k]
+                    resistance = 1 - eb[buildup_res_k] - eb[res_k]
+                    zones[key] = prof_mult, max(0.0, mastery_zone * efficiency * resistance * scalar.distance_mult)
+                prof_mult, zone = zones[key]
+                procs = max(0.0, min(1.0, buildup * zone / threshold))
+                if procs > 0:
+                    common = (
+                        dmg_bonus * prof_mult * scalar.anomaly_dmg_mult * scalar.anomaly_crit_mult
+                        * scalar.level_mult * def_mult
+                    )
+                    total += (atk3 * pre.anomaly_total_ratio * common * procs
+                              + atk3 * pre.disorder_total_ratio * common * min(procs, 5))
+
+        if self.lieshuang is not None:
+            ratio, buildup, threshold = self.lieshuang
+            dmg_bonus = 1 + eb[dmg_k] + eb[ice_dmg_k]
+            buildup_mult = 1 + eb[buildup_k] + eb[ice_buildup_k]
+            procs = buildup * buildup_mult / threshold
+            total += atk3 * ratio * dmg_bonus * crit_zone * def_mult * procs
+
+        return total
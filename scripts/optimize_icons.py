@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+图标重编码 / 体积预算脚本（在 update_icons.py 之后、build_icon_atlas.py 之前运行）
+
+UI 中图标只以缩略图展示，但上游提供的是原始分辨率的立绘和 Boss 卡面。
+本脚本离线处理 game-data/icons：
+- 按类别缩放到最大尺寸（保持宽高比，不放大）
+- 以按类别调好的 webp 质量重新编码，仅在结果更小时替换原文件
+- 记录每个文件处理后的 sha256，下次运行时内容未变的文件直接跳过
+- 输出每个文件的体积报告（icon_optimize_report.json），任一类别超出预算时返回 1
+
+依赖 Pillow（pip install Pillow）。
+
+使用方式：
+    python scripts/optimize_icons.py
+    python scripts/optimize_icons.py --check        # 只检查预算，不改写文件
+    python scripts/optimize_icons.py --force        # 忽略缓存重新处理
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+from build_icon_atlas import classify, format_bytes
+from update_icons import ICONS_DIR
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(PROJECT_ROOT, "web", "optimizer", "public", "game-data")
+CACHE_PATH = os.path.join(DATA_DIR, "icon_optimize_cache.json")
+REPORT_PATH = os.path.join(DATA_DIR, "icon_optimize_report.json")
+
+# 未匹配任何类别的图标（如 Unknown.webp）只统计不处理
+OTHER_CATEGORY = "other"
+
+
+@dataclass(frozen=True)
+class IconProfile:
+    max_edge: int  # 最长边上限（像素）
+    quality: int  # webp 质量
+    budget: int  # 类别总字节预算
+
+
+# 类别名与 build_icon_atlas.ICON_CATEGORIES 保持一致
+# max_edge 取 UI 最大展示尺寸的 2x；质量越小的图标越容易出现色块，质量相应调高
+ICON_PROFILES: Dict[str, IconProfile] = {
+    "role": IconProfile(max_edge=768, quality=80, budget=8 * 1024 * 1024),
+    "role_crop": IconProfile(max_edge=256, quality=82, budget=2 * 1024 * 1024),
+    "role_circle": IconProfile(max_edge=142, quality=85, budget=512 * 1024),
+    "weapon": IconProfile(max_edge=256, quality=82, budget=2 * 1024 * 1024),
+    "suit": IconProfile(max_edge=152, quality=85, budget=256 * 1024),
+    "boss": IconProfile(max_edge=320, quality=78, budget=6 * 1024 * 1024),
+    "bangboo": IconProfile(max_edge=256, quality=82, budget=1024 * 1024),
+    "element": IconProfile(max_edge=64, quality=90, budget=128 * 1024),
+}
+
+
+@dataclass
+class IconResult:
+    file: str
+    category: str
+    status: str  # optimized / kept / cached / skipped / error
+    before: int
+    after: int
+    width: int = 0
+    height: int = 0
+    message: str = ""
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_cache(path: str) -> Dict[str, str]:
+    """文件名 -> 上次处理后的 sha256"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_json_atomic(data, path: str) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def encode_icon(data: bytes, profile: IconProfile) -> tuple:
+    """缩放并重新编码，返回 (webp 字节, 宽, 高)"""
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGBA")
+        width, height = img.size
+        scale = profile.max_edge / max(width, height)
+        if scale < 1:
+            width, height = max(1, round(width * scale)), max(1, round(height * scale))
+            img = img.resize((width, height), Image.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, format="WEBP", quality=profile.quality, method=6)
+    return buffer.getvalue(), width, height
+
+
+def optimize_icon(
+    filepath: str,
+    cache: Dict[str, str],
+    check_only: bool,
+    force: bool,
+) -> IconResult:
+    filename = os.path.basename(filepath)
+    category = classify(os.path.splitext(filename)[0]) or OTHER_CATEGORY
+    with open(filepath, "rb") as f:
+        data = f.read()
+    digest = sha256_bytes(data)
+    result = IconResult(file=filename, category=category, status="skipped", before=len(data), after=len(data))
+
+    profile = ICON_PROFILES.get(category)
+    if profile is None or check_only:
+        return result
+    if not force and cache.get(filename) == digest:
+        result.status = "cached"
+        return result
+
+    try:
+        encoded, result.width, result.height = encode_icon(data, profile)
+    except (OSError, ValueError) as e:
+        result.status = "error"
+        result.message = str(e)
+        return result
+
+    if len(encoded) < len(data):
+        # 先写临时文件再替换，中断时不会留下损坏的图标
+        tmp_path = filepath + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encoded)
+        os.replace(tmp_path, filepath)
+        result.status = "optimized"
+        result.after = len(encoded)
+        cache[filename] = sha256_bytes(encoded)
+    else:
+        result.status = "kept"
+        cache[filename] = digest
+    return result
+
+
+def summarize(results: List[IconResult]) -> Dict[str, dict]:
+    """按类别汇总体积并与预算比较"""
+    summary: Dict[str, dict] = {}
+    for r in results:
+        entry = summary.setdefault(r.category, {"count": 0, "before": 0, "after": 0})
+        entry["count"] += 1
+        entry["before"] += r.before
+        entry["after"] += r.after
+    for category, entry in summary.items():
+        profile = ICON_PROFILES.get(category)
+        entry["budget"] = profile.budget if profile else None
+        entry["over_budget"] = bool(profile and entry["after"] > profile.budget)
+    return summary
+
+
+def print_summary(summary: Dict[str, dict]) -> None:
+    print(f"\n{'类别':<12}{'图标数':>8}{'处理前':>14}{'处理后':>14}{'预算':>14}  状态")
+    for category in list(ICON_PROFILES) + [OTHER_CATEGORY]:
+        entry = summary.get(category)
+        if not entry:
+            continue
+        budget = format_bytes(entry["budget"]) if entry["budget"] else "-"
+        state = "✗ 超出预算" if entry["over_budget"] else "✓"
+        print(
+            f"{category:<12}{entry['count']:>8}{format_bytes(entry['before']):>14}"
+            f"{format_bytes(entry['after']):>14}{budget:>14}  {state}"
+        )
+    before = sum(e["before"] for e in summary.values())
+    after = sum(e["after"] for e in summary.values())
+    print(f"{'合计':<12}{sum(e['count'] for e in summary.values()):>8}{format_bytes(before):>14}{format_bytes(after):>14}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="按类别缩放/重编码图标并检查体积预算")
+    parser.add_argument("--icons-dir", default=ICONS_DIR, help="图标目录（默认 update_icons.py 的输出目录）")
+    parser.add_argument("--check", action="store_true", help="只统计体积并检查预算，不改写文件")
+    parser.add_argument("--force", action="store_true", help="忽略缓存，重新处理所有图标")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="并行处理线程数")
+    parser.add_argument("--report", default=REPORT_PATH, help="逐文件报告输出路径")
+    args = parser.parse_args()
+
+    if Image is None and not args.check:
+        print("错误: 需要 Pillow，请先执行 pip install Pillow")
+        return 1
+    if not os.path.isdir(args.icons_dir):
+        print(f"未找到图标目录: {args.icons_dir}（请先运行 update_icons.py）")
+        return 1
+
+    cache = load_cache(CACHE_PATH)
+    files = [
+        os.path.join(args.icons_dir, name)
+        for name in sorted(os.listdir(args.icons_dir))
+        if name.endswith(".webp")
+    ]
+    print(f"图标目录: {args.icons_dir}（{len(files)} 个文件）")
+
+    # Pillow 的编解码会释放 GIL，线程池即可充分利用多核
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        results = list(pool.map(lambda p: optimize_icon(p, cache, args.check, args.force), files))
+
+    for r in results:
+        if r.status == "error":
+            print(f"  ✗ {r.file}: {r.message}")
+
+    if not args.check:
+        save_json_atomic(cache, CACHE_PATH)
+
+    counts: Dict[str, int] = {}
+    for r in results:
+        counts[r.status] = counts.get(r.status, 0) + 1
+    print("处理结果: " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+
+    summary = summarize(results)
+    print_summary(summary)
+    save_json_atomic(
+        {"summary": summary, "files": [asdict(r) for r in results]},
+        args.report,
+    )
+    print(f"\n报告已写入: {args.report}")
+
+    over = [c for c, e in summary.items() if e["over_budget"]]
+    if over:
+        print(f"✗ 以下类别超出体积预算: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
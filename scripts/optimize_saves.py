@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+存档批量优化（无浏览器）
+
+读取应用导出的存档 JSON（save-data-zod.ts 的 SaveDataZod）与 public/game-data，
+对一组 (角色, 队伍, 敌人) 任务运行与 fast-optimization.worker.ts 相同口径的期望伤害 TopN 搜索，
+结果写为 JSON。适合在服务器上批量跑多个账号的优化。
+
+任务来源：
+- 默认：每个存档中所有有前台角色、且能确定敌人的队伍各一个任务
+  （敌人取 optimizationConfig.selectedEnemyId，其次取该队伍战场的 enemyId）
+- --jobs：任务列表 JSON（数组），每项可含
+  {save, team, character, enemyId, skills, topN, minDiscLevel, excludeTeams}
+  save 为存档路径（只传一个存档时可省略），team / character 为存档中的 ID 或名称
+
+技能依次取任务的 skills、角色的 selectedSkillKeys、队伍的 optimizationConfig.selectedSkillKeys；
+目标套装取角色的 targetFourPieceSetId / targetTwoPieceSetIds。
+
+使用方式：
+    python scripts/optimize_saves.py saves/account1.json saves/account2.json -o results.json
+    python scripts/optimize_saves.py saves/account1.json --jobs jobs.json --top-n 20 --workers 4
+    python scripts/optimize_saves.py saves/account1.json --engine scalar
+    python scripts/optimize_saves.py saves/account1.json --engine incremental
+    python scripts/optimize_saves.py saves/big_inventory.json --search-workers 0
+    python scripts/optimize_saves.py saves/account1.json --no-prune
+    python scripts/optimize_saves.py saves/account1.json --branch-bound
+
+搜索前默认做无损的候选盘支配剪枝（dominance_pruning.py，不改变 TopN），结果中的
+candidates.pruning 记录剪掉的盘数与组合数；--no-prune 关闭。--branch-bound 在搜索中按上界跳过
+不可能进入 TopN 的子树（结果不变），stats.boundSkipped 为跳过的组合数。
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import fast_evaluator
+import parallel_search
+import vector_evaluator
+from dominance_pruning import prune_dominated
+from fast_evaluator import IDX_TO_PROP, Precomputed
+from optimizer_context import (
+    DATA_DIR,
+    DEFAULT_MIN_DISC_LEVEL,
+    GameData,
+    build_request,
+    candidate_discs,
+    resolve_agent,
+)
+
+DEFAULT_TOP_N = 10
+
+# 评估引擎：scalar 为逐组合评估，incremental 为按层入栈的增量 DFS 评估，numpy 为按块向量化评估（需要 numpy）
+ENGINES = {
+    "scalar": fast_evaluator.search,
+    "incremental": functools.partial(fast_evaluator.search, incremental=True),
+    "numpy": vector_evaluator.search,
+}
+
+
+def default_engine() -> str:
+    return "numpy" if vector_evaluator.np is not None else "scalar"
+
+
+def run_search(pre, top_n: int, engine: str, search_workers: int, bound: bool = False) -> dict:
+    """单个任务的搜索（search_workers > 1 时按前缀任务分到进程池）"""
+    if search_workers > 1:
+        return parallel_search.search(pre, top_n=top_n, workers=search_workers, engine=engine, bound=bound)
+    return ENGINES[engine](pre, top_n=top_n, bound=bound)
+
+
+def load_save(path: Path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        save = json.load(f)
+    for key in ("characters", "discs", "teams"):
+        if not isinstance(save.get(key), list):
+            raise ValueError(f"{path} 不是有效的存档导出（缺少 {key}）")
+    return save
+
+
+def find_team(save: dict, ref: str) -> dict:
+    for team in save.get("teams") or []:
+        if str(team.get("id")) == str(ref) or team.get("name") == ref:
+            return team
+    raise ValueError(f"存档中没有队伍: {ref}")
+
+
+def find_character(save: dict, ref: str) -> dict:
+    for char in save.get("characters") or []:
+        if str(char.get("id")) == str(ref) or char.get("key") == ref:
+            return char
+    raise ValueError(f"存档中没有角色: {ref}")
+
+
+def team_battle(save: dict, team: dict) -> Optional[dict]:
+    return next((b for b in save.get("battles") or [] if str(b.get("teamId")) == str(team.get("id"))), None)
+
+
+def default_jobs(save_path: str, save: dict) -> List[dict]:
+    """存档中每个可优化的队伍一个任务"""
+    jobs = []
+    for team in save.get("teams") or []:
+        if not team.get("frontCharacterId"):
+            continue
+        battle = team_battle(save, team)
+        enemy_id = ((team.get("optimizationConfig") or {}).get("selectedEnemyId")
+                    or (battle or {}).get("enemyId"))
+        if enemy_id:
+            jobs.append({"save": save_path, "team": str(team["id"]), "enemyId": str(enemy_id)})
+    return jobs
+
+
+def resolve_job(save: dict, job: dict) -> Tuple[dict, Optional[dict], Optional[dict], str, List[str]]:
+    """(前台角色, 队伍, 战场, 敌人 ID, 技能列表)"""
+    team = find_team(save, job["team"]) if job.get("team") else None
+    if job.get("character"):
+        char = find_character(save, job["character"])
+    elif team:
+        char = find_character(save, team["frontCharacterId"])
+    else:
+        raise ValueError("任务需要 team 或 character")
+    if team is None:
+        team = next((t for t in save.get("teams") or [] if str(t.get("frontCharacterId")) == str(char.get("id"))), None)
+
+    battle = team_battle(save, team) if team else None
+    config = (team or {}).get("optimizationConfig") or {}
+    enemy_id = job.get("enemyId") or config.get("selectedEnemyId") or (battle or {}).get("enemyId")
+    if not enemy_id:
+        raise ValueError("未指定敌人（enemyId）")
+    skills = job.get("skills") or char.get("selectedSkillKeys") or config.get("selectedSkillKeys") or []
+    return char, team, battle, str(enemy_id), list(skills)
+
+
+def excluded_characters(save: dict, team_refs: List[str], front_id: str) -> List[str]:
+    """被排除队伍的成员（其装备的驱动盘不参与优化；前台角色自身除外）"""
+    members = set()
+    for ref in team_refs:
+        team = find_team(save, ref)
+        members |= {str(team.get(k)) for k in ("frontCharacterId", "backCharacter1Id", "backCharacter2Id") if team.get(k)}
+    members.discard(str(front_id))
+    return sorted(members)
+
+
+def job_request(game: GameData, save: dict, job: dict) -> Tuple[dict, Precomputed, int]:
+    """任务 -> (结果头部字段, Precomputed, 无法解析而跳过的盘数)"""
+    char, team, battle, enemy_id, skills = resolve_job(save, job)
+    if not skills:
+        raise ValueError("未选择技能（任务 skills / 角色 selectedSkillKeys / 队伍配置均为空）")
+    agent = resolve_agent(game, char)
+    target_set = str(char.get("targetFourPieceSetId") or "")
+    two_piece_sets = [str(s) for s in char.get("targetTwoPieceSetIds") or []]
+    discs, skipped = candidate_discs(
+        game, save, agent, target_set, two_piece_sets,
+        min_level=int(job.get("minDiscLevel", DEFAULT_MIN_DISC_LEVEL)),
+        excluded_characters=excluded_characters(save, job.get("excludeTeams") or [], char["id"]),
+    )
+    status = (battle or {}).get("enemyStatus") or {}
+    pre = build_request(
+        game, save, char,
+        team=team,
+        battle=battle,
+        enemy_id=enemy_id,
+        skill_keys=skills,
+        discs=discs,
+        target_set_id=target_set,
+        objective=char.get("objective") or "skill",
+        is_stunned=bool(status.get("isStunned")),
+        has_corruption_shield=bool(status.get("hasCorruptionShield")),
+    )
+    header = {
+        "character": {"id": char.get("id"), "key": char.get("key"), "gameId": agent.char_id},
+        "team": (team or {}).get("id"),
+        "enemyId": enemy_id,
+        "skills": skills,
+        "targetSetId": target_set or None,
+    }
+    return header, pre, skipped
+
+
+def run_job(game: GameData, save: dict, job: dict, top_n: int, engine: str = "scalar", search_workers: int = 1,
+            prune: bool = True, bound: bool = False) -> dict:
+    header, pre, skipped = job_request(game, save, job)
+    top_n = int(job.get("topN", top_n))
+    counts = [len(slot) for slot in pre.discs_by_slot]
+    combinations = 1
+    for count in counts:
+        combinations *= count
+    pruning = None
+    if prune:
+        pre, pruning = prune_dominated(pre, top_n)
+    result = run_search(pre, top_n, engine, search_workers, bound)
+
+    for build in result["builds"]:
+        build["finalStats"] = {IDX_TO_PROP[i]: v for i, v in enumerate(build["finalStats"]) if v != 0}
+    return {
+        **header,
+        "candidates": {"perSlot": counts, "combinations": combinations, "skippedDiscs": skipped, "pruning": pruning},
+        "builds": result["builds"],
+        "stats": result["stats"],
+    }
+
+
+def run_save_jobs(data_dir: Path, save_path: str, jobs: List[dict], top_n: int, engine: str,
+                  search_workers: int = 1, prune: bool = True, bound: bool = False) -> List[dict]:
+    """一个存档的全部任务（进程池中按存档分发）"""
+    game = GameData(data_dir)
+    save = load_save(Path(save_path))
+    results = []
+    for job in jobs:
+        entry = {"save": save_path, "job": job}
+        try:
+            entry.update(run_job(game, save, job, top_n, engine, search_workers, prune, bound))
+        except (ValueError, FileNotFoundError) as e:
+            entry["error"] = str(e)
+        results.append(entry)
+    return results
+
+
+def collect_jobs(save_paths: List[str], jobs_path: Optional[Path]) -> Dict[str, List[dict]]:
+    """按存档分组的任务"""
+    grouped: Dict[str, List[dict]] = {path: [] for path in save_paths}
+    if jobs_path is None:
+        for path in save_paths:
+            grouped[path] = default_jobs(path, load_save(Path(path)))
+        return grouped
+    with open(jobs_path, "r", encoding="utf-8") as f:
+        jobs = json.load(f)
+    for job in jobs:
+        path = job.get("save") or (save_paths[0] if len(save_paths) == 1 else None)
+        if path is None:
+            raise ValueError(f"任务未指定 save，且传入了多个存档: {job}")
+        grouped.setdefault(path, []).append({**job, "save": path})
+    return grouped
+
+
+def write_results(results: List[dict], output: Path) -> None:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(output.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "results": results}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, output)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="对导出的存档批量运行驱动盘优化")
+    parser.add_argument("saves", nargs="+", help="存档导出 JSON")
+    parser.add_argument("--jobs", type=Path, help="任务列表 JSON（默认：每个存档的全部队伍）")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N, help=f"每个任务保留的结果数（默认 {DEFAULT_TOP_N}）")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default=default_engine(),
+                        help="评估引擎（默认：已安装 numpy 时用 numpy，否则 scalar）")
+    parser.add_argument("--workers", type=int, default=1, help="并行处理存档的进程数")
+    parser.add_argument("--search-workers", type=int, default=1,
+                        help="单个任务内并行搜索的进程数（>1 时存档按顺序处理；0 为全部 CPU）")
+    parser.add_argument("--no-prune", action="store_true", help="关闭候选盘支配剪枝")
+    parser.add_argument("--branch-bound", action="store_true", help="按伤害上界跳过不可能进入 TopN 的子树")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="game-data 目录")
+    parser.add_argument("-o", "--output", type=Path, default=Path("optimization_results.json"), help="输出 JSON")
+    args = parser.parse_args()
+
+    if args.engine == "numpy" and vector_evaluator.np is None:
+        print("✗ --engine numpy 需要 numpy（pip install numpy）")
+        return 1
+
+    try:
+        grouped = collect_jobs(args.saves, args.jobs)
+    except (ValueError, OSError) as e:
+        print(f"✗ {e}")
+        return 1
+
+    if args.search_workers == 0:
+        args.search_workers = os.cpu_count() or 1
+
+    results: List[dict] = []
+    if args.workers > 1 and len(grouped) > 1 and args.search_workers <= 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(run_save_jobs, args.data_dir, path, jobs, args.top_n, args.engine, 1,
+                                   not args.no_prune, args.branch_bound)
+                       for path, jobs in grouped.items()]
+            for future in futures:
+                results += future.result()
+    else:
+        for path, jobs in grouped.items():
+            results += run_save_jobs(args.data_dir, path, jobs, args.top_n, args.engine, args.search_workers,
+                                     not args.no_prune, args.branch_bound)
+
+    failed = 0
+    for entry in results:
+        label = f"{entry['save']} · {entry['job'].get('team') or entry['job'].get('character')}"
+        if "error" in entry:
+            failed += 1
+            print(f"✗ {label}: {entry['error']}")
+            continue
+        best = entry["builds"][0]["damage"] if entry["builds"] else 0
+        stats = entry["stats"]
+        pruning = entry["candidates"]["pruning"]
+        pruned_note = f"（支配剪枝去掉 {pruning['removedDiscs']} 个盘，剩 {pruning['combinationsAfter']:,}）" if pruning else ""
+        bound_note = f"，定界跳过 {stats['boundSkipped']:,}" if "boundSkipped" in stats else ""
+        print(
+            f"✓ {label}: {entry['candidates']['combinations']:,} 个组合{pruned_note}，"
+            f"计算 {stats['totalProcessed']:,}，剪枝 {stats['prunedCount']:,}{bound_note}，"
+            f"{stats['timeMs'] / 1000:.1f}s，最高 {best:,.0f}"
+        )
+
+    write_results(results, args.output)
+    print(f"✓ {len(results) - failed}/{len(results)} 个任务完成 -> {args.output}")
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
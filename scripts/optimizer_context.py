@@ -0,0 +1,800 @@
+#!/usr/bin/env python3
+"""
+优化请求构建（Python 版）
+
+对应 web/optimizer/src/optimizer/services/optimizer-context.ts 的 buildFastRequest，以及它在
+浏览器里依赖的模型层（agent.ts / wengine.ts / drive-disk.ts / enemy.ts / skill-converter.ts）
+和 BattleService.getOptimizerEvaluatorBuffs 的 Buff 选择口径：
+
+- 输入：存档导出（save-data-zod.ts 的 SaveDataZod）+ public/game-data 中由脚本生成的数据
+  （agent_snapshots、set_bonus_table、weapon_talents 等）
+- 输出：fast_evaluator.Precomputed，可直接交给 fast_evaluator.search
+
+与 UI 的差异：
+- 不做 OptimizerView 的有效词条支配剪枝（有损的启发式）；无损的支配剪枝见 dominance_pruning.py
+- 不处理驱动盘锁定位置（pinnedSlots），与 Worker 快速路径一致
+"""
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from build_agent_snapshots import SNAPSHOT_NAME, PropResolver, snapshot_stats
+from build_set_bonus_table import TABLE_NAME as SET_TABLE_NAME, set_bonus_row, set_rows
+from build_weapon_talent_table import TABLE_NAME as WEAPON_TABLE_NAME, expand_weapon
+from fast_evaluator import (
+    ELEMENT_KEYS,
+    ConversionBuff,
+    DiscData,
+    FixedMultipliers,
+    Precomputed,
+    SkillParams,
+    zeros,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = PROJECT_ROOT / "web" / "optimizer" / "public" / "game-data"
+
+# 有效词条主词条得分（OptimizerView effectiveStatPruning.mainStatScore）
+MAIN_STAT_SCORE = 10
+DEFAULT_MIN_DISC_LEVEL = 15
+
+WEAPON_TYPE_RUPTURE = 6
+
+# 异常期望窗口（anomaly-constants.ts ANOMALY_EXPECT_WINDOW_SEC / ANOMALY_DEFAULT_DURATION）
+ANOMALY_EXPECT_WINDOW_SEC = 3
+ANOMALY_DEFAULT_DURATION = 10
+ANOMALY_DAMAGE_PARAMS = {
+    "fire": ("tick", 0.5, 0.5),
+    "electric": ("tick", 1.25, 1),
+    "ether": ("tick", 0.625, 0.5),
+    "ice": ("single", 5.0, 0),
+    "physical": ("single", 7.13, 0),
+}
+# 紊乱：450% + floor(T / interval) * tickRatio（烈霜：600% + floor(T) * 75%）
+DISORDER_PARAMS = {
+    "fire": (4.5, 0.5, 0.5),
+    "electric": (4.5, 1, 1.25),
+    "ether": (4.5, 0.5, 0.625),
+    "ice": (4.5, 1, 0.075),
+    "physical": (4.5, 1, 0.075),
+    "lieshuang": (6.0, 1, 0.75),
+}
+DEFAULT_ANOMALY_THRESHOLDS = {"physical": 720.0, "fire": 600.0, "ice": 600.0, "electric": 600.0, "ether": 600.0}
+
+# 特殊异常（agent.ts SPECIAL_ANOMALY_AGENTS）与特例规则（special-rules.ts）
+SPECIAL_ANOMALY_AGENTS = {"1091": {"element": "lieshuang", "ratio": 15.0}}
+AGENT_SPECIAL_RULES = {"1431": {"forceStunned": True, "stunVulnerabilityCap": 2.1}}  # 叶瞬光
+
+# 技能分类 -> (技能类型标签, ZOD 技能等级字段)
+SKILL_CATEGORIES = {
+    "Basic": ("normal", "basic"),
+    "Dodge": ("dodge", "dodge"),
+    "Special": ("special", "special"),
+    "Chain": ("chain", "chain"),
+    "Assist": ("assist", "assist"),
+}
+SKILL_TAGS = {
+    "normal": 1, "special": 2, "chain": 3, "ultimate": 4, "dash": 5,
+    "dodge": 6, "assist": 7, "enhanced": 8, "additional": 9,
+}
+SKILL_PARAM_PATTERN = re.compile(r"\{Skill:(\d+), Prop:(\d+)\}")
+
+# 驱动盘数值（drive-disk.ts DriveDiskStats）
+MAIN_STAT_MAX_VALUES = {
+    "S": {
+        "atk_": 0.30, "hp_": 0.30, "def_": 0.48, "crit_": 0.24, "crit_dmg_": 0.48, "pen_": 0.24,
+        "atk": 316, "hp": 2200, "def": 184, "anomProf": 92,
+        "fire_dmg_": 0.30, "ice_dmg_": 0.30, "electric_dmg_": 0.30, "physical_dmg_": 0.30, "ether_dmg_": 0.30,
+        "anomMas_": 0.30, "impact_": 0.18, "enerRegen_": 0.60, "energyRegen_": 0.60, "impact": 100,
+    },
+    "A": {
+        "atk_": 0.20, "hp_": 0.20, "def_": 0.32, "crit_": 0.16, "crit_dmg_": 0.32, "pen_": 0.16,
+        "atk": 212, "hp": 1468, "def": 124, "anomProf": 60,
+        "fire_dmg_": 0.20, "ice_dmg_": 0.20, "electric_dmg_": 0.20, "physical_dmg_": 0.20, "ether_dmg_": 0.20,
+        "anomMas_": 0.20, "impact_": 0.12, "enerRegen_": 0.40, "energyRegen_": 0.40, "impact": 66,
+    },
+    "B": {
+        "atk_": 0.10, "hp_": 0.10, "def_": 0.16, "crit_": 0.08, "crit_dmg_": 0.16, "pen_": 0.08,
+        "atk": 104, "hp": 734, "def": 60, "anomProf": 32,
+        "fire_dmg_": 0.10, "ice_dmg_": 0.10, "electric_dmg_": 0.10, "physical_dmg_": 0.10, "ether_dmg_": 0.10,
+        "anomMas_": 0.10, "impact_": 0.06, "enerRegen_": 0.20, "energyRegen_": 0.20, "impact": 33,
+    },
+}
+SUB_STAT_BASE_VALUES = {
+    "S": {"atk": 19, "hp": 112, "def": 15, "pen": 9, "anomProf": 9,
+          "atk_": 0.03, "hp_": 0.03, "def_": 0.048, "crit_": 0.024, "crit_dmg_": 0.048},
+    "A": {"atk": 15, "hp": 79, "def": 10, "pen": 6, "anomProf": 6,
+          "atk_": 0.02, "hp_": 0.02, "def_": 0.032, "crit_": 0.016, "crit_dmg_": 0.032},
+    "B": {"atk": 7, "hp": 39, "def": 5, "pen": 3, "anomProf": 3,
+          "atk_": 0.01, "hp_": 0.01, "def_": 0.016, "crit_": 0.008, "crit_dmg_": 0.016},
+}
+MAX_LEVELS = {"S": 15, "A": 12, "B": 9}
+
+# ZOD 词条键 -> PropertyType 成员名（drive-disk.ts parsePropertyType）
+DISC_KEY_TO_PROP = {
+    "HP_": "HP_", "ATK_": "ATK_", "DEF_": "DEF_", "CRIT_": "CRIT_", "CRIT_DMG_": "CRIT_DMG_", "PEN_": "PEN_",
+    "ANOMALY_PROFICIENCY": "ANOM_PROF", "ENERGY_REGEN": "ENER_REGEN", "ENERGY_REGEN_": "ENER_REGEN_",
+    "ANOMALY_MASTERY": "ANOM_MAS", "ANOMALY_MASTERY_": "ANOM_MAS_",
+    "hp": "HP", "hp_": "HP_", "atk": "ATK", "atk_": "ATK_", "def": "DEF", "def_": "DEF_",
+    "pen": "PEN", "pen_": "PEN_", "crit_": "CRIT_", "crit_dmg_": "CRIT_DMG_",
+    "energyregen": "ENER_REGEN", "energyregen_": "ENER_REGEN_", "enerregen": "ENER_REGEN", "enerregen_": "ENER_REGEN_",
+    "anomprof": "ANOM_PROF", "anomaly_proficiency": "ANOM_PROF", "anommas": "ANOM_MAS", "anommas_": "ANOM_MAS_",
+    "impact": "IMPACT", "impact_": "IMPACT_",
+    "energyRegen": "ENER_REGEN", "energyRegen_": "ENER_REGEN_", "enerRegen": "ENER_REGEN", "enerRegen_": "ENER_REGEN_",
+    "anomProf": "ANOM_PROF", "anomMas": "ANOM_MAS", "anomMas_": "ANOM_MAS_",
+}
+for _element in ELEMENT_KEYS.values():
+    DISC_KEY_TO_PROP[f"{_element.upper()}_DMG_"] = DISC_KEY_TO_PROP[f"{_element}_dmg_"] = f"{_element.upper()}_DMG_"
+
+# PropertyType 成员名 -> 驱动盘数值表的键（drive-disk.ts propertyTypeToKey）
+PROP_TO_DISC_KEY = {
+    "HP": "hp", "HP_": "hp_", "ATK": "atk", "ATK_": "atk_", "DEF": "def", "DEF_": "def_",
+    "PEN": "pen", "PEN_": "pen_", "CRIT_": "crit_", "CRIT_DMG_": "crit_dmg_",
+    "ANOM_PROF": "anomProf", "ANOM_MAS_": "anomMas_", "IMPACT": "impact", "IMPACT_": "impact_",
+    "ENER_REGEN": "energyRegen", "ENER_REGEN_": "energyRegen_",
+}
+for _element in ELEMENT_KEYS.values():
+    PROP_TO_DISC_KEY[f"{_element.upper()}_DMG_"] = f"{_element}_dmg_"
+
+# 音擎副属性（wengine.ts ensureDetailsLoaded）：名称关键字 -> (百分比类型, 固定值类型)
+WEAPON_RAND_STATS = [
+    ("攻击力", "ATK_", "ATK"),
+    ("生命值", "HP_", "HP"),
+    ("防御力", "DEF_", "DEF"),
+    ("暴击率", "CRIT_", "CRIT_"),
+    ("暴击伤害", "CRIT_DMG_", "CRIT_DMG_"),
+    ("穿透", "PEN_", "PEN_"),
+    ("异常精通", "ANOM_PROF", "ANOM_PROF"),
+    ("能量自动回复", "ENER_REGEN_", "ENER_REGEN_"),
+]
+WEAPON_PERCENT_STATS = {"CRIT_", "CRIT_DMG_", "ATK_", "HP_", "DEF_", "PEN_", "SHIELD_", "ENER_REGEN_"}
+
+# 有效词条：固定值 -> 百分比（主词条 / 副词条按 1/3 计分）
+FLAT_TO_PERCENT = {"ATK": "ATK_", "HP": "HP_", "DEF": "DEF_", "PEN": "PEN_"}
+
+# 不参与优化目标的驱动盘词条（fillArrayFromDisc）
+IGNORED_DISC_PROPS = {"DEF", "DEF_"}
+
+# 快照1（toCombatStats）：三元组 -> 面板
+COMBAT_TRIPLETS = {"ATK_BASE": ("ATK_", "ATK"), "HP_BASE": ("HP_", "HP"), "DEF_BASE": ("DEF_", "DEF")}
+COMBAT_TRIPLET_PROPS = {"ATK_", "ATK", "HP_", "HP", "DEF_", "DEF", "IMPACT_"}
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r"[\s']", "", name).lower()
+
+
+class GameData:
+    """game-data 目录的惰性加载视图（JSON 与编译好的表只读一次）"""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = data_dir
+        self.resolver = PropResolver()
+        self._json: Dict[str, object] = {}
+        self._snapshots: Optional[Tuple[dict, bytes]] = None
+        self._set_table: Optional[Tuple[dict, bytes]] = None
+
+    def json(self, rel_path: str, default=None):
+        if rel_path not in self._json:
+            path = self.data_dir / rel_path
+            if not path.exists():
+                if default is not None:
+                    return default
+                raise FileNotFoundError(f"缺少游戏数据: {path}")
+            with open(path, "r", encoding="utf-8") as f:
+                self._json[rel_path] = json.load(f)
+        return self._json[rel_path]
+
+    @property
+    def snapshots(self) -> Tuple[dict, bytes]:
+        if self._snapshots is None:
+            manifest = self.json(f"{SNAPSHOT_NAME}.json")
+            self._snapshots = (manifest, (self.data_dir / manifest["binary"]).read_bytes())
+        return self._snapshots
+
+    @property
+    def set_table(self) -> Optional[Tuple[dict, bytes]]:
+        """套装加成表（不存在时为 None，按 equipment_data_buff 现算）"""
+        if self._set_table is None and (self.data_dir / f"{SET_TABLE_NAME}.json").exists():
+            manifest = self.json(f"{SET_TABLE_NAME}.json")
+            self._set_table = (manifest, (self.data_dir / manifest["binary"]).read_bytes())
+        return self._set_table
+
+    def set_idx_by_id(self) -> Dict[str, int]:
+        table = self.set_table
+        return {entry["id"]: entry["setIdx"] for entry in table[0]["sets"]} if table else {}
+
+    def set_bonus(self, set_id: str, row: str) -> List[float]:
+        """套装的 twoPiece / fourPiece 行（优先取套装加成表）"""
+        table = self.set_table
+        if table:
+            set_idx = self.set_idx_by_id().get(set_id)
+            if set_idx is not None:
+                return list(set_bonus_row(table[0], table[1], set_idx, row))
+        data = self.json(f"equipment_data_buff/{set_id}.json", default={})
+        rows = set_rows(data, self.resolver)
+        return rows[0] if row == "twoPiece" else rows[1]
+
+    def weapon_buffs(self, weapon_id: str, refinement: int) -> List[dict]:
+        """某个精炼等级的音擎天赋 Buff（优先从 weapon_talents.json 还原）"""
+        table = self.json(WEAPON_TABLE_NAME, default={})
+        data = expand_weapon(table, weapon_id) if table.get("weapons", {}).get(weapon_id) else None
+        if data is None:
+            data = self.json(f"weapon_data_buff/{weapon_id}.json", default={})
+        talents = data.get("talents") or []
+        for talent in talents:
+            if talent.get("level") == refinement:
+                return talent.get("buffs") or []
+        return []
+
+    def prop_array(self, stats: Dict[str, float]) -> List[float]:
+        arr = zeros()
+        for name, value in stats.items():
+            idx = self.resolver.index(name)
+            if idx is not None and isinstance(value, (int, float)):
+                arr[idx] += value
+        return arr
+
+
+# ----------------------------------------------------------------------
+# 存档实体解析
+# ----------------------------------------------------------------------
+
+@dataclass
+class AgentInfo:
+    char_id: str
+    zod: dict
+    entry: dict
+    weapon_type: int
+    element: int
+    name_cn: str
+
+
+@dataclass
+class DiscInfo:
+    id: str
+    set_id: str
+    slot: int
+    level: int
+    main_stat: str
+    # PropertyType 成员名 -> 数值（主词条 + 副词条）
+    stats: Dict[str, float] = field(default_factory=dict)
+    location: str = ""
+
+
+def resolve_agent(game: GameData, zod_char: dict) -> AgentInfo:
+    key = str(zod_char.get("key", "")).strip().lower()
+    for char_id, entry in game.json("character.json").items():
+        names = {str(entry.get("EN", "")).strip().lower(), str(entry.get("code", "")).strip().lower()}
+        if key in names:
+            return AgentInfo(
+                char_id=str(char_id),
+                zod=zod_char,
+                entry=entry,
+                weapon_type=int(entry.get("type") or 0),
+                element=int(entry.get("element") or 200),
+                name_cn=entry.get("CHS", ""),
+            )
+    raise ValueError(f"未找到角色游戏数据: {zod_char.get('key')}")
+
+
+def resolve_weapon_id(game: GameData, key: str) -> str:
+    normalized = normalize_name(key)
+    for weapon_id, entry in game.json("weapon.json").items():
+        name = entry.get("EN") or ""
+        if name == key or normalize_name(name) == normalized:
+            return str(weapon_id)
+    raise ValueError(f"未找到音擎游戏数据: {key}")
+
+
+def resolve_set_id(game: GameData, set_key: str) -> str:
+    normalized = normalize_name(set_key)
+    for set_id, entry in game.json("equipment.json").items():
+        name = (entry.get("EN") or {}).get("name") or ""
+        if name and (name == set_key or normalize_name(name) == normalized):
+            return str(set_id)
+    raise ValueError(f"未找到驱动盘套装游戏数据: {set_key}")
+
+
+def parse_disc_prop(key: str, resolver: PropResolver) -> str:
+    """ZOD 词条键 -> PropertyType 成员名（未知键按 HP 处理，与 parsePropertyType 一致）"""
+    if key in DISC_KEY_TO_PROP:
+        return DISC_KEY_TO_PROP[key]
+    return key if key in resolver.enum else "HP"
+
+
+def parse_disc(game: GameData, zod_disc: dict) -> DiscInfo:
+    """ZOD 驱动盘 -> 主副词条数值（drive-disk.ts fromZodData + getStats）"""
+    substats = zod_disc.get("substats") or []
+    level = int(zod_disc.get("level") or 0)
+    total_lines = sum(int(s.get("upgrades") or 0) for s in substats)
+    if substats and total_lines >= 4 and 0 < total_lines - 4 <= 5:
+        level = max(level, (total_lines - 4) * 3)
+
+    slot = int(zod_disc.get("slotKey") or 0)
+    if not 1 <= slot <= 6:
+        raise ValueError(f"无效的驱动盘位置: {zod_disc.get('slotKey')}")
+    rarity = str(zod_disc.get("rarity", "")).upper()
+    if rarity not in MAX_LEVELS:
+        rarity = "B"
+
+    main_stat = parse_disc_prop(str(zod_disc.get("mainStatKey", "")), game.resolver)
+    stats: Dict[str, float] = {}
+    main_key = PROP_TO_DISC_KEY.get(main_stat)
+    if main_key in MAIN_STAT_MAX_VALUES[rarity]:
+        stats[main_stat] = MAIN_STAT_MAX_VALUES[rarity][main_key] * (0.25 + 0.75 * level / MAX_LEVELS[rarity])
+    for substat in substats:
+        prop = parse_disc_prop(str(substat.get("key", "")), game.resolver)
+        sub_key = PROP_TO_DISC_KEY.get(prop)
+        if sub_key in SUB_STAT_BASE_VALUES[rarity]:
+            stats[prop] = stats.get(prop, 0.0) + SUB_STAT_BASE_VALUES[rarity][sub_key] * int(substat.get("upgrades") or 0)
+
+    return DiscInfo(
+        id=str(zod_disc.get("id")),
+        set_id=resolve_set_id(game, str(zod_disc.get("setKey", ""))),
+        slot=slot,
+        level=level,
+        main_stat=main_stat,
+        stats=stats,
+        location=str(zod_disc.get("location") or ""),
+    )
+
+
+def agent_base_stats(game: GameData, agent: AgentInfo) -> List[float]:
+    """角色局外白值（agent_snapshots；与 getCharacterBaseStats().out_of_combat 一致）"""
+    manifest, binary = game.snapshots
+    if agent.char_id not in manifest["characters"]:
+        raise ValueError(f"角色快照中没有 {agent.char_id}，请先运行 build_agent_snapshots.py")
+    zod = agent.zod
+    return snapshot_stats(
+        manifest, binary, agent.char_id,
+        int(zod.get("level") or 1), int(zod.get("promotion") or 0), int(zod.get("core") or 0),
+    )
+
+
+def weapon_base_stats(game: GameData, zod_weapon: Optional[dict]) -> Tuple[List[float], Optional[str]]:
+    """音擎局外属性（基础攻击力 + 副属性），以及音擎游戏 ID"""
+    arr = zeros()
+    if not zod_weapon:
+        return arr, None
+    weapon_id = resolve_weapon_id(game, str(zod_weapon.get("key", "")))
+    detail = game.json(f"weapon/{weapon_id}.json", default={})
+    level = int(zod_weapon.get("level") or 1)
+    promotion = int(zod_weapon.get("promotion") or zod_weapon.get("phase") or 0)
+
+    base = (detail.get("BaseProperty") or {}).get("Value") or 0
+    if base > 0:
+        rate = ((detail.get("Level") or {}).get(str(level)) or {}).get("Rate") or 0
+        arr[game.resolver.index("ATK_BASE")] += base * (1 + rate / 10000 + 0.8922 * promotion)
+
+    rand = detail.get("RandProperty") or {}
+    rand_name = rand.get("Name") or rand.get("Name2") or ""
+    is_percent = "%" in (rand.get("Format") or "")
+    rand_type = next(
+        (percent if is_percent else flat for keyword, percent, flat in WEAPON_RAND_STATS if keyword in rand_name),
+        None,
+    )
+    value = rand.get("Value") or 0
+    if rand_type and value > 0:
+        value = value / 10000 if rand_type in WEAPON_PERCENT_STATS else value
+        arr[game.resolver.index(rand_type)] += value * (1 + 0.3 * promotion)
+    return arr, weapon_id
+
+
+# ----------------------------------------------------------------------
+# Buff 选择（BattleService.getOptimizerEvaluatorBuffs）
+# ----------------------------------------------------------------------
+
+def buff_target(buff: dict, flag: str) -> bool:
+    defaults = {"target_self": True, "target_enemy": False, "target_teammate": False}
+    return bool((buff.get("target") or {}).get(flag, defaults[flag]))
+
+
+def character_buffs(game: GameData, agent: AgentInfo) -> List[dict]:
+    """角色 Buff（按影画等级过滤天赋）"""
+    mindscape = int(agent.zod.get("mindscape") or 0)
+    buffs = []
+    for buff in game.json(f"character_data_buff/{agent.char_id}.json", default=[]):
+        parts = str(buff.get("id", "")).split("_")
+        if "_talent_" in str(buff.get("id", "")) and len(parts) > 2 and parts[2].isdigit() and int(parts[2]) > mindscape:
+            continue
+        buffs.append(buff)
+    return buffs
+
+
+def agent_buffs(game: GameData, agent: AgentInfo, zod_weapon: Optional[dict]) -> List[dict]:
+    """角色 + 装备音擎当前精炼的 Buff（不含驱动盘 4 件套）"""
+    buffs = list(character_buffs(game, agent))
+    if zod_weapon:
+        weapon_id = resolve_weapon_id(game, str(zod_weapon.get("key", "")))
+        buffs += game.weapon_buffs(weapon_id, int(zod_weapon.get("modification") or 1))
+    return [b for b in buffs if b.get("source") != "DRIVE_DISK_4PC"]
+
+
+def combat_snapshot(game: GameData, stats: Sequence[float]) -> Dict[str, float]:
+    """局外属性 -> 快照1（PropertyCollection.toCombatStats），按属性名索引"""
+    idx = game.resolver.prop_idx
+    result = {name: stats[i] for name, i in idx.items() if name not in COMBAT_TRIPLET_PROPS}
+    for base, (percent, flat) in COMBAT_TRIPLETS.items():
+        result[base] = stats[idx[base]] * (1 + stats[idx[percent]]) + stats[idx[flat]]
+    result["IMPACT"] = stats[idx["IMPACT"]] * (1 + stats[idx["IMPACT_"]])
+    return result
+
+
+def teammate_snapshot(game: GameData, save: dict, agent: AgentInfo) -> Dict[str, float]:
+    """队友快照1：白值 + 音擎 + 已装备驱动盘 + 生效的 2 件套"""
+    stats = agent_base_stats(game, agent)
+    weapon_stats, _ = weapon_base_stats(game, equipped_weapon(save, agent.zod))
+    stats = [a + b for a, b in zip(stats, weapon_stats)]
+    set_counts: Dict[str, int] = {}
+    discs_by_id = {str(d.get("id")): d for d in save.get("discs") or []}
+    for disc_id in (agent.zod.get("equippedDiscs") or {}).values():
+        zod_disc = discs_by_id.get(str(disc_id))
+        if not zod_disc:
+            continue
+        disc = parse_disc(game, zod_disc)
+        for name, value in disc.stats.items():
+            idx = game.resolver.index(name)
+            if idx is not None:
+                stats[idx] += value
+        set_counts[disc.set_id] = set_counts.get(disc.set_id, 0) + 1
+    for set_id, count in set_counts.items():
+        if count >= 2:
+            stats = [a + b for a, b in zip(stats, game.set_bonus(set_id, "twoPiece"))]
+    return combat_snapshot(game, stats)
+
+
+def settle_teammate_conversion(buff: dict, snapshot: Dict[str, float]) -> Optional[dict]:
+    """队友转换类 Buff 按队友快照1结算为普通 Buff（产物为 0 时丢弃）"""
+    conv = buff["conversion"]
+    source = snapshot.get(conv.get("from_property"), 0.0)
+    converted = max(0.0, source - (conv.get("from_property_threshold") or 0)) * conv.get("conversion_ratio", 0)
+    if conv.get("max_value") is not None:
+        converted = min(converted, conv["max_value"])
+    if not converted:
+        return None
+    in_combat = dict(buff.get("in_combat_stats") or {})
+    in_combat[conv["to_property"]] = in_combat.get(conv["to_property"], 0) + converted
+    return {**buff, "in_combat_stats": in_combat, "conversion": None, "name": f"{buff.get('name')}（队友结算）"}
+
+
+def select_buffs(game: GameData, save: dict, front: AgentInfo, backs: Sequence[AgentInfo],
+                 team: Optional[dict], battle: Optional[dict]) -> List[dict]:
+    """优化器使用的 Buff 列表：前台自身 + 队友（转换类已结算）+ 自选 Buff"""
+    active = (battle or {}).get("activeBuffs") or {}
+
+    def is_active(buff: dict) -> bool:
+        return active.get(buff.get("id"), True) is not False
+
+    buffs = []
+    for buff in agent_buffs(game, front, equipped_weapon(save, front.zod)):
+        if not (buff_target(buff, "target_self") or buff_target(buff, "target_enemy")) or not is_active(buff):
+            continue
+        conv = buff.get("conversion")
+        if front.weapon_type == WEAPON_TYPE_RUPTURE and conv and conv.get("to_property") == "SHEER_FORCE":
+            continue
+        buffs.append(buff)
+
+    for custom in (team or {}).get("customBuffs") or []:
+        if custom.get("isActive"):
+            buffs.append({
+                "id": custom.get("id"),
+                "name": custom.get("name"),
+                "source": "MANUAL",
+                "in_combat_stats": custom.get("in_combat_stats") or {},
+                "max_stacks": 1,
+                "stack_mode": "linear",
+            })
+
+    for back in backs:
+        snapshot = None
+        for buff in agent_buffs(game, back, equipped_weapon(save, back.zod)):
+            if not (buff_target(buff, "target_teammate") or buff_target(buff, "target_enemy")) or not is_active(buff):
+                continue
+            if buff.get("conversion"):
+                snapshot = snapshot or teammate_snapshot(game, save, back)
+                buff = settle_teammate_conversion(buff, snapshot)
+                if buff is None:
+                    continue
+            buffs.append(buff)
+    return buffs
+
+
+# ----------------------------------------------------------------------
+# 技能 / 敌人
+# ----------------------------------------------------------------------
+
+def agent_skills(game: GameData, agent: AgentInfo) -> Dict[str, dict]:
+    """技能名 -> {ratio, anomalyBuildup, type}（skill-converter.ts；同名技能取第一个）"""
+    detail = game.json(f"character/{agent.char_id}.json")
+    skills: Dict[str, dict] = {}
+    for category, (skill_type, level_key) in SKILL_CATEGORIES.items():
+        level = int(agent.zod.get(level_key) or 1)
+        for item in ((detail.get("Skill") or {}).get(category) or {}).get("Description") or []:
+            params = item.get("Param")
+            if not isinstance(params, list) or not params or item.get("Name") in skills:
+                continue
+            ratio = buildup = 0.0
+            for param in params:
+                match = SKILL_PARAM_PATTERN.search(param.get("Desc") or "")
+                if not match or match.group(2) != "1001":
+                    continue
+                data = (param.get("Param") or {}).get(match.group(1)) or {}
+                ratio += (data.get("DamagePercentage", 0) + (level - 1) * data.get("DamagePercentageGrowth", 0)) / 10000
+                buildup += data.get("AttributeInfliction", 0) / 100
+            skills[item["Name"]] = {"ratio": ratio, "anomalyBuildup": buildup, "type": skill_type}
+    return skills
+
+
+def skill_params(game: GameData, agent: AgentInfo, skill_keys: Sequence[str]) -> List[SkillParams]:
+    """选中的技能（重复选择按次数累加倍率与积蓄）"""
+    available = agent_skills(game, agent)
+    counts: Dict[str, int] = {}
+    for key in skill_keys:
+        if key not in available:
+            raise ValueError(f"{agent.entry.get('CHS') or agent.char_id} 没有技能: {key}")
+        counts[key] = counts.get(key, 0) + 1
+    is_penetration = agent.weapon_type == WEAPON_TYPE_RUPTURE
+    return [
+        SkillParams(
+            ratio=(available[key]["ratio"] or 1) * count,
+            element=agent.element,
+            anomaly_buildup=available[key]["anomalyBuildup"] * count,
+            tags=[SKILL_TAGS[available[key]["type"]]],
+            is_penetration=is_penetration,
+            is_mingpo=is_penetration,
+        )
+        for key, count in counts.items()
+    ]
+
+
+def enemy_profile(game: GameData, enemy_id: str) -> dict:
+    """敌人防御 / 抗性 / 异常阈值 / 失衡易伤（enemy.ts）"""
+    enemy = game.json("enemy.json").get(str(enemy_id))
+    if enemy is None:
+        raise ValueError(f"未找到敌人: {enemy_id}")
+    bars = game.json("anomaly_bars.json", default={})
+    thresholds = {}
+    for element in ELEMENT_KEYS.values():
+        bar = bars.get(str(enemy.get(f"{element}_anomaly_bar")))
+        requirements = (bar or {}).get("buildup_requirements") or []
+        thresholds[element] = requirements[0] if requirements else DEFAULT_ANOMALY_THRESHOLDS[element]
+    defense = enemy.get("level_60_plus_defense")
+    return {
+        "id": str(enemy_id),
+        "name": enemy.get("CHS") or enemy.get("full_name") or enemy.get("EN"),
+        "defense": defense if defense is not None else enemy.get("defense", 0),
+        "stunVulnerability": enemy.get("stun_vulnerability_multiplier", 0.5),
+        "resistances": {el: enemy.get(f"{el}_dmg_resistance", 0) for el in ELEMENT_KEYS.values()},
+        "anomalyThresholds": thresholds,
+    }
+
+
+def stun_vulnerability(agent: AgentInfo, enemy: dict, is_stunned: bool) -> Tuple[bool, float]:
+    """(是否失衡, 失衡易伤增量)；特例角色强制失衡并限制上限"""
+    rule = AGENT_SPECIAL_RULES.get(agent.char_id) or {}
+    mult = enemy["stunVulnerability"]
+    if rule.get("forceStunned"):
+        is_stunned = True
+        value = max(1.0, 1 + mult)
+        if rule.get("stunVulnerabilityCap") is not None:
+            value = min(rule["stunVulnerabilityCap"], value)
+    elif not is_stunned:
+        return False, 0.0
+    else:
+        value = max(1.0, 1 + mult)
+    vulnerability = min(1.1, max(0.0, value - 1))
+    return True, vulnerability if vulnerability != 0 else mult
+
+
+def anomaly_ratios(element: int, special: Optional[dict]) -> Tuple[float, float]:
+    """(异常总倍率, 紊乱总倍率)，窗口 T = ANOMALY_EXPECT_WINDOW_SEC"""
+    key = ELEMENT_KEYS.get(element, "physical")
+    kind, ratio, interval = ANOMALY_DAMAGE_PARAMS[key]
+    anomaly = ratio * (ANOMALY_EXPECT_WINDOW_SEC // interval) if kind == "tick" else ratio
+    disorder_key = "lieshuang" if special and special.get("element") == "lieshuang" else key
+    base, interval, step = DISORDER_PARAMS[disorder_key]
+    remaining = max(0, ANOMALY_DEFAULT_DURATION - ANOMALY_EXPECT_WINDOW_SEC)
+    return anomaly, base + (remaining // interval) * step
+
+
+# ----------------------------------------------------------------------
+# 请求构建
+# ----------------------------------------------------------------------
+
+def equipped_weapon(save: dict, zod_char: dict) -> Optional[dict]:
+    weapon_id = zod_char.get("equippedWengine")
+    return next((w for w in save.get("wengines") or [] if str(w.get("id")) == str(weapon_id)), None) if weapon_id else None
+
+
+def prop_name(resolver: PropResolver, value) -> Optional[str]:
+    """属性名或 PropertyType 枚举值 -> 成员名"""
+    if isinstance(value, str) and not value.isdigit():
+        return value
+    return next((name for name, enum_value in resolver.enum.items() if enum_value == int(value)), None)
+
+
+def effective_stats(game: GameData, agent: AgentInfo) -> List[str]:
+    names = [n for n in (prop_name(game.resolver, v) for v in agent.zod.get("effectiveStats") or []) if n in game.resolver.enum]
+    if names:
+        return names
+    element_dmg = f"{ELEMENT_KEYS.get(agent.element, 'physical').upper()}_DMG_"
+    if agent.char_id == "1091":
+        return ["ATK_", "CRIT_", "CRIT_DMG_", "ANOM_PROF", "ANOM_MAS_", "PEN_", "ICE_DMG_"]
+    return {
+        1: ["ATK_", "CRIT_", "CRIT_DMG_", "PEN_", element_dmg],
+        2: ["CRIT_", "IMPACT_", "ATK_"],
+        3: ["ATK_", "ANOM_PROF", "ANOM_MAS_", "PEN_", element_dmg],
+        4: ["ATK_", "HP_", "ENER_REGEN_"],
+        5: ["HP_", "ATK_", "ENER_REGEN_"],
+        6: ["HP_", "CRIT_", "CRIT_DMG_", element_dmg],
+    }.get(agent.weapon_type, ["ATK_", "CRIT_", "CRIT_DMG_", element_dmg])
+
+
+def stat_score(stat: str, effective: Sequence[str], is_main: bool) -> float:
+    if stat in effective:
+        return MAIN_STAT_SCORE if is_main else 1
+    percent = FLAT_TO_PERCENT.get(stat)
+    if percent and percent in effective:
+        return MAIN_STAT_SCORE / 3 if is_main else 1 / 3
+    return 0
+
+
+def candidate_discs(game: GameData, save: dict, agent: AgentInfo, target_set_id: str,
+                    two_piece_set_ids: Sequence[str], min_level: int = DEFAULT_MIN_DISC_LEVEL,
+                    excluded_characters: Iterable[str] = ()) -> Tuple[List[DiscInfo], int]:
+    """候选驱动盘（等级 / 排除角色 / 套装 / 主词条筛选），以及无法解析而跳过的数量"""
+    excluded = {str(c) for c in excluded_characters}
+    allowed_sets = ({target_set_id} if target_set_id else set()) | set(two_piece_set_ids)
+    filters = {
+        int(slot): {prop_name(game.resolver, v) for v in values}
+        for slot, values in (agent.zod.get("mainStatFilters") or {}).items()
+        if values
+    }
+    discs, skipped = [], 0
+    for zod_disc in save.get("discs") or []:
+        try:
+            disc = parse_disc(game, zod_disc)
+        except ValueError:
+            skipped += 1
+            continue
+        if disc.level < min_level or disc.location in excluded:
+            continue
+        if allowed_sets and disc.set_id not in allowed_sets:
+            continue
+        if disc.slot in filters and disc.main_stat not in filters[disc.slot]:
+            continue
+        discs.append(disc)
+    return discs, skipped
+
+
+def build_request(game: GameData, save: dict, front_char: dict, *, team: Optional[dict] = None,
+                  battle: Optional[dict] = None, enemy_id: str, skill_keys: Sequence[str],
+                  discs: Sequence[DiscInfo], target_set_id: str = "", objective: str = "damage",
+                  is_stunned: bool = False, has_corruption_shield: bool = False) -> Precomputed:
+    """构建一次优化的 Precomputed（对应 buildFastRequest）"""
+    resolver = game.resolver
+    chars_by_id = {str(c.get("id")): c for c in save.get("characters") or []}
+    front = resolve_agent(game, front_char)
+    backs = [
+        resolve_agent(game, chars_by_id[str(cid)])
+        for cid in ((team or {}).get("backCharacter1Id"), (team or {}).get("backCharacter2Id"))
+        if cid and str(cid) in chars_by_id
+    ]
+
+    # 局外底座：角色白值 + 音擎
+    agent_stats = agent_base_stats(game, front)
+    weapon_stats, _ = weapon_base_stats(game, equipped_weapon(save, front.zod))
+    merged_stats = [a + w for a, w in zip(agent_stats, weapon_stats)]
+
+    # 普通 Buff -> mergedBuff（按满层计入），转换类 -> conversionBuffs
+    merged_buff = zeros()
+    conversions: List[ConversionBuff] = []
+    for buff in select_buffs(game, save, front, backs, team, battle):
+        conv = buff.get("conversion")
+        if conv:
+            from_idx = resolver.index(conv.get("from_property", ""))
+            to_idx = resolver.index(conv.get("to_property", ""))
+            if from_idx is not None and to_idx is not None:
+                conversions.append(ConversionBuff(
+                    from_idx=from_idx,
+                    to_idx=to_idx,
+                    ratio=conv.get("conversion_ratio", 0),
+                    threshold=conv.get("from_property_threshold") or 0,
+                    max_value=conv.get("max_value"),
+                ))
+            continue
+        max_stacks = buff.get("max_stacks", 1)
+        stacks = max(1, max_stacks) if buff.get("stack_mode", "linear") and max_stacks else 1
+        for name, value in (buff.get("in_combat_stats") or {}).items():
+            idx = resolver.index(name)
+            if idx is not None and isinstance(value, (int, float)):
+                merged_buff[idx] += value * stacks
+
+    # 目标套装（候选盘中存在时才预合并）
+    target_two_piece, target_four_piece = zeros(), zeros()
+    if target_set_id and any(d.set_id == target_set_id for d in discs):
+        target_two_piece = game.set_bonus(target_set_id, "twoPiece")
+        target_four_piece = game.set_bonus(target_set_id, "fourPiece")
+
+    # setIdx：套装加成表中的沿用表中索引，其余追加在表之后
+    set_idx_by_id = game.set_idx_by_id()
+    next_idx = len(set_idx_by_id)
+    set_two_piece: Dict[int, List[float]] = {}
+    effective = effective_stats(game, front)
+    discs_by_slot: List[List[DiscData]] = [[] for _ in range(6)]
+    for disc in discs:
+        if disc.set_id not in set_idx_by_id:
+            set_idx_by_id[disc.set_id] = next_idx
+            next_idx += 1
+        set_idx = set_idx_by_id[disc.set_id]
+        if disc.set_id != target_set_id and set_idx not in set_two_piece:
+            set_two_piece[set_idx] = game.set_bonus(disc.set_id, "twoPiece")
+
+        stats = []
+        for name, value in disc.stats.items():
+            idx = resolver.index(name)
+            if name not in IGNORED_DISC_PROPS and idx is not None and value != 0:
+                stats.append((idx, value))
+        score = stat_score(disc.main_stat, effective, True) + sum(
+            stat_score(name, effective, False) for name in disc.stats if name != disc.main_stat
+        )
+        discs_by_slot[disc.slot - 1].append(DiscData(
+            id=disc.id,
+            stats=sorted(stats),
+            set_id=disc.set_id,
+            set_idx=set_idx,
+            is_target=disc.set_id == target_set_id,
+            effective_score=score,
+            main_stat=disc.main_stat,
+        ))
+    for slot in discs_by_slot:
+        slot.sort(key=lambda d: (d.set_idx, -d.effective_score))
+
+    # 固定乘区：角色 + 音擎局外属性中的减防 / 无视防御 / 减抗 / 易伤 / 异常增伤（不含 Buff）
+    base_props = [a + w for a, w in zip(agent_stats, weapon_stats)]
+    level = int(front.zod.get("level") or 60)
+    enemy = enemy_profile(game, enemy_id)
+    stunned, vulnerability = stun_vulnerability(front, enemy, is_stunned)
+    fixed = FixedMultipliers(
+        base_dmg_taken_inc=base_props[resolver.index("DMG_INC_")],
+        stun_vulnerability=vulnerability if stunned else 0.0,
+        distance_mult=1.0,
+        attacker_level=level,
+        base_anomaly_dmg_bonus=base_props[resolver.index("ANOMALY_DMG_")],
+        level_base=level * 10 + 100,
+        enemy_def=enemy["defense"] * (2 if has_corruption_shield else 1),
+        base_def_red=base_props[resolver.index("DEF_RED_")],
+        base_def_ign=base_props[resolver.index("DEF_IGN_")],
+        base_res_red=base_props[resolver.index("ENEMY_RES_RED_")],
+    )
+
+    skills = skill_params(game, front, skill_keys)
+    if not skills:
+        raise ValueError("未选择技能")
+    special = SPECIAL_ANOMALY_AGENTS.get(front.char_id)
+    anomaly_total, disorder_total = anomaly_ratios(skills[0].element, special)
+
+    return Precomputed(
+        merged_stats=merged_stats,
+        merged_buff=merged_buff,
+        conversion_buffs=conversions,
+        discs_by_slot=discs_by_slot,
+        target_set_id=target_set_id,
+        target_set_two_piece=target_two_piece,
+        target_set_four_piece_buff=target_four_piece,
+        set_two_piece=set_two_piece,
+        fixed=fixed,
+        skills=skills,
+        objective=objective if objective in ("hp", "atk") else "damage",
+        element_resistances=enemy["resistances"],
+        anomaly_thresholds=enemy["anomalyThresholds"],
+        special_anomaly=special,
+        anomaly_total_ratio=anomaly_total,
+        disorder_total_ratio=disorder_total,
+    )
+
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+并行搜索调度（进程池）
+
+fast-optimization.worker.ts 按第一层循环把组合空间固定切成 W 段；候选盘数不均、目标套装剪枝
+又让各段的实际工作量相差很大，先做完的核只能空等。这里改为：
+
+- 把 6 层枚举空间切成大量 (slot0, slot1) 前缀任务（按 slot_order 的前两层）
+- 按估计工作量（前缀下满足四件套的叶子数）从大到小排序后分批
+- 所有批次进入进程池的共享队列，空闲进程随时取下一批（动态调度：先做完的进程
+  继续拿剩余任务，效果等同于从慢进程处"偷"工作）
+- 每个进程只初始化一次引擎（Precomputed 随 initializer 传入），每批返回本批 TopN，
+  主进程合并；同分按完整枚举顺序决胜，因此结果与单进程完整枚举一致
+  （前提是叶子分数与枚举路径无关：各引擎回滚都不做浮点减法，同一组合在任何批次中分数逐位相同）
+
+引擎可选 scalar（fast_evaluator.PrefixSearch）、incremental（PrefixSearch + 增量 DFS 评估器）
+或 numpy（vector_evaluator.VectorEvaluator）；PrefixSearch 在每个前缀内按套装构成模板枚举；
+bound=True 时两者都启用分支定界（各批次从空 TopN 开始定界，结果不变）。
+
+命令行：对存档中的任务按不同进程数各跑一遍，报告吞吐量（组合/秒）、相对第一个进程数的加速比
+与并行效率，并检查 TopN 与第一个进程数的结果一致（任务来源与 optimize_saves.py 相同）。
+
+使用方式：
+    from parallel_search import search
+    result = search(pre, top_n=10, workers=32, engine="numpy")
+
+    python scripts/parallel_search.py saves/big_inventory.json --workers 1 2 4 8 16 32
+    python scripts/parallel_search.py saves/big_inventory.json --workers 1 4 --engine scalar --bound
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import vector_evaluator
+from fast_evaluator import PrefixSearch, Precomputed, combo_discs
+from vector_evaluator import TopN, VectorEvaluator
+
+# 任务前缀的层数（slot0, slot1）
+TASK_DEPTH = 2
+# 每个进程平均分到的批数（越多负载越均衡，进程间通信也越多）
+BATCHES_PER_WORKER = 16
+
+ENGINES = ("scalar", "incremental", "numpy")
+
+# 进程内的引擎（_init_worker 设置）
+_engine = None
+
+
+def make_engine(pre: Precomputed, engine: str, top_n: int, bound: bool = False):
+    if engine == "numpy":
+        return VectorEvaluator(pre, min_prefix_levels=TASK_DEPTH, bound=bound)
+    if engine in ("scalar", "incremental"):
+        return PrefixSearch(pre, top_n, bound, incremental=engine == "incremental")
+    raise ValueError(f"未知的评估引擎: {engine}")
+
+
+def feasible_leaves(engine, prefix: Sequence[int]) -> int:
+    """前缀下满足四件套门槛的叶子数（任务工作量估计）"""
+    slots, counts = engine.slots, engine.counts
+    depth = len(prefix)
+    if not engine.pre.target_set_id:
+        total = 1
+        for count in counts[depth:]:
+            total *= count
+        return total
+    # ways[t]：剩余层中恰好选到 t 个目标盘的组合数
+    ways = [1]
+    for slot in slots[depth:]:
+        targets = sum(1 for d in slot if d.is_target)
+        others = len(slot) - targets
+        nxt = [0] * (len(ways) + 1)
+        for t, w in enumerate(ways):
+            nxt[t] += w * others
+            nxt[t + 1] += w * targets
+        ways = nxt
+    need = max(0, 4 - sum(1 for level, i in enumerate(prefix) if slots[level][i].is_target))
+    return sum(ways[need:])
+
+
+def plan_batches(engine, workers: int) -> List[List[Tuple[int, ...]]]:
+    """前缀任务按工作量降序切成批（大任务先发，尾部用小任务填平）"""
+    prefixes = itertools.product(*(range(n) for n in engine.counts[:TASK_DEPTH]))
+    tasks = [(feasible_leaves(engine, p), p) for p in prefixes]
+    tasks.sort(key=lambda item: -item[0])
+    total = sum(cost for cost, _ in tasks)
+    target = max(1, total // max(1, workers * BATCHES_PER_WORKER))
+    batches, batch, cost = [], [], 0
+    for task_cost, prefix in tasks:
+        batch.append(prefix)
+        cost += task_cost
+        if cost >= target:
+            batches.append(batch)
+            batch, cost = [], 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def run_batch(engine, prefixes: Sequence[Tuple[int, ...]], top_n: int):
+    """执行一批前缀任务 -> (评估数, 剪枝数, 定界跳过数, [(damage, 各层下标)])"""
+    engine.bounded = 0
+    if isinstance(engine, VectorEvaluator):
+        top = TopN(top_n, 6)
+        expanded = (
+            prefix + rest
+            for prefix in prefixes
+            for rest in itertools.product(*(range(n) for n in engine.counts[len(prefix):engine.prefix_levels]))
+        )
+        processed, pruned = engine.run(expanded, top)
+        return processed, pruned, engine.bounded, top.ranked()
+    engine.heap, engine.processed, engine.pruned = [], 0, 0
+    for prefix in prefixes:
+        engine.run(prefix)
+    return engine.processed, engine.pruned, engine.bounded, engine.ranked()
+
+
+def _init_worker(pre: Precomputed, engine: str, top_n: int, bound: bool) -> None:
+    global _engine
+    _engine = make_engine(pre, engine, top_n, bound)
+
+
+def _run_batch(prefixes: Sequence[Tuple[int, ...]], top_n: int):
+    return run_batch(_engine, prefixes, top_n)
+
+
+def merge_ranked(ranked: Sequence[Tuple[float, Tuple[int, ...]]], top_n: int) -> List[Tuple[float, Tuple[int, ...]]]:
+    """合并各批 TopN：伤害降序，同分按枚举顺序（各层下标字典序）"""
+    return sorted(ranked, key=lambda item: (-item[0], item[1]))[:top_n]
+
+
+def search(pre: Precomputed, top_n: int = 10, workers: int = 0, engine: str = "", bound: bool = False) -> dict:
+    """
+    多进程枚举全部组合并返回 TopN（输出结构与 fast_evaluator.search 相同，stats 额外含 tasks / workers）
+
+    workers <= 0 时使用全部 CPU；engine 为空时已安装 numpy 用 numpy，否则 scalar。
+    """
+    start = time.perf_counter()
+    engine = engine or ("numpy" if vector_evaluator.np is not None else "scalar")
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    local = make_engine(pre, engine, top_n, bound)
+    batches = plan_batches(local, workers)
+
+    processed = pruned = bounded = 0
+    ranked: List[Tuple[float, Tuple[int, ...]]] = []
+    if workers == 1:
+        for batch in batches:
+            p, q, b, r = run_batch(local, batch, top_n)
+            processed, pruned, bounded, ranked = processed + p, pruned + q, bounded + b, merge_ranked(ranked + r, top_n)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(pre, engine, top_n, bound)) as pool:
+            futures = [pool.submit(_run_batch, batch, top_n) for batch in batches]
+            for future in as_completed(futures):
+                p, q, b, r = future.result()
+                processed, pruned, bounded, ranked = processed + p, pruned + q, bounded + b, merge_ranked(ranked + r, top_n)
+
+    scalar = local.scalar if isinstance(local, VectorEvaluator) else local.evaluator
+    builds = [scalar.full_result(combo_discs(local.slots, local.order, combo)) for _, combo in ranked]
+    elapsed = time.perf_counter() - start
+    stats = {
+        "totalProcessed": processed,
+        "prunedCount": pruned,
+        "timeMs": elapsed * 1000,
+        "averageSpeed": (processed + pruned + bounded) / elapsed if elapsed > 0 else 0.0,
+        "tasks": sum(len(b) for b in batches),
+        "batches": len(batches),
+        "workers": workers,
+        "engine": engine,
+    }
+    if bound:
+        stats["boundSkipped"] = bounded
+    return {"builds": builds, "stats": stats}
+
+
+def scaling_job(game, save: dict, job: dict, worker_counts: Sequence[int], top_n: int, engine: str,
+                bound: bool) -> bool:
+    """同一任务按各进程数搜索，打印吞吐量 / 加速比 / 效率；TopN 与第一个进程数不一致时返回 False"""
+    from optimize_saves import job_request
+
+    header, pre, _ = job_request(game, save, job)
+    top_n = int(job.get("topN", top_n))
+    print(f"{job['save']} · {job.get('team') or job.get('character')} ({header['character']['key']})")
+    base_top = base_speed = None
+    ok = True
+    for workers in worker_counts:
+        result = search(pre, top_n, workers, engine, bound)
+        stats = result["stats"]
+        top = [(b["damage"], tuple(b["discIds"])) for b in result["builds"]]
+        speed = stats["averageSpeed"]
+        if base_top is None:
+            base_top, base_speed = top, speed
+        same = top == base_top
+        ok = ok and same
+        speedup = speed / base_speed if base_speed else 0.0
+        print(
+            f"  {'✓' if same else '✗'} {workers:>3} 进程: {stats['timeMs'] / 1000:.2f}s，{speed:,.0f} 组合/s，"
+            f"x{speedup:.2f}（效率 {speedup * worker_counts[0] / workers:.0%}），"
+            f"{stats['tasks']} 个任务 / {stats['batches']} 批，TopN {'一致' if same else '不一致'}"
+        )
+    return ok
+
+
+def main() -> int:
+    from optimize_saves import DEFAULT_TOP_N, collect_jobs, load_save
+    from optimizer_context import DATA_DIR, GameData
+
+    parser = argparse.ArgumentParser(description="并行搜索扩展性测量（进程数 -> 吞吐量）")
+    parser.add_argument("saves", nargs="+", help="存档导出 JSON")
+    parser.add_argument("--jobs", type=Path, help="任务列表 JSON（默认：每个存档的全部队伍）")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="依次测量的进程数（默认 1 2 4 8）")
+    parser.add_argument("--engine", choices=ENGINES, default="", help="评估引擎（默认：有 numpy 用 numpy，否则 scalar）")
+    parser.add_argument("--bound", action="store_true", help="启用分支定界")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N, help=f"每个任务保留的结果数（默认 {DEFAULT_TOP_N}）")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="game-data 目录")
+    args = parser.parse_args()
+
+    print(f"CPU: {os.cpu_count()}")
+    try:
+        grouped = collect_jobs(args.saves, args.jobs)
+    except (ValueError, OSError) as e:
+        print(f"✗ {e}")
+        return 1
+
+    game = GameData(args.data_dir)
+    failed = 0
+    for path, jobs in grouped.items():
+        save = load_save(Path(path))
+        for job in jobs:
+            try:
+                if not scaling_job(game, save, job, args.workers, args.top_n, args.engine, args.bound):
+                    failed += 1
+            except (ValueError, FileNotFoundError) as e:
+                failed += 1
+                print(f"✗ {path} · {job.get('team') or job.get('character')}: {e}")
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
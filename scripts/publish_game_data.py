@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+game-data 发布脚本（pnpm build 之后，对构建产物 dist/game-data 运行；见 netlify.toml）
+
+- --minify：将 JSON 压缩为单行（去掉 indent=2 的空白），原地改写。只应对构建产物使用，
+  public/game-data 中入库的文件保持原格式（update_data.py 的 sha 比对与各脚本缓存依赖它）
+- 为 JSON 生成最高压缩等级的 .gz 旁路文件；netlify.toml 为其设置 Content-Encoding，
+  前端（utils/precompressed.ts）在 VITE_PRECOMPRESSED_DATA=gzip 时请求 .json.gz。
+  列式二进制与合并包按 Range 读取，不生成预压缩文件
+- 增量：以压缩空白前的源文件内容哈希为键，把发布内容与 .gz 缓存在 node_modules/.cache 下；
+  每次构建都是全新的 dist，命中缓存的文件直接复制缓存结果，只有内容变化的文件重新压缩
+- 输出按目录汇总的体积表：原始 / 压缩空白后 / gzip / brotli（brotli 只用于对比，不发布，
+  需要 brotli 包：pip install brotli）
+
+使用方式：
+    python scripts/publish_game_data.py                  # 默认处理 web/optimizer/dist/game-data
+    python scripts/publish_game_data.py --minify         # 同时压缩 JSON 空白
+    python scripts/publish_game_data.py --force          # 忽略缓存，全部重新生成
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(PROJECT_ROOT, "web", "optimizer", "dist", "game-data")
+# 压缩结果缓存放在构建缓存目录，避免写进发布目录；文件名为源文件哈希
+CACHE_DIR = os.path.join(PROJECT_ROOT, "web", "optimizer", "node_modules", ".cache", "publish-game-data")
+
+# 需要预压缩的文件类型（前端只对 game-data JSON 请求 .gz）
+COMPRESSIBLE_SUFFIXES = (".json",)
+# 流水线内部记录文件，不属于发布内容
+INTERNAL_FILES = {
+    "publish_manifest.json",
+    "fetch_manifest.json",
+    "record_manifest.json",
+    "icon_optimize_cache.json",
+    "icon_optimize_report.json",
+    "buff_validation_cache.json",
+    "buff_validation_report.json",
+    "cleanup_scan_cache.json",
+    "text_index.json",
+}
+
+
+@dataclass
+class PublishResult:
+    path: str  # 相对 data_dir 的路径
+    raw: int  # 压缩空白前的源文件大小
+    minified: int
+    gzip: int
+    brotli: Optional[int]
+    cache_key: str
+    skipped: bool  # 命中缓存
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def minify_json(data: bytes) -> bytes:
+    """保持键顺序，只去掉空白"""
+    obj = json.loads(data)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_bytes(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def collect_files(data_dir: str) -> List[str]:
+    """需要发布的文件（相对路径，排序保证输出稳定）"""
+    files = []
+    for root, _, names in os.walk(data_dir):
+        for name in names:
+            if not name.endswith(COMPRESSIBLE_SUFFIXES) or name in INTERNAL_FILES:
+                continue
+            files.append(os.path.relpath(os.path.join(root, name), data_dir))
+    return sorted(files)
+
+
+def load_cached(cached_path: str) -> Optional[Tuple[bytes, bytes, Optional[int]]]:
+    """缓存的 (发布内容, .gz, brotli 体积)；缓存不完整时返回 None"""
+    body = read_bytes(cached_path)
+    gz_data = read_bytes(cached_path + ".gz")
+    if body is None or gz_data is None:
+        return None
+    if brotli is None:
+        return body, gz_data, None
+    br_data = read_bytes(cached_path + ".br")
+    return None if br_data is None else (body, gz_data, len(br_data))
+
+
+def publish_file(
+    data_dir: str,
+    cache_dir: str,
+    rel_path: str,
+    minify: bool,
+    force: bool,
+) -> PublishResult:
+    path = os.path.join(data_dir, rel_path)
+    with open(path, "rb") as f:
+        data = f.read()
+    raw_size = len(data)
+    # 键取压缩空白前的内容：全新构建的 dist 中是入库原文，与上次发布时的输入一致
+    cache_key = sha256_bytes(data) + (".min" if minify else "")
+    cached_path = os.path.join(cache_dir, cache_key)
+
+    cached = None if force else load_cached(cached_path)
+    skipped = cached is not None
+    if cached is not None:
+        body, gz_data, br_size = cached
+    else:
+        body = minify_json(data) if minify else data
+        # mtime=0 让相同内容生成相同的 .gz，避免无意义的变更
+        gz_data = gzip.compress(body, compresslevel=9, mtime=0)
+        write_atomic(cached_path, body)
+        write_atomic(cached_path + ".gz", gz_data)
+        br_size = None
+        if brotli is not None:
+            br_data = brotli.compress(body, quality=11, mode=brotli.MODE_TEXT)
+            write_atomic(cached_path + ".br", br_data)
+            br_size = len(br_data)
+
+    if body != data:
+        write_atomic(path, body)
+    write_atomic(path + ".gz", gz_data)
+
+    return PublishResult(
+        path=rel_path,
+        raw=raw_size,
+        minified=len(body),
+        gzip=len(gz_data),
+        brotli=br_size,
+        cache_key=cache_key,
+        skipped=skipped,
+    )
+
+
+def prune_cache(cache_dir: str, keep: Set[str]) -> None:
+    """删除本次未用到的缓存条目，缓存只保留当前一版"""
+    for name in os.listdir(cache_dir):
+        if name.split(".", 1)[0] not in keep:
+            os.remove(os.path.join(cache_dir, name))
+
+
+def remove_orphan_siblings(data_dir: str, files: List[str]) -> int:
+    """删除源文件已不存在（或不再预压缩）的 .gz / .br"""
+    published = set(files)
+    removed = 0
+    for root, _, names in os.walk(data_dir):
+        for name in names:
+            if not name.endswith((".gz", ".br")):
+                continue
+            rel_path = os.path.relpath(os.path.join(root, name), data_dir)
+            if name.endswith(".br") or rel_path[:-3] not in published:
+                os.remove(os.path.join(root, name))
+                removed += 1
+    return removed
+
+
+def format_kb(n: Optional[int]) -> str:
+    return "-" if n is None else f"{n / 1024:.1f} KB"
+
+
+def print_size_table(results: List[PublishResult]) -> None:
+    """按顶层目录汇总（根目录文件单独列出）"""
+    groups: Dict[str, List[int]] = {}
+    for r in results:
+        group = r.path.split(os.sep, 1)[0] if os.sep in r.path else r.path
+        totals = groups.setdefault(group, [0, 0, 0, 0, 0])
+        totals[0] += 1
+        totals[1] += r.raw
+        totals[2] += r.minified
+        totals[3] += r.gzip
+        totals[4] += r.brotli or 0
+
+    header = f"{'文件/目录':<32}{'数量':>6}{'原始':>14}{'压缩空白':>14}{'gzip':>14}{'brotli':>14}"
+    print(header)
+    print("-" * len(header))
+    for group, (count, raw, minified, gz, br) in sorted(groups.items()):
+        print(
+            f"{group:<32}{count:>6}{format_kb(raw):>14}{format_kb(minified):>14}"
+            f"{format_kb(gz):>14}{format_kb(br if brotli else None):>14}"
+        )
+    print("-" * len(header))
+    count, raw, minified, gz, br = (sum(t[i] for t in groups.values()) for i in range(5))
+    print(
+        f"{'合计':<32}{count:>6}{format_kb(raw):>14}{format_kb(minified):>14}"
+        f"{format_kb(gz):>14}{format_kb(br if brotli else None):>14}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="为构建产物中的 game-data JSON 生成 .gz 预压缩文件")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="game-data 目录（默认：构建产物 dist/game-data）")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="压缩结果缓存目录")
+    parser.add_argument("--force", action="store_true", help="忽略缓存，全部重新生成")
+    parser.add_argument("--minify", action="store_true", help="原地压缩 JSON 空白（只用于构建产物）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="并行线程数")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.data_dir):
+        print(f"未找到数据目录: {args.data_dir}（请先运行 pnpm build）")
+        return 1
+    if brotli is None:
+        print("提示: 未安装 brotli（pip install brotli），体积表不含 brotli 列\n")
+
+    os.makedirs(args.cache_dir, exist_ok=True)
+    files = collect_files(args.data_dir)
+
+    # zlib / brotli 压缩时释放 GIL，线程池即可并行
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        results = list(
+            pool.map(
+                lambda p: publish_file(args.data_dir, args.cache_dir, p, args.minify, args.force),
+                files,
+            )
+        )
+
+    prune_cache(args.cache_dir, {r.cache_key.split(".", 1)[0] for r in results})
+    orphans = remove_orphan_siblings(args.data_dir, files)
+
+    updated = sum(1 for r in results if not r.skipped)
+    print(f"✓ 共 {len(results)} 个文件，重新压缩 {updated} 个，复用缓存 {len(results) - updated} 个（内容未变）")
+    if orphans:
+        print(f"✓ 删除 {orphans} 个过期的压缩文件")
+    print()
+    print_size_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
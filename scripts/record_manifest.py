@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Per-record content hashes for the game-data pipeline.
+
+update_data.py calls ``update_record_manifest()`` after each fetch. Every record
+(index entry + detail file) gets a canonical sha256; the IDs whose hash changed
+since the previous fetch are stored as the "changed" set (for reporting).
+
+Downstream scripts run with ``--only-changed`` keep their own baseline instead:
+``load_changed_ids(category, consumer)`` returns the IDs whose hash differs from
+the hashes that consumer last acknowledged with ``acknowledge()``. Changes from
+several fetches therefore accumulate until the consumer has processed them; a
+consumer without a baseline gets every ID.
+
+Usage:
+    python scripts/record_manifest.py                    # recompute and print changed IDs
+    python scripts/record_manifest.py --show             # print the stored changed set only
+    python scripts/record_manifest.py --pending icons    # IDs the "icons" consumer has not processed yet
+"""
+import argparse
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Optional, Set
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(PROJECT_ROOT, "web", "optimizer", "public", "game-data")
+# Pipeline bookkeeping lives outside public/ (git-ignored) so it is never deployed with the site.
+STATE_DIR = os.path.join(PROJECT_ROOT, ".cache", "game-data")
+RECORD_MANIFEST_PATH = os.path.join(STATE_DIR, "record_manifest.json")
+
+# category -> (index filename, detail directory or None)
+RECORD_SOURCES = {
+    "character": ("character.json", "character"),
+    "weapon": ("weapon.json", "weapon"),
+    "equipment": ("equipment.json", "equipment"),
+    "bangboo": ("bangboo_index.json", None),
+    "enemy": ("enemy_index.json", None),
+}
+
+
+def canonical_hash(obj: Any) -> str:
+    """sha256 of the canonical JSON form (sorted keys, no whitespace), independent of file formatting."""
+    data = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _load_json(path: str) -> Optional[Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def compute_record_hashes(data_dir: str = DATA_DIR) -> Dict[str, Dict[str, str]]:
+    """Return {category: {id: hash}} over index entries combined with their detail files."""
+    hashes: Dict[str, Dict[str, str]] = {}
+    for category, (index_name, detail_name) in RECORD_SOURCES.items():
+        index = _load_json(os.path.join(data_dir, index_name))
+        if not isinstance(index, dict):
+            continue
+        records: Dict[str, str] = {}
+        for item_id, entry in index.items():
+            record = {"index": entry}
+            if detail_name:
+                record["detail"] = _load_json(os.path.join(data_dir, detail_name, f"{item_id}.json"))
+            records[str(item_id)] = canonical_hash(record)
+        hashes[category] = records
+    return hashes
+
+
+def migrate_state_file(path: str) -> None:
+    """Move a state file that older versions wrote into DATA_DIR to ``path``."""
+    legacy = os.path.join(DATA_DIR, os.path.basename(path))
+    if not os.path.exists(path) and os.path.exists(legacy):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(legacy, path)
+
+
+def load_record_manifest(path: str = RECORD_MANIFEST_PATH) -> Dict[str, Any]:
+    migrate_state_file(path)
+    manifest = _load_json(path)
+    if not isinstance(manifest, dict):
+        return {"records": {}, "changed": {}, "consumers": {}}
+    manifest.setdefault("records", {})
+    manifest.setdefault("changed", {})
+    manifest.setdefault("consumers", {})
+    return manifest
+
+
+def _save_record_manifest(manifest: Dict[str, Any], path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def update_record_manifest(data_dir: str = DATA_DIR, path: str = RECORD_MANIFEST_PATH) -> Dict[str, list]:
+    """
+    Recompute record hashes, store them with the changed-ID set and return that set.
+
+    New and modified IDs count as changed; removed IDs are listed under "removed".
+    """
+    stored = load_record_manifest(path)
+    previous = stored["records"]
+    current = compute_record_hashes(data_dir)
+
+    changed: Dict[str, list] = {}
+    removed: Dict[str, list] = {}
+    for category, records in current.items():
+        old = previous.get(category, {})
+        changed[category] = sorted(i for i, h in records.items() if old.get(i) != h)
+        removed[category] = sorted(i for i in old if i not in records)
+
+    manifest = {"records": current, "changed": changed, "removed": removed, "consumers": stored["consumers"]}
+    _save_record_manifest(manifest, path)
+    return changed
+
+
+def load_changed_ids(category: str, consumer: str, path: str = RECORD_MANIFEST_PATH) -> Set[str]:
+    """IDs of ``category`` whose hash differs from what ``consumer`` last acknowledged (all IDs if never)."""
+    manifest = load_record_manifest(path)
+    records = manifest["records"].get(category, {})
+    baseline = manifest["consumers"].get(consumer, {}).get(category)
+    if baseline is None:
+        return set(records)
+    return {i for i, h in records.items() if baseline.get(i) != h}
+
+
+def acknowledge(consumer: str, categories: Iterable[str], path: str = RECORD_MANIFEST_PATH) -> None:
+    """Record the current hashes of ``categories`` as processed by ``consumer``."""
+    manifest = load_record_manifest(path)
+    baseline = manifest["consumers"].setdefault(consumer, {})
+    for category in categories:
+        baseline[category] = dict(manifest["records"].get(category, {}))
+    _save_record_manifest(manifest, path)
+
+
+def print_changed(changed: Dict[str, list]) -> None:
+    total = sum(len(ids) for ids in changed.values())
+    print(f"Changed records: {total}")
+    for category, ids in changed.items():
+        if ids:
+            print(f"  {category} ({len(ids)}): {', '.join(ids)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compute per-record content hashes and the changed-ID set.")
+    parser.add_argument("--show", action="store_true", help="Only print the changed set stored by the last run.")
+    parser.add_argument("--pending", metavar="CONSUMER", help="Print the IDs CONSUMER has not acknowledged yet.")
+    args = parser.parse_args()
+
+    if args.pending:
+        print_changed({c: sorted(load_changed_ids(c, args.pending)) for c in RECORD_SOURCES})
+    elif args.show:
+        print_changed(load_record_manifest().get("changed", {}))
+    else:
+        print_changed(update_record_manifest())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Tests for http_fetcher.Fetcher against a local http.server.
+
+Covers conditional requests (304), resumable downloads (.part + Range), stale
+partial files (416), retries with backoff on 429/5xx and per-host rate limiting.
+Standard library only, like the fetcher itself.
+
+Usage:
+    python scripts/test_http_fetcher.py
+    python -m pytest scripts/test_http_fetcher.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from http_fetcher import FetchError, Fetcher, TokenBucket
+
+ETAG = '"v1"'
+PAYLOAD = bytes(range(256)) * 64  # 16 KB
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Routes configured per test through the server's ``state`` attribute."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, as the fetcher expects
+
+    def log_message(self, format, *args):  # noqa: A002 - silence request logging
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: Dict[str, str] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        state = self.server.state
+        with state["lock"]:
+            state["requests"].append((self.path, dict(self.headers), time.monotonic()))
+            hits = sum(1 for path, _, _ in state["requests"] if path == self.path)
+
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == ETAG:
+                self._send(304, headers={"ETag": ETAG})
+            else:
+                self._send(200, b'{"ok":true}', {"ETag": ETAG, "Content-Type": "application/json"})
+        elif self.path in ("/file", "/no-range"):
+            range_header = self.headers.get("Range")
+            if self.path == "/file" and range_header:
+                start = int(range_header.removeprefix("bytes=").rstrip("-"))
+                if start >= len(PAYLOAD):
+                    self._send(416, headers={"Content-Range": f"bytes */{len(PAYLOAD)}"})
+                    return
+                body = PAYLOAD[start:]
+                self._send(206, body, {"Content-Range": f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}"})
+            else:
+                self._send(200, PAYLOAD)
+        elif self.path in ("/flaky", "/flaky-file"):
+            # Fails with the configured statuses first, then succeeds.
+            failures: List[int] = state["failures"]
+            if hits <= len(failures):
+                self._send(failures[hits - 1], b"try again")
+            else:
+                self._send(200, PAYLOAD)
+        elif self.path == "/always-503":
+            self._send(503, b"down")
+        else:
+            self._send(404, b"not found")
+
+
+class FetcherTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.state = {"lock": threading.Lock(), "requests": [], "failures": []}
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def fetcher(self, **kwargs) -> Fetcher:
+        options = {"concurrency": 4, "rate": 1000.0, "retries": 3, "backoff": 0.01, "timeout": 5.0}
+        options.update(kwargs)
+        return Fetcher(**options)
+
+    def requests(self, path: str) -> List[tuple]:
+        return [r for r in self.server.state["requests"] if r[0] == path]
+
+    # --- conditional requests -------------------------------------------------
+
+    def test_not_modified_is_a_result(self):
+        fetcher = self.fetcher()
+        first = fetcher.fetch(f"{self.base_url}/etag")
+        self.assertEqual(first.status, 200)
+        self.assertEqual(first.headers["etag"], ETAG)
+
+        second = fetcher.fetch(f"{self.base_url}/etag", headers={"If-None-Match": first.headers["etag"]})
+        self.assertTrue(second.not_modified)
+        self.assertEqual(second.body, b"")
+        self.assertEqual(len(self.requests("/etag")), 2)
+
+    # --- resumable downloads ----------------------------------------------------
+
+    def test_download_writes_file_and_removes_part(self):
+        target = os.path.join(self.tmp.name, "file.bin")
+        received = self.fetcher().download_to_file(f"{self.base_url}/file", target)
+
+        self.assertEqual(received, len(PAYLOAD))
+        self.assertEqual(Path(target).read_bytes(), PAYLOAD)
+        self.assertFalse(os.path.exists(target + ".part"))
+        self.assertNotIn("Range", self.requests("/file")[0][1])
+
+    def test_resumes_part_with_range(self):
+        target = os.path.join(self.tmp.name, "file.bin")
+        Path(target + ".part").write_bytes(PAYLOAD[:1000])
+
+        received = self.fetcher().download_to_file(f"{self.base_url}/file", target)
+
+        self.assertEqual(received, len(PAYLOAD) - 1000)
+        self.assertEqual(Path(target).read_bytes(), PAYLOAD)
+        self.assertEqual(self.requests("/file")[0][1].get("Range"), "bytes=1000-")
+
+    def test_server_without_range_restarts_from_zero(self):
+        target = os.path.join(self.tmp.name, "file.bin")
+        Path(target + ".part").write_bytes(b"stale prefix")
+
+        self.fetcher().download_to_file(f"{self.base_url}/no-range", target)
+
+        self.assertEqual(Path(target).read_bytes(), PAYLOAD)
+
+    def test_stale_part_416_restarts_download(self):
+        target = os.path.join(self.tmp.name, "file.bin")
+        stale = PAYLOAD + b"extra bytes from an older version"
+        Path(target + ".part").write_bytes(stale)
+
+        received = self.fetcher().download_to_file(f"{self.base_url}/file", target)
+
+        self.assertEqual(received, len(PAYLOAD))
+        self.assertEqual(Path(target).read_bytes(), PAYLOAD)
+        ranges = [headers.get("Range") for _, headers, _ in self.requests("/file")]
+        self.assertEqual(ranges, [f"bytes={len(stale)}-", None])
+
+    def test_failed_download_keeps_existing_file(self):
+        target = os.path.join(self.tmp.name, "file.bin")
+        Path(target).write_bytes(b"previous")
+
+        with self.assertRaises(FetchError):
+            self.fetcher(retries=0).download_to_file(f"{self.base_url}/missing", target)
+        self.assertEqual(Path(target).read_bytes(), b"previous")
+
+    # --- retries and backoff ----------------------------------------------------
+
+    def test_retries_429_and_5xx_then_succeeds(self):
+        self.server.state["failures"] = [429, 503]
+        result = self.fetcher().fetch(f"{self.base_url}/flaky")
+
+        self.assertEqual(result.body, PAYLOAD)
+        self.assertEqual(len(self.requests("/flaky")), 3)
+
+    def test_download_retries_5xx(self):
+        self.server.state["failures"] = [502]
+        target = os.path.join(self.tmp.name, "file.bin")
+
+        self.fetcher().download_to_file(f"{self.base_url}/flaky-file", target)
+
+        self.assertEqual(Path(target).read_bytes(), PAYLOAD)
+        self.assertEqual(len(self.requests("/flaky-file")), 2)
+
+    def test_backoff_grows_between_attempts(self):
+        backoff = 0.05
+        with self.assertRaises(FetchError) as ctx:
+            self.fetcher(retries=2, backoff=backoff).fetch(f"{self.base_url}/always-503")
+
+        self.assertEqual(ctx.exception.status, 503)
+        times = [t for _, _, t in self.requests("/always-503")]
+        self.assertEqual(len(times), 3)
+        # attempt n waits backoff * 2**n plus up to 50% jitter
+        first_gap, second_gap = times[1] - times[0], times[2] - times[1]
+        self.assertGreaterEqual(first_gap, backoff)
+        self.assertGreaterEqual(second_gap, 2 * backoff)
+        self.assertLess(first_gap, 1.5 * backoff + 0.5)
+
+    def test_client_errors_are_not_retried(self):
+        with self.assertRaises(FetchError) as ctx:
+            self.fetcher().fetch(f"{self.base_url}/missing")
+
+        self.assertEqual(ctx.exception.status, 404)
+        self.assertEqual(len(self.requests("/missing")), 1)
+
+    # --- rate limiting ----------------------------------------------------------
+
+    def test_rate_limit_spaces_requests_per_host(self):
+        rate = 20.0
+        fetcher = self.fetcher(concurrency=8, rate=rate, burst=1)
+        start = time.monotonic()
+        fetcher.map(lambda _: fetcher.fetch(f"{self.base_url}/etag"), range(6))
+        elapsed = time.monotonic() - start
+
+        # burst 1: the first request is free, the other 5 wait 1/rate each
+        self.assertGreaterEqual(elapsed, 5 / rate * 0.95)
+        self.assertEqual(len(self.requests("/etag")), 6)
+
+    def test_token_bucket_allows_burst_then_refills(self):
+        bucket = TokenBucket(rate=50.0, capacity=3)
+        start = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        burst_elapsed = time.monotonic() - start
+        bucket.acquire()
+        refill_elapsed = time.monotonic() - start
+
+        self.assertLess(burst_elapsed, 0.02)
+        self.assertGreaterEqual(refill_elapsed, 1 / 50.0 * 0.95)
+
+    def test_map_keeps_input_order(self):
+        fetcher = self.fetcher()
+        paths = ["/etag", "/missing", "/etag"]
+
+        def status(path: str) -> int:
+            try:
+                return fetcher.fetch(f"{self.base_url}{path}").status
+            except FetchError as e:
+                return e.status
+
+        self.assertEqual(fetcher.map(status, paths), [200, 404, 200])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,63 +1,169 @@
+import argparse
+import hashlib
 import os
-import urllib.request
 import json
-import time
-from urllib.error import HTTPError, URLError
+import threading
+
+from http_fetcher import Fetcher, FetchError
+from record_manifest import STATE_DIR, load_record_manifest, migrate_state_file, print_changed, update_record_manifest
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_DIR = os.path.join(PROJECT_ROOT, "web", "optimizer", "public", "game-data")
 
-# URL -> Local Filename mapping
+API_BASE = "https://api.hakush.in/zzz/data"
+
+# API path (relative to API_BASE) -> Local Filename mapping
 DATA_SOURCES = {
-    "https://api.hakush.in/zzz/data/character.json": "character.json",
-    "https://api.hakush.in/zzz/data/weapon.json": "weapon.json",
-    "https://api.hakush.in/zzz/data/equipment.json": "equipment.json",
-    "https://api.hakush.in/zzz/data/bangboo.json": "bangboo_index.json",
-    "https://api.hakush.in/zzz/data/monster.json": "enemy_index.json",
+    "character.json": "character.json",
+    "weapon.json": "weapon.json",
+    "equipment.json": "equipment.json",
+    "bangboo.json": "bangboo_index.json",
+    "monster.json": "enemy_index.json",
 }
 
+# Persisted per-URL fetch state (ETag / Last-Modified / size / content hash).
+# Kept in STATE_DIR with record_manifest.json, outside public/, so it is not deployed.
+MANIFEST_PATH = os.path.join(STATE_DIR, "fetch_manifest.json")
+
+
+class FetchManifest:
+    """
+    Per-URL fetch state used for conditional (If-None-Match / If-Modified-Since) requests.
+
+    Entry format:
+        {"path": "character/1011.json", "etag": "...", "last_modified": "...",
+         "size": 12345, "sha256": "..."}
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        # Run statistics
+        self.bytes_received = 0
+        self.not_modified = 0
+        self.unchanged = 0
+        self.written = 0
+        migrate_state_file(path)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("entries", {})
+            except (OSError, json.JSONDecodeError):
+                print(f"Warning: ignoring unreadable manifest {path}")
+
+    def conditional_headers(self, url, filepath):
+        # Only ask for a 304 when we still have the file the validators describe.
+        entry = self.entries.get(url)
+        if not entry or not os.path.exists(filepath):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record(self, url, filepath, result, digest):
+        with self._lock:
+            self.bytes_received += len(result.body)
+            self.entries[url] = {
+                "path": os.path.relpath(filepath, DATA_DIR).replace(os.sep, "/"),
+                "etag": result.headers.get("etag"),
+                "last_modified": result.headers.get("last-modified"),
+                "size": len(result.body),
+                "sha256": digest,
+            }
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def save(self):
+        with self._lock:
+            data = {"entries": dict(sorted(self.entries.items()))}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        return (
+            f"received {self.bytes_received} bytes, "
+            f"{self.written} written, {self.unchanged} unchanged, {self.not_modified} not modified (304)"
+        )
+
+
+def sha256_file(filepath):
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
 def ensure_dir(directory):
     if not os.path.exists(directory):
         os.makedirs(directory)
         # print(f"Created directory: {directory}")
 
-def download_json(url, filepath, skip_if_exists=False):
+def download_json(fetcher, manifest, url, filepath, skip_if_exists=False):
+    """
+    Fetch ``url`` into ``filepath`` using a conditional request.
+
+    The file is only rewritten when the server returns new content whose hash differs
+    from what is already on disk.
+    """
     if skip_if_exists and os.path.exists(filepath):
         # print(f"Skipping existing file: {os.path.basename(filepath)}")
         return True
 
-    print(f"Downloading: {url} -> {os.path.basename(filepath)}")
     try:
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req) as response:
-            data = response.read()
-            # Validate JSON before writing
-            try:
-                json_content = json.loads(data)
-                # Write to file
-                with open(filepath, 'wb') as f:
-                    f.write(data)
-                # print(f"Successfully updated {os.path.basename(filepath)}")
-                return True
-            except json.JSONDecodeError:
-                print(f"Error: Invalid JSON received from {url}")
-                return False
-                
-    except HTTPError as e:
-        print(f"Download failed (HTTP {e.code}): {url}")
-    except URLError as e:
-        print(f"Download failed (URL Error): {url} {e.reason}")
-    except Exception as e:
-        print(f"Download failed: {url} {str(e)}")
-    return False
-
-def update_detailed_data(category_name, json_filename):
+        result = fetcher.fetch(url, headers=manifest.conditional_headers(url, filepath))
+    except FetchError as e:
+        print(f"Download failed ({e}): {url}")
+        return False
+
+    if result.not_modified:
+        manifest.count("not_modified")
+        return True
+
+    data = result.body
+    # Validate JSON before writing
+    try:
+        json.loads(data)
+    except json.JSONDecodeError:
+        print(f"Error: Invalid JSON received from {url}")
+        return False
+
+    digest = hashlib.sha256(data).hexdigest()
+    manifest.record(url, filepath, result, digest)
+
+    if os.path.exists(filepath) and sha256_file(filepath) == digest:
+        manifest.count("unchanged")
+        return True
+
+    print(f"Updated: {url} -> {os.path.basename(filepath)}")
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, filepath)
+    manifest.count("written")
+    return True
+
+def update_detailed_data(fetcher, manifest, category_name, json_filename, api_base=API_BASE, skip_existing=False):
     """
     Update detailed data for a specific category.
     
     Args:
+        fetcher: Shared Fetcher (concurrency / rate limit / retries).
+        manifest: FetchManifest used for conditional requests.
         category_name: The category name used in the API URL (e.g., 'character', 'weapon').
         json_filename: The local main JSON filename (e.g., 'character.json').
+        api_base: API root URL (overridable for a local stand-in server).
+        skip_existing: Do not revalidate detail files that already exist locally.
     """
     print(f"\n--- Updating detailed {category_name} data ---")
     
@@ -73,60 +179,120 @@ def update_detailed_data(category_name, json_filename):
     with open(main_json_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    count = 0
-    total = len(data)
-    
-    for item_id in data.keys():
+    def fetch_item(item_id):
         # URL format: https://api.hakush.in/zzz/data/{lang}/{category}/{id}.json
         # NOTE: hakush API uses "zh" for Chinese, not "chs".
-        url = f"https://api.hakush.in/zzz/data/zh/{category_name}/{item_id}.json"
+        url = f"{api_base}/zh/{category_name}/{item_id}.json"
         filepath = os.path.join(sub_dir, f"{item_id}.json")
-        
-        if download_json(url, filepath, skip_if_exists=True):
-            count += 1
-        
-        # Add a small delay only if we actually downloaded something to avoid rate limits
-        if not os.path.exists(filepath):
-             time.sleep(0.2)
+        return download_json(fetcher, manifest, url, filepath, skip_if_exists=skip_existing)
+
+    # Requests are spread over the fetcher's worker pool; the per-host token bucket
+    # replaces the old fixed sleeps between downloads.
+    results = fetcher.map(fetch_item, list(data.keys()))
+    count = sum(1 for ok in results if ok)
+
+    print(f"Updated {count}/{len(data)} detailed items for {category_name}")
+
+def rebuild_derived():
+    """Rebuild the derived optimizer tables and the game-data bundle from the local files."""
+    # Imported here so that a broken builder never stops a plain fetch
+    from build_agent_snapshots import build_snapshots, write_snapshots
+    from build_data_bundle import build_bundle, print_bundle_summary
+    from build_set_bonus_table import build_table as build_set_bonus_table, write_table as write_set_bonus_table
+    from build_weapon_talent_table import build_table, verify_table, write_table
+    from extract_core_skill_props import build_catalogue, write_catalogue
+
+    # Core-skill catalogue, agent snapshots, weapon talents, set bonuses
+    print("\n--- Rebuilding derived optimizer tables ---")
+    catalogue = build_catalogue()
+    write_catalogue(catalogue)
+    print(f"Core-skill props: {len(catalogue['props'])}, unmapped: {catalogue['unmapped'] or 'none'}")
+    snapshots, snapshot_binary = build_snapshots()
+    write_snapshots(snapshots, snapshot_binary)
+    print(f"Agent snapshots: {len(snapshots['characters'])} characters")
+    talent_table = build_table()
+    mismatched = verify_table(talent_table)
+    if mismatched:
+        print(f"Weapon talent table not written, round-trip mismatch: {', '.join(mismatched)}")
+    else:
+        write_table(talent_table)
+        print(f"Weapon talent table: {len(talent_table['weapons'])} weapons, {len(talent_table['columns'])} columns")
+    set_bonus, set_bonus_binary = build_set_bonus_table()
+    write_set_bonus_table(set_bonus, set_bonus_binary)
+    print(f"Set bonus table: {len(set_bonus['sets'])} sets, hash {set_bonus['hash']}")
+
+    # Rebuild the consolidated bundle so it never lags behind the index files
+    print("\n--- Rebuilding game-data bundle ---")
+    print_bundle_summary(build_bundle(DATA_DIR))
 
-    print(f"Updated {count}/{total} detailed items for {category_name}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Download game data from the hakush API.")
+    parser.add_argument("--base-url", default=API_BASE, help=f"API root URL (default: {API_BASE}).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum parallel requests (default: 8).")
+    parser.add_argument("--rate", type=float, default=20.0, help="Requests per second per host (default: 20).")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per request with exponential backoff (default: 3).")
+    parser.add_argument("--force", action="store_true", help="Ignore the fetch manifest and send unconditional requests.")
+    parser.add_argument("--skip-existing", action="store_true", help="Do not revalidate detail files that already exist locally.")
+    parser.add_argument("--rebuild-derived", action="store_true", help="Rebuild derived tables and the bundle even if no record changed.")
+    args = parser.parse_args()
+
+    api_base = args.base_url.rstrip("/")
+    fetcher = Fetcher(concurrency=args.concurrency, rate=args.rate, retries=args.retries)
+
     print(f"Starting data update...")
     print(f"Target directory: {DATA_DIR}")
     ensure_dir(DATA_DIR)
 
+    manifest = FetchManifest()
+    if args.force:
+        manifest.entries = {}
+
     # 1. Update Main JSONs
     print("\n--- Updating Main JSONs ---")
-    success_count = 0
-    for url, filename in DATA_SOURCES.items():
-        filepath = os.path.join(DATA_DIR, filename)
-        if download_json(url, filepath, skip_if_exists=False): # Always update main files
-            success_count += 1
-        time.sleep(0.5)
+    results = fetcher.map(
+        lambda item: download_json(fetcher, manifest, f"{api_base}/{item[0]}", os.path.join(DATA_DIR, item[1])),  # Always revalidate main files
+        list(DATA_SOURCES.items()),
+    )
+    success_count = sum(1 for ok in results if ok)
 
     print(f"Main data update complete. Updated {success_count}/{len(DATA_SOURCES)} files.")
 
     # 2. Update Detailed Data
     # Character
-    update_detailed_data("character", "character.json")
+    update_detailed_data(fetcher, manifest, "character", "character.json", api_base, args.skip_existing)
     
     # Weapon
-    update_detailed_data("weapon", "weapon.json")
+    update_detailed_data(fetcher, manifest, "weapon", "weapon.json", api_base, args.skip_existing)
 
     # Equipment (Drive Disks) - URL category might need verification, assuming 'equipment'
     # Check if 'equipment' directory exists or if we should use a different name
-    update_detailed_data("equipment", "equipment.json")
+    update_detailed_data(fetcher, manifest, "equipment", "equipment.json", api_base, args.skip_existing)
     
     # Bangboo
     # Note: Detailed endpoints for bangboo (e.g. /data/chs/bangboo/{id}.json) do not exist.
     # All necessary data seems to be contained in the main bangboo.json file.
-    # update_detailed_data("bangboo", "bangboo_index.json")
+    # update_detailed_data(fetcher, manifest, "bangboo", "bangboo_index.json", api_base)
 
     # Monster (Enemy)
     # Note: Detailed endpoints for monster (e.g. /data/chs/monster/{id}.json) do not exist.
     # All necessary data seems to be contained in the main monster.json (enemy.json) file.
-    # update_detailed_data("monster", "enemy_index.json")
+    # update_detailed_data(fetcher, manifest, "monster", "enemy_index.json", api_base)
+
+    manifest.save()
+    print(f"\nFetch summary: {manifest.summary()}")
+
+    # 3. Record-level change detection for downstream --only-changed runs
+    print("\n--- Detecting changed records ---")
+    changed = update_record_manifest()
+    print_changed(changed)
+
+    # 4. Derived optimizer tables + bundle, only when a record changed (or on request)
+    removed = load_record_manifest().get("removed", {})
+    if args.rebuild_derived or any(changed.values()) or any(removed.values()):
+        rebuild_derived()
+    else:
+        print("\nNo records changed, derived tables and bundle left as is (use --rebuild-derived to force).")
 
 if __name__ == "__main__":
     main()
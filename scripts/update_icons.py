@@ -1,11 +1,14 @@
+import argparse
 import os
 import json
-import urllib.request
-import time
-from urllib.error import HTTPError, URLError
+
+from http_fetcher import Fetcher, FetchError
+from record_manifest import acknowledge, load_changed_ids
 
 # 配置部分
 BASE_URL = "https://api.hakush.in/zzz/UI/"
+# record_manifest 中本脚本的消费者名（--only-changed 按它确认过的哈希取变更 ID）
+RECORD_CONSUMER = "icons"
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 ICONS_DIR = os.path.join(PROJECT_ROOT, "web", "optimizer", "public", "game-data", "icons")
 
@@ -40,121 +43,140 @@ def ensure_dir(directory):
         os.makedirs(directory)
         print(f"创建目录: {directory}")
 
-def download_file(url, filepath):
-    if os.path.exists(filepath):
+# 共享下载器：keep-alive 连接复用 + 有界线程池 + 每主机令牌桶限速（main 中按命令行参数重建）
+FETCHER = Fetcher(concurrency=16, rate=50.0)
+
+def download_file(url, filepath, force=False):
+    """force=True 时即使文件已存在也重新下载（记录变化但图标文件名不变时，图标内容可能已更新）"""
+    if os.path.exists(filepath) and not force:
         # print(f"文件已存在，跳过: {os.path.basename(filepath)}")
         return True
     
     print(f"正在下载: {url} -> {os.path.basename(filepath)}")
     try:
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req) as response, open(filepath, 'wb') as out_file:
-            out_file.write(response.read())
-        time.sleep(0.1) # 稍微暂停避免请求过快
+        # 先写 .part 再原子重命名；中断后再次运行会用 Range 续传
+        FETCHER.download_to_file(url, filepath)
         return True
-    except HTTPError as e:
-        print(f"下载失败 (HTTP {e.code}): {url}")
-    except URLError as e:
-        print(f"下载失败 (URL Error): {url} {e.reason}")
-    except Exception as e:
+    except FetchError as e:
+        print(f"下载失败 ({e}): {url}")
+    except OSError as e:
         print(f"下载失败: {url} {str(e)}")
     return False
 
-def process_character_icons(data):
-    count = 0
+def download_icons(filenames, force=False):
+    """并行下载一组图标文件名（去重），返回成功数量"""
+    unique = list(dict.fromkeys(filenames))
+    results = FETCHER.map(
+        lambda filename: download_file(f"{BASE_URL}{filename}", os.path.join(ICONS_DIR, filename), force),
+        unique,
+    )
+    return sum(1 for ok in results if ok)
+
+def icon_filename_from_path(icon_path):
+    """UI/Sprite/.../SuitWhiteWaterBallad.png -> SuitWhiteWaterBallad.webp"""
+    basename = os.path.basename(icon_path)
+    name_without_ext = os.path.splitext(basename)[0]
+    return f"{name_without_ext}.webp"
+
+def character_icon_files(data):
+    filenames = []
     for char_id, char_info in data.items():
         icon_code = char_info.get("icon")
         if icon_code:
             # 大头像
-            filename = f"{icon_code}.webp"
-            url = f"{BASE_URL}{filename}"
-            if download_file(url, os.path.join(ICONS_DIR, filename)):
-                count += 1
-            
+            filenames.append(f"{icon_code}.webp")
             # 小头像 (IconRolexx -> IconRoleCropxx)
             if "IconRole" in icon_code:
                 crop_code = icon_code.replace("IconRole", "IconRoleCrop")
-                crop_filename = f"{crop_code}.webp"
-                crop_url = f"{BASE_URL}{crop_filename}"
-                if download_file(crop_url, os.path.join(ICONS_DIR, crop_filename)):
-                    count += 1
-    return count
-
-def process_weapon_icons(data):
-    count = 0
+                filenames.append(f"{crop_code}.webp")
+    return filenames
+
+def weapon_icon_files(data):
+    filenames = []
     for weapon_id, weapon_info in data.items():
         icon_code = weapon_info.get("icon")
         if icon_code:
-            filename = f"{icon_code}.webp"
-            url = f"{BASE_URL}{filename}"
-            if download_file(url, os.path.join(ICONS_DIR, filename)):
-                count += 1
-    return count
-
-def process_equipment_icons(data):
-    count = 0
+            filenames.append(f"{icon_code}.webp")
+    return filenames
+
+def equipment_icon_files(data):
+    filenames = []
     for equip_id, equip_info in data.items():
         # 路径类似: UI/Sprite/A1DynamicLoad/IconSuit/UnPacker/SuitWhiteWaterBallad.png
         icon_path = equip_info.get("icon")
         if icon_path:
-            # 提取文件名 (不带扩展名)
-            basename = os.path.basename(icon_path)
-            name_without_ext = os.path.splitext(basename)[0]
-            
-            filename = f"{name_without_ext}.webp"
-            url = f"{BASE_URL}{filename}"
-            if download_file(url, os.path.join(ICONS_DIR, filename)):
-                count += 1
-    return count
-
-def process_enemy_icons(data):
-    count = 0
+            filenames.append(icon_filename_from_path(icon_path))
+    return filenames
+
+def enemy_icon_files(data):
+    filenames = []
     for enemy_id, enemy_info in data.items():
         # 优先使用 icon 字段
         icon_path = enemy_info.get("icon")
         code_name = enemy_info.get("code_name")
-        
-        filename = None
-        
         if icon_path:
-            # 提取文件名
-            basename = os.path.basename(icon_path)
-            name_without_ext = os.path.splitext(basename)[0]
-            filename = f"{name_without_ext}.webp"
+            filenames.append(icon_filename_from_path(icon_path))
         elif code_name:
-             filename = f"{code_name}.webp"
-
-        if filename:
-            url = f"{BASE_URL}{filename}"
-            if download_file(url, os.path.join(ICONS_DIR, filename)):
-                count += 1
-    return count
+            filenames.append(f"{code_name}.webp")
+    return filenames
 
-def process_bangboo_icons(data):
-    count = 0
+def bangboo_icon_files(data):
+    filenames = []
     for bangboo_id, bangboo_info in data.items():
         icon_path = bangboo_info.get("icon")
         if icon_path:
-             # 提取文件名
-            basename = os.path.basename(icon_path)
-            name_without_ext = os.path.splitext(basename)[0]
-            filename = f"{name_without_ext}.webp"
-            
-            url = f"{BASE_URL}{filename}"
-            if download_file(url, os.path.join(ICONS_DIR, filename)):
-                count += 1
-    return count
+            filenames.append(icon_filename_from_path(icon_path))
+    return filenames
+
+def process_character_icons(data, force=False):
+    return download_icons(character_icon_files(data), force)
+
+def process_weapon_icons(data, force=False):
+    return download_icons(weapon_icon_files(data), force)
+
+def process_equipment_icons(data, force=False):
+    return download_icons(equipment_icon_files(data), force)
+
+def process_enemy_icons(data, force=False):
+    return download_icons(enemy_icon_files(data), force)
+
+def process_bangboo_icons(data, force=False):
+    return download_icons(bangboo_icon_files(data), force)
+
+def filter_changed(data, category, only_changed):
+    """--only-changed 模式下只保留本脚本上次确认之后发生变化的 ID（多次 update_data.py 的变更会累积）"""
+    if not only_changed:
+        return data
+    changed = load_changed_ids(category, RECORD_CONSUMER)
+    return {k: v for k, v in data.items() if str(k) in changed}
+
+def record_done(done, category, downloaded, filenames):
+    """该分类的图标全部下载成功时记为已处理（有失败时不确认，下次 --only-changed 重试）"""
+    if downloaded == len(set(filenames)):
+        done.append(category)
 
 def main():
+    global FETCHER, BASE_URL
+
+    parser = argparse.ArgumentParser(description="从 hakush 下载角色/音擎/驱动盘/敌人/邦布图标")
+    parser.add_argument("--only-changed", action="store_true", help="只处理 record_manifest.json 中标记为变化的 ID")
+    parser.add_argument("--concurrency", type=int, default=16, help="并行下载数 (默认 16)")
+    parser.add_argument("--rate", type=float, default=50.0, help="每个主机每秒请求数上限 (默认 50)")
+    parser.add_argument("--base-url", default=BASE_URL, help=f"图标根地址 (默认 {BASE_URL})")
+    args = parser.parse_args()
+
+    FETCHER = Fetcher(concurrency=args.concurrency, rate=args.rate)
+    BASE_URL = args.base_url.rstrip("/") + "/"
+
     print(f"开始更新图标...")
     print(f"目标目录: {ICONS_DIR}")
     ensure_dir(ICONS_DIR)
+    done = []
 
     # 1. 下载静态图标
-    print("\n--- 处理静态图标 ---")
-    for filename in STATIC_ICONS:
-        url = f"{BASE_URL}{filename}"
-        download_file(url, os.path.join(ICONS_DIR, filename))
+    if not args.only_changed:
+        print("\n--- 处理静态图标 ---")
+        download_icons(STATIC_ICONS)
 
     # 2. 处理 Character
     print("\n--- 处理角色图标 ---")
@@ -162,7 +184,8 @@ def main():
     if os.path.exists(char_path):
         with open(char_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            process_character_icons(data)
+            subset = filter_changed(data, "character", args.only_changed)
+            record_done(done, "character", process_character_icons(subset, args.only_changed), character_icon_files(subset))
     else:
         print(f"未找到文件: {char_path}")
 
@@ -172,7 +195,8 @@ def main():
     if os.path.exists(weapon_path):
         with open(weapon_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            process_weapon_icons(data)
+            subset = filter_changed(data, "weapon", args.only_changed)
+            record_done(done, "weapon", process_weapon_icons(subset, args.only_changed), weapon_icon_files(subset))
     else:
         print(f"未找到文件: {weapon_path}")
 
@@ -182,7 +206,8 @@ def main():
     if os.path.exists(equip_path):
         with open(equip_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            process_equipment_icons(data)
+            subset = filter_changed(data, "equipment", args.only_changed)
+            record_done(done, "equipment", process_equipment_icons(subset, args.only_changed), equipment_icon_files(subset))
     else:
         print(f"未找到文件: {equip_path}")
 
@@ -192,7 +217,8 @@ def main():
     if os.path.exists(enemy_path):
         with open(enemy_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            process_enemy_icons(data)
+            subset = filter_changed(data, "enemy", args.only_changed)
+            record_done(done, "enemy", process_enemy_icons(subset, args.only_changed), enemy_icon_files(subset))
     else:
         print(f"未找到文件: {enemy_path}")
 
@@ -202,10 +228,13 @@ def main():
     if os.path.exists(bangboo_path):
         with open(bangboo_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            process_bangboo_icons(data)
+            subset = filter_changed(data, "bangboo", args.only_changed)
+            record_done(done, "bangboo", process_bangboo_icons(subset, args.only_changed), bangboo_icon_files(subset))
     else:
         print(f"未找到文件: {bangboo_path}")
 
+    if done:
+        acknowledge(RECORD_CONSUMER, done)
     print("\n图标更新完成!")
 
 if __name__ == "__main__":
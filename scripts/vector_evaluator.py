@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+向量化评估器（NumPy）
+
+fast_evaluator.py 的批量版本：一次评估一整块组合，口径与 FastEvaluator._leaf
+（即 docs/fast_evaluator_flow.md 的各步骤）一致：
+
+- 列压缩：只有候选盘词条 / 非目标套装 2 件套涉及的属性列随组合变化（K 列），
+  其余属性在整次搜索中是常量，按标量参与计算
+- 每个枚举层的候选盘存为 [n_discs × K] 矩阵；末尾若干层预先展开为按列存储的 [K × R] 尾块
+  （R ≤ tail_rows），前缀层在 Python 中枚举，每个前缀折算为一行常量，与尾块逐列广播相加；
+  尾块按 block_rows 分段评估，临时数组大小有界
+- 套装计数：前缀已凑齐的非目标 2 件套并入常量；还差的套装用尾块计数 [S × R] 生成掩码，按列加上 2 件套
+- 目标四件套：尾块按目标盘数降序排列，满足 "前缀目标盘数 + 尾块目标盘数 >= 4" 的行是一段连续切片
+- TopN：每块先按当前门槛过滤（与门槛同分的行保留），再用 partition 求第 N 名分数，
+  分数不低于它的行（含全部同分行）与已有 TopN 合并，合并时按 (分数降序, 枚举顺序) 截断
+
+最终 TopN 交回 FastEvaluator.full_result，输出结构与 fast_evaluator.search 相同。
+需要 numpy（pip install numpy）。
+"""
+import itertools
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fast_evaluator import (
+    ATK, ATK_, ATK_BASE, DEF, DEF_, DEF_BASE, ELEMENT_KEYS, ELEMENT_TO_BUILDUP_IDX, ELEMENT_TO_BUILDUP_RES_IDX,
+    ELEMENT_TO_DMG_IDX, HP, HP_, HP_BASE, IMPACT, IMPACT_, PROP_IDX, SKILL_TAG_DMG_IDX, STANDARD_BUILDUP_THRESHOLD,
+    DamageBound, FastEvaluator, Precomputed, combo_discs, is_monotone, slot_order,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 尾块最大行数（预展开矩阵约 tail_rows × K × 8 字节）
+DEFAULT_TAIL_ROWS = 1 << 18
+# 每次评估的行数（临时数组约 block_rows × 8 字节 × 数十个）
+DEFAULT_BLOCK_ROWS = 1 << 15
+
+# 快照面板：基础值 -> (百分比, 固定值)；面板值 -> 基础值
+SNAPSHOT_TRIPLETS = {ATK_BASE: (ATK_, ATK), HP_BASE: (HP_, HP), DEF_BASE: (DEF_, DEF)}
+PANEL_TO_BASE = {ATK: ATK_BASE, HP: HP_BASE, DEF: DEF_BASE, IMPACT: IMPACT}
+
+
+class TopN:
+    """按块合并的 TopN（分数降序；同分按枚举顺序靠前者优先，与 search 的堆一致）"""
+
+    def __init__(self, n: int, width: int):
+        self.n = n
+        self.scores = np.empty(0)
+        self.combos = np.empty((0, width), dtype=np.int64)
+
+    @property
+    def threshold(self) -> float:
+        return float(self.scores.min()) if len(self.scores) >= self.n else -np.inf
+
+    def offer(self, scores, combos_of) -> None:
+        """scores: 本块分数；combos_of(rows) -> 对应行的各层下标 [len(rows) × width]"""
+        rows = np.flatnonzero(scores >= self.threshold)
+        if rows.size == 0:
+            return
+        if rows.size > self.n:
+            # 与第 N 名同分的行全部保留，取舍交给 merge 按枚举顺序决定（argpartition 会任意丢弃）
+            cutoff = np.partition(scores[rows], -self.n)[-self.n]
+            rows = rows[scores[rows] >= cutoff]
+        self.merge(scores[rows], combos_of(rows))
+
+    def merge(self, scores, combos) -> None:
+        merged_scores = np.concatenate([self.scores, scores])
+        merged_combos = np.concatenate([self.combos, combos])
+        if len(merged_scores) > self.n:
+            # 先按 (分数降序, 枚举顺序) 排序再截断，保证边界同分时结果确定
+            keys = [merged_combos[:, c] for c in range(merged_combos.shape[1] - 1, -1, -1)]
+            order = np.lexsort(keys + [-merged_scores])[:self.n]
+            merged_scores, merged_combos = merged_scores[order], merged_combos[order]
+        self.scores, self.combos = merged_scores, merged_combos
+
+    def ranked(self) -> List[Tuple[float, Tuple[int, ...]]]:
+        keys = [self.combos[:, c] for c in range(self.combos.shape[1] - 1, -1, -1)]
+        order = np.lexsort(keys + [-self.scores])
+        return [(float(self.scores[i]), tuple(int(x) for x in self.combos[i])) for i in order]
+
+
+class VectorEvaluator:
+    """
+    块评估引擎
+
+    - slots：按 slot_order 排好的各层候选盘（外层少、内层多，与 search 相同）
+    - 前 prefix_levels 层逐个枚举，后 tail_levels 层展开为尾块
+    - bound=True 时启用分支定界：TopN 满后，前缀的上界（DamageBound）低于门槛时跳过整块，
+      跳过的组合数累计在 bounded。上界只在前缀层检查，尾块内不检查：伤害目标的上界要到离叶子
+      一两层时才收紧到能剪枝，而前缀通常只有一两层，所以实际上只有 atk / hp 目标（且前缀至少两层）
+      会跳过；伤害目标的剪枝请用 scalar / incremental 的 +bound（逐层检查）
+    """
+
+    def __init__(self, pre: Precomputed, block_rows: int = DEFAULT_BLOCK_ROWS, tail_rows: int = DEFAULT_TAIL_ROWS,
+                 min_prefix_levels: int = 1, bound: bool = False):
+        if np is None:
+            raise RuntimeError("向量化评估器需要 numpy（pip install numpy）")
+        self.pre = pre
+        self.scalar = FastEvaluator(pre)
+        self.order = slot_order(pre.discs_by_slot)
+        self.slots = [pre.discs_by_slot[s] for s in self.order]
+        self.counts = [len(s) for s in self.slots]
+        if 0 in self.counts:
+            raise ValueError("没有可用的驱动盘组合")
+        self.has_target = bool(pre.target_set_id)
+        self.base = np.array(self.scalar.base_stats)
+        self.merged_buff = np.array(self.scalar.merged_buff)
+
+        # 变化列：候选盘词条 + 非目标套装 2 件套
+        set_idxs = sorted({d.set_idx for slot in self.slots for d in slot if not d.is_target})
+        two_piece = {s: pre.set_two_piece.get(s) or [] for s in set_idxs}
+        cols = {i for slot in self.slots for d in slot for i, _ in d.stats}
+        cols.update(i for row in two_piece.values() for i, v in enumerate(row) if v)
+        self.cols = sorted(cols)
+        self.col_pos = {c: k for k, c in enumerate(self.cols)}
+        width = len(self.cols)
+
+        # 非目标套装：只有 2 件套在变化列上有数值的才需要计数
+        self.sets = [s for s in set_idxs if any(two_piece[s])]
+        set_pos = {s: j for j, s in enumerate(self.sets)}
+        self.two_piece = np.array([[two_piece[s][c] for c in self.cols] for s in self.sets]).reshape(len(self.sets), width)
+
+        self.stats, self.set_counts, self.targets = [], [], []
+        for slot in self.slots:
+            stats = np.zeros((len(slot), width))
+            counts = np.zeros((len(slot), len(self.sets)), dtype=np.int8)
+            targets = np.zeros(len(slot), dtype=np.int8)
+            for r, disc in enumerate(slot):
+                for i, v in disc.stats:
+                    stats[r, self.col_pos[i]] += v
+                if disc.is_target:
+                    targets[r] = 1
+                elif disc.set_idx in set_pos:
+                    counts[r, set_pos[disc.set_idx]] = 1
+            self.stats.append(stats)
+            self.set_counts.append(counts)
+            self.targets.append(targets)
+
+        self.block_rows = block_rows
+        self._build_tail(tail_rows, min_prefix_levels)
+        self.bounds = DamageBound(pre, self.slots) if bound and is_monotone(pre) else None
+        self.bounded = 0
+
+    def _build_tail(self, tail_rows: int, min_prefix_levels: int) -> None:
+        """末尾若干层展开为尾块（行数不超过 tail_rows，至少一层，前缀至少保留 min_prefix_levels 层）"""
+        tail_levels, rows = 1, self.counts[5]
+        while tail_levels < 6 - min_prefix_levels and rows * self.counts[5 - tail_levels] <= tail_rows:
+            rows *= self.counts[5 - tail_levels]
+            tail_levels += 1
+        self.tail_levels = tail_levels
+        self.prefix_levels = 6 - tail_levels
+
+        stats, counts, targets = self.stats[5], self.set_counts[5], self.targets[5]
+        for level in range(4, self.prefix_levels - 1, -1):
+            rows = self.counts[level] * len(targets)
+            stats = (self.stats[level][:, None, :] + stats[None, :, :]).reshape(rows, stats.shape[1])
+            counts = (self.set_counts[level][:, None, :] + counts[None, :, :]).reshape(rows, counts.shape[1])
+            targets = (self.targets[level][:, None] + targets[None, :]).reshape(rows)
+
+        # 按目标盘数降序排列：满足四件套的行是连续前缀切片（零拷贝）
+        perm = np.argsort(-targets, kind="stable")
+        self.tail_perm = perm
+        # 按列存储（每列连续），块内逐列读取
+        self.tail_stats = np.ascontiguousarray(stats[perm].T)
+        self.tail_set_counts = np.ascontiguousarray(counts[perm].T)
+        self.tail_set_max = self.tail_set_counts.max(axis=1) if len(self.sets) else np.zeros(0, dtype=np.int8)
+        tail_targets = targets[perm]
+        # need -> 尾块目标盘数 >= need 的行数
+        self.tail_feasible = [int(np.count_nonzero(tail_targets >= need)) for need in range(7)]
+        self.tail_rows = len(perm)
+
+    # ------------------------------------------------------------------
+    # 块评估
+    # ------------------------------------------------------------------
+
+    def prefix_block(self, prefix: Sequence[int]) -> Optional[dict]:
+        """
+        前缀的块常量；整块不满足四件套时返回 None
+
+        - rows：尾块中满足四件套的行数（切片 [0, rows)）
+        - acc：变化列上的 局外底座 + 前缀盘（不含 2 件套，对应 accumulator）
+        - panel：acc + 前缀已凑齐的非目标 2 件套（对应 accumulator + dyn2pc 的常量部分）
+        - partial：[(套装列号, 尾块还需的件数)]，2 件套是否生效取决于尾块行
+        """
+        rows = self.tail_rows
+        if self.has_target:
+            need = max(0, 4 - sum(int(self.targets[l][i]) for l, i in enumerate(prefix)))
+            rows = self.tail_feasible[need]
+            if rows == 0:
+                return None
+        acc = self.base[self.cols] + sum(self.stats[l][i] for l, i in enumerate(prefix))
+        panel = acc.copy()
+        partial = []
+        if self.sets:
+            prefix_counts = sum(self.set_counts[l][i] for l, i in enumerate(prefix))
+            for j, count in enumerate(prefix_counts):
+                if count >= 2:
+                    panel += self.two_piece[j]
+                elif count + self.tail_set_max[j] >= 2:
+                    partial.append((j, 2 - int(count)))
+        return {"rows": rows, "acc": acc, "panel": panel, "partial": partial}
+
+    def block_scores(self, block: dict, lo: int, hi: int):
+        """尾块行 [lo, hi) 上每个组合的可变伤害（不含通用乘区；对应 FastEvaluator._leaf）"""
+        pre, base, mb, pos = self.pre, self.base, self.merged_buff, self.col_pos
+        tail = self.tail_stats
+        masks = [
+            (self.tail_set_counts[j, lo:hi] >= need, self.two_piece[j])
+            for j, need in block["partial"]
+        ]
+
+        def varying(k: int, const: float):
+            value = tail[k, lo:hi] + const
+            for mask, two_piece in masks:
+                if two_piece[k]:
+                    np.add(value, two_piece[k], out=value, where=mask)
+            return value
+
+        def acc(c):
+            k = pos.get(c)
+            return base[c] if k is None else tail[k, lo:hi] + block["acc"][k]
+
+        def panel(c):
+            k = pos.get(c)
+            return base[c] if k is None else varying(k, block["panel"][k])
+
+        eb = {}
+
+        def get(c):
+            if c not in eb:
+                k = pos.get(c)
+                eb[c] = base[c] + mb[c] if k is None else varying(k, block["panel"][k] + mb[c])
+            return eb[c]
+
+        # 快照1 -> 快照2（按需计算：大多数情况下只用到攻击力）
+        snap2 = {}
+
+        def snapshot2(c):
+            if c not in snap2:
+                if c == IMPACT:
+                    snap2[c] = panel(IMPACT) * (1 + panel(IMPACT_)) * (1 + mb[IMPACT_]) + mb[IMPACT]
+                else:
+                    percent, flat = SNAPSHOT_TRIPLETS[c]
+                    snap2[c] = (panel(c) * (1 + panel(percent)) + panel(flat)) * (1 + mb[percent]) + mb[flat]
+            return snap2[c]
+
+        # 快照3：转换类 Buff（源取快照2，不链式）
+        snap3 = {}
+        for conv in pre.conversion_buffs:
+            value = snapshot2(conv.from_idx) if conv.from_idx in SNAPSHOT_TRIPLETS or conv.from_idx == IMPACT else acc(conv.from_idx)
+            converted = np.maximum(0.0, value - conv.threshold) * conv.ratio
+            if conv.max_value is not None:
+                converted = np.minimum(converted, conv.max_value)
+            if conv.to_idx in PANEL_TO_BASE:
+                snap3[conv.to_idx] = snap3.get(conv.to_idx, 0.0) + converted
+            else:
+                eb[conv.to_idx] = get(conv.to_idx) + converted
+
+        def snapshot3(c):
+            return snapshot2(PANEL_TO_BASE[c]) + snap3.get(c, 0.0)
+
+        rows = hi - lo
+        if pre.objective in ("hp", "atk"):
+            return np.broadcast_to(snapshot3(HP if pre.objective == "hp" else ATK), (rows,))
+
+        atk3 = snapshot3(ATK)
+        if self.scalar.has_mingpo:
+            eb[PROP_IDX["PEN"]] = 0.0
+            eb[PROP_IDX["PEN_"]] = 0.0
+            eb[PROP_IDX["SHEER_FORCE"]] = get(PROP_IDX["SHEER_FORCE"]) + snapshot2(HP_BASE) * 0.1 + snapshot2(ATK_BASE) * 0.3
+
+        fm = pre.fixed
+        def_red = fm.base_def_red + get(PROP_IDX["DEF_RED_"])
+        def_ign = fm.base_def_ign + get(PROP_IDX["DEF_IGN_"])
+        effective_def = np.maximum(
+            0.0, self.scalar.base_def * (1 - def_red - def_ign) * (1 - get(PROP_IDX["PEN_"])) - get(PROP_IDX["PEN"])
+        )
+        def_mult = fm.level_base / (effective_def + fm.level_base)
+        crit_zone = 1 + np.minimum(1.0, np.maximum(0.0, get(PROP_IDX["CRIT_"]))) * get(PROP_IDX["CRIT_DMG_"])
+
+        # 同元素 / 同标签的技能共用增伤区，同元素共用异常的精通 / 积蓄区
+        direct_base = atk3 * crit_zone * def_mult
+        bonus_cache, anomaly_cache = {}, {}
+        total = 0.0
+        for skill in pre.skills:
+            key = (skill.element, tuple(skill.tags))
+            if key not in bonus_cache:
+                bonus_cache[key] = self._dmg_bonus(get, skill)
+            dmg_bonus = bonus_cache[key]
+            if skill.is_penetration:
+                total = total + (
+                    get(PROP_IDX["SHEER_FORCE"]) * skill.ratio * dmg_bonus * crit_zone
+                    * (1 + get(PROP_IDX["SHEER_DMG_"]))
+                )
+            else:
+                total = total + direct_base * (skill.ratio * dmg_bonus)
+            if skill.anomaly_buildup > 0:
+                if skill.element not in anomaly_cache:
+                    anomaly_cache[skill.element] = self._anomaly_zones(get, atk3, def_mult, skill.element)
+                scale, rate = anomaly_cache[skill.element]
+                # 触发次数 procs ∈ [0, 1]，紊乱的 min(procs, 5) 恒等于 procs
+                procs = np.minimum(1.0, np.maximum(0.0, skill.anomaly_buildup * rate))
+                total = total + scale * dmg_bonus * procs
+
+        if pre.special_anomaly and pre.special_anomaly.get("element") == "lieshuang":
+            total = total + self._lieshuang_damage(get, atk3, def_mult, crit_zone)
+
+        return np.broadcast_to(total, (rows,))
+
+    @staticmethod
+    def _dmg_bonus(get, skill):
+        bonus = 1 + get(PROP_IDX["DMG_"])
+        if skill.element in ELEMENT_TO_DMG_IDX:
+            bonus = bonus + get(ELEMENT_TO_DMG_IDX[skill.element])
+        for tag in skill.tags:
+            if tag in SKILL_TAG_DMG_IDX:
+                bonus = bonus + get(SKILL_TAG_DMG_IDX[tag])
+        return bonus
+
+    def _anomaly_zones(self, get, atk, def_mult, element: int):
+        """
+        异常 + 紊乱伤害的与技能无关部分（对应 FastEvaluator.anomaly_damage）
+
+        返回 (scale, rate)：单个技能的伤害 = scale × 增伤区 × clip(积蓄 × rate, 0, 1)
+        """
+        scalar, pre = self.scalar, self.pre
+        prof_mult = np.minimum(10.0, np.maximum(0.0, get(PROP_IDX["ANOM_PROF"]) / 100))
+        mastery = get(PROP_IDX["ANOM_MAS"])
+        mastery_zone = np.where(mastery > 0, mastery / 100, 1.0)
+        efficiency = 1 + get(PROP_IDX["ANOM_BUILDUP_"])
+        if element in ELEMENT_TO_BUILDUP_IDX:
+            efficiency = efficiency + get(ELEMENT_TO_BUILDUP_IDX[element])
+        res_idx = ELEMENT_TO_BUILDUP_RES_IDX.get(element, ELEMENT_TO_BUILDUP_RES_IDX[200])
+        resistance = 1 - get(PROP_IDX["ANOM_BUILDUP_RES_"]) - get(res_idx)
+        zone = np.maximum(0.0, mastery_zone * efficiency * resistance * scalar.distance_mult)
+
+        threshold = pre.anomaly_thresholds.get(ELEMENT_KEYS.get(element, "physical"), STANDARD_BUILDUP_THRESHOLD)
+        constant = (
+            (pre.anomaly_total_ratio + pre.disorder_total_ratio)
+            * scalar.anomaly_dmg_mult * scalar.anomaly_crit_mult * scalar.level_mult
+        )
+        return atk * prof_mult * def_mult * constant, zone / threshold
+
+    def _lieshuang_damage(self, get, atk, def_mult, crit_zone):
+        """烈霜伤害（对应 FastEvaluator.lieshuang_damage）"""
+        pre = self.pre
+        dmg_bonus = 1 + get(PROP_IDX["DMG_"]) + get(ELEMENT_TO_DMG_IDX[202])
+        buildup_mult = 1 + get(PROP_IDX["ANOM_BUILDUP_"]) + get(ELEMENT_TO_BUILDUP_IDX[202])
+        buildup = sum(s.anomaly_buildup for s in pre.skills if s.element == 202)
+        if buildup == 0 and pre.skills:
+            buildup = pre.skills[0].anomaly_buildup
+        procs = buildup * buildup_mult / pre.anomaly_thresholds.get("ice", 600.0)
+        return atk * pre.special_anomaly["ratio"] * dmg_bonus * crit_zone * def_mult * procs
+
+    # ------------------------------------------------------------------
+    # 枚举
+    # ------------------------------------------------------------------
+
+    def tail_combos(self, prefix: Sequence[int], rows):
+        """尾块行 -> 各层下标 [len(rows) × 6]"""
+        tail = np.unravel_index(self.tail_perm[rows], self.counts[self.prefix_levels:])
+        combos = np.empty((len(rows), 6), dtype=np.int64)
+        combos[:, :self.prefix_levels] = prefix
+        for j, indices in enumerate(tail):
+            combos[:, self.prefix_levels + j] = indices
+        return combos
+
+    def prefixes(self, worker_id: int = 0, total_workers: int = 1) -> Iterable[Tuple[int, ...]]:
+        """前缀（第一层按 [n0*w/W, n0*(w+1)/W) 分片，与 search 一致）"""
+        lo = self.counts[0] * worker_id // total_workers
+        hi = self.counts[0] * (worker_id + 1) // total_workers
+        return itertools.product(range(lo, hi), *(range(n) for n in self.counts[1:self.prefix_levels]))
+
+    def run(self, prefixes: Iterable[Sequence[int]], top: TopN) -> Tuple[int, int]:
+        """评估给定前缀下的全部组合，结果并入 top；返回 (评估数, 剪枝数)"""
+        processed = pruned = 0
+        for prefix in prefixes:
+            block = self.prefix_block(prefix)
+            if block is None:
+                pruned += self.tail_rows
+                continue
+            rows = block["rows"]
+            pruned += self.tail_rows - rows
+            if self.bounds is not None and self.prefix_bound(prefix) < top.threshold:
+                self.bounded += rows
+                continue
+            processed += rows
+            for lo in range(0, rows, self.block_rows):
+                hi = min(rows, lo + self.block_rows)
+                scores = self.block_scores(block, lo, hi)
+                top.offer(scores, lambda r, prefix=prefix, lo=lo: self.tail_combos(prefix, r + lo))
+        return processed, pruned
+
+    def prefix_bound(self, prefix: Sequence[int]) -> float:
+        """前缀下所有组合的伤害上界"""
+        scalar = self.scalar
+        scalar.begin()
+        for level, i in enumerate(prefix):
+            scalar.push(self.slots[level][i])
+        return self.bounds.value(scalar, len(prefix))
+
+    def builds(self, top: TopN) -> List[dict]:
+        return [self.scalar.full_result(combo_discs(self.slots, self.order, combo)) for _, combo in top.ranked()]
+
+
+def search(pre: Precomputed, top_n: int = 10, worker_id: int = 0, total_workers: int = 1,
+           block_rows: int = DEFAULT_BLOCK_ROWS, tail_rows: int = DEFAULT_TAIL_ROWS, bound: bool = False) -> dict:
+    """与 fast_evaluator.search 相同的输入输出，按块向量化评估"""
+    start = time.perf_counter()
+    engine = VectorEvaluator(pre, block_rows, tail_rows, bound=bound)
+    top = TopN(top_n, 6)
+    processed, pruned = engine.run(engine.prefixes(worker_id, total_workers), top)
+    builds = engine.builds(top)
+    elapsed = time.perf_counter() - start
+    stats = {
+        "totalProcessed": processed,
+        "prunedCount": pruned,
+        "timeMs": elapsed * 1000,
+        "averageSpeed": (processed + pruned + engine.bounded) / elapsed if elapsed > 0 else 0.0,
+    }
+    if bound:
+        stats["boundSkipped"] = engine.bounded
+    return {"builds": builds, "stats": stats}
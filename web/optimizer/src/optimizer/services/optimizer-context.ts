@@ -41,6 +41,8 @@ import type {
     FastOptimizationRequest,
     PrecomputedSkillParams,
 } from '../types/precomputed';
+import { setBonusSetCount, type SetBonusTable } from '../types/set-bonus-table';
+import { buildSnapshotStats, type AgentSnapshots } from '../types/agent-snapshot';
 
 /**
  * 技能参数（用于构建 SerializedSkill）
@@ -674,6 +676,10 @@ export class OptimizerContext {
         teammateConversionBuffs?: { buff: Buff; teammateStats: Float64Array }[];
         // deprecated: legacy comment kept to preserve line history
         buffStatusMap?: Map<string, { isActive: boolean }>;
+        /** 套装加成表（存在时表内套装使用稳定的 setIdx，2 件套由 Worker 直接从表中读取） */
+        setBonusTable?: SetBonusTable | null;
+        /** 角色静态属性快照（存在且包含该角色时直接读取局外白值，不再从 character/{id}.json 构建） */
+        agentSnapshots?: AgentSnapshots | null;
         config?: {
             topN?: number;
             workerId?: number;
@@ -696,6 +702,8 @@ export class OptimizerContext {
             externalBuffs = [],
             teammateConversionBuffs = [],
             buffStatusMap,
+            setBonusTable,
+            agentSnapshots,
             config = {},
         } = options;
 
@@ -740,9 +748,23 @@ export class OptimizerContext {
         };
 
         // 1a. 添加角色静态属性（仅 out_of_combat）
-        const baseProps = agent.getCharacterBaseStats();
-        for (const [prop, value] of baseProps.out_of_combat.entries()) {
-            addToPropArray(mergedStats, prop, value);
+        // 优先使用离线快照（等级 / 突破 / 核心技等级组合行向量）；快照缺失或不含该角色时按 Agent 对象模型计算
+        const snapshotStats = agentSnapshots
+            ? buildSnapshotStats(agentSnapshots.manifest, agentSnapshots.binary, agent.game_id, {
+                  level: agent.level,
+                  promotion: agent.breakthrough,
+                  core: agent.core_skill,
+              })
+            : null;
+        if (snapshotStats) {
+            for (let i = 0; i < snapshotStats.length; i++) {
+                mergedStats[i] += snapshotStats[i];
+            }
+        } else {
+            const baseProps = agent.getCharacterBaseStats();
+            for (const [prop, value] of baseProps.out_of_combat.entries()) {
+                addToPropArray(mergedStats, prop, value);
+            }
         }
 
         // 1b. 添加武器静态属性（仅 out_of_combat）
@@ -913,6 +935,7 @@ export class OptimizerContext {
             if (setId === targetSetId) continue; // 跳过目标套装
             if (seenSets.has(setId)) continue;
             seenSets.add(setId);
+            if (setBonusTable && setId in setBonusTable.setIdxById) continue; // Worker 从套装加成表读取
 
             const twoPiece = createPropArray();
             const twoPieceProps = disc.getSetBuff(DriveDiskSetBonus.TWO_PIECE);
@@ -954,7 +977,9 @@ export class OptimizerContext {
             return 0;
         };
 
-        const setIdToIdx = new Map<string, number>();
+        // 套装加成表中的套装使用表中的 setIdx，其余套装追加在表之后
+        const setIdToIdx = new Map<string, number>(Object.entries(setBonusTable?.setIdxById ?? {}));
+        let nextSetIdx = setBonusTable ? setBonusSetCount(setBonusTable) : 0;
 
         for (const disc of discs) {
             const slotIdx = disc.position - 1;
@@ -964,7 +989,7 @@ export class OptimizerContext {
             const setId = disc.game_id;
             let setIdx = setIdToIdx.get(setId);
             if (setIdx === undefined) {
-                setIdx = setIdToIdx.size;
+                setIdx = nextSetIdx++;
                 setIdToIdx.set(setId, setIdx);
             }
 
@@ -1075,6 +1100,7 @@ export class OptimizerContext {
             otherSetTwoPieceSparse: Object.fromEntries(
                 Object.entries(otherSetTwoPiece).map(([k, v]) => [k, toSparseDelta(v)])
             ),
+            setBonusTable: setBonusTable ?? undefined,
             fixedMultipliers,
             skillsParams: skills.map(s => this.createSkillParams(s, isPenetration)),
             objective: (() => {
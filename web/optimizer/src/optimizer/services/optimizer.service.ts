@@ -24,6 +24,7 @@ import { IDX_TO_PROP_TYPE } from '../types/property-index';
 import { PRESETS_STORAGE_KEY, PRESETS_STORAGE_VERSION, type PresetStorage } from '../types/presets';
 import { PropertyType } from '../../model/base';
 import { Team } from '../../model/team';
+import { dataLoaderService } from '../../services/data-loader.service';
 // Actually, let's redefine the mapping or move it to a shared place. 
 // For now, I will define a local mapping to avoid dependency on View.
 const SKILL_TYPE_TO_KEY: Record<string, string> = {
@@ -443,6 +444,8 @@ export class OptimizerService {
             constraints: options.constraints,
             externalBuffs: options.externalBuffs,
             buffStatusMap: options.buffStatusMap,
+            setBonusTable: await dataLoaderService.getSetBonusTable(),
+            agentSnapshots: await dataLoaderService.getAgentSnapshots(),
             config: {
                 topN: this.topN,
                 progressInterval: 10000,
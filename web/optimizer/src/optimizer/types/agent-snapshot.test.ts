@@ -0,0 +1,93 @@
+import { describe, it, expect } from 'vitest';
+import {
+  buildSnapshotStats,
+  createAgentSnapshots,
+  snapshotBuffStats,
+  type AgentSnapshotManifest,
+  type SnapshotBuffStats,
+} from './agent-snapshot';
+import { PROP_IDX } from './property-index';
+
+const ROWS = [
+  'base',
+  'growth',
+  ...Array.from({ length: 6 }, (_, p) => `promotion${p}`),
+  ...Array.from({ length: 7 }, (_, c) => `core${c + 1}`),
+];
+
+/**
+ * 按 scripts/build_agent_snapshots.py 的布局构造：两列（ATK_BASE, CRIT_），一个角色
+ */
+function buildFixture(): { manifest: AgentSnapshotManifest; binary: ArrayBuffer } {
+  const columns = [PROP_IDX.ATK_BASE, PROP_IDX.CRIT_];
+  const values = new Float64Array(ROWS.length * columns.length);
+  const set = (row: string, col: number, value: number) => {
+    values[ROWS.indexOf(row) * columns.length + col] = value;
+  };
+  set('base', 0, 95);
+  set('base', 1, 0.05);
+  set('growth', 0, 54230);
+  set('promotion5', 0, 169);
+  set('core7', 0, 75);
+  set('core7', 1, 0.048);
+
+  return {
+    manifest: {
+      version: 1,
+      binary: 'agent_snapshots.bin',
+      byteLength: values.byteLength,
+      propCount: PROP_IDX.TOTAL_PROPS,
+      columns,
+      columnNames: ['ATK_BASE', 'CRIT_'],
+      rows: ROWS,
+      characters: { '1011': { offset: 0, name: '安比' } },
+    },
+    binary: values.buffer,
+  };
+}
+
+describe('buildSnapshotStats', () => {
+  it('combines base, growth, promotion and core rows like Agent.getGrowthStats', () => {
+    const { manifest, binary } = buildFixture();
+    const stats = buildSnapshotStats(manifest, binary, '1011', { level: 60, promotion: 5, core: 7 })!;
+
+    expect(stats).toHaveLength(PROP_IDX.TOTAL_PROPS);
+    expect(stats[PROP_IDX.ATK_BASE]).toBe(95 + (59 * 54230) / 10000 + 169 + 75);
+    expect(stats[PROP_IDX.CRIT_]).toBeCloseTo(0.098);
+    expect(stats[PROP_IDX.HP_BASE]).toBe(0);
+  });
+
+  it('uses level 1 values without promotion or core bonuses', () => {
+    const { manifest, binary } = buildFixture();
+    const stats = buildSnapshotStats(manifest, binary, '1011', { level: 1, promotion: 0, core: 1 })!;
+    expect(stats[PROP_IDX.ATK_BASE]).toBe(95);
+  });
+
+  it('returns null for unknown agents', () => {
+    const { manifest, binary } = buildFixture();
+    expect(buildSnapshotStats(manifest, binary, '9999', { level: 1, promotion: 0, core: 1 })).toBeNull();
+  });
+});
+
+describe('createAgentSnapshots', () => {
+  it('accepts a manifest whose size matches the binary', () => {
+    const { manifest, binary } = buildFixture();
+    expect(createAgentSnapshots(manifest, binary).manifest).toBe(manifest);
+  });
+
+  it('rejects mismatched width or size so callers fall back to the agent model', () => {
+    const { manifest, binary } = buildFixture();
+    expect(() => createAgentSnapshots({ ...manifest, propCount: 10 }, binary)).toThrow();
+    expect(() => createAgentSnapshots(manifest, binary.slice(8))).toThrow();
+  });
+});
+
+describe('snapshotBuffStats', () => {
+  it('expands sparse buff stats into property arrays', () => {
+    const buff: SnapshotBuffStats = ['1011_talent_1', [[PROP_IDX.ATK_, 0.1]], [[PROP_IDX.CRIT_, 0.12]]];
+    const { outOfCombat, inCombat } = snapshotBuffStats(buff);
+    expect(outOfCombat[PROP_IDX.ATK_]).toBe(0.1);
+    expect(inCombat[PROP_IDX.CRIT_]).toBe(0.12);
+    expect(inCombat[PROP_IDX.ATK_]).toBe(0);
+  });
+});
@@ -0,0 +1,116 @@
+/**
+ * 角色静态属性快照
+ *
+ * 对应 scripts/build_agent_snapshots.py 的输出：
+ * - agent_snapshots.json：清单（列 -> PROP_IDX、每个角色的起始行、Buff 属性）
+ * - agent_snapshots.bin：小端 Float64 行向量，每个角色 rows.length 行，每行 columns.length 列
+ *
+ * 局外面板 = base + ((level - 1) * growth) / 10000 + promotion[突破] + core[核心技等级 - 1]，
+ * 与 Agent.getGrowthStats / getBaseStats / getCoreSkillStats 的计算方式相同，
+ * 优化开始时无需再从 character/{id}.json 构建 Agent 对象模型。
+ */
+
+import { PROP_IDX } from './property-index';
+
+/** [Buff ID, 局外 [PROP_IDX, 数值][], 局内 [PROP_IDX, 数值][]] */
+export type SnapshotBuffStats = [string, [number, number][], [number, number][]];
+
+export interface AgentSnapshotEntry {
+  /** 在 bin 中的起始行 */
+  offset: number;
+  name: string;
+  buffs?: SnapshotBuffStats[];
+}
+
+export interface AgentSnapshotManifest {
+  version: number;
+  binary: string;
+  byteLength: number;
+  propCount: number;
+  /** 保存的列对应的 PROP_IDX（升序） */
+  columns: number[];
+  columnNames: string[];
+  /** 每个角色的行布局：base, growth, promotion0..5, core1..7 */
+  rows: string[];
+  characters: Record<string, AgentSnapshotEntry>;
+}
+
+export const AGENT_SNAPSHOT_VERSION = 1;
+
+/** 已加载的快照（清单 + 二进制行向量） */
+export interface AgentSnapshots {
+  manifest: AgentSnapshotManifest;
+  binary: ArrayBuffer;
+}
+
+/**
+ * 校验清单与二进制后组合为 AgentSnapshots（版本、列宽或大小不符时抛出异常，由调用方回退）
+ */
+export function createAgentSnapshots(manifest: AgentSnapshotManifest, binary: ArrayBuffer): AgentSnapshots {
+  if (manifest.version !== AGENT_SNAPSHOT_VERSION) {
+    throw new Error(`Unsupported agent snapshot version: ${manifest.version}`);
+  }
+  if (manifest.propCount !== PROP_IDX.TOTAL_PROPS) {
+    throw new Error(`Agent snapshot width ${manifest.propCount} != PROP_IDX.TOTAL_PROPS ${PROP_IDX.TOTAL_PROPS}`);
+  }
+  const expected = Object.keys(manifest.characters).length * manifest.rows.length * manifest.columns.length * 8;
+  if (binary.byteLength !== expected || manifest.byteLength !== expected) {
+    throw new Error(`Agent snapshot size mismatch: expected ${expected}, got ${binary.byteLength}`);
+  }
+  return { manifest, binary };
+}
+
+export interface AgentSnapshotQuery {
+  level: number;
+  /** 突破等级 0-5 */
+  promotion: number;
+  /** 核心技等级 1-7 */
+  core: number;
+}
+
+/**
+ * 还原某个角色的局外属性数组（长度 PROP_IDX.TOTAL_PROPS），角色不存在时返回 null
+ */
+export function buildSnapshotStats(
+  manifest: AgentSnapshotManifest,
+  binary: ArrayBuffer,
+  agentId: string,
+  query: AgentSnapshotQuery
+): Float64Array | null {
+  const entry = manifest.characters[agentId];
+  if (!entry) return null;
+  if (manifest.version !== AGENT_SNAPSHOT_VERSION) {
+    throw new Error(`Unsupported agent snapshot version: ${manifest.version}`);
+  }
+
+  const width = manifest.columns.length;
+  const rows = new Float64Array(binary, entry.offset * width * 8, manifest.rows.length * width);
+  const rowStart = (name: string): number => {
+    const index = manifest.rows.indexOf(name);
+    if (index < 0) throw new Error(`Agent snapshot row not found: ${name}`);
+    return index * width;
+  };
+
+  const base = rowStart('base');
+  const growth = rowStart('growth');
+  const promotion = rowStart(`promotion${query.promotion}`);
+  const core = rowStart(`core${Math.max(1, query.core)}`);
+
+  const stats = new Float64Array(PROP_IDX.TOTAL_PROPS);
+  for (let i = 0; i < width; i++) {
+    stats[manifest.columns[i]] =
+      rows[base + i] + ((query.level - 1) * rows[growth + i]) / 10000 + rows[promotion + i] + rows[core + i];
+  }
+  return stats;
+}
+
+/**
+ * 将快照中的 Buff 属性还原为属性数组（局外, 局内）
+ */
+export function snapshotBuffStats(buff: SnapshotBuffStats): { outOfCombat: Float64Array; inCombat: Float64Array } {
+  const outOfCombat = new Float64Array(PROP_IDX.TOTAL_PROPS);
+  const inCombat = new Float64Array(PROP_IDX.TOTAL_PROPS);
+  for (const [idx, value] of buff[1]) outOfCombat[idx] += value;
+  for (const [idx, value] of buff[2]) inCombat[idx] += value;
+  return { outOfCombat, inCombat };
+}
@@ -6,3 +6,5 @@ export * from './serialized';
 export * from './presets';
 export * from './property-index';
 export * from './precomputed';
+export * from './agent-snapshot';
+export * from './set-bonus-table';
@@ -7,6 +7,7 @@
 
 import { PROP_IDX } from './property-index';
 import { EnemyStats } from '../../model/enemy';
+import type { SetBonusTable } from './set-bonus-table';
 
 /**
  * 转换类 Buff 的预处理数据
@@ -204,6 +205,13 @@ export interface PrecomputedData {
   otherSetTwoPiece: Record<string, Float64Array>;
   otherSetTwoPieceSparse?: Record<string, SparseDelta>;
 
+  /**
+   * 套装加成表（scripts/build_set_bonus_table.py）
+   * - 存在时表内套装的 setIdx 即表中的 setIdx，2 件套直接取表中的行视图；
+   *   otherSetTwoPiece 只包含表中没有的套装
+   */
+  setBonusTable?: SetBonusTable;
+
   /**
    * 固定乘区（不受驱动盘影响）
    */
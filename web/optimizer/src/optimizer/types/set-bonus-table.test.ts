@@ -0,0 +1,65 @@
+import { describe, it, expect } from 'vitest';
+import {
+  createSetBonusTable,
+  setBonusRow,
+  setBonusSetCount,
+  type SetBonusTableManifest,
+} from './set-bonus-table';
+import { PROP_IDX } from './property-index';
+
+/**
+ * 按 scripts/build_set_bonus_table.py 的布局构造：两个套装，每个套装 twoPiece / fourPiece 两行
+ */
+function buildFixture(): { manifest: SetBonusTableManifest; binary: ArrayBuffer } {
+  const width = PROP_IDX.TOTAL_PROPS;
+  const values = new Float64Array(2 * 2 * width);
+  values[0 * width + PROP_IDX.CRIT_] = 0.08;
+  values[1 * width + PROP_IDX.ATK_] = 0.09;
+  values[2 * width + PROP_IDX.PEN_] = 0.08;
+  values[3 * width + PROP_IDX.ULTIMATE_ATK_DMG_] = 0.2;
+
+  return {
+    manifest: {
+      version: 1,
+      hash: '0123456789abcdef',
+      binary: 'set_bonus_table.bin',
+      byteLength: values.byteLength,
+      propCount: width,
+      rows: ['twoPiece', 'fourPiece'],
+      sets: [
+        { setIdx: 0, id: '31000', name: '啄木鸟电音', fourPieceStacks: [] },
+        { setIdx: 1, id: '31100', name: '河豚电音', fourPieceStacks: [] },
+      ],
+    },
+    binary: values.buffer,
+  };
+}
+
+describe('createSetBonusTable', () => {
+  it('maps set IDs to their stable setIdx', () => {
+    const { manifest, binary } = buildFixture();
+    const table = createSetBonusTable(manifest, binary);
+    expect(table.setIdxById).toEqual({ '31000': 0, '31100': 1 });
+    expect(setBonusSetCount(table)).toBe(2);
+  });
+
+  it('rejects binaries that do not match the manifest', () => {
+    const { manifest, binary } = buildFixture();
+    expect(() => createSetBonusTable(manifest, binary.slice(8))).toThrow();
+    expect(() => createSetBonusTable({ ...manifest, version: 2 }, binary)).toThrow();
+  });
+});
+
+describe('setBonusRow', () => {
+  it('returns zero-copy views aligned to PROP_IDX', () => {
+    const { manifest, binary } = buildFixture();
+    const table = createSetBonusTable(manifest, binary);
+
+    const twoPiece = setBonusRow(table, 1, 'twoPiece');
+    expect(twoPiece.buffer).toBe(binary);
+    expect(twoPiece).toHaveLength(PROP_IDX.TOTAL_PROPS);
+    expect(twoPiece[PROP_IDX.PEN_]).toBe(0.08);
+    expect(setBonusRow(table, 1, 'fourPiece')[PROP_IDX.ULTIMATE_ATK_DMG_]).toBe(0.2);
+    expect(setBonusRow(table, 0, 'twoPiece')[PROP_IDX.CRIT_]).toBe(0.08);
+  });
+});
@@ -0,0 +1,91 @@
+/**
+ * 驱动盘套装加成表
+ *
+ * 对应 scripts/build_set_bonus_table.py 的输出：
+ * - set_bonus_table.json：清单（setIdx -> 套装 ID、行布局、内容哈希）
+ * - set_bonus_table.bin：小端 Float64，每个套装 rows.length 行，每行 propCount 列（完整 PROP_IDX 宽度）
+ *
+ * 行与 PROP_IDX 完全对齐，Worker 直接在 ArrayBuffer 上创建 Float64Array 视图，
+ * 无需在每次优化开始时遍历 two_piece_buffs / four_piece_buffs 对象。
+ */
+
+import { PROP_IDX } from './property-index';
+
+export interface SetBonusTableEntry {
+  /** 稳定的套装索引（跨数据更新保持不变，新套装追加在末尾） */
+  setIdx: number;
+  /** 套装 ID（equipment_data_buff 文件名，即 DriveDisk.game_id） */
+  id: string;
+  name: string;
+  /** 4 件套 Buff 的叠层信息（fourPiece 行不含层数） */
+  fourPieceStacks: { id: string; max_stacks?: number; stack_mode?: string }[];
+}
+
+export interface SetBonusTableManifest {
+  version: number;
+  /** 表内容哈希（二进制 + setIdx 顺序） */
+  hash: string;
+  binary: string;
+  byteLength: number;
+  propCount: number;
+  /** 每个套装的行布局：twoPiece（2 件套局外属性）, fourPiece（4 件套局内属性） */
+  rows: string[];
+  sets: SetBonusTableEntry[];
+}
+
+/**
+ * 传给 Worker 的套装加成表（清单只保留 Worker 需要的字段）
+ */
+export interface SetBonusTable {
+  hash: string;
+  propCount: number;
+  rows: string[];
+  /** 套装 ID -> setIdx */
+  setIdxById: Record<string, number>;
+  binary: ArrayBuffer;
+}
+
+export const SET_BONUS_TABLE_VERSION = 1;
+
+/**
+ * 校验清单与二进制并生成 SetBonusTable
+ */
+export function createSetBonusTable(manifest: SetBonusTableManifest, binary: ArrayBuffer): SetBonusTable {
+  if (manifest.version !== SET_BONUS_TABLE_VERSION) {
+    throw new Error(`Unsupported set bonus table version: ${manifest.version}`);
+  }
+  if (manifest.propCount !== PROP_IDX.TOTAL_PROPS) {
+    throw new Error(`Set bonus table width ${manifest.propCount} != PROP_IDX.TOTAL_PROPS ${PROP_IDX.TOTAL_PROPS}`);
+  }
+  const expected = manifest.sets.length * manifest.rows.length * manifest.propCount * 8;
+  if (binary.byteLength !== expected || manifest.byteLength !== expected) {
+    throw new Error(`Set bonus table size mismatch: expected ${expected}, got ${binary.byteLength}`);
+  }
+
+  const setIdxById: Record<string, number> = {};
+  for (const entry of manifest.sets) setIdxById[entry.id] = entry.setIdx;
+  return {
+    hash: manifest.hash,
+    propCount: manifest.propCount,
+    rows: manifest.rows,
+    setIdxById,
+    binary,
+  };
+}
+
+/**
+ * 套装数量（setIdx 范围 [0, setCount)）
+ */
+export function setBonusSetCount(table: SetBonusTable): number {
+  return table.binary.byteLength / (table.rows.length * table.propCount * 8);
+}
+
+/**
+ * 某个套装的一行（零拷贝视图，长度 propCount；只读使用）
+ */
+export function setBonusRow(table: SetBonusTable, setIdx: number, row: 'twoPiece' | 'fourPiece'): Float64Array {
+  const rowIdx = table.rows.indexOf(row);
+  if (rowIdx < 0) throw new Error(`Set bonus table row not found: ${row}`);
+  const offset = (setIdx * table.rows.length + rowIdx) * table.propCount * 8;
+  return new Float64Array(table.binary, offset, table.propCount);
+}
@@ -0,0 +1,845 @@
+/**
+ * Python / TS 快速评估器一致性夹具
+ *
+ * 由 scripts/export_parity_fixture.py 根据 scripts/fixtures/parity_save.json 生成，请勿手动修改。
+ * expected 为 Python fast_evaluator.search 的 TopN；属性数组为稀疏 [PROP_IDX, 数值] 列表。
+ */
+
+export type SparseStats = [number, number][];
+
+export interface ParityDisc {
+  id: string;
+  setId: string;
+  setIdx: number;
+  isTargetSet: boolean;
+  stats: SparseStats;
+}
+
+export interface ParityPrecomputed {
+  mergedStats: SparseStats;
+  mergedBuff: SparseStats;
+  conversionBuffs: {
+    fromPropIdx: number;
+    toPropIdx: number;
+    ratio: number;
+    threshold: number;
+    maxValue: number | null;
+    isTeammate: boolean;
+  }[];
+  discsBySlot: ParityDisc[][];
+  targetSetId: string;
+  targetSetTwoPiece: SparseStats;
+  targetSetFourPieceBuff: SparseStats;
+  otherSetTwoPiece: Record<string, SparseStats>;
+  fixedMultipliers: {
+    baseResRed: number;
+    baseDmgTakenInc: number;
+    stunVulnerability: number;
+    distanceMult: number;
+    attackerLevel: number;
+    baseAnomalyCritRate: number;
+    baseAnomalyCritDmg: number;
+    baseAnomalyDmgBonus: number;
+    defenseParams: { levelBase: number; enemyDef: number; baseDefRed: number; baseDefIgn: number };
+  };
+  skillsParams: {
+    ratio: number;
+    element: number;
+    anomalyBuildup: number;
+    tags: number[];
+    isPenetration: boolean;
+    isMingpo: boolean;
+  }[];
+  objective: 'damage' | 'atk' | 'hp';
+  agentLevel: number;
+  enemyStats: {
+    elementResistances: Record<string, number>;
+    anomalyThresholds: Record<string, number>;
+    hasCorruptionShield: boolean;
+  };
+  specialAnomalyConfig: { element: string; ratio: number } | null;
+  anomalyTotalRatioAtT: number;
+  disorderTotalRatioAtT: number;
+}
+
+export interface ParityCase {
+  name: string;
+  precomputed: ParityPrecomputed;
+  expected: { damage: number; discIds: string[] }[];
+}
+
+export const PARITY_PROP_COUNT = 94;
+export const PARITY_TOP_N = 10;
+
+export const PARITY_CASES: ParityCase[] = [
+  {
+    "name": "t1 Miyabi",
+    "precomputed": {
+      "mergedStats": [
+        [0, 7673.7042],
+        [1, 1569.4551999999999],
+        [2, 606.5977],
+        [16, 0.05],
+        [17, 0.5],
+        [19, 1.2],
+        [23, 86.0],
+        [27, 116.0],
+        [29, 328.0]
+      ],
+      "mergedBuff": [
+        [6, 100.0],
+        [14, 0.3],
+        [30, 0.6000000000000001],
+        [50, 0.6],
+        [74, 0.25],
+        [93, 0.35]
+      ],
+      "conversionBuffs": [
+        {
+          "fromPropIdx": 16,
+          "toPropIdx": 30,
+          "ratio": 1.0,
+          "threshold": 0,
+          "maxValue": 0.8,
+          "isTeammate": false
+        }
+      ],
+      "discsBySlot": [
+        [
+          {
+            "id": "d0",
+            "setId": "31300",
+            "setIdx": 3,
+            "isTargetSet": false,
+            "stats": [
+              [4, 2200.0],
+              [6, 38.0],
+              [10, 18.0],
+              [16, 0.07200000000000001],
+              [29, 18.0]
+            ]
+          },
+          {
+            "id": "d30",
+            "setId": "31900",
+            "setIdx": 8,
+            "isTargetSet": false,
+            "stats": [
+              [4, 2200.0],
+              [6, 19.0],
+              [7, 0.09],
+              [17, 0.096]
+            ]
+          },
+          {
+            "id": "d18",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": true,
+            "stats": [
+              [4, 2200.0],
+              [6, 19.0],
+              [7, 0.09],
+              [10, 18.0],
+              [17, 0.048]
+            ]
+          }
+        ],
+        [
+          {
+            "id": "d1",
+            "setId": "31300",
+            "setIdx": 3,
+            "isTargetSet": false,
+            "stats": [
+              [4, 224.0],
+              [6, 316.0],
+              [7, 0.09],
+              [10, 9.0]
+            ]
+          },
+          {
+            "id": "d31",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": true,
+            "stats": [
+              [4, 224.0],
+              [6, 316.0],
+              [7, 0.06],
+              [16, 0.07200000000000001],
+              [29, 18.0]
+            ]
+          },
+          {
+            "id": "d7",
+            "setId": "33600",
+            "setIdx": 23,
+            "isTargetSet": false,
+            "stats": [
+              [4, 224.0],
+              [6, 316.0],
+              [10, 9.0],
+              [16, 0.07200000000000001],
+              [17, 0.14400000000000002]
+            ]
+          }
+        ],
+        [
+          {
+            "id": "d8",
+            "setId": "31300",
+            "setIdx": 3,
+            "isTargetSet": false,
+            "stats": [
+              [10, 9.0],
+              [16, 0.07200000000000001],
+              [17, 0.096]
+            ]
+          },
+          {
+            "id": "d2",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": true,
+            "stats": [
+              [6, 57.0],
+              [10, 9.0],
+              [16, 0.07200000000000001],
+              [17, 0.048]
+            ]
+          },
+          {
+            "id": "d20",
+            "setId": "33600",
+            "setIdx": 23,
+            "isTargetSet": false,
+            "stats": [
+              [6, 57.0],
+              [10, 9.0],
+              [17, 0.14400000000000002],
+              [29, 18.0]
+            ]
+          }
+        ],
+        [
+          {
+            "id": "d9",
+            "setId": "31900",
+            "setIdx": 8,
+            "isTargetSet": false,
+            "stats": [
+              [4, 112.0],
+              [10, 9.0],
+              [17, 0.48],
+              [29, 27.0]
+            ]
+          },
+          {
+            "id": "d3",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": true,
+            "stats": [
+              [4, 112.0],
+              [7, 0.06],
+              [10, 27.0],
+              [16, 0.24]
+            ]
+          },
+          {
+            "id": "d21",
+            "setId": "33600",
+            "setIdx": 23,
+            "isTargetSet": false,
+            "stats": [
+              [4, 224.0],
+              [6, 38.0],
+              [7, 0.3],
+              [16, 0.024],
+              [17, 0.048]
+            ]
+          }
+        ],
+        [
+          {
+            "id": "d4",
+            "setId": "31300",
+            "setIdx": 3,
+            "isTargetSet": false,
+            "stats": [
+              [7, 0.06],
+              [11, 0.24],
+              [16, 0.024],
+              [17, 0.096],
+              [29, 27.0]
+            ]
+          },
+          {
+            "id": "d34",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": true,
+            "stats": [
+              [4, 224.0],
+              [7, 0.09],
+              [16, 0.048],
+              [29, 18.0],
+              [62, 0.3]
+            ]
+          },
+          {
+            "id": "d10",
+            "setId": "33600",
+            "setIdx": 23,
+            "isTargetSet": false,
+            "stats": [
+              [7, 0.3],
+              [10, 18.0],
+              [16, 0.048],
+              [29, 27.0]
+            ]
+          }
+        ],
+        [
+          {
+            "id": "d11",
+            "setId": "31900",
+            "setIdx": 8,
+            "isTargetSet": false,
+            "stats": [
+              [4, 112.0],
+              [7, 0.3],
+              [10, 18.0],
+              [16, 0.048],
+              [29, 18.0]
+            ]
+          },
+          {
+            "id": "d41",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": true,
+            "stats": [
+              [6, 38.0],
+              [7, 0.03],
+              [10, 9.0],
+              [16, 0.07200000000000001],
+              [28, 0.3]
+            ]
+          },
+          {
+            "id": "d5",
+            "setId": "33600",
+            "setIdx": 23,
+            "isTargetSet": false,
+            "stats": [
+              [4, 336.0],
+              [6, 38.0],
+              [7, 0.3],
+              [16, 0.07200000000000001],
+              [17, 0.14400000000000002]
+            ]
+          }
+        ]
+      ],
+      "targetSetId": "33500",
+      "targetSetTwoPiece": [
+        [59, 0.1]
+      ],
+      "targetSetFourPieceBuff": [
+        [7, 0.1],
+        [16, 0.2]
+      ],
+      "otherSetTwoPiece": {
+        "31300": [
+          [29, 30.0]
+        ],
+        "31900": [
+          [26, 0.15]
+        ],
+        "33600": [
+          [60, 0.1]
+        ]
+      },
+      "fixedMultipliers": {
+        "baseResRed": 0.0,
+        "baseDmgTakenInc": 0.0,
+        "stunVulnerability": 0.5,
+        "distanceMult": 1.0,
+        "attackerLevel": 60,
+        "baseAnomalyCritRate": 0,
+        "baseAnomalyCritDmg": 0,
+        "baseAnomalyDmgBonus": 0.0,
+        "defenseParams": {
+          "levelBase": 700,
+          "enemyDef": 794.0,
+          "baseDefRed": 0.0,
+          "baseDefIgn": 0.0
+        }
+      },
+      "skillsParams": [
+        {
+          "ratio": 13.848,
+          "element": 202,
+          "anomalyBuildup": 566.76,
+          "tags": [1],
+          "isPenetration": false,
+          "isMingpo": false
+        },
+        {
+          "ratio": 69.101,
+          "element": 202,
+          "anomalyBuildup": 440.02,
+          "tags": [1],
+          "isPenetration": false,
+          "isMingpo": false
+        }
+      ],
+      "objective": "damage",
+      "agentLevel": 60,
+      "enemyStats": {
+        "elementResistances": {
+          "physical": 0.0,
+          "fire": 0.0,
+          "ice": 0.0,
+          "electric": 0.0,
+          "ether": 0.0
+        },
+        "anomalyThresholds": {
+          "physical": 600.0,
+          "fire": 600.0,
+          "ice": 600.0,
+          "electric": 600.0,
+          "ether": 720.0
+        },
+        "hasCorruptionShield": false
+      },
+      "specialAnomalyConfig": {
+        "element": "lieshuang",
+        "ratio": 15.0
+      },
+      "anomalyTotalRatioAtT": 5.0,
+      "disorderTotalRatioAtT": 11.25
+    },
+    "expected": [
+      {
+        "damage": 3221360.1119679757,
+        "discIds": ["d18", "d31", "d2", "d21", "d34", "d11"]
+      },
+      {
+        "damage": 3214586.7203317606,
+        "discIds": ["d18", "d31", "d2", "d21", "d34", "d5"]
+      },
+      {
+        "damage": 3114358.245185354,
+        "discIds": ["d18", "d31", "d20", "d3", "d34", "d5"]
+      },
+      {
+        "damage": 3096048.874613687,
+        "discIds": ["d18", "d31", "d20", "d3", "d34", "d11"]
+      },
+      {
+        "damage": 3034565.9016514733,
+        "discIds": ["d18", "d31", "d2", "d9", "d34", "d5"]
+      },
+      {
+        "damage": 3034023.353670666,
+        "discIds": ["d18", "d31", "d2", "d3", "d34", "d5"]
+      },
+      {
+        "damage": 3029306.1865098695,
+        "discIds": ["d18", "d31", "d2", "d9", "d34", "d11"]
+      },
+      {
+        "damage": 3027298.620745198,
+        "discIds": ["d30", "d31", "d2", "d3", "d34", "d5"]
+      },
+      {
+        "damage": 3016751.5114162317,
+        "discIds": ["d0", "d31", "d2", "d3", "d34", "d5"]
+      },
+      {
+        "damage": 3007824.137052771,
+        "discIds": ["d18", "d31", "d2", "d3", "d34", "d11"]
+      }
+    ]
+  },
+  {
+    "name": "t2 Lycaon",
+    "precomputed": {
+      "mergedStats": [
+        [0, 8416.2915],
+        [1, 703.5933],
+        [2, 606.5977],
+        [16, 0.05],
+        [17, 0.5],
+        [19, 1.2],
+        [23, 137.0],
+        [27, 91.0],
+        [29, 90.0]
+      ],
+      "mergedBuff": [
+        [24, 1.02],
+        [30, 0.2],
+        [74, 0.25],
+        [93, 0.35]
+      ],
+      "conversionBuffs": [],
+      "discsBySlot": [
+        [
+          {
+            "id": "d0",
+            "setId": "31300",
+            "setIdx": 3,
+            "isTargetSet": false,
+            "stats": [
+              [4, 2200.0],
+              [6, 38.0],
+              [10, 18.0],
+              [16, 0.07200000000000001],
+              [29, 18.0]
+            ]
+          },
+          {
+            "id": "d30",
+            "setId": "31900",
+            "setIdx": 8,
+            "isTargetSet": false,
+            "stats": [
+              [4, 2200.0],
+              [6, 19.0],
+              [7, 0.09],
+              [17, 0.096]
+            ]
+          },
+          {
+            "id": "d18",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": false,
+            "stats": [
+              [4, 2200.0],
+              [6, 19.0],
+              [7, 0.09],
+              [10, 18.0],
+              [17, 0.048]
+            ]
+          }
+        ],
+        [
+          {
+            "id": "d1",
+            "setId": "31300",
+            "setIdx": 3,
+            "isTargetSet": false,
+            "stats": [
+              [4, 224.0],
+              [6, 316.0],
+              [7, 0.09],
+              [10, 9.0]
+            ]
+          },
+          {
+            "id": "d31",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": false,
+            "stats": [
+              [4, 224.0],
+              [6, 316.0],
+              [7, 0.06],
+              [16, 0.07200000000000001],
+              [29, 18.0]
+            ]
+          },
+          {
+            "id": "d7",
+            "setId": "33600",
+            "setIdx": 23,
+            "isTargetSet": false,
+            "stats": [
+              [4, 224.0],
+              [6, 316.0],
+              [10, 9.0],
+              [16, 0.07200000000000001],
+              [17, 0.14400000000000002]
+            ]
+          }
+        ],
+        [
+          {
+            "id": "d8",
+            "setId": "31300",
+            "setIdx": 3,
+            "isTargetSet": false,
+            "stats": [
+              [10, 9.0],
+              [16, 0.07200000000000001],
+              [17, 0.096]
+            ]
+          },
+          {
+            "id": "d2",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": false,
+            "stats": [
+              [6, 57.0],
+              [10, 9.0],
+              [16, 0.07200000000000001],
+              [17, 0.048]
+            ]
+          },
+          {
+            "id": "d20",
+            "setId": "33600",
+            "setIdx": 23,
+            "isTargetSet": false,
+            "stats": [
+              [6, 57.0],
+              [10, 9.0],
+              [17, 0.14400000000000002],
+              [29, 18.0]
+            ]
+          }
+        ],
+        [
+          {
+            "id": "d9",
+            "setId": "31900",
+            "setIdx": 8,
+            "isTargetSet": false,
+            "stats": [
+              [4, 112.0],
+              [10, 9.0],
+              [17, 0.48],
+              [29, 27.0]
+            ]
+          },
+          {
+            "id": "d3",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": false,
+            "stats": [
+              [4, 112.0],
+              [7, 0.06],
+              [10, 27.0],
+              [16, 0.24]
+            ]
+          },
+          {
+            "id": "d21",
+            "setId": "33600",
+            "setIdx": 23,
+            "isTargetSet": false,
+            "stats": [
+              [4, 224.0],
+              [6, 38.0],
+              [7, 0.3],
+              [16, 0.024],
+              [17, 0.048]
+            ]
+          }
+        ],
+        [
+          {
+            "id": "d4",
+            "setId": "31300",
+            "setIdx": 3,
+            "isTargetSet": false,
+            "stats": [
+              [7, 0.06],
+              [11, 0.24],
+              [16, 0.024],
+              [17, 0.096],
+              [29, 27.0]
+            ]
+          },
+          {
+            "id": "d34",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": false,
+            "stats": [
+              [4, 224.0],
+              [7, 0.09],
+              [16, 0.048],
+              [29, 18.0],
+              [62, 0.3]
+            ]
+          },
+          {
+            "id": "d10",
+            "setId": "33600",
+            "setIdx": 23,
+            "isTargetSet": false,
+            "stats": [
+              [7, 0.3],
+              [10, 18.0],
+              [16, 0.048],
+              [29, 27.0]
+            ]
+          }
+        ],
+        [
+          {
+            "id": "d11",
+            "setId": "31900",
+            "setIdx": 8,
+            "isTargetSet": false,
+            "stats": [
+              [4, 112.0],
+              [7, 0.3],
+              [10, 18.0],
+              [16, 0.048],
+              [29, 18.0]
+            ]
+          },
+          {
+            "id": "d41",
+            "setId": "33500",
+            "setIdx": 22,
+            "isTargetSet": false,
+            "stats": [
+              [6, 38.0],
+              [7, 0.03],
+              [10, 9.0],
+              [16, 0.07200000000000001],
+              [28, 0.3]
+            ]
+          },
+          {
+            "id": "d5",
+            "setId": "33600",
+            "setIdx": 23,
+            "isTargetSet": false,
+            "stats": [
+              [4, 336.0],
+              [6, 38.0],
+              [7, 0.3],
+              [16, 0.07200000000000001],
+              [17, 0.14400000000000002]
+            ]
+          }
+        ]
+      ],
+      "targetSetId": "",
+      "targetSetTwoPiece": [],
+      "targetSetFourPieceBuff": [],
+      "otherSetTwoPiece": {
+        "31300": [
+          [29, 30.0]
+        ],
+        "31900": [
+          [26, 0.15]
+        ],
+        "33500": [
+          [59, 0.1]
+        ],
+        "33600": [
+          [60, 0.1]
+        ]
+      },
+      "fixedMultipliers": {
+        "baseResRed": 0.0,
+        "baseDmgTakenInc": 0.0,
+        "stunVulnerability": 0.0,
+        "distanceMult": 1.0,
+        "attackerLevel": 60,
+        "baseAnomalyCritRate": 0,
+        "baseAnomalyCritDmg": 0,
+        "baseAnomalyDmgBonus": 0.0,
+        "defenseParams": {
+          "levelBase": 700,
+          "enemyDef": 794.0,
+          "baseDefRed": 0.0,
+          "baseDefIgn": 0.0
+        }
+      },
+      "skillsParams": [
+        {
+          "ratio": 0.918,
+          "element": 202,
+          "anomalyBuildup": 43.32,
+          "tags": [2],
+          "isPenetration": false,
+          "isMingpo": false
+        },
+        {
+          "ratio": 33.892,
+          "element": 202,
+          "anomalyBuildup": 173.36,
+          "tags": [3],
+          "isPenetration": false,
+          "isMingpo": false
+        }
+      ],
+      "objective": "damage",
+      "agentLevel": 60,
+      "enemyStats": {
+        "elementResistances": {
+          "physical": 0.0,
+          "fire": 0.0,
+          "ice": 0.0,
+          "electric": 0.0,
+          "ether": 0.0
+        },
+        "anomalyThresholds": {
+          "physical": 600.0,
+          "fire": 600.0,
+          "ice": 600.0,
+          "electric": 600.0,
+          "ether": 720.0
+        },
+        "hasCorruptionShield": false
+      },
+      "specialAnomalyConfig": null,
+      "anomalyTotalRatioAtT": 5.0,
+      "disorderTotalRatioAtT": 5.025
+    },
+    "expected": [
+      {
+        "damage": 77049.85266291443,
+        "discIds": ["d0", "d31", "d8", "d21", "d34", "d5"]
+      },
+      {
+        "damage": 76550.41961509714,
+        "discIds": ["d0", "d31", "d20", "d21", "d34", "d5"]
+      },
+      {
+        "damage": 76413.32863430734,
+        "discIds": ["d0", "d1", "d20", "d21", "d34", "d5"]
+      },
+      {
+        "damage": 76353.69337126554,
+        "discIds": ["d0", "d7", "d8", "d21", "d34", "d5"]
+      },
+      {
+        "damage": 75792.52674662662,
+        "discIds": ["d0", "d1", "d2", "d21", "d34", "d5"]
+      },
+      {
+        "damage": 75620.34200300697,
+        "discIds": ["d0", "d31", "d2", "d21", "d34", "d5"]
+      },
+      {
+        "damage": 75485.03813271053,
+        "discIds": ["d0", "d7", "d20", "d21", "d34", "d5"]
+      },
+      {
+        "damage": 75272.33983021684,
+        "discIds": ["d0", "d1", "d20", "d3", "d34", "d5"]
+      },
+      {
+        "damage": 75044.14973496301,
+        "discIds": ["d0", "d7", "d2", "d21", "d34", "d5"]
+      },
+      {
+        "damage": 75022.05105076714,
+        "discIds": ["d0", "d1", "d20", "d21", "d34", "d11"]
+      }
+    ]
+  }
+];
@@ -0,0 +1,108 @@
+/**
+ * Python / TS 快速评估器一致性测试
+ *
+ * 夹具由 scripts/export_parity_fixture.py 生成：输入为小存档（每个位置 3 个盘）构建的
+ * PrecomputedData，期望值为 Python fast_evaluator.search 的 TopN。
+ * 这里用 TS FastEvaluator 枚举全部组合，验证 TopN 的 discIds 与伤害和 Python 一致。
+ */
+
+import { describe, it, expect } from 'vitest';
+import { FastEvaluator } from './fast-evaluator';
+import { PROP_IDX } from '../types/property-index';
+import type { PrecomputedData, DiscData } from '../types/precomputed';
+import { EnemyStats } from '../../model/enemy';
+import {
+  PARITY_CASES,
+  PARITY_PROP_COUNT,
+  PARITY_TOP_N,
+  type ParityPrecomputed,
+  type SparseStats,
+} from './fast-evaluator.parity-fixture';
+
+/** 与 export_parity_fixture.py 的 RELATIVE_TOLERANCE 一致 */
+const RELATIVE_TOLERANCE = 1e-9;
+
+function dense(sparse: SparseStats): Float64Array {
+  const stats = new Float64Array(PROP_IDX.TOTAL_PROPS);
+  for (const [idx, value] of sparse) stats[idx] = value;
+  return stats;
+}
+
+function toPrecomputed(fixture: ParityPrecomputed): PrecomputedData {
+  const { fixedMultipliers, enemyStats } = fixture;
+  const otherSetTwoPiece: Record<string, Float64Array> = {};
+  for (const [setId, sparse] of Object.entries(fixture.otherSetTwoPiece)) {
+    otherSetTwoPiece[setId] = dense(sparse);
+  }
+  return {
+    mergedStats: dense(fixture.mergedStats),
+    mergedBuff: dense(fixture.mergedBuff),
+    conversionBuffs: fixture.conversionBuffs,
+    discsBySlot: fixture.discsBySlot.map((slot) =>
+      slot.map((disc): DiscData => ({
+        id: disc.id,
+        stats: dense(disc.stats),
+        effectiveScore: 0,
+        setId: disc.setId,
+        setIdx: disc.setIdx,
+        isTargetSet: disc.isTargetSet,
+      }))
+    ),
+    targetSetId: fixture.targetSetId,
+    targetSetTwoPiece: dense(fixture.targetSetTwoPiece),
+    targetSetFourPieceBuff: dense(fixture.targetSetFourPieceBuff),
+    otherSetTwoPiece,
+    fixedMultipliers,
+    skillsParams: fixture.skillsParams,
+    objective: fixture.objective,
+    agentLevel: fixture.agentLevel,
+    enemyStats: new EnemyStats(
+      100000,
+      fixedMultipliers.defenseParams.enemyDef,
+      60,
+      1000,
+      true,
+      1,
+      false,
+      enemyStats.elementResistances,
+      enemyStats.anomalyThresholds,
+      enemyStats.hasCorruptionShield
+    ),
+    specialAnomalyConfig: fixture.specialAnomalyConfig,
+    anomalyTotalRatioAtT: fixture.anomalyTotalRatioAtT,
+    disorderTotalRatioAtT: fixture.disorderTotalRatioAtT,
+  };
+}
+
+/** 枚举全部组合，返回按伤害降序的 TopN */
+function searchTopN(precomputed: PrecomputedData, topN: number): { damage: number; discIds: string[] }[] {
+  const evaluator = new FastEvaluator(precomputed);
+  const [s0, s1, s2, s3, s4, s5] = precomputed.discsBySlot;
+  const results: { damage: number; discIds: string[] }[] = [];
+  for (const d0 of s0) for (const d1 of s1) for (const d2 of s2)
+    for (const d3 of s3) for (const d4 of s4) for (const d5 of s5) {
+      const discs = [d0, d1, d2, d3, d4, d5];
+      const damage = evaluator.calculateDamage(discs);
+      if (damage !== null) results.push({ damage, discIds: discs.map((d) => d.id) });
+    }
+  results.sort((a, b) => b.damage - a.damage);
+  return results.slice(0, topN);
+}
+
+describe('FastEvaluator 与 Python fast_evaluator 一致', () => {
+  it('夹具的属性宽度与 PROP_IDX 一致', () => {
+    expect(PARITY_PROP_COUNT).toBe(PROP_IDX.TOTAL_PROPS);
+  });
+
+  for (const parityCase of PARITY_CASES) {
+    it(`${parityCase.name}: TopN 与伤害一致`, () => {
+      const actual = searchTopN(toPrecomputed(parityCase.precomputed), PARITY_TOP_N);
+
+      expect(actual.map((b) => b.discIds)).toEqual(parityCase.expected.map((b) => b.discIds));
+      actual.forEach((build, i) => {
+        const expected = parityCase.expected[i].damage;
+        expect(Math.abs(build.damage - expected)).toBeLessThanOrEqual(RELATIVE_TOLERANCE * expected);
+      });
+    });
+  }
+});
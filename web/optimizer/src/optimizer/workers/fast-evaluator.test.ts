@@ -11,6 +11,7 @@ import { describe, it, expect } from 'vitest';
 import { FastEvaluator } from './fast-evaluator';
 import { PROP_IDX } from '../types/property-index';
 import type { PrecomputedData, DiscData } from '../types/precomputed';
+import { createSetBonusTable } from '../types/set-bonus-table';
 import { EnemyStats } from '../../model/enemy';
 
 /**
@@ -377,4 +378,36 @@ describe('FastEvaluator 增量枚举测试', () => {
     // 应该恢复到只有 disc1 的状态
     expect(Math.abs(snapshotAfterPop[PROP_IDX.CRIT_] - snapshotAfter1[PROP_IDX.CRIT_])).toBeLessThan(0.0001);
   });
+
+  it('套装加成表中的 2pc 应与 otherSetTwoPiece 一致', () => {
+    // 表中 setIdx 0 = set_target，setIdx 1 = set_other（与 mock 盘的 setIdx 相同）
+    const width = PROP_IDX.TOTAL_PROPS;
+    const values = new Float64Array(2 * 2 * width);
+    values[0 * width + PROP_IDX.ATK_] = 0.1;
+    values[2 * width + PROP_IDX.CRIT_] = 0.08;
+    const setBonusTable = createSetBonusTable(
+      {
+        version: 1,
+        hash: 'test',
+        binary: 'set_bonus_table.bin',
+        byteLength: values.byteLength,
+        propCount: width,
+        rows: ['twoPiece', 'fourPiece'],
+        sets: [
+          { setIdx: 0, id: 'set_target', name: 'target', fourPieceStacks: [] },
+          { setIdx: 1, id: 'set_other', name: 'other', fourPieceStacks: [] },
+        ],
+      },
+      values.buffer
+    );
+
+    const withObjects = createMockPrecomputed();
+    const withTable = { ...createMockPrecomputed(), otherSetTwoPiece: {}, setBonusTable };
+    const discs: DiscData[] = [0, 0, 0, 0, 1, 1].map((idx, slot) => withObjects.discsBySlot[slot][idx]);
+
+    const expected = new FastEvaluator(withObjects).calculateDamageWithMultipliers(discs);
+    const actual = new FastEvaluator(withTable).calculateDamageWithMultipliers(discs);
+    expect(expected).not.toBeNull();
+    expect(Math.abs(actual!.damage - expected!.damage)).toBeLessThan(1e-9);
+  });
 });
@@ -22,6 +22,7 @@ import type {
   DiscData,
   OptimizationBuildResult,
 } from '../types/precomputed';
+import { setBonusRow, setBonusSetCount } from '../types/set-bonus-table';
 import {
   STANDARD_BUILDUP_THRESHOLD,
 } from '../../utils/anomaly-constants';
@@ -143,12 +144,24 @@ export class FastEvaluator {
 
     // evalBuffer 在叶子评估阶段动态写入（accumulator + workerMergedBuff）
 
-    // 预构建 otherSetTwoPieceByIdx：只在 worker 初始化做一次字符串查找
+    // 套装加成表：表内套装的 setIdx 即表中的行号，2 件套直接取 ArrayBuffer 上的视图
+    const { setBonusTable } = precomputed;
+    if (setBonusTable) {
+      const setCount = Math.min(setBonusSetCount(setBonusTable), maxSetIdx + 1);
+      for (let setIdx = 0; setIdx < setCount; setIdx++) {
+        const twoPiece = setBonusRow(setBonusTable, setIdx, 'twoPiece');
+        this.otherSetTwoPieceByIdx[setIdx] = twoPiece;
+        this.otherSetTwoPieceSparseByIdx[setIdx] = this.toSparse(twoPiece);
+      }
+    }
+
+    // 预构建 otherSetTwoPieceByIdx：只在 worker 初始化做一次字符串查找（表中没有的套装）
+    const setIdxById = this.buildSetIdxById(precomputed.discsBySlot);
     const { otherSetTwoPiece } = precomputed;
     if (otherSetTwoPiece) {
       for (const [setId, twoPiece] of Object.entries(otherSetTwoPiece)) {
-        const setIdx = this.findSetIdxById(precomputed.discsBySlot, setId);
-        if (setIdx !== null) this.otherSetTwoPieceByIdx[setIdx] = twoPiece;
+        const setIdx = setIdxById.get(setId);
+        if (setIdx !== undefined) this.otherSetTwoPieceByIdx[setIdx] = twoPiece;
       }
     }
 
@@ -156,8 +169,8 @@ export class FastEvaluator {
     const otherSetTwoPieceSparse = (precomputed as any).otherSetTwoPieceSparse as Record<string, { idx: Int16Array; val: Float64Array }> | undefined;
     if (otherSetTwoPieceSparse) {
       for (const [setId, sparse] of Object.entries(otherSetTwoPieceSparse)) {
-        const setIdx = this.findSetIdxById(precomputed.discsBySlot, setId);
-        if (setIdx !== null) this.otherSetTwoPieceSparseByIdx[setIdx] = sparse;
+        const setIdx = setIdxById.get(setId);
+        if (setIdx !== undefined) this.otherSetTwoPieceSparseByIdx[setIdx] = sparse;
       }
     }
 
@@ -339,15 +352,30 @@ export class FastEvaluator {
     return max;
   }
 
-  private findSetIdxById(discsBySlot: DiscData[][], setId: string): number | null {
+  private buildSetIdxById(discsBySlot: DiscData[][]): Map<string, number> {
+    const setIdxById = new Map<string, number>();
     for (let s = 0; s < discsBySlot.length; s++) {
       const slot = discsBySlot[s];
       for (let i = 0; i < slot.length; i++) {
         const d = slot[i];
-        if (d.setId === setId) return d.setIdx;
+        if (!setIdxById.has(d.setId)) setIdxById.set(d.setId, d.setIdx);
       }
     }
-    return null;
+    return setIdxById;
+  }
+
+  private toSparse(arr: Float64Array): { idx: Int16Array; val: Float64Array } {
+    let count = 0;
+    for (let i = 0; i < arr.length; i++) if (arr[i] !== 0) count++;
+    const idx = new Int16Array(count);
+    const val = new Float64Array(count);
+    for (let i = 0, k = 0; i < arr.length; i++) {
+      if (arr[i] !== 0) {
+        idx[k] = i;
+        val[k++] = arr[i];
+      }
+    }
+    return { idx, val };
   }
 
   private findSetIdByIdx(discsBySlot: DiscData[][], setIdx: number): string | null {
@@ -0,0 +1,74 @@
+import { describe, it, expect, vi } from 'vitest';
+import type { Enemy } from '../model/enemy';
+import type { Team } from '../model/team';
+import { BattleService } from './battle.service';
+import { getAgentSpecialRule } from '../utils/special-rules';
+
+vi.mock('../optimizer/services/optimizer.service', () => ({
+  optimizerService: {},
+}));
+
+/** 只带前台角色的队伍桩（setTeam 会加载 Buff，这里直接写入私有字段） */
+const withFrontAgent = (service: BattleService, gameId: string, nameCn: string): void => {
+  const team = { frontAgent: { game_id: gameId, name_cn: nameCn } } as unknown as Team;
+  (service as unknown as { team: Team | null }).team = team;
+};
+
+const buildEnemy = (stunVulnerabilityMultiplier: number): Enemy =>
+  ({ stun_vulnerability_multiplier: stunVulnerabilityMultiplier }) as Enemy;
+
+describe('getAgentSpecialRule', () => {
+  it('按 game_id 命中叶瞬光的特例规则', () => {
+    expect(getAgentSpecialRule('1431')).toEqual({ forceStunned: true, stunVulnerabilityCap: 2.1 });
+  });
+
+  it('中文名、未知 ID 与空值不命中', () => {
+    expect(getAgentSpecialRule('叶瞬光')).toBeNull();
+    expect(getAgentSpecialRule('1091')).toBeNull();
+    expect(getAgentSpecialRule(undefined)).toBeNull();
+    expect(getAgentSpecialRule(null)).toBeNull();
+  });
+});
+
+describe('BattleService 前台角色特例规则', () => {
+  it('前台为 1431 时强制失衡，失衡易伤乘区上限 2.1', () => {
+    const service = new BattleService();
+    service.setEnemy(buildEnemy(1.5));
+    service.setEnemyStatus(false, false);
+    withFrontAgent(service, '1431', '叶瞬光');
+
+    expect(service.getIsEnemyStunned()).toBe(true);
+    expect(service.getStunVulnerabilityMultiplier()).toBe(2.1);
+  });
+
+  it('前台为 1431 时未超过上限的乘区保持原值', () => {
+    const service = new BattleService();
+    service.setEnemy(buildEnemy(0.5));
+    withFrontAgent(service, '1431', '叶瞬光');
+
+    expect(service.getStunVulnerabilityMultiplier()).toBe(1.5);
+  });
+
+  it('其他前台角色沿用失衡开关', () => {
+    const service = new BattleService();
+    service.setEnemy(buildEnemy(1.5));
+    withFrontAgent(service, '1091', '雅');
+
+    service.setEnemyStatus(false, false);
+    expect(service.getIsEnemyStunned()).toBe(false);
+    expect(service.getStunVulnerabilityMultiplier()).toBe(1.0);
+
+    service.setEnemyStatus(true, false);
+    expect(service.getIsEnemyStunned()).toBe(true);
+    expect(service.getStunVulnerabilityMultiplier()).toBe(2.5);
+  });
+
+  it('改名后的中文名不影响按 ID 查找', () => {
+    const service = new BattleService();
+    service.setEnemy(buildEnemy(1.5));
+    service.setEnemyStatus(false, false);
+    withFrontAgent(service, '1431', 'Ye Shunguang');
+
+    expect(service.getIsEnemyStunned()).toBe(true);
+  });
+});
@@ -15,7 +15,7 @@ import type { WEngine } from '../model/wengine';
 import type { DriveDisk } from '../model/drive-disk';
 import { OptimizerContext } from '../optimizer/services/optimizer-context';
 import { optimizerService } from '../optimizer/services/optimizer.service';
-import { getAgentSpecialRuleByCnName } from '../utils/special-rules';
+import { getAgentSpecialRule } from '../utils/special-rules';
 
 /**
  * 技能伤害参数（用于 DamageCalculator / Worker 口径）
@@ -827,7 +827,7 @@ export class BattleService {
   }
 
   getIsEnemyStunned(): boolean {
-    const frontAgentRule = getAgentSpecialRuleByCnName(this.team?.frontAgent?.name_cn);
+    const frontAgentRule = getAgentSpecialRule(this.team?.frontAgent?.game_id);
     return frontAgentRule?.forceStunned === true ? true : this.isEnemyStunned;
   }
 
@@ -888,7 +888,7 @@ export class BattleService {
 
     const baseMult = 1 + (this.enemy.stun_vulnerability_multiplier ?? 0);
 
-    const frontAgentRule = getAgentSpecialRuleByCnName(this.team?.frontAgent?.name_cn);
+    const frontAgentRule = getAgentSpecialRule(this.team?.frontAgent?.game_id);
     if (frontAgentRule?.forceStunned) {
       const cap = frontAgentRule.stunVulnerabilityCap;
       if (typeof cap === 'number') {
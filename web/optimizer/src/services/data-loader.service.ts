@@ -12,8 +12,23 @@
  */
 
 import type { SkillSet } from "../model/skill";
+import {
+  createSetBonusTable,
+  type SetBonusTable,
+  type SetBonusTableManifest,
+} from "../optimizer/types/set-bonus-table";
 import { generateSkillSet } from "../utils/skill-converter";
+import {
+  expandWeaponBuffData,
+  type WeaponTalentTable,
+} from "../utils/weapon-talent-table";
+import {
+  createAgentSnapshots,
+  type AgentSnapshotManifest,
+  type AgentSnapshots,
+} from "../optimizer/types/agent-snapshot";
 import { gameDataCacheService } from "./game-data-cache.service";
+import { fetchGameData } from "../utils/precompressed";
 
 /**
  * 角色基础信息
@@ -156,6 +171,9 @@ export class DataLoaderService {
   private _characterBuffCache: Map<string, Promise<any>> = new Map();
   private _weaponDetailCache: Map<string, Promise<any>> = new Map();
   private _weaponBuffCache: Map<string, Promise<any>> = new Map();
+  private _weaponTalentTable: Promise<WeaponTalentTable | null> | null = null;
+  private _setBonusTable: Promise<SetBonusTable | null> | null = null;
+  private _agentSnapshots: Promise<AgentSnapshots | null> | null = null;
   private _equipmentDetailCache: Map<string, Promise<any>> = new Map();
   private _equipmentBuffCache: Map<string, Promise<any>> = new Map();
 
@@ -313,7 +331,7 @@ export class DataLoaderService {
    * 直接从网络加载JSON文件
    */
   private async fetchJsonFile<T>(path: string): Promise<Record<string, T>> {
-    const response = await fetch(path);
+    const response = await fetchGameData(path);
     if (!response.ok) {
       throw new Error(`Failed to load ${path}: ${response.statusText}`);
     }
@@ -439,15 +457,82 @@ export class DataLoaderService {
       return this._weaponBuffCache.get(gameId);
     }
 
-    // 加载数据
-    const promise = this.loadJsonFile<any>(
-      `/game-data/weapon_data_buff/${gameId}.json`,
+    // 优先从合并的天赋属性表还原，表中没有时加载单个文件
+    const promise = this.getWeaponTalentTable().then(
+      (table) =>
+        (table && expandWeaponBuffData(table, gameId)) ??
+        this.loadJsonFile<any>(`/game-data/weapon_data_buff/${gameId}.json`),
     );
     this._weaponBuffCache.set(gameId, promise);
 
     return promise;
   }
 
+  /**
+   * 获取音擎天赋属性表（所有音擎共用一次加载，加载失败时返回 null）
+   */
+  private getWeaponTalentTable(): Promise<WeaponTalentTable | null> {
+    if (!this._weaponTalentTable) {
+      this._weaponTalentTable = this.loadJsonFile<unknown>(
+        "/game-data/weapon_talents.json",
+      )
+        .then((table) => table as unknown as WeaponTalentTable)
+        .catch((error) => {
+          console.warn("音擎天赋属性表加载失败，改为按音擎加载:", error);
+          return null;
+        });
+    }
+    return this._weaponTalentTable;
+  }
+
+  /**
+   * 获取驱动盘套装加成表（优化器用，加载失败时返回 null，由调用方回退到逐个套装构建）
+   */
+  getSetBonusTable(): Promise<SetBonusTable | null> {
+    if (!this._setBonusTable) {
+      this._setBonusTable = (async () => {
+        const manifest = (await this.loadJsonFile<unknown>(
+          "/game-data/set_bonus_table.json",
+        )) as unknown as SetBonusTableManifest;
+        const response = await fetch(`/game-data/${manifest.binary}`);
+        if (!response.ok) {
+          throw new Error(
+            `Failed to load ${manifest.binary}: ${response.statusText}`,
+          );
+        }
+        return createSetBonusTable(manifest, await response.arrayBuffer());
+      })().catch((error) => {
+        console.warn("驱动盘套装加成表加载失败，改为逐个套装构建:", error);
+        return null;
+      });
+    }
+    return this._setBonusTable;
+  }
+
+  /**
+   * 获取角色静态属性快照（优化器用，加载失败时返回 null，由调用方回退到 Agent 对象模型计算）
+   */
+  getAgentSnapshots(): Promise<AgentSnapshots | null> {
+    if (!this._agentSnapshots) {
+      this._agentSnapshots = (async () => {
+        const manifest = (await this.loadJsonFile<unknown>(
+          "/game-data/agent_snapshots.json",
+        )) as unknown as AgentSnapshotManifest;
+        const response = await fetch(`/game-data/${manifest.binary}`);
+        if (!response.ok) {
+          throw new Error(
+            `Failed to load ${manifest.binary}: ${response.statusText}`,
+          );
+        }
+        return createAgentSnapshots(manifest, await response.arrayBuffer());
+      })().catch((error) => {
+        console.warn("角色属性快照加载失败，改为按角色详情计算:", error);
+        return null;
+      });
+    }
+    return this._agentSnapshots;
+  }
+
   /**
    * 获取驱动盘套装详细信息（按需加载）
    */
@@ -572,6 +657,9 @@ export class DataLoaderService {
     this._characterBuffCache.clear();
     this._weaponDetailCache.clear();
     this._weaponBuffCache.clear();
+    this._weaponTalentTable = null;
+    this._setBonusTable = null;
+    this._agentSnapshots = null;
     this._equipmentDetailCache.clear();
     this._equipmentBuffCache.clear();
   }
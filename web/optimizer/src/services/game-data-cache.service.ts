@@ -6,6 +6,26 @@
  */
 
 import { dbService } from './db.service';
+import { decodeColumnar, type ColumnarMeta, type FormatsManifest } from '../utils/columnar-decoder';
+import {
+  BUNDLE_INDEX_SEGMENT,
+  BUNDLE_VERSION,
+  bundleEntryRange,
+  readBundleEntry,
+  type BundleIndex,
+  type BundleSegment,
+} from '../utils/data-bundle';
+import { fetchGameData } from '../utils/precompressed';
+
+/**
+ * 数据格式清单（scripts/columnar_export.py 生成），登记了可用列式格式的数据集
+ */
+const FORMATS_MANIFEST = '/game-data/formats.json';
+
+/**
+ * 合并包偏移表（scripts/build_data_bundle.py 生成），索引文件与全部 Buff 数据分两段打包
+ */
+const BUNDLE_INDEX = '/game-data/bundle.json';
 
 /**
  * 索引文件列表（启动时预加载）
@@ -26,6 +46,9 @@ const INDEX_FILES = [
  */
 class GameDataCacheService {
   private static instance: GameDataCacheService;
+  private formatsManifest: Promise<FormatsManifest | null> | null = null;
+  private bundleIndex: Promise<BundleIndex | null> | null = null;
+  private segmentBytes = new Map<string, Promise<Uint8Array | null>>();
 
   private constructor() {}
 
@@ -69,10 +92,128 @@ class GameDataCacheService {
   }
 
   /**
-   * 从网络加载 JSON
+   * 从网络加载数据集
+   *
+   * formats.json 登记了列式格式时优先加载列式文件，失败时回退到原始 JSON
    */
   private async fetchJson<T>(path: string): Promise<T> {
-    const response = await fetch(path);
+    try {
+      const bundled = await this.fetchFromBundle<T>(path);
+      if (bundled !== undefined) {
+        return bundled;
+      }
+    } catch (err) {
+      console.warn(`[GameDataCache] 合并包读取失败，回退到单独请求: ${path}`, err);
+    }
+
+    const entry = (await this.getFormatsManifest())?.datasets[path];
+    if (entry) {
+      try {
+        return await this.fetchColumnar<T>(entry.columnar, entry.binary);
+      } catch (err) {
+        console.warn(`[GameDataCache] 列式数据加载失败，回退到 JSON: ${path}`, err);
+      }
+    }
+    return this.fetchRawJson<T>(path);
+  }
+
+  /**
+   * 从合并包读取（不在合并包中时返回 undefined）
+   *
+   * 索引文件（启动时）下载整个索引段，之后的索引文件都从内存读取；
+   * Buff 段不整段下载，每个文件只用 Range 请求取出自己那一段
+   */
+  private async fetchFromBundle<T>(path: string): Promise<T | undefined> {
+    const index = await this.getBundleIndex();
+    const entry = index?.entries[path];
+    const segment = entry && index?.segments[entry.segment];
+    if (!entry || !segment) {
+      return undefined;
+    }
+
+    if (entry.segment === BUNDLE_INDEX_SEGMENT) {
+      const bytes = await this.getSegmentBytes(entry.segment, segment);
+      if (bytes) {
+        return readBundleEntry<T>(entry, bytes);
+      }
+    }
+
+    const [start, end] = bundleEntryRange(entry);
+    const response = await fetch(segment.file, { headers: { Range: `bytes=${start}-${end - 1}` } });
+    if (!response.ok) {
+      throw new Error(`Failed to load ${segment.file}: ${response.statusText}`);
+    }
+    const bytes = new Uint8Array(await response.arrayBuffer());
+    // 服务器不支持 Range 时返回完整内容（200）
+    return readBundleEntry<T>(entry, bytes, response.status === 206 ? start : 0);
+  }
+
+  /**
+   * 加载合并包偏移表（每个会话只请求一次，不存在时按单文件加载）
+   */
+  private getBundleIndex(): Promise<BundleIndex | null> {
+    if (!this.bundleIndex) {
+      this.bundleIndex = this.fetchRawJson<BundleIndex>(BUNDLE_INDEX)
+        .then((index) => (index.version === BUNDLE_VERSION ? index : null))
+        .catch(() => null);
+    }
+    return this.bundleIndex;
+  }
+
+  /**
+   * 下载合并包的一整段（多个索引文件并发加载时共享同一个请求）
+   */
+  private getSegmentBytes(name: string, segment: BundleSegment): Promise<Uint8Array | null> {
+    let bytes = this.segmentBytes.get(name);
+    if (!bytes) {
+      bytes = (async () => {
+        const response = await fetch(segment.file);
+        if (!response.ok) {
+          throw new Error(`Failed to load ${segment.file}: ${response.statusText}`);
+        }
+        const data = new Uint8Array(await response.arrayBuffer());
+        if (data.byteLength !== segment.size) {
+          throw new Error(`Bundle size mismatch: expected ${segment.size}, got ${data.byteLength}`);
+        }
+        return data;
+      })().catch((err) => {
+        console.warn(`[GameDataCache] 合并包 ${name} 段下载失败，改为单独请求`, err);
+        return null;
+      });
+      this.segmentBytes.set(name, bytes);
+    }
+    return bytes;
+  }
+
+  /**
+   * 加载格式清单（每个会话只请求一次，不存在时视为只有 JSON 格式）
+   */
+  private getFormatsManifest(): Promise<FormatsManifest | null> {
+    if (!this.formatsManifest) {
+      this.formatsManifest = this.fetchRawJson<FormatsManifest>(FORMATS_MANIFEST).catch(() => null);
+    }
+    return this.formatsManifest;
+  }
+
+  /**
+   * 加载列式元数据与二进制数值列并还原为记录表
+   */
+  private async fetchColumnar<T>(metaPath: string, binaryPath: string): Promise<T> {
+    const [meta, response] = await Promise.all([
+      this.fetchRawJson<ColumnarMeta>(metaPath),
+      fetch(binaryPath),
+    ]);
+    if (!response.ok) {
+      throw new Error(`Failed to load ${binaryPath}: ${response.statusText}`);
+    }
+    return decodeColumnar(meta, await response.arrayBuffer()) as T;
+  }
+
+  /**
+   * 从网络加载 JSON
+   */
+  private async fetchRawJson<T>(path: string): Promise<T> {
+    const response = await fetchGameData(path);
     if (!response.ok) {
       throw new Error(`Failed to load ${path}: ${response.statusText}`);
     }
@@ -0,0 +1,65 @@
+import { describe, it, expect } from 'vitest';
+import { decodeColumnar, type ColumnarMeta } from './columnar-decoder';
+
+/**
+ * 按 scripts/columnar_export.py 的布局规则（按元素大小对齐）手工构造：
+ * hp: float64 @0, level: int8 @16, can_stun: bool @18, tag: dict(uint8) @20
+ */
+function buildFixture(): { meta: ColumnarMeta; buffer: ArrayBuffer } {
+  const buffer = new ArrayBuffer(22);
+  new Float64Array(buffer, 0, 2).set([1234.5, 0.85]);
+  new Int8Array(buffer, 16, 2).set([3, -1]);
+  new Uint8Array(buffer, 18, 2).set([1, 0]);
+  new Uint8Array(buffer, 20, 2).set([1, 0]);
+
+  const meta: ColumnarMeta = {
+    format: 'columnar',
+    version: 1,
+    count: 2,
+    binary: 'enemy.columnar.bin',
+    byteLength: 22,
+    fields: ['id', 'hp', 'level', 'can_stun', 'tag', 'bars'],
+    keyColumn: 'id',
+    columns: [
+      { name: 'id', type: 'string', values: ['1001', '1002'] },
+      { name: 'hp', type: 'float64', offset: 0 },
+      { name: 'level', type: 'int8', offset: 16 },
+      { name: 'can_stun', type: 'bool', offset: 18 },
+      { name: 'tag', type: 'dict', codes: 'uint8', offset: 20, values: ['boss', 'elite'] },
+      { name: 'bars', type: 'json', values: [[1, 2], []] },
+    ],
+  };
+  return { meta, buffer };
+}
+
+describe('decodeColumnar', () => {
+  it('restores records in field order', () => {
+    const { meta, buffer } = buildFixture();
+    const result = decodeColumnar<Record<string, unknown>>(meta, buffer);
+
+    expect(result).toEqual({
+      '1001': { id: '1001', hp: 1234.5, level: 3, can_stun: true, tag: 'elite', bars: [1, 2] },
+      '1002': { id: '1002', hp: 0.85, level: -1, can_stun: false, tag: 'boss', bars: [] },
+    });
+    expect(Object.keys(result['1001'])).toEqual(meta.fields);
+  });
+
+  it('uses explicit keys when no key column is given', () => {
+    const { meta, buffer } = buildFixture();
+    delete meta.keyColumn;
+    meta.keys = ['a', 'b'];
+
+    expect(Object.keys(decodeColumnar(meta, buffer))).toEqual(['a', 'b']);
+  });
+
+  it('rejects a binary of the wrong size', () => {
+    const { meta } = buildFixture();
+    expect(() => decodeColumnar(meta, new ArrayBuffer(8))).toThrow(/size mismatch/);
+  });
+
+  it('rejects unknown versions', () => {
+    const { meta, buffer } = buildFixture();
+    meta.version = 2;
+    expect(() => decodeColumnar(meta, buffer)).toThrow(/Unsupported/);
+  });
+});
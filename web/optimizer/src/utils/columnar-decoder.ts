@@ -0,0 +1,133 @@
+/**
+ * 列式紧凑格式解码
+ *
+ * 对应 scripts/columnar_export.py 的输出：
+ * - {name}.columnar.json：字段列表与字符串列（低基数列为字典编码）
+ * - {name}.columnar.bin：小端数值列，按元素大小对齐，可直接映射为 TypedArray
+ *
+ * 解码结果与原始 {name}.json 完全一致（Record<key, record>）
+ */
+
+export type ColumnarNumericType =
+  | 'int8'
+  | 'int16'
+  | 'int32'
+  | 'uint8'
+  | 'uint16'
+  | 'float32'
+  | 'float64';
+
+export type ColumnarColumn =
+  | { name: string; type: ColumnarNumericType; offset: number }
+  | { name: string; type: 'bool'; offset: number }
+  | { name: string; type: 'dict'; codes: 'uint8' | 'uint16'; offset: number; values: string[] }
+  | { name: string; type: 'string' | 'json'; values: unknown[] };
+
+export interface ColumnarMeta {
+  format: 'columnar';
+  version: number;
+  count: number;
+  binary: string;
+  byteLength: number;
+  fields: string[];
+  columns: ColumnarColumn[];
+  keyColumn?: string;
+  keys?: string[];
+}
+
+/**
+ * formats.json：原始 JSON 路径 -> 可用的替代格式
+ */
+export interface FormatsManifest {
+  version: number;
+  datasets: Record<string, { columnar: string; binary: string; count: number }>;
+}
+
+export const COLUMNAR_VERSION = 1;
+
+const TYPED_ARRAYS = {
+  int8: Int8Array,
+  int16: Int16Array,
+  int32: Int32Array,
+  uint8: Uint8Array,
+  uint16: Uint16Array,
+  float32: Float32Array,
+  float64: Float64Array,
+} as const;
+
+function readNumeric(
+  buffer: ArrayBuffer,
+  type: ColumnarNumericType,
+  offset: number,
+  count: number,
+): ArrayLike<number> {
+  const Ctor = TYPED_ARRAYS[type];
+  if (offset + count * Ctor.BYTES_PER_ELEMENT > buffer.byteLength) {
+    throw new Error(`Columnar column out of range: ${type} @ ${offset}`);
+  }
+  // 导出时已按元素大小对齐；TypedArray 按平台字节序读取，浏览器均为小端
+  return new Ctor(buffer, offset, count);
+}
+
+/**
+ * 将列式元数据与二进制数值列还原为记录表
+ */
+export function decodeColumnar<T>(meta: ColumnarMeta, buffer: ArrayBuffer): Record<string, T> {
+  if (meta.format !== 'columnar' || meta.version !== COLUMNAR_VERSION) {
+    throw new Error(`Unsupported columnar format: ${meta.format} v${meta.version}`);
+  }
+  if (buffer.byteLength !== meta.byteLength) {
+    throw new Error(
+      `Columnar binary size mismatch: expected ${meta.byteLength}, got ${buffer.byteLength}`,
+    );
+  }
+
+  const { count } = meta;
+  const columns = new Map<string, ArrayLike<unknown>>();
+
+  for (const column of meta.columns) {
+    switch (column.type) {
+      case 'string':
+      case 'json':
+        columns.set(column.name, column.values);
+        break;
+      case 'bool': {
+        const raw = readNumeric(buffer, 'uint8', column.offset, count);
+        columns.set(column.name, Array.from(raw, (v) => v !== 0));
+        break;
+      }
+      case 'dict': {
+        const codes = readNumeric(buffer, column.codes, column.offset, count);
+        columns.set(column.name, Array.from(codes, (code) => column.values[code]));
+        break;
+      }
+      default:
+        columns.set(column.name, readNumeric(buffer, column.type, column.offset, count));
+    }
+  }
+
+  const keys = meta.keyColumn
+    ? (columns.get(meta.keyColumn) as ArrayLike<string>)
+    : (meta.keys ?? []);
+  if (keys.length !== count) {
+    throw new Error(`Columnar key count mismatch: expected ${count}, got ${keys.length}`);
+  }
+
+  const fieldColumns = meta.fields.map((field) => {
+    const values = columns.get(field);
+    if (!values) {
+      throw new Error(`Columnar field without column: ${field}`);
+    }
+    return values;
+  });
+
+  const result: Record<string, T> = {};
+  for (let i = 0; i < count; i++) {
+    const record: Record<string, unknown> = {};
+    for (let f = 0; f < meta.fields.length; f++) {
+      record[meta.fields[f]] = fieldColumns[f][i];
+    }
+    result[keys[i]] = record as T;
+  }
+  return result;
+}
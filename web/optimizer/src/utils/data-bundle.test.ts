@@ -0,0 +1,68 @@
+import { describe, it, expect } from 'vitest';
+import { bundleEntryRange, readBundleEntry, type BundleEntry } from './data-bundle';
+import type { ColumnarMeta } from './columnar-decoder';
+
+const encoder = new TextEncoder();
+
+/**
+ * 按 scripts/build_data_bundle.py 的布局构造：json 条目 + columnar 条目（二进制段 8 字节对齐）
+ */
+function buildBundle(): { bytes: Uint8Array; json: BundleEntry; columnar: BundleEntry } {
+  const jsonText = encoder.encode('{"1011":{"name":"安比"}}');
+  const meta: ColumnarMeta = {
+    format: 'columnar',
+    version: 1,
+    count: 1,
+    binary: 'enemy.columnar.bin',
+    byteLength: 8,
+    fields: ['id', 'hp'],
+    keyColumn: 'id',
+    columns: [
+      { name: 'id', type: 'string', values: ['3001'] },
+      { name: 'hp', type: 'float64', offset: 0 },
+    ],
+  };
+  const metaText = encoder.encode(JSON.stringify(meta));
+
+  const metaOffset = jsonText.length;
+  const binaryOffset = Math.ceil((metaOffset + metaText.length) / 8) * 8;
+  const bytes = new Uint8Array(binaryOffset + 8);
+  bytes.set(jsonText, 0);
+  bytes.set(metaText, metaOffset);
+  new DataView(bytes.buffer).setFloat64(binaryOffset, 1234.5, true);
+
+  return {
+    bytes,
+    json: { segment: 'index', format: 'json', offset: 0, length: jsonText.length },
+    columnar: {
+      segment: 'index',
+      format: 'columnar',
+      offset: metaOffset,
+      length: metaText.length,
+      binaryOffset,
+      binaryLength: 8,
+    },
+  };
+}
+
+describe('readBundleEntry', () => {
+  it('reads json and columnar entries from the whole bundle', () => {
+    const { bytes, json, columnar } = buildBundle();
+
+    expect(readBundleEntry(json, bytes)).toEqual({ '1011': { name: '安比' } });
+    expect(readBundleEntry(columnar, bytes)).toEqual({ '3001': { id: '3001', hp: 1234.5 } });
+  });
+
+  it('reads an entry from a range response', () => {
+    const { bytes, columnar } = buildBundle();
+    const [start, end] = bundleEntryRange(columnar);
+
+    const slice = bytes.slice(start, end);
+    expect(readBundleEntry(columnar, slice, start)).toEqual({ '3001': { id: '3001', hp: 1234.5 } });
+  });
+
+  it('rejects entries outside the provided bytes', () => {
+    const { bytes, json } = buildBundle();
+    expect(() => readBundleEntry({ ...json, offset: bytes.length }, bytes)).toThrow(/out of range/);
+  });
+});
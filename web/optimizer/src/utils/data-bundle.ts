@@ -0,0 +1,82 @@
+/**
+ * game-data 合并包解析
+ *
+ * 对应 scripts/build_data_bundle.py 的输出：
+ * - bundle.json：偏移表 {路径: 条目}，以及各段的文件名、大小、哈希
+ * - game-data.index.{hash}.bundle：索引文件内容首尾相接（启动时整段下载）
+ * - game-data.buff.{hash}.bundle：Buff 数据（按条目 Range 请求）
+ *
+ * 条目的偏移均相对所在段。条目格式：
+ * - json：[offset, offset + length) 为去掉空白的 JSON 文本
+ * - columnar：[offset, offset + length) 为列式元数据，
+ *   [binaryOffset, binaryOffset + binaryLength) 为二进制数值列（8 字节对齐）
+ */
+
+import { decodeColumnar, type ColumnarMeta } from './columnar-decoder';
+
+export interface BundleEntry {
+  segment: string;
+  format: 'json' | 'columnar';
+  offset: number;
+  length: number;
+  binaryOffset?: number;
+  binaryLength?: number;
+}
+
+export interface BundleSegment {
+  file: string;
+  size: number;
+  sha256: string;
+}
+
+export interface BundleIndex {
+  version: number;
+  dataVersion: string | null;
+  segments: Record<string, BundleSegment>;
+  entries: Record<string, BundleEntry>;
+}
+
+export const BUNDLE_VERSION = 2;
+
+/** 启动时整段下载的索引段 */
+export const BUNDLE_INDEX_SEGMENT = 'index';
+
+const textDecoder = new TextDecoder();
+
+/**
+ * 条目在所在段中覆盖的字节范围 [start, end)，用于 Range 请求
+ */
+export function bundleEntryRange(entry: BundleEntry): [number, number] {
+  const end =
+    entry.format === 'columnar'
+      ? (entry.binaryOffset ?? 0) + (entry.binaryLength ?? 0)
+      : entry.offset + entry.length;
+  return [entry.offset, end];
+}
+
+/**
+ * 从条目所在段（或其中一部分）中解析一个条目
+ *
+ * @param bytes 段内容；只取了一部分时 base 为该部分在段中的起始偏移
+ */
+export function readBundleEntry<T>(entry: BundleEntry, bytes: Uint8Array, base = 0): T {
+  const start = entry.offset - base;
+  if (start < 0 || start + entry.length > bytes.byteLength) {
+    throw new Error(`Bundle entry out of range: ${entry.offset}+${entry.length}`);
+  }
+  const text = textDecoder.decode(bytes.subarray(start, start + entry.length));
+
+  if (entry.format === 'json') {
+    return JSON.parse(text) as T;
+  }
+
+  const binaryStart = (entry.binaryOffset ?? 0) - base;
+  const binaryLength = entry.binaryLength ?? 0;
+  if (binaryStart < 0 || binaryStart + binaryLength > bytes.byteLength) {
+    throw new Error(`Bundle binary out of range: ${entry.binaryOffset}+${binaryLength}`);
+  }
+  // 复制出独立的 ArrayBuffer，保证 TypedArray 视图从偏移 0 开始、满足对齐要求
+  const absoluteStart = bytes.byteOffset + binaryStart;
+  const binary = bytes.buffer.slice(absoluteStart, absoluteStart + binaryLength) as ArrayBuffer;
+  return decodeColumnar(JSON.parse(text) as ColumnarMeta, binary) as T;
+}
@@ -0,0 +1,20 @@
+import { describe, it, expect } from 'vitest';
+import { precompressedPath } from './precompressed';
+
+describe('precompressedPath', () => {
+  it('启用 gzip 时 game-data JSON 改取 .json.gz', () => {
+    expect(precompressedPath('/game-data/character.json', 'gzip')).toBe('/game-data/character.json.gz');
+    expect(precompressedPath('/game-data/character/1011.json', 'gzip')).toBe('/game-data/character/1011.json.gz');
+  });
+
+  it('未启用时保持原路径', () => {
+    expect(precompressedPath('/game-data/character.json', undefined)).toBeNull();
+    expect(precompressedPath('/game-data/character.json', '')).toBeNull();
+  });
+
+  it('非 JSON 或非 game-data 路径不改写', () => {
+    expect(precompressedPath('/game-data/enemy.columnar.bin', 'gzip')).toBeNull();
+    expect(precompressedPath('/game-data/game-data.e812e6a84e5d.bundle', 'gzip')).toBeNull();
+    expect(precompressedPath('/index.json', 'gzip')).toBeNull();
+  });
+});
@@ -0,0 +1,33 @@
+/**
+ * game-data 预压缩文件
+ *
+ * 发布时 scripts/publish_game_data.py 为 dist/game-data 下的 JSON 生成 .gz 旁路文件，
+ * netlify.toml 为其设置 Content-Encoding: gzip，浏览器取回后按原始 JSON 解码。
+ * 只有构建时设置了 VITE_PRECOMPRESSED_DATA=gzip 才请求 .gz（开发服务器与 vite preview 没有这些文件）。
+ */
+
+const PRECOMPRESSED_ENCODING: string | undefined = import.meta.env.VITE_PRECOMPRESSED_DATA;
+
+/**
+ * JSON 路径对应的预压缩文件路径；未启用或不是 game-data JSON 时返回 null
+ */
+export function precompressedPath(path: string, encoding = PRECOMPRESSED_ENCODING): string | null {
+  if (encoding !== 'gzip' || !path.startsWith('/game-data/') || !path.endsWith('.json')) {
+    return null;
+  }
+  return `${path}.gz`;
+}
+
+/**
+ * 加载 game-data 文件：优先请求预压缩文件，缺失时（404 或 SPA 回退的 HTML）回退到原始路径
+ */
+export async function fetchGameData(path: string): Promise<Response> {
+  const variant = precompressedPath(path);
+  if (variant) {
+    const response = await fetch(variant);
+    if (response.ok && !response.headers.get('content-type')?.includes('text/html')) {
+      return response;
+    }
+  }
+  return fetch(path);
+}
@@ -9,17 +9,18 @@ export interface AgentSpecialRule {
   stunVulnerabilityCap?: number;
 }
 
-const AGENT_SPECIAL_RULES_BY_CN_NAME: Record<string, AgentSpecialRule> = {
-  // 叶瞬光：强制视为失衡，失衡易伤乘区上限 2.1
-  叶瞬光: {
+/** 按角色 game_id 索引（中文名会随本地化/改名变化，不适合作为键） */
+const AGENT_SPECIAL_RULES: Record<string, AgentSpecialRule> = {
+  // 1431 叶瞬光：强制视为失衡，失衡易伤乘区上限 2.1
+  '1431': {
     forceStunned: true,
     stunVulnerabilityCap: 2.1,
   },
 };
 
-export function getAgentSpecialRuleByCnName(nameCn?: string | null): AgentSpecialRule | null {
-  if (!nameCn) return null;
-  return AGENT_SPECIAL_RULES_BY_CN_NAME[nameCn] ?? null;
+export function getAgentSpecialRule(gameId?: string | null): AgentSpecialRule | null {
+  if (!gameId) return null;
+  return AGENT_SPECIAL_RULES[gameId] ?? null;
 }
 
 const LIESHUANG_ELEMENT = 'lieshuang';
@@ -0,0 +1,89 @@
+import { describe, it, expect } from 'vitest';
+import {
+  expandWeaponBuffData,
+  weaponTalentSlotStats,
+  type WeaponTalentTable,
+} from './weapon-talent-table';
+import { PROP_IDX } from '../optimizer/types/property-index';
+
+/**
+ * 按 scripts/build_weapon_talent_table.py 的布局构造：一个音擎，一个槽位，两列（ATK_, CRIT_）
+ */
+function buildFixture(): WeaponTalentTable {
+  const levels = [1, 2, 3, 4, 5];
+  return {
+    version: 1,
+    refinements: 5,
+    columns: [PROP_IDX.ATK_, PROP_IDX.CRIT_],
+    columnNames: ['ATK_', 'CRIT_'],
+    weapons: {
+      '14001': {
+        wengine_id: '14001',
+        code_name: 'Weapon_S_Test',
+        name: '测试音擎',
+        rarity: 4,
+        weapon_type: '强攻',
+        talents: {
+          name: levels.map(() => '天赋'),
+          description: levels.map((r) => `描述${r}`),
+        },
+        slots: [
+          {
+            fields: ['id', 'name', 'description', 'in_combat_stats', 'out_of_combat_stats', 'trigger_conditions'],
+            cols: [0, 1],
+            in: [0, 0.1, 0, 0.115, 0, 0.13, 0, 0.145, 0, 0.16],
+            out: [0.08, 0, 0.09, 0, 0.1, 0, 0.11, 0, 0.12, 0],
+            const: { trigger_conditions: '发动[普通攻击]时' },
+            perLevel: { description: levels.map((r) => `Buff 描述${r}`) },
+            templates: { id: '14001_talent_{r}_1', name: '测试音擎-精{r}' },
+          },
+        ],
+      },
+    },
+    skipped: [],
+  };
+}
+
+describe('expandWeaponBuffData', () => {
+  it('restores the weapon_data_buff file layout', () => {
+    const data = expandWeaponBuffData(buildFixture(), '14001');
+
+    expect(data.wengine_id).toBe('14001');
+    expect(data.talents).toHaveLength(5);
+    expect(data.talents[2]).toEqual({
+      level: 3,
+      name: '天赋',
+      description: '描述3',
+      buffs: [
+        {
+          id: '14001_talent_3_1',
+          name: '测试音擎-精3',
+          description: 'Buff 描述3',
+          in_combat_stats: { CRIT_: 0.13 },
+          out_of_combat_stats: { ATK_: 0.1 },
+          trigger_conditions: '发动[普通攻击]时',
+        },
+      ],
+    });
+    expect(Object.keys(data.talents[0].buffs[0])).toEqual(buildFixture().weapons['14001'].slots[0].fields);
+  });
+
+  it('returns null for weapons missing from the table', () => {
+    expect(expandWeaponBuffData(buildFixture(), '99999')).toBeNull();
+  });
+});
+
+describe('weaponTalentSlotStats', () => {
+  it('reads one refinement row into property arrays', () => {
+    const [slot] = weaponTalentSlotStats(buildFixture(), '14001', 5)!;
+    expect(slot.inCombat).toHaveLength(PROP_IDX.TOTAL_PROPS);
+    expect(slot.inCombat[PROP_IDX.CRIT_]).toBe(0.16);
+    expect(slot.outOfCombat[PROP_IDX.ATK_]).toBe(0.12);
+    expect(slot.inCombat[PROP_IDX.ATK_]).toBe(0);
+  });
+
+  it('rejects unsupported table versions', () => {
+    const table = { ...buildFixture(), version: 2 };
+    expect(() => weaponTalentSlotStats(table, '14001', 1)).toThrow();
+  });
+});
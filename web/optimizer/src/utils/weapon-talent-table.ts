@@ -0,0 +1,137 @@
+/**
+ * 音擎天赋属性表解析
+ *
+ * 对应 scripts/build_weapon_talent_table.py 的输出 weapon_talents.json：
+ * - columns / columnNames：所有音擎共用的属性列（PROP_IDX，升序）
+ * - weapons[id].slots：同一音擎各精炼等级中位置相同的 Buff
+ *   - cols：用到的列（columns 中的下标）
+ *   - in / out：局内 / 局外属性的稠密表 [精炼 × cols.length]，按行展开（全为 0 时省略）
+ *   - const / perLevel / templates：其余字段（templates 中 {r} 为精炼等级）
+ *
+ * expandWeaponBuffData 还原出与 weapon_data_buff/{id}.json 相同的结构，供 Buff.fromBuffData 使用；
+ * weaponTalentSlotStats 直接取某个精炼等级的属性数组，无需构建 Buff 对象。
+ */
+
+import { PROP_IDX } from '../optimizer/types/property-index';
+
+export interface WeaponTalentSlot {
+  /** 原 Buff 的字段顺序 */
+  fields: string[];
+  cols: number[];
+  in?: number[];
+  out?: number[];
+  /** 无法映射到 PROP_IDX 的属性（每个精炼等级一项） */
+  extraIn?: Record<string, unknown>[];
+  extraOut?: Record<string, unknown>[];
+  const?: Record<string, unknown>;
+  perLevel?: Record<string, unknown[]>;
+  templates?: Record<string, string>;
+}
+
+export interface WeaponTalentEntry {
+  wengine_id: string;
+  code_name: string;
+  name: string;
+  rarity: number;
+  weapon_type: string;
+  talents: { name: string[]; description: string[] };
+  slots: WeaponTalentSlot[];
+  [key: string]: unknown;
+}
+
+export interface WeaponTalentTable {
+  version: number;
+  refinements: number;
+  columns: number[];
+  columnNames: string[];
+  weapons: Record<string, WeaponTalentEntry>;
+  /** 天赋结构不规则、需回退到原文件的音擎 */
+  skipped: string[];
+}
+
+export const WEAPON_TALENT_TABLE_VERSION = 1;
+
+const STAT_FIELDS: Record<string, ['in' | 'out', 'extraIn' | 'extraOut']> = {
+  in_combat_stats: ['in', 'extraIn'],
+  out_of_combat_stats: ['out', 'extraOut'],
+};
+
+function checkVersion(table: WeaponTalentTable): void {
+  if (table.version !== WEAPON_TALENT_TABLE_VERSION) {
+    throw new Error(`Unsupported weapon talent table version: ${table.version}`);
+  }
+}
+
+/**
+ * 还原为 weapon_data_buff/{id}.json 的结构，音擎不在表中时返回 null
+ */
+export function expandWeaponBuffData(table: WeaponTalentTable, weaponId: string): any | null {
+  const weapon = table.weapons[weaponId];
+  if (!weapon) return null;
+  checkVersion(table);
+
+  const { talents: talentFields, slots, ...info } = weapon;
+  const talents = [];
+  for (let r = 1; r <= table.refinements; r++) {
+    const buffs = slots.map((slot) => {
+      const width = slot.cols.length;
+      const buff: Record<string, unknown> = {};
+      for (const field of slot.fields) {
+        const statField = STAT_FIELDS[field];
+        if (statField) {
+          const [key, extraKey] = statField;
+          const stats: Record<string, unknown> = {};
+          const values = slot[key];
+          if (values) {
+            for (let i = 0; i < width; i++) {
+              const value = values[(r - 1) * width + i];
+              if (value !== 0) stats[table.columnNames[slot.cols[i]]] = value;
+            }
+          }
+          Object.assign(stats, slot[extraKey]?.[r - 1]);
+          buff[field] = stats;
+        } else if (slot.const && field in slot.const) {
+          buff[field] = slot.const[field];
+        } else if (slot.templates && field in slot.templates) {
+          buff[field] = slot.templates[field].replace('{r}', String(r));
+        } else {
+          buff[field] = slot.perLevel?.[field]?.[r - 1];
+        }
+      }
+      return buff;
+    });
+    talents.push({
+      level: r,
+      name: talentFields.name[r - 1],
+      description: talentFields.description[r - 1],
+      buffs,
+    });
+  }
+  return { ...info, talents };
+}
+
+/**
+ * 某个精炼等级下各 Buff 槽位的属性数组（长度 PROP_IDX.TOTAL_PROPS），音擎不在表中时返回 null
+ */
+export function weaponTalentSlotStats(
+  table: WeaponTalentTable,
+  weaponId: string,
+  refinement: number
+): { inCombat: Float64Array; outOfCombat: Float64Array }[] | null {
+  const weapon = table.weapons[weaponId];
+  if (!weapon) return null;
+  checkVersion(table);
+
+  const row = Math.min(Math.max(refinement, 1), table.refinements) - 1;
+  return weapon.slots.map((slot) => {
+    const inCombat = new Float64Array(PROP_IDX.TOTAL_PROPS);
+    const outOfCombat = new Float64Array(PROP_IDX.TOTAL_PROPS);
+    const width = slot.cols.length;
+    for (let i = 0; i < width; i++) {
+      const idx = table.columns[slot.cols[i]];
+      if (slot.in) inCombat[idx] = slot.in[row * width + i];
+      if (slot.out) outOfCombat[idx] = slot.out[row * width + i];
+    }
+    return { inCombat, outOfCombat };
+  });
+}